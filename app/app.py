@@ -6,7 +6,9 @@ import os
 from datetime import datetime, date
 import json
 # Import enhanced models
-from app.models.database import init_db
+from app.models.database import ensure_schema, init_app as init_database
+from app import cli, scheduler
+from app.utils import query_stats
 from app.models.user import User
 from app.models.member import Member
 from app.models.trainer import Trainer
@@ -40,6 +42,23 @@ def create_app():
         'DATABASE_PATH',
         'gym_management.db'
     )
+    # Connection pool: one reused connection per request/app context (0 disables pooling)
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', '10'))
+    app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    # 'production' enables WAL + busy timeout; DB_WRITE_QUEUE serializes writes through one thread
+    app.config['DB_PROFILE'] = os.environ.get('DB_PROFILE', 'default')
+    app.config['DB_WRITE_QUEUE'] = os.environ.get('DB_WRITE_QUEUE', '0') == '1'
+    app.config['DB_READ_ONLY_READERS'] = os.environ.get(
+        'DB_READ_ONLY_READERS',
+        '1' if app.config['DB_PROFILE'] == 'production' else '0'
+    ) == '1'
+    # Kiosk check-ins are queued and committed in batches (app/models/checkin.py)
+    app.config['KIOSK_FLUSH_INTERVAL'] = float(os.environ.get('KIOSK_FLUSH_INTERVAL', '0.5'))
+    app.config['KIOSK_FLUSH_BATCH'] = int(os.environ.get('KIOSK_FLUSH_BATCH', '200'))
+    init_database(app)
+    # Query instrumentation (per-request counts/timings, slow-query log, /admin/_perf)
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', '200'))
+    query_stats.init_app(app)
     
     # Mail configuration
     app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -60,9 +79,16 @@ def create_app():
     bcrypt = Bcrypt(app)
     app.bcrypt = bcrypt
     
-    # Initialize database inside app context (required because seeding uses current_app / bcrypt)
-    with app.app_context():
-        init_db(app.config['DATABASE_PATH'])
+    # Create/upgrade the schema only when its version is behind (one query on a
+    # warm database). Demo data is inserted explicitly with `flask seed-db`.
+    ensure_schema(app.config['DATABASE_PATH'])
+    cli.init_app(app)
+
+    # Background jobs: either SCHEDULER_ENABLED=1 (thread per worker, leased so
+    # only one runs each job) or `flask run-jobs` from cron
+    app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', '0') == '1'
+    app.config['SCHEDULER_TICK_SECONDS'] = float(os.environ.get('SCHEDULER_TICK_SECONDS', '60'))
+    scheduler.init_app(app)
 
     app.config.setdefault('SESSION_COOKIE_SECURE', False)   # must be False for http://127.0.0.1
     app.config.setdefault('SESSION_COOKIE_SAMESITE', 'Lax')
@@ -158,5 +184,6 @@ def create_app():
 
 
 if __name__ == '__main__':
+    os.environ.setdefault('SCHEDULER_ENABLED', '1')
     app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,69 @@
+"""Flask CLI commands for database maintenance.
+
+    flask --app app.app init-db     create/upgrade the schema
+    flask --app app.app seed-db     insert the demo admin, trainers, members and history
+    flask --app app.app run-jobs    run the due background jobs (schedule it from cron)
+    flask --app app.app rebuild-rollups   recompute the revenue/attendance rollups
+"""
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import scheduler
+from app.models import database
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create or upgrade the database schema."""
+    db_path = current_app.config['DATABASE_PATH']
+    if database.init_db(db_path):
+        click.echo(f"Schema at version {database.SCHEMA_VERSION}: {db_path}")
+    else:
+        click.echo(f"Schema already at version {database.SCHEMA_VERSION}: {db_path}")
+
+
+@click.command('seed-db')
+@with_appcontext
+def seed_db_command():
+    """Insert demo data into empty tables (existing rows are left alone)."""
+    db_path = current_app.config['DATABASE_PATH']
+    database.seed_db(db_path)
+    click.echo(f"Seeded {db_path}")
+
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Recompute daily_revenue, daily_attendance and member_attendance_stats from payments and attendance."""
+    db_path = current_app.config['DATABASE_PATH']
+    database.rebuild_rollups(db_path)
+    click.echo(f"Rebuilt rollups: {db_path}")
+
+
+@click.command('run-jobs')
+@click.option('--job', 'names', multiple=True, help='Only run this job (repeatable).')
+@click.option('--force', is_flag=True, help='Run even if the job is not due yet.')
+@click.option('--loop', is_flag=True, help='Keep running, checking every SCHEDULER_TICK_SECONDS.')
+@with_appcontext
+def run_jobs_command(names, force, loop):
+    """Run background jobs that are due (payment reminders/cancellations, ...)."""
+    unknown = set(names) - set(scheduler.JOBS)
+    if unknown:
+        raise click.BadParameter(f"unknown job(s): {', '.join(sorted(unknown))}", param_hint='--job')
+    while True:
+        for name, run_id in scheduler.run_due_jobs(names, force=force).items():
+            click.echo(f"{name}: run #{run_id}" if run_id else f"{name}: not due or locked by another worker")
+        if not loop:
+            break
+        time.sleep(current_app.config['SCHEDULER_TICK_SECONDS'])
+
+
+def init_app(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_db_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(run_jobs_command)
@@ -1,6 +1,7 @@
 from datetime import date
 from flask import current_app
 from app.models.database import execute_query
+from app.models.rows import RowMapper
 
 
 class Announcement:
@@ -20,95 +21,60 @@ class Announcement:
         self.created_at = created_at   # ✅ timestamp when created
 
     @classmethod
-    def get_all(cls):
-        """Fetch all announcements (admin use only)"""
+    def get_all(cls, limit=None):
+        """Fetch all announcements, newest first (admin use only)"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = '''SELECT * FROM announcements ORDER BY id DESC'''
-        results = execute_query(query, fetch=True)
-        
-        announcements = []
-        for row in results:
-            announcements.append(cls(
-                id=row[0], title=row[1], content=row[2], announcement_type=row[3],
-                target_audience=row[4], is_public=bool(row[5]), is_active=bool(row[6]),
-                start_date=row[7], end_date=row[8], created_by=row[9], created_at=row[10]
-            ))
-        return announcements
+        query = f'SELECT {ANNOUNCEMENT.select} FROM announcements ORDER BY id DESC'
+        params = ()
+        if limit is not None:
+            query += ' LIMIT ?'
+            params = (limit,)
+        results = execute_query(query, params, db_path, fetch=True)
+        return ANNOUNCEMENT.all(results)
 
     @classmethod
     def get_public_announcements(cls):
         """Get public announcements for home page"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         today = date.today()
-        query = '''SELECT * FROM announcements 
+        query = f'''SELECT {ANNOUNCEMENT.select} FROM announcements
           WHERE is_public = 1 AND is_active = 1 
           AND (start_date IS NULL OR start_date <= ?)
           AND (end_date IS NULL OR end_date >= ?)
           ORDER BY id DESC LIMIT 5''' 
         results = execute_query(query, (today, today), db_path, fetch=True)
-        
-        announcements = []
-        for row in results:
-            announcements.append(cls(
-                id=row[0], title=row[1], content=row[2], announcement_type=row[3],
-                target_audience=row[4], is_public=bool(row[5]), is_active=bool(row[6]),
-                start_date=row[7], end_date=row[8], created_by=row[9], created_at=row[10]
-            ))
-        return announcements
+        return ANNOUNCEMENT.all(results)
     
     @classmethod
     def get_for_role(cls, role):
         """Get announcements for specific role"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         today = date.today()
-        query = '''SELECT * FROM announcements 
+        query = f'''SELECT {ANNOUNCEMENT.select} FROM announcements
           WHERE is_active = 1 
           AND (target_audience = 'all' OR target_audience = ?)
           AND (start_date IS NULL OR start_date <= ?)
           AND (end_date IS NULL OR end_date >= ?)
           ORDER BY id DESC''' 
         results = execute_query(query, (role, today, today), db_path, fetch=True)
-        
-        announcements = []
-        for row in results:
-            announcements.append(cls(
-                id=row[0], title=row[1], content=row[2], announcement_type=row[3],
-                target_audience=row[4], is_public=bool(row[5]), is_active=bool(row[6]),
-                start_date=row[7], end_date=row[8], created_by=row[9], created_at=row[10]
-            ))
-        return announcements
+        return ANNOUNCEMENT.all(results)
 
     @classmethod
     def get_by_id(cls, announcement_id):
         """Fetch a single announcement by ID"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM announcements WHERE id = ?'
+        query = f'SELECT {ANNOUNCEMENT.select} FROM announcements WHERE id = ?'
         result = execute_query(query, (announcement_id,), db_path, fetch=True)
         
-        if result:
-            row = result[0]
-            return cls(
-                id=row[0], title=row[1], content=row[2], announcement_type=row[3],
-                target_audience=row[4], is_public=bool(row[5]), is_active=bool(row[6]),
-                start_date=row[7], end_date=row[8], created_by=row[9], created_at=row[10]
-            )
-        return None
+        return ANNOUNCEMENT.one(result[0]) if result else None
 
     @classmethod
     def get_by_creator(cls, creator_id):
         """Fetch all announcements created by a specific trainer/user"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM announcements WHERE created_by = ? ORDER BY id DESC'
+        query = f'SELECT {ANNOUNCEMENT.select} FROM announcements WHERE created_by = ? ORDER BY id DESC'
         results = execute_query(query, (creator_id,), db_path, fetch=True)
-        
-        announcements = []
-        for row in results:
-            announcements.append(cls(
-                id=row[0], title=row[1], content=row[2], announcement_type=row[3],
-                target_audience=row[4], is_public=bool(row[5]), is_active=bool(row[6]),
-                start_date=row[7], end_date=row[8], created_by=row[9], created_at=row[10]
-            ))
-        return announcements
+        return ANNOUNCEMENT.all(results)
 
     def save(self):
         """Save announcement to database"""
@@ -146,3 +112,9 @@ class Announcement:
         query = 'UPDATE announcements SET is_active = 0 WHERE id = ?'
         execute_query(query, (self.id,), db_path)
         self.is_active = False
+
+
+ANNOUNCEMENT = RowMapper(Announcement, [
+    'id', 'title', 'content', 'announcement_type', 'target_audience',
+    'is_public', 'is_active', 'start_date', 'end_date', 'created_by', 'created_at',
+], converters={'is_public': bool, 'is_active': bool})
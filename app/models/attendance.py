@@ -1,7 +1,28 @@
 # models/attendance.py - MINIMAL CHANGES VERSION
-from .database import execute_query
+from .database import execute_query, execute_many, execute_update, transaction
+from .availability import AvailabilityIndex
+from .time_slot import slot_catalog
+from app.utils.helpers import month_bounds
+from app.utils.pagination import DEFAULT_PAGE_SIZE, build_page, keyset_filter
 from flask import current_app
-from datetime import date, datetime, time as dtime
+from datetime import date, datetime, timedelta, time as dtime
+
+# Explicit column list instead of SELECT * so columns added later (slot_end_at)
+# do not shift the joined extras that _from_attendance_row reads by position
+COLUMNS = ('id', 'member_id', 'trainer_id', 'check_in_time', 'check_out_time', 'date',
+           'time_slot', 'workout_type', 'notes', 'status', 'created_at', 'time_slot_id')
+SELECT_COLUMNS = ', '.join(COLUMNS)
+SELECT_A_COLUMNS = ', '.join(f'a.{c}' for c in COLUMNS)
+
+# Schedules sort by the slot's start minute; joined as s
+SLOT_JOIN = "LEFT JOIN time_slots s ON s.id = a.time_slot_id"
+
+# Counts for a member with no member_attendance_stats row yet
+EMPTY_MEMBER_STATS = {'present': 0, 'absent': 0, 'late': 0, 'total': 0}
+
+# Sessions marked per reconcile_expired call, and its progress marker in watermarks
+RECONCILE_BATCH = 500
+RECONCILE_WATERMARK = 'attendance_absent'
 
 def _parse_date(d):
     """Return a date object for ISO-like strings or human-readable formats."""
@@ -88,6 +109,54 @@ def _slot_to_datetimes(slot_label, on_date=None):
     dt2 = datetime.combine(on_date, t2) if t2 else None
     return (dt1.isoformat() if dt1 else None, dt2.isoformat() if dt2 else None)
 
+def slot_end_at(time_slot, on_date):
+    """
+    When a session on ``on_date`` in ``time_slot`` is over, as an ISO timestamp.
+    - the slot's end time when the label has one ('6:00 AM - 8:00 AM')
+    - an hour after the start for single-time labels ('6:00 AM')
+    - midnight after ``on_date`` for labels that cannot be parsed ('Morning')
+    Stored in attendance.slot_end_at so auto_mark_absent is a single UPDATE.
+    """
+    on_date = _parse_date(on_date)
+    if not on_date:
+        return None
+    start_iso, end_iso = _slot_to_datetimes(time_slot, on_date=on_date)
+    if end_iso:
+        return end_iso
+    if start_iso:
+        return (datetime.fromisoformat(start_iso) + timedelta(hours=1)).isoformat()
+    return datetime.combine(on_date + timedelta(days=1), dtime.min).isoformat()
+
+
+def fill_slot_end_times(db_path, scheduled_only=True):
+    """
+    Set slot_end_at on rows that lack it (written by code that bypasses save()).
+    Rows with a time_slot_id take the slot's end minute in SQL; the rest are
+    handled per distinct (date, time_slot) pair, so each label is parsed once.
+    Returns the number of rows updated.
+    """
+    status_filter = "status = 'scheduled' AND " if scheduled_only else ""
+    filled = execute_update(
+        f"""UPDATE attendance SET slot_end_at = (
+                SELECT strftime('%Y-%m-%dT%H:%M:%S', attendance.date, '+' || s.end_minute || ' minutes')
+                FROM time_slots s WHERE s.id = attendance.time_slot_id)
+            WHERE {status_filter}slot_end_at IS NULL AND time_slot_id IS NOT NULL""",
+        (), db_path
+    )
+    pairs = execute_query(
+        f"SELECT date, time_slot FROM attendance WHERE {status_filter}slot_end_at IS NULL GROUP BY date, time_slot",
+        (), db_path, fetch=True
+    ) or []
+    updates = [(slot_end_at(slot, day), day, slot) for day, slot in pairs]
+    updates = [u for u in updates if u[0]]
+    if not updates:
+        return filled
+    return filled + execute_many(
+        f"UPDATE attendance SET slot_end_at = ? WHERE {status_filter}slot_end_at IS NULL AND date = ? AND time_slot IS ?",
+        updates, db_path
+    )
+
+
 def _datetimes_to_slot(check_in_iso, check_out_iso):
     """
     Convert two ISO datetimes (strings or datetime) to a label like '6:00 AM - 8:00 AM'.
@@ -112,12 +181,13 @@ class Attendance:
     def __init__(self, id=None, member_id=None, trainer_id=None,
                  time_slot=None, check_in_time=None, check_out_time=None,
                  date=None, workout_type=None, notes=None,
-                 status='present', created_at=None, updated_at=None):
+                 status='present', created_at=None, updated_at=None, time_slot_id=None):
         # Keep time_slot and check_in/check_out both available.
         self.id = id
         self.member_id = member_id
         self.trainer_id = trainer_id
         self.time_slot = time_slot  # descriptive slot label
+        self.time_slot_id = time_slot_id  # time_slots.id (None for free-text labels)
         # store parsed datetimes internally
         self.check_in_time = _parse_datetime(check_in_time)
         self.check_out_time = _parse_datetime(check_out_time)
@@ -145,7 +215,7 @@ class Attendance:
         if not row:
             return None
 
-        # Expected columns: id, member_id, trainer_id, check_in_time, check_out_time, date, time_slot, workout_type, notes, status, created_at
+        # Expected columns: COLUMNS (id, ..., created_at, time_slot_id), then joined extras
         att = cls(
             id=row[0],
             member_id=row[1],
@@ -158,20 +228,21 @@ class Attendance:
             notes=row[8] if len(row) > 8 else None,
             status=row[9] if len(row) > 9 else 'scheduled',
             created_at=row[10] if len(row) > 10 else None,
+            time_slot_id=row[11] if len(row) > 11 else None,
         )
 
         # Handle joined extras (member_name, trainer_name, etc.)
-        if len(row) > 11:
+        width = len(COLUMNS)
+        if len(row) > width:
             if extras_order:
                 for i, name in enumerate(extras_order):
-                    if i < len(row) - 11:
-                        setattr(att, name, row[11 + i])
+                    if i < len(row) - width:
+                        setattr(att, name, row[width + i])
             else:
                 # Default handling for backwards compatibility
-                if len(row) > 11:
-                    att.member_name = row[11]
-                if len(row) > 12:
-                    att.trainer_name = row[12]
+                att.member_name = row[width]
+                if len(row) > width + 1:
+                    att.trainer_name = row[width + 1]
 
         # If time_slot is missing but we have check_in/check_out, derive it
         if not att.time_slot and (att.check_in_time or att.check_out_time):
@@ -183,7 +254,7 @@ class Attendance:
     @classmethod
     def get_by_id(cls, attendance_id):
         db_path = cls._db_path()
-        rows = execute_query("SELECT * FROM attendance WHERE id = ?", (attendance_id,), db_path, fetch=True)
+        rows = execute_query(f"SELECT {SELECT_COLUMNS} FROM attendance WHERE id = ?", (attendance_id,), db_path, fetch=True)
         return cls._from_attendance_row(rows[0]) if rows else None
 
     @classmethod
@@ -195,8 +266,8 @@ class Attendance:
         db_path = cls._db_path()
         date_param = attendance_date.isoformat() if isinstance(attendance_date, date) else attendance_date
         
-        query = """
-            SELECT * FROM attendance
+        query = f"""
+            SELECT {SELECT_COLUMNS} FROM attendance
             WHERE trainer_id=? AND member_id=? AND date=? AND time_slot = ?
             LIMIT 1
         """ 
@@ -213,15 +284,16 @@ class Attendance:
     def get_attendance_by_date(cls, attendance_date):
         db_path = cls._db_path()
         date_param = attendance_date.isoformat() if isinstance(attendance_date, date) else attendance_date
-        query = '''
-            SELECT a.*, um.full_name as member_name, ut.full_name as trainer_name
+        query = f'''
+            SELECT {SELECT_A_COLUMNS}, um.full_name as member_name, ut.full_name as trainer_name
             FROM attendance a
             LEFT JOIN members m ON a.member_id = m.id
             LEFT JOIN users um ON m.user_id = um.id
             LEFT JOIN trainers t ON a.trainer_id = t.id
             LEFT JOIN users ut ON t.user_id = ut.id
+            {SLOT_JOIN}
             WHERE a.date = ?
-            ORDER BY a.time_slot, a.check_in_time
+            ORDER BY s.start_minute, a.check_in_time
         '''
         results = execute_query(query, (date_param,), db_path, fetch=True)
         return [cls._from_attendance_row(r, extras_order=['member_name', 'trainer_name']) for r in results]
@@ -232,13 +304,14 @@ class Attendance:
             attendance_date = date.today()
         db_path = cls._db_path()
         date_param = attendance_date.isoformat() if isinstance(attendance_date, date) else attendance_date
-        query = '''
-            SELECT a.*, um.full_name as member_name
+        query = f'''
+            SELECT {SELECT_A_COLUMNS}, um.full_name as member_name
             FROM attendance a
             LEFT JOIN members m ON a.member_id = m.id
             LEFT JOIN users um ON m.user_id = um.id
+            {SLOT_JOIN}
             WHERE a.trainer_id = ? AND a.date = ?
-            ORDER BY a.time_slot, a.check_in_time
+            ORDER BY s.start_minute, a.check_in_time
         '''
         results = execute_query(query, (trainer_id, date_param), db_path, fetch=True)
         return [cls._from_attendance_row(r, extras_order=['member_name']) for r in results]
@@ -246,32 +319,57 @@ class Attendance:
     @classmethod
     def get_member_attendance(cls, member_id, limit=10):
         db_path = cls._db_path()
-        query = '''
-            SELECT a.*, ut.full_name as trainer_name
+        query = f'''
+            SELECT {SELECT_A_COLUMNS}, ut.full_name as trainer_name
             FROM attendance a
             LEFT JOIN trainers t ON a.trainer_id = t.id
             LEFT JOIN users ut ON t.user_id = ut.id
+            {SLOT_JOIN}
             WHERE a.member_id = ?
-            ORDER BY a.date DESC, a.time_slot DESC
+            ORDER BY a.date DESC, s.start_minute DESC
             LIMIT ?
         '''
         results = execute_query(query, (member_id, limit), db_path, fetch=True)
         return [cls._from_attendance_row(r, extras_order=['trainer_name']) for r in results]
 
+    @classmethod
+    def get_member_attendance_page(cls, member_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        One page of a member's history, newest first, keyset-paginated on
+        (date, id) over idx_attendance_member_date. ``cursor`` is the
+        previous page's next_cursor; ValueError if it is malformed.
+        """
+        db_path = cls._db_path()
+        after, after_params = keyset_filter('a.date', 'a.id', cursor)
+        query = f'''
+            SELECT {SELECT_A_COLUMNS}, ut.full_name as trainer_name
+            FROM attendance a
+            LEFT JOIN trainers t ON a.trainer_id = t.id
+            LEFT JOIN users ut ON t.user_id = ut.id
+            WHERE a.member_id = ? {after}
+            ORDER BY a.date DESC, a.id DESC
+            LIMIT ?
+        '''
+        rows = execute_query(query, (member_id, *after_params, limit + 1), db_path, fetch=True) or []
+        page = build_page(rows, limit, key=lambda row: (row[5], row[0]))
+        page.items = [cls._from_attendance_row(r, extras_order=['trainer_name']) for r in page.items]
+        return page
+
     @classmethod
     def get_trainer_schedule(cls, trainer_id, attendance_date=None):
         if attendance_date is None:
             attendance_date = date.today()
         db_path = cls._db_path()
         date_param = attendance_date.isoformat() if isinstance(attendance_date, date) else attendance_date
-        query = '''
-            SELECT a.*, um.full_name as member_name, u.phone as member_phone
+        query = f'''
+            SELECT {SELECT_A_COLUMNS}, um.full_name as member_name, u.phone as member_phone
             FROM attendance a
             LEFT JOIN members m ON a.member_id = m.id
             LEFT JOIN users um ON m.user_id = um.id
             LEFT JOIN users u ON m.user_id = u.id
+            {SLOT_JOIN}
             WHERE a.trainer_id = ? AND a.date = ?
-            ORDER BY a.time_slot, a.check_in_time
+            ORDER BY s.start_minute, a.check_in_time
         '''
         results = execute_query(query, (trainer_id, date_param), db_path, fetch=True)
         return [cls._from_attendance_row(r, extras_order=['member_name', 'member_phone']) for r in results]
@@ -279,28 +377,17 @@ class Attendance:
     @classmethod
     def check_slot_availability(cls, trainer_id, time_slot, attendance_date=None, exclude_attendance_id=None):
         """
-        Return True if the trainer has NO booking at the given time_slot and date.
+        Return True if the trainer has NO booking overlapping the given time_slot on that date.
+        time_slot is a slot id, a slot label or a TimeSlot; bookings are compared by their
+        slot's start/end minutes, or by label for rows without a time_slot_id.
         If exclude_attendance_id is provided, ignore that attendance row (useful for rescheduling).
+        Answered from the AvailabilityIndex, so repeated checks for a trainer/day are free.
         """
-        if attendance_date is None:
-            attendance_date = date.today()
         db_path = cls._db_path()
-        date_param = attendance_date.isoformat() if isinstance(attendance_date, date) else attendance_date
-
-        if exclude_attendance_id:
-            query = '''
-                SELECT COUNT(*) FROM attendance
-                WHERE trainer_id = ? AND time_slot = ? AND date = ? AND id != ?
-            '''
-            result = execute_query(query, (trainer_id, time_slot, date_param, exclude_attendance_id), db_path, fetch=True)
-        else:
-            query = '''
-                SELECT COUNT(*) FROM attendance
-                WHERE trainer_id = ? AND time_slot = ? AND date = ?
-            '''
-            result = execute_query(query, (trainer_id, time_slot, date_param), db_path, fetch=True)
-
-        return (result[0][0] == 0) if result else True
+        attendance_date = _parse_date(attendance_date) or date.today()
+        slot = time_slot if hasattr(time_slot, 'start_minute') else slot_catalog(db_path).resolve(time_slot)
+        return AvailabilityIndex.is_free(trainer_id, slot or time_slot, attendance_date,
+                                         exclude_attendance_id=exclude_attendance_id, db_path=db_path)
 
 
     def save(self):
@@ -320,6 +407,18 @@ class Attendance:
         if self.check_out_time:
             check_out_iso = self.check_out_time.isoformat()
 
+        # Catalog slot: by id, or by label when the label was changed (or the id never set)
+        catalog = slot_catalog(db_path)
+        slot = catalog.get(self.time_slot_id)
+        if slot is None or (self.time_slot and self.time_slot != slot.label):
+            slot = catalog.resolve(self.time_slot, self.trainer_id, self.date)
+        self.time_slot_id = slot.id if slot else None
+        on_date = self.date or date.today()
+        if slot:
+            self.time_slot = slot.label
+            check_in_iso = check_in_iso or slot.starts_at(on_date).isoformat()
+            check_out_iso = check_out_iso or slot.ends_at(on_date).isoformat()
+
         # if missing but time_slot available, try to derive datetimes
         if (not check_in_iso or not check_out_iso) and self.time_slot:
             derived_in, derived_out = _slot_to_datetimes(self.time_slot, on_date=self.date or date.today())
@@ -332,24 +431,28 @@ class Attendance:
         if not self.time_slot and (check_in_iso or check_out_iso):
             self.time_slot = _datetimes_to_slot(check_in_iso, check_out_iso)
 
+        end_at = slot.ends_at(on_date).isoformat() if slot else slot_end_at(self.time_slot, on_date)
+
         # Save to DB with time_slot column
         if self.id:
             # UPDATE
             query = '''UPDATE attendance 
                     SET member_id=?, trainer_id=?, check_in_time=?, check_out_time=?, 
-                        date=?, time_slot=?, workout_type=?, notes=?, status=?
+                        date=?, time_slot=?, workout_type=?, notes=?, status=?, slot_end_at=?, time_slot_id=?
                     WHERE id=?'''
             params = (self.member_id, self.trainer_id, check_in_iso, check_out_iso,
-                    date_str, self.time_slot, self.workout_type, self.notes, self.status, self.id)
+                    date_str, self.time_slot, self.workout_type, self.notes, self.status, end_at,
+                    self.time_slot_id, self.id)
             execute_query(query, params, db_path)
             return self.id
         else:
             # INSERT
             query = '''INSERT INTO attendance 
-                    (member_id, trainer_id, check_in_time, check_out_time, date, time_slot, workout_type, notes, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+                    (member_id, trainer_id, check_in_time, check_out_time, date, time_slot, workout_type, notes, status,
+                     slot_end_at, time_slot_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
             params = (self.member_id, self.trainer_id, check_in_iso, check_out_iso,
-                    date_str, self.time_slot, self.workout_type, self.notes, self.status)
+                    date_str, self.time_slot, self.workout_type, self.notes, self.status, end_at, self.time_slot_id)
             result = execute_query(query, params, db_path)
             if result:
                 self.id = result
@@ -366,17 +469,19 @@ class Attendance:
     @classmethod
     def get_monthly_stats(cls, year, month):
         db_path = cls._db_path()
+        # Session totals come from the daily rollup; distinct members/trainers
+        # cannot be summed per day, so they read the month's rows via idx_attendance_date
         query = '''
-            SELECT 
-                COUNT(*) as total_sessions,
+            SELECT
+                (SELECT COALESCE(SUM(present + absent), 0) FROM daily_attendance
+                 WHERE day >= ? AND day < ?) as total_sessions,
                 COUNT(DISTINCT member_id) as unique_members,
                 COUNT(DISTINCT trainer_id) as active_trainers
-            FROM attendance 
-            WHERE strftime('%Y', date) = ? 
-            AND strftime('%m', date) = ?
+            FROM attendance
+            WHERE date >= ? AND date < ?
             AND status IN ('present', 'absent')  -- only count scheduled sessions
         '''
-        result = execute_query(query, (str(year), f"{month:02d}"), db_path, fetch=True)
+        result = execute_query(query, month_bounds(year, month) * 2, db_path, fetch=True)
         if result:
             row = result[0]
             return {
@@ -386,16 +491,47 @@ class Attendance:
             }
         return {'total_sessions': 0, 'unique_members': 0, 'active_trainers': 0}
 
+    @classmethod
+    def get_member_stats(cls, member_id):
+        """
+        Lifetime present/absent/late/total counts for a member, from the
+        member_attendance_stats rollup (one primary-key read). ``total`` also
+        counts sessions that are still scheduled.
+        """
+        return cls.get_member_stats_many([member_id])[member_id]
+
+    @classmethod
+    def get_member_stats_many(cls, member_ids):
+        """{member_id: get_member_stats(member_id)} for several members in one query"""
+        db_path = cls._db_path()
+        member_ids = list(member_ids)
+        stats = {member_id: dict(EMPTY_MEMBER_STATS) for member_id in member_ids}
+        if not member_ids:
+            return stats
+        rows = execute_query(
+            f"SELECT member_id, present, absent, late, total FROM member_attendance_stats "
+            f"WHERE member_id IN ({', '.join('?' * len(member_ids))})",
+            tuple(member_ids), db_path, fetch=True
+        ) or []
+        for member_id, present, absent, late, total in rows:
+            stats[member_id] = {'present': present, 'absent': absent, 'late': late, 'total': total}
+        return stats
+
     @classmethod
     def get_member_attendance_percentage(cls, member_id, up_to_date=None):
         """
         Calculate attendance percentage for a member.
         - Count only 'present' and 'absent' as scheduled sessions.
         - Exclude 'scheduled' from totals (not yet marked).
+        Without ``up_to_date`` this reads the member_attendance_stats rollup;
+        a cut-off date falls back to counting the member's rows.
         """
-        db_path = cls._db_path()
         if up_to_date is None:
-            up_to_date = date.today()
+            stats = cls.get_member_stats(member_id)
+            total = stats['present'] + stats['absent']
+            return round((stats['present'] / total) * 100, 2) if total > 0 else 0.0
+
+        db_path = cls._db_path()
         date_param = up_to_date.isoformat() if isinstance(up_to_date, date) else up_to_date
 
         query = '''
@@ -417,53 +553,60 @@ class Attendance:
         return round((present / total) * 100, 2) if total > 0 else 0.0
     
     @classmethod
-    def auto_mark_absent(cls):
+    def auto_mark_absent(cls, now=None):
         """
-        Mark all 'scheduled' sessions as 'absent' if their end time has passed.
+        Mark all 'scheduled' sessions as 'absent' once their slot_end_at has passed.
         This keeps attendance data consistent even if trainers didn't mark manually.
+        One UPDATE over idx_attendance_scheduled_end; rows written without a
+        slot_end_at are filled in first. Returns the number of rows marked.
         """
         db_path = cls._db_path()
+        now = now or datetime.now()
+        fill_slot_end_times(db_path)
+        return execute_update(
+            "UPDATE attendance SET status = 'absent' WHERE status = 'scheduled' AND slot_end_at < ?",
+            (now.isoformat(),),
+            db_path
+        )
 
-        # Get all scheduled sessions
-        rows = execute_query(
-            "SELECT * FROM attendance WHERE status = 'scheduled'",
-            (),
-            db_path,
-            fetch=True
+    @classmethod
+    def reconcile_expired(cls, limit=RECONCILE_BATCH, now=None):
+        """
+        Incremental auto-absent: mark at most ``limit`` scheduled sessions whose
+        slot ended since the watermark (the last slot_end_at handled) and advance it.
+        With nothing due this is two indexed reads and no write, so it is cheap
+        enough to run before a page read. Sessions booked behind the watermark are
+        left to the full auto_mark_absent sweep. Returns the number of rows marked.
+        """
+        db_path = cls._db_path()
+        now = now or datetime.now()
+        row = execute_query("SELECT value FROM watermarks WHERE name = ?", (RECONCILE_WATERMARK,), db_path, fetch=True)
+        watermark = row[0][0] if row else ''
+        # slot_end_at of the limit-th due session: the end of this batch's range
+        row = execute_query(
+            """SELECT MAX(slot_end_at) FROM (
+                   SELECT slot_end_at FROM attendance
+                   WHERE status = 'scheduled' AND slot_end_at >= ? AND slot_end_at < ?
+                   ORDER BY slot_end_at LIMIT ?)""",
+            (watermark, now.isoformat(), limit), db_path, fetch=True
         )
-        now = datetime.now()
-        updated = 0
-
-        for r in rows:
-            att = cls._from_attendance_row(r)
-            if not att or not att.date:
-                continue
-
-            start_iso, end_iso = _slot_to_datetimes(att.time_slot, on_date=att.date)
-
-            # Check if session has expired
-            expired = False
-            if att.date < date.today():
-                expired = True
-            elif end_iso:
-                try:
-                    expired = now > datetime.fromisoformat(end_iso)
-                except Exception:
-                    expired = False
-            elif start_iso:
-                # Fallback: if only start time present, consider expired if past start time + 1hr
-                try:
-                    start_dt = datetime.fromisoformat(start_iso)
-                    expired = now > start_dt.replace(minute=start_dt.minute + 59)
-                except Exception:
-                    expired = False
-
-            if expired:
-                att.status = "absent"
-                att.save()
-                updated += 1
-
-        return updated
+        upper = row[0][0] if row else None
+        if upper is None:
+            return 0
+        with transaction(db_path):
+            # Sessions tied with the last one are included, so a batch can exceed ``limit``
+            marked = execute_update(
+                """UPDATE attendance SET status = 'absent'
+                   WHERE status = 'scheduled' AND slot_end_at >= ? AND slot_end_at <= ?""",
+                (watermark, upper), db_path
+            )
+            execute_query(
+                """INSERT INTO watermarks (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                   ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value), updated_at = CURRENT_TIMESTAMP""",
+                (RECONCILE_WATERMARK, upper), db_path
+            )
+        return marked
+
     @classmethod
     def get_member_scheduled_on_date(cls, member_id, on_date):
         """
@@ -473,10 +616,11 @@ class Attendance:
         db_path = cls._db_path()
         date_param = on_date.isoformat() if isinstance(on_date, date) else on_date
 
-        query = """
-            SELECT * FROM attendance
-            WHERE member_id = ? AND date = ? AND status = 'scheduled'
-            ORDER BY time_slot
+        query = f"""
+            SELECT {SELECT_A_COLUMNS} FROM attendance a
+            {SLOT_JOIN}
+            WHERE a.member_id = ? AND a.date = ? AND a.status = 'scheduled'
+            ORDER BY s.start_minute
         """
         rows = execute_query(query, (member_id, date_param), db_path, fetch=True)
         return [cls._from_attendance_row(r) for r in rows] if rows else []
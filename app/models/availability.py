@@ -0,0 +1,197 @@
+"""In-memory index of trainer bookings, for availability checks and grids.
+
+For each (trainer, date) the index keeps that day's bookings as
+(attendance_id, minute bitset, label, time_slot_id). Bit n of the bitset is
+minute n after midnight, taken from the booked slot's start/end minutes. Rows
+without a time_slot_id use their parsed label instead. A slot is free when
+it has fewer bookings than its capacity and no booking in another slot
+intersects its bitset or carries its label.
+
+Pairs are loaded on first use, many at once: a week or month for every trainer
+is one query. The index is cached per database and dropped as soon as
+data_versions shows a write to attendance or time_slots, so bookings made by
+other workers invalidate it too.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from flask import current_app
+
+from app.models.database import execute_query, get_data_versions
+from app.models.time_slot import minute_mask, slot_catalog
+
+DEFAULT_DAYS = 7
+MAX_DAYS = 31
+# Loaded (trainer, date) pairs kept before the index starts over
+MAX_ENTRIES = 100_000
+
+# Tables whose writes make the index stale
+INDEX_TABLES = ('attendance', 'time_slots')
+
+# Slot minutes come from the cached catalog rather than a join per row
+BOOKINGS_QUERY = '''
+    SELECT id, trainer_id, date, time_slot, time_slot_id
+    FROM attendance
+    WHERE date >= ? AND date <= ? AND trainer_id IN ({placeholders})
+'''
+
+_cache = {}  # db_path -> (versions, {(trainer_id, date iso): bookings})
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _label_mask(label):
+    """Minute bitset of a free-text slot label; single times last an hour, unparseable labels are 0"""
+    from app.models.attendance import _slot_to_datetimes  # attendance imports this module
+
+    start_iso, end_iso = _slot_to_datetimes(label, on_date=date(2000, 1, 1))
+    if not start_iso:
+        return 0
+    start = datetime.fromisoformat(start_iso)
+    start_minute = start.hour * 60 + start.minute
+    if not end_iso:
+        return minute_mask(start_minute, min(start_minute + 60, 1440))
+    end = datetime.fromisoformat(end_iso)
+    return minute_mask(start_minute, end.hour * 60 + end.minute)
+
+
+def all_slot_masks(db_path):
+    """time_slots.id -> minute bitset for every slot, including deactivated ones"""
+    rows = execute_query("SELECT id, start_minute, end_minute FROM time_slots", (), db_path, fetch=True) or []
+    return {slot_id: minute_mask(start, end) for slot_id, start, end in rows}
+
+
+def slot_conflict(bookings, slot, exclude_attendance_id=None):
+    """
+    Why ``slot`` (a TimeSlot, or a label the catalog does not know) cannot be
+    booked given a trainer's ``bookings`` for the day: 'trainer_busy' when a
+    booking in another slot overlaps it, 'slot_full' when it has reached its
+    capacity, None when it is free.
+    """
+    if hasattr(slot, 'start_minute'):
+        slot_id, mask, label, capacity = slot.id, slot.mask, slot.label, slot.capacity or 1
+    else:
+        slot_id, mask, label, capacity = None, 0, slot, 1
+    taken = 0
+    for attendance_id, busy, booked_label, booked_slot_id in bookings:
+        if attendance_id == exclude_attendance_id:
+            continue
+        if slot_id is not None and booked_slot_id == slot_id:
+            taken += 1
+        elif busy & mask or booked_label == label:
+            return 'trainer_busy'
+    return 'slot_full' if taken >= capacity else None
+
+
+def booking_entry(attendance_id, label, slot_id, slot_masks):
+    """The (attendance_id, bitset, label, time_slot_id) tuple the index keeps for a row"""
+    mask = slot_masks.get(slot_id)
+    if mask is None:
+        mask = _label_mask(label)
+    return attendance_id, mask, label, slot_id
+
+
+class AvailabilityIndex:
+    @classmethod
+    def _entries(cls, db_path):
+        versions = get_data_versions(INDEX_TABLES, db_path)
+        with _cache_lock:
+            cached = _cache.get(db_path)
+            if cached is None or cached[0] != versions or len(cached[1]) > MAX_ENTRIES:
+                cached = _cache[db_path] = (versions, {})
+        return cached[1]
+
+    @classmethod
+    def bookings(cls, trainer_ids, days, db_path=None):
+        """{(trainer_id, date iso): ((attendance_id, bitset, label, time_slot_id), ...)} for every trainer x day"""
+        db_path = db_path or current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        entries = cls._entries(db_path)
+        wanted = [(trainer_id, day.isoformat()) for trainer_id in trainer_ids for day in days]
+        missing = [key for key in wanted if key not in entries]
+        if missing:
+            missing_trainers = sorted({key[0] for key in missing})
+            rows = execute_query(
+                BOOKINGS_QUERY.format(placeholders=', '.join('?' * len(missing_trainers))),
+                (min(key[1] for key in missing), max(key[1] for key in missing), *missing_trainers),
+                db_path, fetch=True
+            ) or []
+            slot_masks = all_slot_masks(db_path)
+            loaded = {}
+            for attendance_id, trainer_id, day, label, slot_id in rows:
+                loaded.setdefault((trainer_id, day), []).append(booking_entry(attendance_id, label, slot_id, slot_masks))
+            with _cache_lock:
+                for key in missing:
+                    entries[key] = tuple(loaded.get(key, ()))
+        return {key: entries[key] for key in wanted}
+
+    @classmethod
+    def is_free(cls, trainer_id, slot, day, exclude_attendance_id=None, db_path=None):
+        """True if ``trainer_id`` can take another booking in ``slot`` (a TimeSlot or a label) on ``day``"""
+        bookings = cls.bookings([trainer_id], [day], db_path)[(trainer_id, day.isoformat())]
+        return slot_conflict(bookings, slot, exclude_attendance_id) is None
+
+    @classmethod
+    def free_trainers(cls, trainer_ids, slot, day, db_path=None):
+        """The subset of ``trainer_ids`` that can take another booking in ``slot`` on ``day``"""
+        bookings = cls.bookings(trainer_ids, [day], db_path)
+        return {trainer_id for trainer_id in trainer_ids
+                if slot_conflict(bookings[(trainer_id, day.isoformat())], slot) is None}
+
+    @classmethod
+    def grid(cls, start, days=DEFAULT_DAYS, trainer_id=None, db_path=None):
+        """
+        Free and booked slot ids per trainer per day for ``days`` days from
+        ``start``, for one trainer or every active trainer, plus the slots referenced.
+        """
+        if not 1 <= days <= MAX_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_DAYS}")
+        db_path = db_path or current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        query = '''
+            SELECT t.id, u.full_name FROM trainers t
+            LEFT JOIN users u ON t.user_id = u.id
+            WHERE t.status = 'active'
+        '''
+        params = ()
+        if trainer_id is not None:
+            query += " AND t.id = ?"
+            params = (trainer_id,)
+        trainers = execute_query(query + " ORDER BY t.id", params, db_path, fetch=True) or []
+        if trainer_id is not None and not trainers:
+            raise ValueError("Unknown or inactive trainer")
+
+        catalog = slot_catalog(db_path)
+        dates = [start + timedelta(days=i) for i in range(days)]
+        bookings = cls.bookings([t[0] for t in trainers], dates, db_path)
+        used = {}
+        result = []
+        for tid, name in trainers:
+            day_rows = []
+            for day in dates:
+                day_bookings = bookings[(tid, day.isoformat())]
+                free, booked = [], []
+                for slot in catalog.for_trainer_day(tid, day):
+                    used[slot.id] = slot
+                    (booked if day_bookings and slot_conflict(day_bookings, slot) else free).append(slot.id)
+                day_rows.append({'date': day.isoformat(), 'free': free, 'booked': booked})
+            result.append({'trainer_id': tid, 'name': name, 'days': day_rows})
+
+        return {
+            'start': start.isoformat(),
+            'days': days,
+            'slots': [
+                {'id': slot.id, 'label': slot.label, 'start_minute': slot.start_minute, 'end_minute': slot.end_minute,
+                 'capacity': slot.capacity}
+                for slot in sorted(used.values(), key=lambda s: (s.start_minute, s.end_minute, s.id))
+            ],
+            'trainers': result,
+        }
+
+    @classmethod
+    def invalidate(cls, db_path=None):
+        """Drop the index for ``db_path`` (all databases when None)"""
+        with _cache_lock:
+            if db_path is None:
+                _cache.clear()
+            else:
+                _cache.pop(db_path, None)
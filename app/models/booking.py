@@ -0,0 +1,264 @@
+"""Atomic session booking.
+
+BookingEngine.book and BookingEngine.reschedule run every check and the write
+in one BEGIN IMMEDIATE transaction. The write lock is taken before the checks
+read anything, so two workers racing for the same trainer slot are
+serialized: the second one sees the first one's booking and gets a conflict.
+The checks are:
+
+  - the slot is one the trainer offers that day and has not started yet
+  - the member has no other scheduled session that day (one per day)
+  - no booking of the trainer's in another slot overlaps it
+  - the slot still has room (time_slots.capacity bookings per trainer and date)
+
+Capacity is also enforced by the trg_attendance_capacity_* triggers, so rows
+written by any other path cannot overbook a slot either.
+
+Both calls return a BookingResult instead of raising. Its conflict code
+says what went wrong.
+
+BookingEngine.book_recurring books a weekly pattern up to an end date. It
+reads the member's and the trainer's bookings for the whole range once,
+applies the same checks to every date, and inserts the free dates with one
+executemany. Dates that conflict are skipped and reported per date.
+"""
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+
+from app.models.attendance import Attendance
+from app.models.availability import all_slot_masks, booking_entry, slot_conflict
+from app.models.database import execute_many, execute_query, transaction
+from app.models.time_slot import slot_catalog
+
+# Longest span book_recurring accepts
+MAX_RECURRING_WEEKS = 26
+
+# The columns Attendance.save writes for a new catalog-slot booking
+RECURRING_INSERT = '''
+    INSERT INTO attendance (member_id, trainer_id, check_in_time, check_out_time, date, time_slot, status,
+                            slot_end_at, time_slot_id)
+    VALUES (?, ?, ?, ?, ?, ?, 'scheduled', ?, ?)
+'''
+
+# BookingResult.conflict values
+INVALID_SLOT = 'invalid_slot'
+PAST_SLOT = 'past_slot'
+SAME_SLOT = 'same_slot'
+MEMBER_DAY_BOOKED = 'member_day_booked'
+TRAINER_BUSY = 'trainer_busy'
+SLOT_FULL = 'slot_full'
+NOT_FOUND = 'not_found'
+
+MESSAGES = {
+    INVALID_SLOT: 'Invalid time slot selected.',
+    PAST_SLOT: 'Cannot schedule a session that starts now or in the past. Please select a future slot.',
+    SAME_SLOT: 'You already have this slot booked for that date.',
+    MEMBER_DAY_BOOKED: 'Only one booking per day is allowed. To change your slot, please reschedule from the '
+                       'Attendance page.',
+    TRAINER_BUSY: 'This time slot is not available',
+    SLOT_FULL: 'This time slot is fully booked',
+    NOT_FOUND: 'Booking not found.',
+}
+
+
+class BookingResult:
+    __slots__ = ('attendance_id', 'conflict', 'slot', 'conflicting_ids', 'day')
+
+    def __init__(self, attendance_id=None, conflict=None, slot=None, conflicting_ids=(), day=None):
+        self.attendance_id = attendance_id
+        self.conflict = conflict
+        self.slot = slot
+        self.conflicting_ids = tuple(conflicting_ids)
+        self.day = day
+
+    @property
+    def ok(self):
+        return self.conflict is None
+
+    @property
+    def message(self):
+        return MESSAGES.get(self.conflict, 'Session booked.')
+
+    def to_dict(self):
+        return {
+            'ok': self.ok,
+            'attendance_id': self.attendance_id,
+            'conflict': self.conflict,
+            'message': self.message,
+            'slot_id': self.slot.id if self.slot else None,
+            'conflicting_ids': list(self.conflicting_ids),
+            'date': self.day.isoformat() if self.day else None,
+        }
+
+    def __repr__(self):
+        return f"<BookingResult {'ok' if self.ok else self.conflict} attendance={self.attendance_id}>"
+
+
+class RecurringResult:
+    """Outcome of BookingEngine.book_recurring: one BookingResult per date, in date order"""
+    __slots__ = ('results',)
+
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def booked(self):
+        return [result for result in self.results.values() if result.ok]
+
+    @property
+    def conflicts(self):
+        return {day: result for day, result in self.results.items() if not result.ok}
+
+    def to_dict(self):
+        return {
+            'booked': [result.to_dict() for result in self.booked],
+            'conflicts': [result.to_dict() for result in self.conflicts.values()],
+        }
+
+    def __repr__(self):
+        return f"<RecurringResult booked={len(self.booked)} conflicts={len(self.conflicts)}>"
+
+
+class BookingEngine:
+    @classmethod
+    def book(cls, member_id, trainer_id, slot_value, day, now=None):
+        """Book ``member_id`` with ``trainer_id`` in ``slot_value`` (slot id or label) on ``day``"""
+        return cls._write(member_id, trainer_id, slot_value, day, now)
+
+    @classmethod
+    def reschedule(cls, attendance_id, member_id, slot_value, now=None):
+        """Move the member's booking ``attendance_id`` to another slot on the same day"""
+        return cls._write(member_id, None, slot_value, None, now, attendance_id=attendance_id)
+
+    @classmethod
+    def _write(cls, member_id, trainer_id, slot_value, day, now, attendance_id=None):
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        now = now or datetime.now()
+        try:
+            with transaction(db_path):
+                existing = None
+                if attendance_id is not None:
+                    existing = Attendance.get_by_id(attendance_id)
+                    if existing is None or existing.member_id != member_id:
+                        return BookingResult(attendance_id, NOT_FOUND)
+                    trainer_id, day = existing.trainer_id, existing.date
+                result = cls._check(db_path, member_id, trainer_id, slot_value, day, now, existing)
+                if not result.ok:
+                    return result
+                booking = existing or Attendance(member_id=member_id, trainer_id=trainer_id, date=day)
+                booking.time_slot, booking.time_slot_id = result.slot.label, result.slot.id
+                # A moved booking takes the new slot's times
+                booking.check_in_time = booking.check_out_time = None
+                booking.status = 'scheduled'
+                booking.save()
+                result.attendance_id = booking.id
+                return result
+        except sqlite3.IntegrityError as e:
+            if 'slot full' not in str(e):
+                raise
+            # Only reachable when something bypassed the checks above
+            return BookingResult(attendance_id, SLOT_FULL)
+
+    @classmethod
+    def book_recurring(cls, member_id, trainer_id, slot_value, weekdays, start, until, now=None):
+        """
+        Book ``slot_value`` on every ``weekdays`` day (0 = Monday) from
+        ``start`` to ``until`` inclusive. Every date is checked in one pass
+        and the free ones are inserted together, in one transaction. Dates
+        with a conflict are skipped; the RecurringResult lists them.
+        """
+        weekdays = sorted({int(w) for w in weekdays})
+        if not weekdays or not all(0 <= w <= 6 for w in weekdays):
+            raise ValueError("Choose at least one weekday (0 = Monday to 6 = Sunday)")
+        if until < start:
+            raise ValueError("The end date must not be before the start date")
+        if (until - start).days >= MAX_RECURRING_WEEKS * 7:
+            raise ValueError(f"A recurring booking can span at most {MAX_RECURRING_WEEKS} weeks")
+        days = [start + timedelta(days=i) for i in range((until - start).days + 1)]
+        days = [day for day in days if day.weekday() in weekdays]
+        if not days:
+            raise ValueError("No dates in that range fall on the chosen weekdays")
+
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        now = now or datetime.now()
+        bounds = (days[0].isoformat(), days[-1].isoformat())
+        with transaction(db_path):
+            member_rows, bookings = {}, {}
+            for attendance_id, day, slot_id in execute_query(
+                    "SELECT id, date, time_slot_id FROM attendance WHERE member_id = ? AND status = 'scheduled' "
+                    "AND date BETWEEN ? AND ?", (member_id, *bounds), db_path, fetch=True) or []:
+                member_rows.setdefault(day, []).append((attendance_id, slot_id))
+            slot_masks = all_slot_masks(db_path)
+            for attendance_id, day, label, slot_id in execute_query(
+                    "SELECT id, date, time_slot, time_slot_id FROM attendance WHERE trainer_id = ? "
+                    "AND date BETWEEN ? AND ?", (trainer_id, *bounds), db_path, fetch=True) or []:
+                bookings.setdefault(day, []).append(booking_entry(attendance_id, label, slot_id, slot_masks))
+
+            catalog = slot_catalog(db_path)
+            results = {}
+            for day in days:
+                key = day.isoformat()
+                results[day] = cls._decide(catalog, trainer_id, slot_value, day, now,
+                                           member_rows.get(key, ()), bookings.get(key, ()))
+
+            booked = [(day, result.slot) for day, result in results.items() if result.ok]
+            if booked:
+                execute_many(RECURRING_INSERT, [
+                    (member_id, trainer_id, slot.starts_at(day).isoformat(), slot.ends_at(day).isoformat(),
+                     day.isoformat(), slot.label, slot.ends_at(day).isoformat(), slot.id)
+                    for day, slot in booked
+                ], db_path)
+                ids = dict(execute_query(
+                    "SELECT date, id FROM attendance WHERE member_id = ? AND status = 'scheduled' "
+                    "AND date BETWEEN ? AND ?", (member_id, *bounds), db_path, fetch=True) or [])
+                for day, _ in booked:
+                    results[day].attendance_id = ids.get(day.isoformat())
+        return RecurringResult(results)
+
+    @classmethod
+    def _check(cls, db_path, member_id, trainer_id, slot_value, day, now, existing=None):
+        """The conflict for this booking, reading inside the caller's transaction"""
+        if not isinstance(day, date):
+            return BookingResult(conflict=INVALID_SLOT)
+        exclude_id = existing.id if existing else None
+        member_rows = execute_query(
+            "SELECT id, time_slot_id FROM attendance WHERE member_id = ? AND date = ? AND status = 'scheduled' "
+            "AND id IS NOT ?",
+            (member_id, day.isoformat(), exclude_id), db_path, fetch=True
+        ) or []
+        rows = execute_query(
+            "SELECT id, time_slot, time_slot_id FROM attendance WHERE trainer_id = ? AND date = ?",
+            (trainer_id, day.isoformat()), db_path, fetch=True
+        ) or []
+        slot_masks = all_slot_masks(db_path)
+        bookings = [booking_entry(row[0], row[1], row[2], slot_masks) for row in rows]
+        return cls._decide(slot_catalog(db_path), trainer_id, slot_value, day, now, member_rows, bookings, existing)
+
+    @classmethod
+    def _decide(cls, catalog, trainer_id, slot_value, day, now, member_rows, bookings, existing=None):
+        """
+        The conflict for booking ``slot_value`` on ``day``, given the member's
+        other scheduled (id, time_slot_id) rows that day and the trainer's
+        availability entries for it.
+        """
+        slot = catalog.resolve(slot_value, trainer_id, day)
+        if slot is None:
+            return BookingResult(conflict=INVALID_SLOT, day=day)
+        if existing is not None and existing.time_slot_id == slot.id:
+            return BookingResult(existing.id, SAME_SLOT, slot, day=day)
+        if slot.starts_at(day) <= now:
+            return BookingResult(conflict=PAST_SLOT, slot=slot, day=day)
+
+        if member_rows:
+            conflict = SAME_SLOT if any(slot_id == slot.id for _, slot_id in member_rows) else MEMBER_DAY_BOOKED
+            return BookingResult(conflict=conflict, slot=slot, conflicting_ids=[row[0] for row in member_rows],
+                                 day=day)
+
+        exclude_id = existing.id if existing else None
+        conflict = slot_conflict(bookings, slot, exclude_id)
+        if conflict:
+            ids = [b[0] for b in bookings if b[0] != exclude_id and (b[3] == slot.id or b[1] & slot.mask)]
+            return BookingResult(conflict=conflict, slot=slot, conflicting_ids=ids, day=day)
+        return BookingResult(slot=slot, day=day)
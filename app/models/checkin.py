@@ -0,0 +1,207 @@
+"""Front-desk kiosk check-in.
+
+A scan names a member (by member id or user id). CheckInDesk finds that
+member's session in an in-memory map of today's bookings, rebuilt only when
+data_versions shows a write to attendance or members. A scan from
+EARLY_MINUTES before the slot starts until LATE_AFTER_MINUTES after marks the
+member present. After that, and until the slot ends, it marks them late.
+
+Scans do not write. The update is queued and a background thread commits the
+queue in batches every KIOSK_FLUSH_INTERVAL seconds, or sooner once
+KIOSK_FLUSH_BATCH updates are waiting. A scan therefore costs one
+data_versions read plus dictionary lookups. The desk remembers today's
+check-ins, queued or flushed, so a second scan of the same member is answered
+from memory.
+"""
+import atexit
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.models.attendance import _slot_to_datetimes
+from app.models.database import execute_many, execute_query, get_data_versions
+from app.models.time_slot import slot_catalog
+
+EARLY_MINUTES = 30
+LATE_AFTER_MINUTES = 10
+DEFAULT_FLUSH_INTERVAL = 0.5   # seconds
+DEFAULT_FLUSH_BATCH = 200
+
+# scan() result codes
+CHECKED_IN = 'checked_in'
+ALREADY_CHECKED_IN = 'already_checked_in'
+TOO_EARLY = 'too_early'
+NO_SESSION = 'no_session'
+
+# Tables whose writes make the bookings map stale
+DESK_TABLES = ('attendance', 'members')
+
+TODAYS_BOOKINGS = '''
+    SELECT a.id, a.member_id, m.user_id, a.time_slot, a.time_slot_id, a.status
+    FROM attendance a
+    JOIN members m ON m.id = a.member_id
+    WHERE a.date = ?
+'''
+
+# Only a still-scheduled row is checked in; the arrival time is kept if one is set
+CHECK_IN_UPDATE = '''
+    UPDATE attendance SET status = ?, check_in_time = COALESCE(check_in_time, ?)
+    WHERE id = ? AND status = 'scheduled'
+'''
+
+
+def _slot_window(label, slot_id, day, catalog):
+    """(start, end) datetimes of a booking, or (None, None) if its slot cannot be read"""
+    slot = catalog.get(slot_id)
+    if slot is not None:
+        return slot.starts_at(day), slot.ends_at(day)
+    start_iso, end_iso = _slot_to_datetimes(label, on_date=day)
+    if not start_iso:
+        return None, None
+    start = datetime.fromisoformat(start_iso)
+    return start, datetime.fromisoformat(end_iso) if end_iso else start + timedelta(hours=1)
+
+
+class CheckInDesk:
+    """Check-in state and write queue for one database"""
+
+    def __init__(self, app, db_path, interval=DEFAULT_FLUSH_INTERVAL, batch=DEFAULT_FLUSH_BATCH):
+        self.app = app
+        self.db_path = db_path
+        self.interval = interval
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._day = None
+        self._versions = None
+        self._by_member = {}      # member_id -> [(attendance_id, start, end, label), ...] by start
+        self._user_members = {}   # user_id -> member_id
+        self._checked_in = {}     # attendance_id -> status, for today
+        self._pending = []        # (status, check-in iso, attendance_id) not yet committed
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=f"kiosk-flush:{db_path}", daemon=True)
+        self._thread.start()
+
+    def _load(self, day):
+        """Rebuild today's bookings map if the day changed or attendance/members were written"""
+        versions = get_data_versions(DESK_TABLES, self.db_path)
+        if day == self._day and versions == self._versions:
+            return
+        rows = execute_query(TODAYS_BOOKINGS, (day.isoformat(),), self.db_path, fetch=True) or []
+        catalog = slot_catalog(self.db_path)
+        by_member, user_members = {}, {}
+        checked_in = self._checked_in if day == self._day else {}
+        for attendance_id, member_id, user_id, label, slot_id, status in rows:
+            if user_id is not None:
+                user_members[user_id] = member_id
+            if status in ('present', 'late'):
+                checked_in.setdefault(attendance_id, status)
+            elif status != 'scheduled':
+                continue
+            start, end = _slot_window(label, slot_id, day, catalog)
+            if start is not None:
+                by_member.setdefault(member_id, []).append((attendance_id, start, end, label))
+        for bookings in by_member.values():
+            bookings.sort(key=lambda b: b[1])
+        self._day, self._versions = day, versions
+        self._by_member, self._user_members, self._checked_in = by_member, user_members, checked_in
+
+    def scan(self, member_id=None, user_id=None, now=None):
+        """
+        Check in the member identified by ``member_id`` or ``user_id``. The
+        result dict has a ``result`` code (CHECKED_IN, ALREADY_CHECKED_IN,
+        TOO_EARLY or NO_SESSION), plus the booking and status when one was found.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._load(now.date())
+            if member_id is None:
+                member_id = self._user_members.get(user_id)
+            bookings = self._by_member.get(member_id, ())
+            upcoming = None
+            for attendance_id, start, end, label in bookings:
+                if now > end:
+                    continue
+                booking = {'attendance_id': attendance_id, 'member_id': member_id, 'time_slot': label}
+                if attendance_id in self._checked_in:
+                    return {'result': ALREADY_CHECKED_IN, 'status': self._checked_in[attendance_id], **booking}
+                if now < start - timedelta(minutes=EARLY_MINUTES):
+                    upcoming = upcoming or {'result': TOO_EARLY, 'starts_at': start.isoformat(), **booking}
+                    continue
+                status = 'late' if now > start + timedelta(minutes=LATE_AFTER_MINUTES) else 'present'
+                self._checked_in[attendance_id] = status
+                self._pending.append((status, now.isoformat(), attendance_id))
+                if len(self._pending) >= self.batch:
+                    self._wake.set()
+                return {'result': CHECKED_IN, 'status': status, **booking}
+        return upcoming or {'result': NO_SESSION, 'member_id': member_id}
+
+    def flush(self):
+        """Commit every queued check-in in one transaction; returns the rows updated"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            with self.app.app_context():
+                return execute_many(CHECK_IN_UPDATE, pending, self.db_path)
+        except Exception:
+            # Put them back in front of anything queued since; the next flush retries
+            with self._lock:
+                self._pending[:0] = pending
+            raise
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Stop the flush thread after one last flush"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception("Kiosk check-in flush failed; will retry")
+            if self._stopped:
+                return
+
+
+_desks = {}
+_desks_lock = threading.Lock()
+
+
+def get_desk(db_path=None):
+    """The process-wide CheckInDesk for ``db_path``, started on first use"""
+    db_path = db_path or current_app.config.get('DATABASE_PATH', 'gym_management.db')
+    desk = _desks.get(db_path)
+    if desk is None:
+        with _desks_lock:
+            desk = _desks.get(db_path)
+            if desk is None:
+                desk = CheckInDesk(
+                    current_app._get_current_object(), db_path,
+                    interval=current_app.config.get('KIOSK_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+                    batch=current_app.config.get('KIOSK_FLUSH_BATCH', DEFAULT_FLUSH_BATCH),
+                )
+                _desks[db_path] = desk
+    return desk
+
+
+def close_desks():
+    """Flush queued check-ins and stop the flush threads"""
+    with _desks_lock:
+        desks = list(_desks.values())
+        _desks.clear()
+    for desk in desks:
+        desk.close()
+
+
+atexit.register(close_desks)
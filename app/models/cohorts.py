@@ -0,0 +1,171 @@
+"""Membership cohort retention.
+
+Members are grouped by join month (month of membership_start_date, which
+renewals leave alone) and plan. A member counts as retained at month N if
+their membership ran at least N full months. Renewals extend
+membership_end_date, so this is N months of paid cover. Month-N retention is
+only reported once the cohort is N months old.
+
+One grouped query returns a small set of rows, one per (cohort, plan,
+tenure in months) with its member, lapsed, renewed and recently-active
+counts. NumPy then turns those rows into the retention matrix and per-plan
+rates. Results are cached per database for the rest of the day.
+"""
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from flask import current_app
+
+from app.models.database import execute_query
+
+DEFAULT_MONTHS = 12
+ACTIVE_WINDOW_DAYS = 30
+
+# Dates are stored as ISO text, so substr is much cheaper than strftime here
+_PART = "CAST(substr({column}, {start}, 2) AS INTEGER)"
+_YEAR = "CAST(substr({column}, 1, 4) AS INTEGER)"
+# Whole months between membership_start_date and membership_end_date
+TENURE_MONTHS = (
+    "MAX(0, COALESCE(("
+    + _YEAR.format(column='m.membership_end_date') + " - "
+    + _YEAR.format(column='m.membership_start_date') + ") * 12 + "
+    + _PART.format(column='m.membership_end_date', start=6) + " - "
+    + _PART.format(column='m.membership_start_date', start=6) + " - ("
+    + _PART.format(column='m.membership_end_date', start=9) + " < "
+    + _PART.format(column='m.membership_start_date', start=9) + "), 0))"
+)
+
+COHORT_QUERY = f'''
+    SELECT substr(m.membership_start_date, 1, 7) AS cohort,
+           m.membership_plan_id AS plan_id,
+           MAX(mp.name) AS plan_name,
+           {TENURE_MONTHS} AS tenure,
+           COUNT(*) AS members,
+           SUM(m.membership_end_date < ?) AS lapsed,
+           SUM(COALESCE(p.completed, 0) > 1) AS renewed,
+           SUM(a.member_id IS NOT NULL) AS active_recently
+    FROM members m
+    LEFT JOIN membership_plans mp ON mp.id = m.membership_plan_id
+    LEFT JOIN (SELECT member_id, COUNT(*) AS completed FROM payments
+               WHERE payment_status = 'completed' GROUP BY member_id) p ON p.member_id = m.id
+    LEFT JOIN (SELECT DISTINCT member_id FROM attendance
+               WHERE date >= ? AND status = 'present') a ON a.member_id = m.id
+    WHERE m.membership_start_date >= ? AND m.membership_start_date < ?
+    GROUP BY cohort, plan_id, tenure
+'''
+
+_cache = {}  # (db_path, months) -> (day, result)
+_cache_lock = threading.Lock()
+
+
+def _rate(numerator, denominator):
+    """Element-wise ratio, None where the denominator is 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+    return [None if np.isnan(r) else round(float(r), 4) for r in np.atleast_1d(ratio)]
+
+
+class CohortAnalytics:
+    @classmethod
+    def get(cls, months=DEFAULT_MONTHS):
+        """Cohort report for the last ``months`` join months, cached until tomorrow"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        today = date.today()
+        key = (db_path, months)
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached and cached[0] == today:
+            return cached[1]
+        result = cls.compute(db_path, months, today)
+        with _cache_lock:
+            _cache[key] = (today, result)
+        return result
+
+    @classmethod
+    def invalidate(cls):
+        with _cache_lock:
+            _cache.clear()
+
+    @classmethod
+    def compute(cls, db_path, months=DEFAULT_MONTHS, today=None):
+        today = today or date.today()
+        first_cohort = today.replace(day=1) - relativedelta(months=months - 1)
+        end = today.replace(day=1) + relativedelta(months=1)
+        rows = execute_query(
+            COHORT_QUERY,
+            (today.isoformat(), (today - timedelta(days=ACTIVE_WINDOW_DAYS)).isoformat(),
+             first_cohort.isoformat(), end.isoformat()),
+            db_path, fetch=True
+        ) or []
+
+        cohort_keys = [(first_cohort + relativedelta(months=i)).strftime('%Y-%m') for i in range(months)]
+        result = {
+            'as_of': today.isoformat(),
+            'months': list(range(months)),
+            'cohorts': [],
+            'plans': [],
+        }
+        cohort_index = {c: i for i, c in enumerate(cohort_keys)}
+        rows = [r for r in rows if r[0] in cohort_index]  # skips start dates that are not ISO text
+        if not rows:
+            result['cohorts'] = [{'cohort': c, 'size': 0, 'retention': [None] * months} for c in cohort_keys]
+            return result
+
+        cohort = np.array([cohort_index[r[0]] for r in rows])
+        plan_ids = sorted({r[1] for r in rows}, key=lambda p: (p is None, p))
+        plan_index = {p: i for i, p in enumerate(plan_ids)}
+        plan = np.array([plan_index[r[1]] for r in rows])
+        plan_names = {r[1]: r[2] for r in rows}
+        tenure = np.minimum(np.array([r[3] for r in rows]), months - 1)
+        counts = np.array([[r[4], r[5], r[6], r[7]] for r in rows], dtype=np.int64)
+
+        # members[c, t]: cohort c members whose tenure is exactly t (capped at the last column);
+        # a reverse cumulative sum gives "still a member after t months"
+        by_tenure = np.zeros((months, months), dtype=np.int64)
+        np.add.at(by_tenure, (cohort, tenure), counts[:, 0])
+        retained = np.flip(np.cumsum(np.flip(by_tenure, axis=1), axis=1), axis=1)
+        sizes = retained[:, 0]
+        # Cohort i is (months - 1 - i) months old; later columns are not observable yet
+        age = (months - 1) - np.arange(months)
+        observable = np.arange(months)[None, :] <= age[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = np.where(observable & (sizes[:, None] > 0), retained / np.maximum(sizes[:, None], 1), np.nan)
+
+        for i, key in enumerate(cohort_keys):
+            result['cohorts'].append({
+                'cohort': key,
+                'size': int(sizes[i]),
+                'retention': [None if np.isnan(v) else round(float(v), 4) for v in matrix[i]],
+            })
+
+        # Per (cohort, plan): size, churn (membership already ended), renewal (2+ completed
+        # payments), recently active (present in the last ACTIVE_WINDOW_DAYS), month-N retention
+        groups = cohort * len(plan_ids) + plan
+        n_groups = months * len(plan_ids)
+        totals = np.zeros((n_groups, 4), dtype=np.int64)
+        np.add.at(totals, groups, counts)
+        checkpoints = [n for n in (1, 3, 6) if n < months]
+        retained_at = {n: np.bincount(groups, weights=counts[:, 0] * (tenure >= n), minlength=n_groups)
+                       for n in checkpoints}
+        churn = _rate(totals[:, 1], totals[:, 0])
+        renewal = _rate(totals[:, 2], totals[:, 0])
+        active = _rate(totals[:, 3], totals[:, 0])
+        retention_at = {n: _rate(retained_at[n], totals[:, 0]) for n in checkpoints}
+
+        for g in np.flatnonzero(totals[:, 0]):
+            c, p = divmod(int(g), len(plan_ids))
+            entry = {
+                'cohort': cohort_keys[c],
+                'plan_id': plan_ids[p],
+                'plan_name': plan_names.get(plan_ids[p]) or 'No plan',
+                'size': int(totals[g, 0]),
+                'churn_rate': churn[g],
+                'renewal_rate': renewal[g],
+                'active_rate': active[g],
+            }
+            for n in checkpoints:
+                entry[f'retention_{n}'] = retention_at[n][g] if n <= age[c] else None
+            result['plans'].append(entry)
+        return result
@@ -0,0 +1,110 @@
+"""Cached snapshot of the admin dashboard numbers.
+
+All counters come from one statement of scalar subqueries, and the recent and
+expiring lists take one query each. The result is cached per database for
+DASHBOARD_CACHE_SECONDS (default 30). A cached snapshot is dropped early when
+the date changes or when data_versions shows that a table it reads was written.
+data_versions is kept up to date by triggers, so other workers' writes count too.
+
+The same versions make the ETag of the /admin/api/metrics counters. A poller
+whose tag is still current gets a 304 without any snapshot being built.
+"""
+import hashlib
+import threading
+import time
+from datetime import date
+
+from flask import current_app
+
+from app.models.announcement import Announcement
+from app.models.database import execute_query, get_data_versions
+from app.models.member import Member
+from app.models.payment import Payment
+from app.utils.helpers import month_bounds
+
+DEFAULT_CACHE_SECONDS = 30
+
+# Tables the snapshot reads; a write to any of them invalidates it
+SNAPSHOT_TABLES = ('members', 'trainers', 'payments', 'attendance', 'equipment', 'announcements')
+
+COUNTERS_QUERY = '''
+    SELECT
+        (SELECT COUNT(*) FROM members WHERE status = 'active'),
+        (SELECT COUNT(*) FROM trainers WHERE status = 'active'),
+        (SELECT COUNT(*) FROM attendance WHERE date = ?),
+        (SELECT COALESCE(SUM(total), 0) FROM daily_revenue),
+        (SELECT COALESCE(SUM(total), 0) FROM daily_revenue WHERE day >= ? AND day < ?),
+        (SELECT COUNT(*) FROM payments WHERE payment_status = 'pending'),
+        (SELECT COUNT(*) FROM equipment WHERE status = 'working'),
+        (SELECT COUNT(*) FROM equipment WHERE status = 'maintenance')
+'''
+COUNTER_NAMES = (
+    'total_members', 'total_trainers', 'today_attendance', 'total_revenue',
+    'monthly_revenue', 'pending_payments', 'working_equipment', 'maintenance_equipment',
+)
+
+_cache = {}  # db_path -> (expires_at, day, versions, snapshot)
+_cache_lock = threading.Lock()
+
+
+class DashboardSnapshot:
+    @classmethod
+    def get(cls):
+        """The dashboard template context, from cache when still valid"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        ttl = current_app.config.get('DASHBOARD_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+        today = date.today()
+        versions = get_data_versions(SNAPSHOT_TABLES, db_path)
+
+        with _cache_lock:
+            cached = _cache.get(db_path)
+        if cached:
+            expires_at, day, cached_versions, snapshot = cached
+            if time.monotonic() < expires_at and day == today and cached_versions == versions:
+                return snapshot
+
+        snapshot = cls.compute(db_path, today)
+        if ttl:
+            with _cache_lock:
+                _cache[db_path] = (time.monotonic() + ttl, today, versions, snapshot)
+        return snapshot
+
+    @classmethod
+    def etag(cls):
+        """Tag that changes whenever the snapshot's tables are written or the date changes"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        versions = get_data_versions(SNAPSHOT_TABLES, db_path)
+        key = f"{date.today().isoformat()}:{','.join(map(str, versions))}"
+        return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+    @classmethod
+    def metrics(cls):
+        """Just the dashboard counters, e.g. for polling screens"""
+        snapshot = cls.get()
+        return {name: snapshot[name] for name in COUNTER_NAMES}
+
+    @classmethod
+    def compute(cls, db_path, today=None):
+        """Run the dashboard queries (uncached)"""
+        today = today or date.today()
+        month_start, month_end = month_bounds(today.year, today.month)
+        row = execute_query(COUNTERS_QUERY, (today.isoformat(), month_start, month_end), db_path, fetch=True)
+        counters = tuple(row[0]) if row else (0,) * len(COUNTER_NAMES)
+
+        snapshot = dict(zip(COUNTER_NAMES, counters))
+        snapshot.update(
+            recent_members=Member.get_recent(5),
+            recent_payments=Payment.get_recent(5),
+            expiring_memberships=Member.get_expiring_soon(15),
+            announcements=Announcement.get_all(limit=5),
+        )
+        return snapshot
+
+    @classmethod
+    def invalidate(cls, db_path=None):
+        """Drop the cached snapshot for ``db_path`` (all databases when None)"""
+        with _cache_lock:
+            if db_path is None:
+                _cache.clear()
+            else:
+                _cache.pop(db_path, None)
@@ -1,52 +1,846 @@
 import sqlite3
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
-from flask import current_app
+from flask import current_app, g, has_app_context
 from flask_bcrypt import Bcrypt
 import json
+from app.utils.query_stats import record_query
 
-def get_db_connection(db_path='gym_management.db'):
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 30.0
+
+# Per-connection PRAGMAs applied by get_db_connection(profile=...).
+# "production" is meant for multi-worker deployments: WAL lets readers run
+# alongside the single writer, and busy_timeout makes writers wait for the
+# lock instead of failing straight away with "database is locked".
+CONNECTION_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,        # ms
+        'cache_size': -20000,        # ~20 MB page cache per connection
+        'mmap_size': 268435456,      # 256 MB memory-mapped reads
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def get_db_connection(db_path='gym_management.db', check_same_thread=True, profile=None, read_only=False):
     """Get database connection with row factory and FK enabled"""
-    conn = sqlite3.connect(db_path)
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=check_same_thread)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")  
+    for name, value in CONNECTION_PROFILES.get(profile or 'default', {}).items():
+        if read_only and name == 'journal_mode':
+            continue  # persistent setting; can only be changed by a writer
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections for a single database file.
+
+    Connections are created lazily up to ``size``; once that many are checked
+    out, ``acquire`` blocks for up to ``timeout`` seconds before giving up.
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 profile=None, read_only=False):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.profile = profile
+        self.read_only = read_only
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Check out a connection, creating one if the pool is not full yet"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return get_db_connection(self.db_path, check_same_thread=False,
+                                         profile=self.profile, read_only=self.read_only)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Connection pool for {self.db_path} exhausted "
+                f"({self.size} connections in use for {self.timeout}s)"
+            )
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection - drop it and let the pool open a fresh one
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones are closed on release)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Single in-process writer thread for one database file.
+
+    Statements submitted from any thread are executed in arrival order on one
+    connection. Whatever is waiting in the queue when the writer wakes up is
+    committed together (group commit); each statement runs inside its own
+    savepoint, so a failing statement is rolled back and reported to its
+    caller without affecting the rest of the batch.
+    """
+
+    def __init__(self, db_path, profile=None, max_batch=100):
+        self.db_path = db_path
+        self.profile = profile
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"sqlite-writer:{db_path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, query, params=()):
+        """Queue a statement and return a Future resolving to its lastrowid"""
+        future = Future()
+        self._queue.put((query, params, future))
+        return future
+
+    def execute(self, query, params=(), timeout=None):
+        """Queue a statement and wait for it to be committed"""
+        return self.submit(query, params).result(timeout)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        conn = get_db_connection(self.db_path, check_same_thread=False, profile=self.profile)
+        conn.isolation_level = None  # transactions are managed explicitly below
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for query, params, future in batch:
+                conn.execute("SAVEPOINT queued_write")
+                try:
+                    cursor = conn.execute(query, params)
+                    outcomes.append((future, cursor.lastrowid, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO queued_write")
+                    outcomes.append((future, None, e))
+                conn.execute("RELEASE queued_write")
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for future, last_id, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(last_id)
+
+
+_pools = {}
+_write_queues = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path='gym_management.db', read_only=False):
+    """Return the process-wide pool for ``db_path``, creating it on first use"""
+    key = (db_path, read_only)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                size = current_app.config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE)
+                timeout = current_app.config.get('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)
+                profile = current_app.config.get('DB_PROFILE')
+                pool = ConnectionPool(db_path, size=size, timeout=timeout,
+                                      profile=profile, read_only=read_only)
+                _pools[key] = pool
+    return pool
+
+
+def get_write_queue(db_path='gym_management.db'):
+    """Return the process-wide writer queue for ``db_path``, starting it on first use"""
+    writer = _write_queues.get(db_path)
+    if writer is None:
+        with _pools_lock:
+            writer = _write_queues.get(db_path)
+            if writer is None:
+                writer = WriteQueue(db_path, profile=current_app.config.get('DB_PROFILE'))
+                _write_queues[db_path] = writer
+    return writer
+
+
+def close_pools():
+    """Close idle pooled connections and stop writer threads (e.g. before deleting a database file)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        writers = list(_write_queues.values())
+        _pools.clear()
+        _write_queues.clear()
+    for writer in writers:
+        writer.close()
+    for pool in pools:
+        pool.close_all()
+
+
+atexit.register(close_pools)
+
+
+def _request_connection(db_path, read_only=False):
+    """Connection bound to the current app context, or None outside Flask.
+
+    Each request (or background job running inside ``app.app_context()``)
+    checks out at most one connection per database and keeps it until the
+    context is torn down, so consecutive model calls skip connect/PRAGMA setup.
+    """
+    if not has_app_context() or not current_app.config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE):
+        return None
+    connections = g.setdefault('_db_connections', {})
+    key = (db_path, read_only)
+    conn = connections.get(key)
+    if conn is None:
+        conn = get_pool(db_path, read_only=read_only).acquire()
+        connections[key] = conn
     return conn
 
 
+def release_request_connections(exception=None):
+    """teardown_appcontext hook: hand request connections back to their pools"""
+    connections = g.pop('_db_connections', None)
+    if not connections:
+        return
+    for key, conn in connections.items():
+        pool = _pools.get(key)
+        if pool is not None:
+            pool.release(conn)
+        else:
+            conn.close()
+
+
+def init_app(app):
+    """Register database connection handling on the Flask app"""
+    app.config.setdefault('DB_POOL_SIZE', DEFAULT_POOL_SIZE)
+    app.config.setdefault('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)
+    app.config.setdefault('DB_PROFILE', 'default')
+    app.config.setdefault('DB_WRITE_QUEUE', False)
+    app.config.setdefault('DB_READ_ONLY_READERS', app.config['DB_PROFILE'] == 'production')
+    app.teardown_appcontext(release_request_connections)
+
+
+_local = threading.local()
+
+
+def _active_transaction(db_path):
+    """Connection of the transaction open for ``db_path`` in this thread, if any"""
+    transactions = getattr(_local, 'transactions', None)
+    if transactions:
+        state = transactions.get(db_path)
+        if state:
+            return state[0]
+    return None
+
+
+@contextmanager
+def transaction(db_path=None):
+    """Unit of work: group every statement in the block into one commit.
+
+    Inside the block, execute_query / execute_many / execute_batches calls
+    for the same database (from any model) share one connection and are not
+    committed individually. Leaving the block normally commits once; an
+    exception rolls everything back and is re-raised. Nested blocks become
+    savepoints, so an inner failure can be caught without losing the outer work.
+
+        with transaction(db_path):
+            payment.save()
+            member.activate_membership(...)
+    """
+    if db_path is None:
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+    transactions = getattr(_local, 'transactions', None)
+    if transactions is None:
+        transactions = _local.transactions = {}
+
+    state = transactions.get(db_path)
+    if state is not None:
+        conn = state[0]
+        state[1] += 1
+        savepoint = f"uow_{state[1]}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+        finally:
+            state[1] -= 1
+        return
+
+    conn = _request_connection(db_path) if has_app_context() else None
+    pooled = conn is not None
+    if not pooled:
+        conn = get_db_connection(db_path)
+    if conn.in_transaction:
+        conn.rollback()
+    conn.execute("BEGIN IMMEDIATE")
+    transactions[db_path] = [conn, 0]
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        del transactions[db_path]
+        if not pooled:
+            conn.close()
+
+
+def _log_query_error(e, query, params):
+    # Optional: log error in Flask if running inside app
+    try:
+        from flask import current_app
+        current_app.logger.error(f"DB Error: {e} | Query: {query} | Params: {params}")
+    except:
+        print(f"DB Error: {e} | Query: {query} | Params: {params}")
+
+
+def _is_read(query):
+    head = query.lstrip()[:6].upper()
+    return head.startswith('SELECT') or head.startswith('WITH')
+
+
 def execute_query(query, params=(), db_path='gym_management.db', fetch=False):
     """Execute a database query with optional parameters"""
-    conn = get_db_connection(db_path)
+    started = time.perf_counter()
+    try:
+        return _run_query(query, params, db_path, fetch)
+    finally:
+        record_query(query, params, time.perf_counter() - started)
+
+
+def _run_query(query, params, db_path, fetch):
+    tx_conn = _active_transaction(db_path)
+    if tx_conn is not None:
+        # Part of a unit of work: the enclosing transaction() commits or rolls back
+        try:
+            cursor = tx_conn.execute(query, params)
+            return cursor.fetchall() if fetch else cursor.lastrowid
+        except Exception as e:
+            _log_query_error(e, query, params)
+            raise
+
+    in_app = has_app_context()
+    if in_app and not fetch and current_app.config.get('DB_WRITE_QUEUE'):
+        try:
+            return get_write_queue(db_path).execute(query, params)
+        except Exception as e:
+            _log_query_error(e, query, params)
+            raise
+
+    read_only = in_app and fetch and current_app.config.get('DB_READ_ONLY_READERS') and _is_read(query)
+    conn = _request_connection(db_path, read_only=bool(read_only)) if in_app else None
+    pooled = conn is not None
+    if not pooled:
+        conn = get_db_connection(db_path)
     cursor = conn.cursor()
 
     try:
         cursor.execute(query, params)
         if fetch:
             result = cursor.fetchall()
-            conn.close()
-            return result
         else:
             conn.commit()
-            last_id = cursor.lastrowid
+            result = cursor.lastrowid
+        cursor.close()
+        if not pooled:
+            conn.close()
+        return result
+    except Exception as e:
+        if pooled:
+            if conn.in_transaction:
+                conn.rollback()
+        else:
             conn.close()
-            return last_id
+        _log_query_error(e, query, params)
+        raise
+
+def iter_query(query, params=(), db_path='gym_management.db', chunk_size=1000):
+    """Yield the rows of a SELECT, fetching ``chunk_size`` at a time.
+
+    Uses its own read-only connection (not the request's pooled one) so the
+    generator can outlive the view that created it, e.g. in a streamed
+    response; at most one chunk of rows is held in memory. The read holds a
+    shared lock until the last row is fetched, which in the default journal
+    mode delays writers' commits - use DB_PROFILE=production (WAL) when large
+    exports run alongside writes.
+    """
+    profile = current_app.config.get('DB_PROFILE') if has_app_context() else None
+    started = time.perf_counter()
+    conn = get_db_connection(db_path, profile=profile, read_only=True)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
     except Exception as e:
+        _log_query_error(e, query, params)
+        raise
+    finally:
         conn.close()
-        # Optional: log error in Flask if running inside app
+        record_query(query, params, time.perf_counter() - started)
+
+
+def execute_update(query, params=(), db_path='gym_management.db'):
+    """Run one UPDATE/DELETE and return the number of rows it changed.
+
+    Like execute_many it runs on the request's connection (or inside the
+    active transaction()), not through the write queue, which only reports
+    lastrowid.
+    """
+    started = time.perf_counter()
+    try:
+        tx_conn = _active_transaction(db_path)
+        if tx_conn is not None:
+            try:
+                return tx_conn.execute(query, params).rowcount
+            except Exception as e:
+                _log_query_error(e, query, params)
+                raise
+
+        conn = _request_connection(db_path) if has_app_context() else None
+        pooled = conn is not None
+        if not pooled:
+            conn = get_db_connection(db_path)
         try:
-            from flask import current_app
-            current_app.logger.error(f"DB Error: {e} | Query: {query} | Params: {params}")
-        except:
-            print(f"DB Error: {e} | Query: {query} | Params: {params}")
+            count = conn.execute(query, params).rowcount
+            conn.commit()
+            return count
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            _log_query_error(e, query, params)
+            raise
+        finally:
+            if not pooled:
+                conn.close()
+    finally:
+        record_query(query, params, time.perf_counter() - started)
+
+
+def execute_many(query, seq_of_params, db_path='gym_management.db'):
+    """Run one statement for every parameter tuple in a single transaction.
+
+    Returns the total number of rows affected.
+    """
+    return execute_batches([(query, seq_of_params)], db_path)[0]
+
+
+def execute_batches(batches, db_path='gym_management.db'):
+    """Run several ``(query, seq_of_params)`` batches through executemany atomically.
+
+    Either every batch is committed or none is. Returns the affected row count
+    of each batch, in order.
+    """
+    batches = [(query, list(seq)) for query, seq in batches]
+    started = time.perf_counter()
+    tx_conn = _active_transaction(db_path)
+    if tx_conn is not None:
+        try:
+            return [tx_conn.executemany(query, seq).rowcount if seq else 0 for query, seq in batches]
+        finally:
+            elapsed = (time.perf_counter() - started) / max(len(batches), 1)
+            for query, seq in batches:
+                record_query(query, f"<batch of {len(seq)}>", elapsed)
+
+    conn = _request_connection(db_path) if has_app_context() else None
+    pooled = conn is not None
+    if not pooled:
+        conn = get_db_connection(db_path)
+
+    counts = []
+    current, seq = 'BEGIN IMMEDIATE', []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for current, seq in batches:
+            counts.append(conn.executemany(current, seq).rowcount if seq else 0)
+        conn.commit()
+        return counts
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        _log_query_error(e, current, f"<batch of {len(seq)}>")
         raise
+    finally:
+        if not pooled:
+            conn.close()
+        elapsed = (time.perf_counter() - started) / max(len(batches), 1)
+        for query, seq in batches:
+            record_query(query, f"<batch of {len(seq)}>", elapsed)
+
+
+# Secondary indexes for the hot lookup paths (and the data fixes they rely
+# on), grouped by version. To add indexes, append a new version rather than
+# editing an applied one; the highest applied version is stored in
+# PRAGMA user_version.
+SCHEMA_INDEXES = {
+    1: [
+        # member history / "already booked today" checks
+        "CREATE INDEX IF NOT EXISTS idx_attendance_member_date ON attendance (member_id, date)",
+        # trainer schedule and slot availability
+        "CREATE INDEX IF NOT EXISTS idx_attendance_trainer_date_slot ON attendance (trainer_id, date, time_slot)",
+        # today's attendance / attendance by date
+        "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_member_created ON payments (member_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_status_date ON payments (payment_status, payment_date)",
+        "CREATE INDEX IF NOT EXISTS idx_members_trainer ON members (trainer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_members_end_date ON members (membership_end_date)",
+        "CREATE INDEX IF NOT EXISTS idx_members_user ON members (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_trainers_user ON trainers (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_reset_token ON users (reset_token)",
+        # foreign keys walked by member/trainer plan pages and deletes
+        "CREATE INDEX IF NOT EXISTS idx_diet_plans_member ON diet_plans (member_id)",
+        "CREATE INDEX IF NOT EXISTS idx_diet_plans_trainer ON diet_plans (trainer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_diet_plan_meals_plan ON diet_plan_meals (diet_plan_id)",
+        "CREATE INDEX IF NOT EXISTS idx_workout_plans_member ON member_workout_plans (member_id)",
+        "CREATE INDEX IF NOT EXISTS idx_workout_plans_trainer ON member_workout_plans (trainer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_workout_plan_details_plan ON workout_plan_details (plan_id)",
+        "CREATE INDEX IF NOT EXISTS idx_progress_member_date ON member_progress (member_id, recorded_date)",
+    ],
+    2: [
+        # Report and expiry filters compare date columns as 'YYYY-MM-DD' text
+        # ranges. Rewrite legacy values ('2024-05-01 00:00:00', '2024-05-01T...')
+        # so they sort with the rest; unparseable values are left untouched.
+        *(
+            f"UPDATE {table} SET {column} = date({column}) "
+            f"WHERE typeof({column}) = 'text' AND date({column}) IS NOT NULL AND {column} <> date({column})"
+            for table, column in (
+                ('payments', 'payment_date'),
+                ('payments', 'due_date'),
+                ('attendance', 'date'),
+                ('members', 'membership_start_date'),
+                ('members', 'membership_end_date'),
+            )
+        ),
+        # new members per month
+        "CREATE INDEX IF NOT EXISTS idx_members_start_date ON members (membership_start_date)",
+    ],
+    3: [
+        # dashboard: revenue sums read only the index, recent lists walk it backwards
+        "CREATE INDEX IF NOT EXISTS idx_payments_status_date_amount ON payments (payment_status, payment_date, amount)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_created ON payments (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_members_created ON members (created_at)",
+    ],
+    # 4 held the payments.created_at backfill, which now runs in _create_schema
+    5: [
+        # The availability index's range load reads only this index (no table
+        # lookups); it supersedes idx_attendance_trainer_date_slot
+        "CREATE INDEX IF NOT EXISTS idx_attendance_trainer_date_slot_id "
+        "ON attendance (trainer_id, date, time_slot, time_slot_id)",
+        "DROP INDEX IF EXISTS idx_attendance_trainer_date_slot",
+    ],
+}
+INDEX_VERSION = max(SCHEMA_INDEXES)
+
+
+def apply_indexes(cursor):
+    """Apply any index sets newer than the version recorded in the database"""
+    current = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if current >= INDEX_VERSION:
+        return current
+    for version in sorted(SCHEMA_INDEXES):
+        if version <= current:
+            continue
+        for statement in SCHEMA_INDEXES[version]:
+            cursor.execute(statement)
+    cursor.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return INDEX_VERSION
+
 
 def _get_bcrypt():
     """Return a Bcrypt instance bound to the current app (call inside app context)."""
     return Bcrypt(current_app)
 
+# Version of the whole schema built by init_db (tables, added columns and
+# index sets). Bump it whenever init_db changes so existing databases are
+# upgraded once; databases already at this version skip init_db on startup.
+SCHEMA_VERSION = 14
+
+# Tables whose writes are counted in data_versions, so caches built from them
+# can tell they are stale without re-running their queries
+VERSIONED_TABLES = ('members', 'trainers', 'payments', 'attendance', 'equipment', 'announcements', 'time_slots')
+
+
+def get_schema_version(cursor):
+    """Highest version recorded in schema_version (0 for a new/legacy database)"""
+    try:
+        row = cursor.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def ensure_schema(db_path='gym_management.db'):
+    """
+    Startup hook: a single version check when the database is up to date,
+    otherwise run init_db. Returns True when the schema was created/upgraded.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        current = get_schema_version(conn.cursor())
+    finally:
+        conn.close()
+    if current >= SCHEMA_VERSION:
+        return False
+    return init_db(db_path)
+
+
+# Rollups kept current by triggers: completed revenue per payment_date,
+# attendance counts per status per date and per member. Reports and member
+# pages read these instead of raw rows.
+ROLLUP_TABLES = {
+    'daily_revenue': '''
+        CREATE TABLE IF NOT EXISTS daily_revenue (
+            day DATE PRIMARY KEY,
+            total REAL NOT NULL DEFAULT 0,
+            payments INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+    'daily_attendance': '''
+        CREATE TABLE IF NOT EXISTS daily_attendance (
+            day DATE PRIMARY KEY,
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            late INTEGER NOT NULL DEFAULT 0,
+            scheduled INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+    'member_attendance_stats': '''
+        CREATE TABLE IF NOT EXISTS member_attendance_stats (
+            member_id INTEGER PRIMARY KEY,
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            late INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0  -- every session, scheduled ones included
+        )
+    ''',
+}
+
+_REVENUE_DELTA = '''
+    INSERT INTO daily_revenue (day, total, payments)
+    SELECT {row}.payment_date, {sign}{row}.amount, {sign}1
+    WHERE {row}.payment_status = 'completed' AND {row}.payment_date IS NOT NULL
+    ON CONFLICT(day) DO UPDATE SET total = total + excluded.total, payments = payments + excluded.payments;
+'''
+_ATTENDANCE_DELTA = '''
+    INSERT INTO daily_attendance (day, present, absent, late, scheduled)
+    SELECT {row}.date, {sign}({row}.status = 'present'), {sign}({row}.status = 'absent'),
+           {sign}({row}.status = 'late'), {sign}({row}.status = 'scheduled')
+    WHERE {row}.date IS NOT NULL
+    ON CONFLICT(day) DO UPDATE SET present = present + excluded.present, absent = absent + excluded.absent,
+                                   late = late + excluded.late, scheduled = scheduled + excluded.scheduled;
+'''
+_MEMBER_ATTENDANCE_DELTA = '''
+    INSERT INTO member_attendance_stats (member_id, present, absent, late, total)
+    SELECT {row}.member_id, {sign}({row}.status = 'present'), {sign}({row}.status = 'absent'),
+           {sign}({row}.status = 'late'), {sign}1
+    WHERE {row}.member_id IS NOT NULL
+    ON CONFLICT(member_id) DO UPDATE SET present = present + excluded.present, absent = absent + excluded.absent,
+                                         late = late + excluded.late, total = total + excluded.total;
+'''
+ROLLUP_TRIGGERS = {
+    'trg_payments_rollup_insert': ('AFTER INSERT ON payments', _REVENUE_DELTA.format(row='NEW', sign='')),
+    'trg_payments_rollup_delete': ('AFTER DELETE ON payments', _REVENUE_DELTA.format(row='OLD', sign='-')),
+    'trg_payments_rollup_update': (
+        'AFTER UPDATE OF payment_status, amount, payment_date ON payments',
+        _REVENUE_DELTA.format(row='OLD', sign='-') + _REVENUE_DELTA.format(row='NEW', sign=''),
+    ),
+    'trg_attendance_rollup_insert': ('AFTER INSERT ON attendance', _ATTENDANCE_DELTA.format(row='NEW', sign='')),
+    'trg_attendance_rollup_delete': ('AFTER DELETE ON attendance', _ATTENDANCE_DELTA.format(row='OLD', sign='-')),
+    'trg_attendance_rollup_update': (
+        'AFTER UPDATE OF status, date ON attendance',
+        _ATTENDANCE_DELTA.format(row='OLD', sign='-') + _ATTENDANCE_DELTA.format(row='NEW', sign=''),
+    ),
+    'trg_member_attendance_insert': (
+        'AFTER INSERT ON attendance', _MEMBER_ATTENDANCE_DELTA.format(row='NEW', sign='')
+    ),
+    'trg_member_attendance_delete': (
+        'AFTER DELETE ON attendance', _MEMBER_ATTENDANCE_DELTA.format(row='OLD', sign='-')
+    ),
+    'trg_member_attendance_update': (
+        'AFTER UPDATE OF status, member_id ON attendance',
+        _MEMBER_ATTENDANCE_DELTA.format(row='OLD', sign='-') + _MEMBER_ATTENDANCE_DELTA.format(row='NEW', sign=''),
+    ),
+}
+ROLLUP_REBUILD = [
+    "DELETE FROM daily_revenue",
+    '''INSERT INTO daily_revenue (day, total, payments)
+       SELECT payment_date, SUM(amount), COUNT(*) FROM payments
+       WHERE payment_status = 'completed' AND payment_date IS NOT NULL
+       GROUP BY payment_date''',
+    "DELETE FROM daily_attendance",
+    '''INSERT INTO daily_attendance (day, present, absent, late, scheduled)
+       SELECT date, SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'late'), SUM(status = 'scheduled')
+       FROM attendance
+       WHERE date IS NOT NULL
+       GROUP BY date''',
+    "DELETE FROM member_attendance_stats",
+    '''INSERT INTO member_attendance_stats (member_id, present, absent, late, total)
+       SELECT member_id, SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'late'), COUNT(*)
+       FROM attendance
+       WHERE member_id IS NOT NULL
+       GROUP BY member_id''',
+]
+
+
+def _create_rollups(cursor):
+    """Create the rollup tables and triggers; backfill tables that did not exist yet"""
+    existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for ddl in ROLLUP_TABLES.values():
+        cursor.execute(ddl)
+    for name, (event, body) in ROLLUP_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    if not set(ROLLUP_TABLES) <= existing:
+        for statement in ROLLUP_REBUILD:
+            cursor.execute(statement)
+
+
+def rebuild_rollups(db_path='gym_management.db'):
+    """Recompute daily_revenue, daily_attendance and member_attendance_stats from the raw tables
+    (after imports or manual fixes)"""
+    with transaction(db_path):
+        for statement in ROLLUP_REBUILD:
+            execute_query(statement, (), db_path)
+
+
+def get_data_versions(tables=VERSIONED_TABLES, db_path='gym_management.db'):
+    """Current write counters for ``tables`` as a tuple (same order), for use as a cache key"""
+    placeholders = ', '.join('?' * len(tables))
+    rows = execute_query(
+        f"SELECT table_name, version FROM data_versions WHERE table_name IN ({placeholders})",
+        tuple(tables), db_path, fetch=True
+    ) or []
+    versions = {row[0]: row[1] for row in rows}
+    return tuple(versions.get(table, 0) for table in tables)
+
+
 def init_db(db_path='gym_management.db'):
-    """Initialize database with all required tables"""
+    """
+    Create or upgrade all tables, columns and indexes, then record SCHEMA_VERSION.
+    Demo data is not inserted here; see seed_db / `flask seed-db`.
+    Returns False when another process had already brought the schema up to date.
+    """
     conn = sqlite3.connect(db_path)
+    # Several workers may start on a new database at once: the first one to
+    # get the write lock migrates, the rest find the new version and stop.
+    conn.execute("BEGIN IMMEDIATE")
     cursor = conn.cursor()
-    
+    if get_schema_version(cursor) >= SCHEMA_VERSION:
+        conn.rollback()
+        conn.close()
+        return False
+    _create_schema(cursor)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+    conn.commit()
+    conn.close()
+    return True
+
+
+def seed_db(db_path='gym_management.db'):
+    """Insert demo users, plans and history into empty tables (needs an app context for Bcrypt)"""
+    ensure_schema(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        insert_default_data(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _create_schema(cursor):
+    """CREATE TABLE IF NOT EXISTS for every table, plus column and index upgrades"""
     # Users table (for authentication - admin, member, trainer)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -151,6 +945,12 @@ CREATE TABLE IF NOT EXISTS payments (
 );
 
     ''')
+    # Payment history pages seek on (created_at, id); a NULL created_at would
+    # never compare below a cursor, so give legacy rows one
+    cursor.execute(
+        "UPDATE payments SET created_at = COALESCE(payment_date, due_date, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
     
     # Attendance table (enhanced with time_slot column)
     cursor.execute('''
@@ -166,6 +966,8 @@ CREATE TABLE IF NOT EXISTS payments (
             notes TEXT,
             status TEXT DEFAULT 'scheduled' CHECK (status IN ('present', 'absent', 'late','scheduled')),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            slot_end_at TIMESTAMP, -- when the session is over (see attendance.slot_end_at)
+            time_slot_id INTEGER REFERENCES time_slots (id),
             FOREIGN KEY (member_id) REFERENCES members (id),
             FOREIGN KEY (trainer_id) REFERENCES trainers (id)
         )
@@ -341,12 +1143,164 @@ CREATE TABLE IF NOT EXISTS payments (
     if 'time_slot' not in columns:
         cursor.execute("ALTER TABLE attendance ADD COLUMN time_slot TEXT")
         print("Added time_slot column to existing attendance table")
-    
-    # Insert default data
-    insert_default_data(cursor)
-    
-    conn.commit()
-    conn.close()
+
+    # Precomputed session end, so the auto-absent sweep is one indexed UPDATE
+    if 'slot_end_at' not in columns:
+        cursor.execute("ALTER TABLE attendance ADD COLUMN slot_end_at TIMESTAMP")
+    _backfill_slot_end_at(cursor)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_attendance_scheduled_end ON attendance (slot_end_at) "
+        "WHERE status = 'scheduled'"
+    )
+
+    # Slot catalog (see app/models/time_slot.py); attendance rows point at their slot
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS time_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL,
+            start_minute INTEGER NOT NULL CHECK (start_minute >= 0 AND start_minute < 1440),
+            end_minute INTEGER NOT NULL CHECK (end_minute > start_minute AND end_minute <= 1440),
+            trainer_id INTEGER REFERENCES trainers (id), -- NULL: every trainer
+            weekday INTEGER CHECK (weekday BETWEEN 0 AND 6), -- 0 = Monday; NULL: every day
+            is_active INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            capacity INTEGER NOT NULL DEFAULT 1 CHECK (capacity >= 1) -- members per trainer per slot
+        )
+    ''')
+    cursor.execute("PRAGMA table_info(time_slots)")
+    if 'capacity' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE time_slots ADD COLUMN capacity INTEGER NOT NULL DEFAULT 1 CHECK (capacity >= 1)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_time_slots_scope ON time_slots (trainer_id, weekday)")
+    _seed_time_slots(cursor)
+    if 'time_slot_id' not in columns:
+        cursor.execute("ALTER TABLE attendance ADD COLUMN time_slot_id INTEGER REFERENCES time_slots (id)")
+    # Rows booked from the old hard-coded list carry a default slot's label
+    cursor.execute('''
+        UPDATE attendance SET time_slot_id = (
+            SELECT s.id FROM time_slots s
+            WHERE s.label = attendance.time_slot AND s.trainer_id IS NULL AND s.weekday IS NULL
+        )
+        WHERE time_slot_id IS NULL AND time_slot IS NOT NULL
+    ''')
+    for name, (event, condition) in SLOT_CAPACITY_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} WHEN {condition} "
+                       f"BEGIN SELECT RAISE(ABORT, 'slot full'); END")
+
+    # Progress markers for incremental background work (e.g. the last slot_end_at
+    # the attendance reconciler has handled)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watermarks (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Password reset columns (previously only added by scripts/add_reset_columns.py)
+    cursor.execute("PRAGMA table_info(users)")
+    user_columns = [column[1] for column in cursor.fetchall()]
+    for column in ('reset_token', 'reset_token_expires'):
+        if column not in user_columns:
+            cursor.execute(f"ALTER TABLE users ADD COLUMN {column} TEXT")
+
+    # Background job history and cross-process leases (see app/scheduler.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_name TEXT NOT NULL,
+            owner TEXT,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP,
+            duration_ms REAL,
+            status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'success', 'failed')),
+            rows_affected INTEGER DEFAULT 0,
+            details TEXT, -- JSON string
+            error TEXT
+        )
+    ''')
+    # last successful run per job
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_name_status_started ON job_runs (job_name, status, started_at)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at TIMESTAMP NOT NULL
+        )
+    ''')
+
+    _create_data_versions(cursor)
+    _create_rollups(cursor)
+    apply_indexes(cursor)
+
+
+def _backfill_slot_end_at(cursor):
+    """Fill attendance.slot_end_at for rows written before the column existed"""
+    from app.models.attendance import slot_end_at  # attendance imports this module
+
+    pairs = cursor.execute(
+        "SELECT date, time_slot FROM attendance WHERE slot_end_at IS NULL GROUP BY date, time_slot"
+    ).fetchall()
+    updates = [(slot_end_at(slot, day), day, slot) for day, slot in pairs]
+    cursor.executemany(
+        "UPDATE attendance SET slot_end_at = ? WHERE slot_end_at IS NULL AND date = ? AND time_slot IS ?",
+        [u for u in updates if u[0]]
+    )
+
+
+# A trainer takes at most time_slots.capacity bookings per slot and date, whatever
+# code path writes the row; the booking engine checks first and maps the abort
+# (sqlite3.IntegrityError 'slot full') to a conflict result
+_SLOT_BOOKINGS = '''
+    (SELECT COUNT(*) FROM attendance
+     WHERE trainer_id = NEW.trainer_id AND date = NEW.date AND time_slot_id = NEW.time_slot_id{exclude})
+    >= (SELECT capacity FROM time_slots WHERE id = NEW.time_slot_id)
+'''
+SLOT_CAPACITY_TRIGGERS = {
+    'trg_attendance_capacity_insert': (
+        'BEFORE INSERT ON attendance',
+        "NEW.time_slot_id IS NOT NULL AND NEW.trainer_id IS NOT NULL AND " + _SLOT_BOOKINGS.format(exclude=''),
+    ),
+    'trg_attendance_capacity_update': (
+        'BEFORE UPDATE OF trainer_id, date, time_slot_id ON attendance',
+        "NEW.time_slot_id IS NOT NULL AND NEW.trainer_id IS NOT NULL "
+        "AND (NEW.trainer_id IS NOT OLD.trainer_id OR NEW.date IS NOT OLD.date "
+        "OR NEW.time_slot_id IS NOT OLD.time_slot_id) AND "
+        + _SLOT_BOOKINGS.format(exclude=' AND id <> NEW.id'),
+    ),
+}
+
+
+def _seed_time_slots(cursor):
+    """Insert the gym-wide default slots into an empty time_slots table"""
+    from app.models.time_slot import DEFAULT_SLOTS, minutes_label  # time_slot imports this module
+
+    if cursor.execute("SELECT COUNT(*) FROM time_slots").fetchone()[0]:
+        return
+    cursor.executemany(
+        "INSERT INTO time_slots (label, start_minute, end_minute) VALUES (?, ?, ?)",
+        [(minutes_label(start, end), start, end) for start, end in DEFAULT_SLOTS]
+    )
+
+
+def _create_data_versions(cursor):
+    """Version counter per table, bumped by triggers on every insert/update/delete"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
 
 def insert_default_data(cursor):
     """Insert default/seed data"""
@@ -373,11 +1327,10 @@ def insert_default_data(cursor):
             ('Yearly VIP', 'Full access with premium benefits', 12, 8999.00, '["Unlimited Gym Access", "Locker Room", "4 Personal Training Sessions/Month", "Nutrition Plan", "Progress Tracking", "Priority Support"]'),
             ('Premium Plus', 'All-inclusive premium package', 6, 4999.00, '["Unlimited Access", "Personal Trainer", "Nutrition Plan", "Group Classes", "Massage Therapy"]')
         ]
-        for plan in plans:
-            cursor.execute('''
-                INSERT INTO membership_plans (name, description, duration_months, price, features)
-                VALUES (?, ?, ?, ?, ?)
-            ''', plan)
+        cursor.executemany('''
+            INSERT INTO membership_plans (name, description, duration_months, price, features)
+            VALUES (?, ?, ?, ?, ?)
+        ''', plans)
 
     # Create sample trainers (you provided 2 trainer users)
     cursor.execute('SELECT COUNT(*) FROM users WHERE role = "trainer"')
@@ -386,24 +1339,25 @@ def insert_default_data(cursor):
             ('Anusha_t', 'venkataraghupathisaimannava@gmail.com', 'trainer123', 'Anusha Reddy', '+919000000011'),
             ('Arjun_t', 'mannava23bcs96@iiitkottayam.ac.in', 'trainer123', 'Arjun Patel', '+919000000012')
         ]
+        user_rows = []
         for trainer in trainer_users:
             password_hash = bcrypt.generate_password_hash(trainer[2])
             if isinstance(password_hash, bytes):
                 password_hash = password_hash.decode('utf-8')
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, role, full_name, phone)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (trainer[0], trainer[1], password_hash, 'trainer', trainer[3], trainer[4]))
+            user_rows.append((trainer[0], trainer[1], password_hash, 'trainer', trainer[3], trainer[4]))
+        cursor.executemany('''
+            INSERT INTO users (username, email, password_hash, role, full_name, phone)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', user_rows)
 
         # Create trainer profiles using the phone saved in users (keeps things consistent)
-        cursor.execute('SELECT id, full_name FROM users WHERE role = "trainer"')
+        cursor.execute('SELECT id, full_name, phone FROM users WHERE role = "trainer"')
         trainer_users = cursor.fetchall()
+        trainer_rows = []
         for user in trainer_users:
             user_id = user[0]
             full_name = user[1]
-            # read phone from users table so it's always in sync
-            phone_row = cursor.execute('SELECT phone FROM users WHERE id = ?', (user_id,)).fetchone()
-            phone = phone_row[0] if phone_row else None
+            phone = user[2]
 
             if 'Anusha' in full_name:
                 specialization = 'Yoga, Flexibility, Cardio'
@@ -427,10 +1381,12 @@ def insert_default_data(cursor):
                 hours = '9:00 AM - 5:00 PM'
                 bio = 'Passionate trainer.'
 
-            cursor.execute('''
-                INSERT INTO trainers (user_id, phone, specialization, experience_years, certification, salary, working_hours, bio)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, phone, specialization, exp, cert, salary, hours, bio))
+            trainer_rows.append((user_id, phone, specialization, exp, cert, salary, hours, bio))
+
+        cursor.executemany('''
+            INSERT INTO trainers (user_id, phone, specialization, experience_years, certification, salary, working_hours, bio)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', trainer_rows)
 
     # Create sample members (you provided 4 members)
     cursor.execute('SELECT COUNT(*) FROM users WHERE role = "member"')
@@ -442,14 +1398,16 @@ def insert_default_data(cursor):
             ('ashok', 'adapa23bcs30@iiitkottayam.ac.in', 'member123', 'Ashok Kumar', '+919000000022')
         ]
 
+        user_rows = []
         for member in member_users:
             password_hash = bcrypt.generate_password_hash(member[2])
             if isinstance(password_hash, bytes):
                 password_hash = password_hash.decode('utf-8')
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, role, full_name, phone)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (member[0], member[1], password_hash, 'member', member[3], member[4]))
+            user_rows.append((member[0], member[1], password_hash, 'member', member[3], member[4]))
+        cursor.executemany('''
+            INSERT INTO users (username, email, password_hash, role, full_name, phone)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', user_rows)
 
         # Fetch available plans and trainers safely
         cursor.execute('SELECT id FROM membership_plans')
@@ -460,6 +1418,8 @@ def insert_default_data(cursor):
         if plan_ids and trainer_ids:
             cursor.execute('SELECT id, full_name FROM users WHERE role = "member" ORDER BY id')
             member_users = cursor.fetchall()
+            today = date.today()
+            member_rows = []
             for i, user in enumerate(member_users):
                 # Assign first 3 members to trainer_ids[0], last member to trainer_ids[1]
                 assigned_trainer = trainer_ids[0] if i < 3 else (trainer_ids[1] if len(trainer_ids) > 1 else trainer_ids[0])
@@ -483,13 +1443,7 @@ def insert_default_data(cursor):
                     weight = 70.0
                     height = 168.0
 
-                today = date.today()
-                cursor.execute('''
-                    INSERT INTO members (
-                        user_id, membership_plan_id, phone, weight, height,
-                        membership_start_date, membership_end_date, trainer_id
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                member_rows.append((
                     user[0],
                     plan_ids[i % len(plan_ids)],
                     phone,
@@ -500,6 +1454,13 @@ def insert_default_data(cursor):
                     assigned_trainer
                 ))
 
+            cursor.executemany('''
+                INSERT INTO members (
+                    user_id, membership_plan_id, phone, weight, height,
+                    membership_start_date, membership_end_date, trainer_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', member_rows)
+
     # Insert sample equipment
     cursor.execute('SELECT COUNT(*) FROM equipment')
     if cursor.fetchone()[0] == 0:
@@ -510,11 +1471,10 @@ def insert_default_data(cursor):
             ('Rowing Machine', 'Cardio', 'CardioMax', 'RM-300', 'maintenance', 'Cardio Area'),
             ('Dumbbell Set (5-50 kg)', 'Strength', 'IronGrip', 'DB-SET-1', 'working', 'Free Weights')
         ]
-        for equipment in equipment_list:
-            cursor.execute('''
-                INSERT INTO equipment (name, category, brand, model, status, location)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', equipment)
+        cursor.executemany('''
+            INSERT INTO equipment (name, category, brand, model, status, location)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', equipment_list)
 
     # Insert sample workouts
     # Insert sample workouts
@@ -541,11 +1501,10 @@ def insert_default_data(cursor):
             ('Butterfly Stretch', 'Inner thigh flexibility', 'flexibility', 'beginner', 10, 0, 'Sit, press soles together, push knees down gently', 'None')
         ]
 
-        for workout in workouts:
-            cursor.execute('''
-                INSERT INTO workouts (name, description, category, difficulty_level, duration_minutes, calories_burned, instructions, equipment_needed)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', workout)
+        cursor.executemany('''
+            INSERT INTO workouts (name, description, category, difficulty_level, duration_minutes, calories_burned, instructions, equipment_needed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', workouts)
 
 
     # Insert sample announcement
@@ -570,8 +1529,12 @@ def insert_default_data(cursor):
     # Payments — insert sample payments AND activate corresponding members
     cursor.execute('SELECT COUNT(*) FROM payments')
     if cursor.fetchone()[0] == 0:
-        # Fetch members with their plan_id and user_id so we can activate user rows as well
-        cursor.execute('SELECT id, membership_plan_id, user_id FROM members')
+        # Fetch members with their plan price/duration and user_id so we can activate user rows as well
+        cursor.execute('''
+            SELECT m.id, m.membership_plan_id, m.user_id, mp.price, mp.duration_months
+            FROM members m
+            LEFT JOIN membership_plans mp ON mp.id = m.membership_plan_id
+        ''')
         members = cursor.fetchall()
 
         # helper to add months to a date (handles month rollover)
@@ -583,29 +1546,22 @@ def insert_default_data(cursor):
             day = min(sourcedate.day, calendar.monthrange(year, month)[1])
             return date(year, month, day)
 
+        payment_rows, member_updates, user_updates = [], [], []
         for i, m in enumerate(members, start=1):
             member_id = m[0]
             membership_plan_id = m[1]
             user_id = m[2]
 
-            # Fetch plan price and duration safely
-            cur_plan = cursor.execute('SELECT price, duration_months FROM membership_plans WHERE id = ?', (membership_plan_id,)).fetchone()
-            plan_price = cur_plan[0] if cur_plan and cur_plan[0] is not None else 0.0
+            plan_price = m[3] if m[3] is not None else 0.0
             try:
-                duration_months = int(cur_plan[1]) if cur_plan and cur_plan[1] is not None else 1
+                duration_months = int(m[4]) if m[4] is not None else 1
             except Exception:
                 duration_months = 1
 
             invoice_number = f"INV{str(i).zfill(4)}"
             transaction_id = f"TXN{str(i).zfill(6)}"
 
-            cursor.execute('''
-                INSERT INTO payments (
-                    member_id, membership_plan_id, amount, payment_method, payment_status,
-                    transaction_id, payment_date, due_date, notes, invoice_number,
-                    reminder_sent, reminder_sent_at, cancelled_processed
-                ) VALUES (?, ?, ?, ?, ?, ?, DATE('now'), DATE('now','+30 day'), ?, ?, 0, NULL, 0)
-            ''', (
+            payment_rows.append((
                 member_id,
                 membership_plan_id,
                 plan_price,
@@ -618,15 +1574,51 @@ def insert_default_data(cursor):
 
             start_dt = date.today()
             end_dt = _add_months(start_dt, duration_months)
+            member_updates.append((start_dt.isoformat(), end_dt.isoformat(), 'active', member_id))
+            if user_id:
+                user_updates.append((user_id,))
 
-            cursor.execute("""
-                UPDATE members
-                SET membership_start_date = ?, membership_end_date = ?, status = ?
-                WHERE id = ?
-            """, (start_dt.isoformat(), end_dt.isoformat(), 'active', member_id))
+        cursor.executemany('''
+            INSERT INTO payments (
+                member_id, membership_plan_id, amount, payment_method, payment_status,
+                transaction_id, payment_date, due_date, notes, invoice_number,
+                reminder_sent, reminder_sent_at, cancelled_processed
+            ) VALUES (?, ?, ?, ?, ?, ?, DATE('now'), DATE('now','+30 day'), ?, ?, 0, NULL, 0)
+        ''', payment_rows)
+        cursor.executemany("""
+            UPDATE members
+            SET membership_start_date = ?, membership_end_date = ?, status = ?
+            WHERE id = ?
+        """, member_updates)
+        cursor.executemany("UPDATE users SET is_active = 1 WHERE id = ?", user_updates)
 
-            if user_id:
-                cursor.execute("UPDATE users SET is_active = 1 WHERE id = ?", (user_id,))
+    # Typical meals for Indian context, by plan (weight loss, maintenance, muscle gain, balanced)
+    sample_meals = {
+        1: [
+            ('breakfast', 'Poha with vegetables', 'Poha, peas, carrots, peanuts', 350, 10.0, 55.0, 8.0, 'Cook poha with minimal oil and vegetables'),
+            ('lunch', 'Grilled chicken + salad', 'Chicken breast, salad greens, tomato, cucumber', 500, 40.0, 20.0, 15.0, 'Grill chicken with spices, serve with salad'),
+            ('dinner', 'Mixed vegetable sabzi + chapati', 'Mixed veg, 1 chapati', 450, 12.0, 60.0, 10.0, 'Lightly sauté vegetables and serve with chapati'),
+            ('snack', 'Buttermilk and fruit', 'Curd, water, seasonal fruit', 200, 6.0, 30.0, 5.0, 'Buttermilk without added sugar')
+        ],
+        2: [
+            ('breakfast', 'Upma with nuts', 'Semolina, peanuts, vegetables', 400, 9.0, 60.0, 10.0, 'Cook upma with vegetables and a few nuts'),
+            ('lunch', 'Paneer bhurji + brown rice', 'Paneer, spices, brown rice', 650, 30.0, 70.0, 20.0, 'Light cooking with minimal oil'),
+            ('dinner', 'Dal tadka + roti', 'Toor dal, spices, 2 rotis', 500, 20.0, 65.0, 10.0, 'Cook dal with tempering'),
+            ('snack', 'Roasted chana', 'Chana', 150, 8.0, 20.0, 3.0, 'Roast lightly')
+        ],
+        3: [
+            ('breakfast', 'Egg omelette + oats', 'Eggs, oats', 600, 35.0, 70.0, 18.0, 'Cook omelette and serve with oats'),
+            ('lunch', 'Chicken biryani (protein rich portion)', 'Chicken, rice, spices', 900, 50.0, 90.0, 30.0, 'Prefer lean portions'),
+            ('dinner', 'Fish curry + rice', 'Fish, rice, coconut milk', 700, 45.0, 80.0, 25.0, 'Cook fish with light oil'),
+            ('snack', 'Peanut butter sandwich', 'Peanut butter, whole wheat bread', 300, 12.0, 32.0, 15.0, 'Use natural peanut butter')
+        ],
+        4: [
+            ('breakfast', 'Vegetable idli', 'Idli, vegetables, chutney', 350, 10.0, 60.0, 7.0, 'Steam idlis and serve with chutney'),
+            ('lunch', 'Grilled fish + salad', 'Fish, salad', 650, 45.0, 40.0, 20.0, 'Grill fish with spices'),
+            ('dinner', 'Mixed dal + roti', 'Dal, 2 rotis', 500, 22.0, 65.0, 10.0, 'Cook dal with tempering'),
+            ('snack', 'Fruit bowl', 'Seasonal fruits', 200, 3.0, 50.0, 1.0, 'Fresh fruit bowl')
+        ],
+    }
 
     # --- Add sample diet plans & meals for each member ---
     cursor.execute('SELECT COUNT(*) FROM diet_plans')
@@ -634,6 +1626,7 @@ def insert_default_data(cursor):
         cursor.execute('SELECT id, trainer_id FROM members')
         member_rows = cursor.fetchall()
 
+        plan_rows = []
         for idx, m in enumerate(member_rows, start=1):
             member_id = m[0]
             assigned_trainer_id = m[1]  # use each member's trainer assignment
@@ -641,82 +1634,58 @@ def insert_default_data(cursor):
             total_cal = 1800 if idx == 1 else (2200 if idx == 2 else (3000 if idx == 3 else 2400))
             start_date = date.today()
             end_date = start_date + timedelta(days=90)
+            plan_rows.append((member_id, assigned_trainer_id, name, f"{name} created by trainer", total_cal, start_date.isoformat(), end_date.isoformat()))
+
+        cursor.executemany('''
+            INSERT INTO diet_plans (member_id, trainer_id, name, description, total_calories, start_date, end_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', plan_rows)
 
-            cursor.execute('''
-                INSERT INTO diet_plans (member_id, trainer_id, name, description, total_calories, start_date, end_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (member_id, assigned_trainer_id, name, f"{name} created by trainer", total_cal, start_date.isoformat(), end_date.isoformat()))
-
-            diet_plan_id = cursor.lastrowid
-
-            # Add typical meals for Indian context
-            if idx == 1:  # weight loss
-                meals = [
-                    ('breakfast', 'Poha with vegetables', 'Poha, peas, carrots, peanuts', 350, 10.0, 55.0, 8.0, 'Cook poha with minimal oil and vegetables'),
-                    ('lunch', 'Grilled chicken + salad', 'Chicken breast, salad greens, tomato, cucumber', 500, 40.0, 20.0, 15.0, 'Grill chicken with spices, serve with salad'),
-                    ('dinner', 'Mixed vegetable sabzi + chapati', 'Mixed veg, 1 chapati', 450, 12.0, 60.0, 10.0, 'Lightly sauté vegetables and serve with chapati'),
-                    ('snack', 'Buttermilk and fruit', 'Curd, water, seasonal fruit', 200, 6.0, 30.0, 5.0, 'Buttermilk without added sugar')
-                ]
-            elif idx == 2:  # maintenance
-                meals = [
-                    ('breakfast', 'Upma with nuts', 'Semolina, peanuts, vegetables', 400, 9.0, 60.0, 10.0, 'Cook upma with vegetables and a few nuts'),
-                    ('lunch', 'Paneer bhurji + brown rice', 'Paneer, spices, brown rice', 650, 30.0, 70.0, 20.0, 'Light cooking with minimal oil'),
-                    ('dinner', 'Dal tadka + roti', 'Toor dal, spices, 2 rotis', 500, 20.0, 65.0, 10.0, 'Cook dal with tempering'),
-                    ('snack', 'Roasted chana', 'Chana', 150, 8.0, 20.0, 3.0, 'Roast lightly')
-                ]
-            elif idx == 3:  # muscle gain
-                meals = [
-                    ('breakfast', 'Egg omelette + oats', 'Eggs, oats', 600, 35.0, 70.0, 18.0, 'Cook omelette and serve with oats'),
-                    ('lunch', 'Chicken biryani (protein rich portion)', 'Chicken, rice, spices', 900, 50.0, 90.0, 30.0, 'Prefer lean portions'),
-                    ('dinner', 'Fish curry + rice', 'Fish, rice, coconut milk', 700, 45.0, 80.0, 25.0, 'Cook fish with light oil'),
-                    ('snack', 'Peanut butter sandwich', 'Peanut butter, whole wheat bread', 300, 12.0, 32.0, 15.0, 'Use natural peanut butter')
-                ]
-            else:  # 4th member balanced
-                meals = [
-                    ('breakfast', 'Vegetable idli', 'Idli, vegetables, chutney', 350, 10.0, 60.0, 7.0, 'Steam idlis and serve with chutney'),
-                    ('lunch', 'Grilled fish + salad', 'Fish, salad', 650, 45.0, 40.0, 20.0, 'Grill fish with spices'),
-                    ('dinner', 'Mixed dal + roti', 'Dal, 2 rotis', 500, 22.0, 65.0, 10.0, 'Cook dal with tempering'),
-                    ('snack', 'Fruit bowl', 'Seasonal fruits', 200, 3.0, 50.0, 1.0, 'Fresh fruit bowl')
-                ]
-
-            for meal in meals:
-                cursor.execute('''
-                    INSERT INTO diet_plan_meals (diet_plan_id, meal_type, meal_name, ingredients, calories, protein, carbs, fat, instructions)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (diet_plan_id, meal[0], meal[1], meal[2], meal[3], meal[4], meal[5], meal[6], meal[7]))
+        # The table was empty, so plan ids come back in insertion (member) order
+        cursor.execute('SELECT id FROM diet_plans ORDER BY id')
+        meal_rows = []
+        for idx, (diet_plan_id,) in enumerate(cursor.fetchall(), start=1):
+            for meal in sample_meals[min(idx, 4)]:
+                meal_rows.append((diet_plan_id,) + meal)
+        cursor.executemany('''
+            INSERT INTO diet_plan_meals (diet_plan_id, meal_type, meal_name, ingredients, calories, protein, carbs, fat, instructions)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', meal_rows)
 
     # --- Add member workout plans and plan details ---
     cursor.execute('SELECT COUNT(*) FROM member_workout_plans')
     if cursor.fetchone()[0] == 0:
-        cursor.execute('SELECT id FROM members')
-        member_rows = [r[0] for r in cursor.fetchall()]
+        # use the trainer actually assigned to each member
+        cursor.execute('SELECT id, trainer_id FROM members')
+        member_rows = cursor.fetchall()
         cursor.execute('SELECT id, name FROM workouts')
         workout_rows = cursor.fetchall()
 
-        for i, member_id in enumerate(member_rows):
-            # use the trainer actually assigned to this member
-            trainer_row = cursor.execute('SELECT trainer_id FROM members WHERE id = ?', (member_id,)).fetchone()
-            trainer_id = trainer_row[0] if trainer_row else None
-
+        plan_rows = []
+        for i, (member_id, trainer_id) in enumerate(member_rows):
             plan_name = 'Beginner Strength Plan' if i == 0 else ('Cardio & Mobility' if i == 1 else ('Hypertrophy Plan' if i == 2 else 'Balanced Plan'))
             start_date = date.today()
             end_date = start_date + timedelta(days=60)
+            plan_rows.append((member_id, trainer_id, plan_name, f"{plan_name} for member {member_id}", start_date.isoformat(), end_date.isoformat()))
 
-            cursor.execute('''
-                INSERT INTO member_workout_plans (member_id, trainer_id, name, description, start_date, end_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (member_id, trainer_id, plan_name, f"{plan_name} for member {member_id}", start_date.isoformat(), end_date.isoformat()))
-
-            plan_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO member_workout_plans (member_id, trainer_id, name, description, start_date, end_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', plan_rows)
 
-            # Assign 3 workouts for each plan (use existing workout ids)
-            chosen_workouts = [workout_rows[0][0], workout_rows[2][0], workout_rows[3][0]] if len(workout_rows) >= 4 else [w[0] for w in workout_rows]
-            days = [1, 3, 5]
-            for wk, day in zip(chosen_workouts, days):
-                cursor.execute('''
-                    INSERT INTO workout_plan_details (plan_id, workout_id, day_of_week, sets, reps, weight, rest_seconds, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (plan_id, wk, day, 3, 10, 20.0, 60, 'Keep form strict'))
+        # Assign 3 workouts for each plan (use existing workout ids)
+        chosen_workouts = [workout_rows[0][0], workout_rows[2][0], workout_rows[3][0]] if len(workout_rows) >= 4 else [w[0] for w in workout_rows]
+        days = [1, 3, 5]
+        cursor.execute('SELECT id FROM member_workout_plans ORDER BY id')
+        detail_rows = [
+            (plan_id, wk, day, 3, 10, 20.0, 60, 'Keep form strict')
+            for (plan_id,) in cursor.fetchall()
+            for wk, day in zip(chosen_workouts, days)
+        ]
+        cursor.executemany('''
+            INSERT INTO workout_plan_details (plan_id, workout_id, day_of_week, sets, reps, weight, rest_seconds, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', detail_rows)
 
     # --- Add sample attendance and progress entries ---
     cursor.execute('SELECT COUNT(*) FROM attendance')
@@ -724,20 +1693,23 @@ def insert_default_data(cursor):
         cursor.execute('SELECT id, trainer_id FROM members')
         members_with_trainer = cursor.fetchall()
         today = date.today()
+        attendance_rows = []
         for i, (mem_id, mem_trainer_id) in enumerate(members_with_trainer):
             check_in = datetime.now().isoformat()
             check_out = (datetime.now() + timedelta(hours=1)).isoformat()
             time_slot = 'Morning' if i == 0 else ('Evening' if i == 1 else ('Afternoon' if i == 2 else 'Evening'))
-            cursor.execute('''
-                INSERT INTO attendance (member_id, trainer_id, check_in_time, check_out_time, date, time_slot, workout_type, notes, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (mem_id, mem_trainer_id, check_in, check_out, today.isoformat(), time_slot, 'strength', 'Good session', 'present'))
+            attendance_rows.append((mem_id, mem_trainer_id, check_in, check_out, today.isoformat(), time_slot, 'strength', 'Good session', 'present'))
+        cursor.executemany('''
+            INSERT INTO attendance (member_id, trainer_id, check_in_time, check_out_time, date, time_slot, workout_type, notes, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', attendance_rows)
 
     cursor.execute('SELECT COUNT(*) FROM member_progress')
     if cursor.fetchone()[0] == 0:
         cursor.execute('SELECT id, trainer_id FROM members')
         members_with_trainer = cursor.fetchall()
         rec_date = date.today() - timedelta(days=7)
+        progress_rows = []
         for i, (mem_id, mem_trainer_id) in enumerate(members_with_trainer):
             # simple sample metrics
             if i == 0:
@@ -758,10 +1730,11 @@ def insert_default_data(cursor):
                 height_m = 1.68
 
             bmi = round((weight / (height_m ** 2)), 2)
-            cursor.execute('''
-                INSERT INTO member_progress (member_id, recorded_date, weight, body_fat_percentage, muscle_mass, bmi, chest, waist, hips, bicep, thigh, notes, recorded_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (mem_id, rec_date.isoformat(), weight, body_fat, 30.0, bmi, 95.0, 82.0, 96.0, 32.0, 55.0, 'Initial recording', mem_trainer_id))
+            progress_rows.append((mem_id, rec_date.isoformat(), weight, body_fat, 30.0, bmi, 95.0, 82.0, 96.0, 32.0, 55.0, 'Initial recording', mem_trainer_id))
+        cursor.executemany('''
+            INSERT INTO member_progress (member_id, recorded_date, weight, body_fat_percentage, muscle_mass, bmi, chest, waist, hips, bicep, thigh, notes, recorded_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', progress_rows)
 
     # All done seeding
     return
@@ -2,6 +2,7 @@
 from datetime import date
 from flask import current_app
 from app.models.database import execute_query
+from app.models.rows import RowMapper
 
 class Equipment:
     def __init__(self, id=None, name=None, category=None, brand=None, model=None,
@@ -28,36 +29,10 @@ class Equipment:
     @classmethod
     def _from_row(cls, row):
         """
-        Safely map a DB row (tuple/list) to an Equipment instance.
-        Handles short rows by padding missing fields with None and applies defaults.
-        Expected order:
-         id, name, category, brand, model,
-         purchase_date, warranty_end_date, status,
-         last_maintenance_date, next_maintenance_date,
-         maintenance_notes, location, created_at
+        Map a DB row selected with EQUIPMENT.select to an Equipment instance.
+        Short rows are padded with None; a NULL status defaults to 'working'.
         """
-        if not row:
-            return None
-
-        fields = [
-            "id", "name", "category", "brand", "model",
-            "purchase_date", "warranty_end_date", "status",
-            "last_maintenance_date", "next_maintenance_date",
-            "maintenance_notes", "location", "created_at"
-        ]
-
-        row_list = list(row)
-        # pad missing entries
-        if len(row_list) < len(fields):
-            row_list += [None] * (len(fields) - len(row_list))
-
-        # Apply defaults for specific fields when missing/None
-        # index 7 is 'status' per the fields list
-        if row_list[7] is None:
-            row_list[7] = "working"
-
-        # Construct the instance with exactly the expected arguments
-        return cls(*row_list[:len(fields)])
+        return EQUIPMENT.one(row)
 
     # ---------------------------
     # Fetch Queries
@@ -65,23 +40,28 @@ class Equipment:
     @classmethod
     def get_all(cls):
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM equipment ORDER BY name'
-        results = execute_query(query, (), db_path, fetch=True)
-        return [cls._from_row(row) for row in results] if results else []
+        query = f'SELECT {EQUIPMENT.select} FROM equipment ORDER BY name'
+        return EQUIPMENT.all(execute_query(query, (), db_path, fetch=True))
+
+    @classmethod
+    def get_list_rows(cls):
+        """Lightweight rows (namedtuples, no notes/warranty columns) for the equipment list pages"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        query = f'SELECT {EQUIPMENT_LIST.select} FROM equipment ORDER BY name'
+        return EQUIPMENT_LIST.light(execute_query(query, (), db_path, fetch=True))
 
     @classmethod
     def get_by_id(cls, equipment_id):
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM equipment WHERE id = ?'
+        query = f'SELECT {EQUIPMENT.select} FROM equipment WHERE id = ?'
         result = execute_query(query, (equipment_id,), db_path, fetch=True)
-        return cls._from_row(result[0]) if result else None
+        return EQUIPMENT.one(result[0]) if result else None
 
     @classmethod
     def get_working(cls):
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM equipment WHERE status = "working" ORDER BY name'
-        results = execute_query(query, (), db_path, fetch=True)
-        return [cls._from_row(row) for row in results] if results else []
+        query = f'SELECT {EQUIPMENT.select} FROM equipment WHERE status = "working" ORDER BY name'
+        return EQUIPMENT.all(execute_query(query, (), db_path, fetch=True))
 
     @classmethod
     def get_working_count(cls):
@@ -195,3 +175,17 @@ class Equipment:
 
     def __str__(self):
         return f"{self.name} ({self.category}) - {self.status}"
+
+
+EQUIPMENT = RowMapper(Equipment, [
+    'id', 'name', 'category', 'brand', 'model',
+    'purchase_date', 'warranty_end_date', 'status',
+    'last_maintenance_date', 'next_maintenance_date',
+    'maintenance_notes', 'location', 'created_at',
+], defaults={'status': 'working'})
+
+# Columns shown on the equipment list pages
+EQUIPMENT_LIST = EQUIPMENT.subset(
+    'id', 'name', 'category', 'brand', 'model', 'purchase_date', 'status',
+    'last_maintenance_date', 'next_maintenance_date', 'location',
+)
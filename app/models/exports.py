@@ -0,0 +1,103 @@
+"""Full-table exports for the accountants (payments, attendance, members).
+
+Each export is one SELECT with optional date-range and status filters. Rows
+are streamed from the database with database.iter_query rather than loaded
+into model objects, so exporting years of history uses constant memory.
+"""
+from datetime import date, timedelta
+
+from flask import current_app
+
+from app.models.database import iter_query
+
+
+class ExportSpec:
+    __slots__ = ('name', 'header', 'select', 'date_column', 'status_column', 'statuses', 'order_by')
+
+    def __init__(self, name, header, select, date_column, status_column, statuses, order_by):
+        self.name = name
+        self.header = header
+        self.select = select
+        self.date_column = date_column
+        self.status_column = status_column
+        self.statuses = statuses
+        self.order_by = order_by
+
+
+EXPORTS = {
+    'payments': ExportSpec(
+        'payments',
+        ['id', 'invoice_number', 'member', 'email', 'plan', 'amount', 'payment_method', 'payment_status',
+         'payment_date', 'due_date', 'transaction_id', 'created_at'],
+        '''SELECT p.id, p.invoice_number, u.full_name, u.email, mp.name, p.amount, p.payment_method,
+                  p.payment_status, p.payment_date, p.due_date, p.transaction_id, p.created_at
+           FROM payments p
+           LEFT JOIN members m ON p.member_id = m.id
+           LEFT JOIN users u ON m.user_id = u.id
+           LEFT JOIN membership_plans mp ON p.membership_plan_id = mp.id''',
+        'p.payment_date', 'p.payment_status', ('pending', 'completed', 'failed', 'refunded'), 'p.id',
+    ),
+    'attendance': ExportSpec(
+        'attendance',
+        ['id', 'date', 'time_slot', 'member', 'trainer', 'status', 'check_in_time', 'check_out_time',
+         'workout_type', 'notes'],
+        '''SELECT a.id, a.date, a.time_slot, um.full_name, ut.full_name, a.status, a.check_in_time,
+                  a.check_out_time, a.workout_type, a.notes
+           FROM attendance a
+           LEFT JOIN members m ON a.member_id = m.id
+           LEFT JOIN users um ON m.user_id = um.id
+           LEFT JOIN trainers t ON a.trainer_id = t.id
+           LEFT JOIN users ut ON t.user_id = ut.id''',
+        'a.date', 'a.status', ('present', 'absent', 'late', 'scheduled'), 'a.id',
+    ),
+    'members': ExportSpec(
+        'members',
+        ['id', 'full_name', 'email', 'phone', 'plan', 'trainer', 'membership_start_date',
+         'membership_end_date', 'status', 'created_at'],
+        '''SELECT m.id, u.full_name, u.email, m.phone, mp.name, tu.full_name, m.membership_start_date,
+                  m.membership_end_date, m.status, m.created_at
+           FROM members m
+           LEFT JOIN users u ON m.user_id = u.id
+           LEFT JOIN membership_plans mp ON m.membership_plan_id = mp.id
+           LEFT JOIN trainers t ON m.trainer_id = t.id
+           LEFT JOIN users tu ON t.user_id = tu.id''',
+        'm.membership_start_date', 'm.status', ('active', 'inactive', 'suspended', 'pending_payment'), 'm.id',
+    ),
+}
+
+
+def build_query(spec, date_from=None, date_to=None, status=None):
+    """SQL and params for ``spec`` with the given filters (both dates inclusive)"""
+    if status and status not in spec.statuses:
+        raise ValueError(f"Unknown {spec.name} status: {status}")
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("The start date is after the end date")
+
+    conditions, params = [], []
+    if date_from:
+        conditions.append(f"{spec.date_column} >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append(f"{spec.date_column} < ?")
+        params.append((date_to + timedelta(days=1)).isoformat())
+    if status:
+        conditions.append(f"{spec.status_column} = ?")
+        params.append(status)
+
+    query = spec.select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return f"{query} ORDER BY {spec.order_by}", tuple(params)
+
+
+def export_rows(name, date_from=None, date_to=None, status=None, chunk_size=1000):
+    """(header, row iterator) for export ``name``; raises KeyError/ValueError on bad input"""
+    spec = EXPORTS[name]
+    query, params = build_query(spec, date_from, date_to, status)
+    db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+    return spec.header, iter_query(query, params, db_path, chunk_size=chunk_size)
+
+
+def parse_date(value):
+    """Optional YYYY-MM-DD query-string value -> date (ValueError if malformed)"""
+    return date.fromisoformat(value) if value else None
@@ -0,0 +1,128 @@
+"""Expected renewal revenue per week.
+
+Every active member whose membership ends inside the horizon renews at that
+end date with their plan's historical renewal probability p. If they renew,
+they renew again one plan duration later with probability p, and so on.
+Renewal k therefore happens with probability p ** (k + 1) and brings in the
+plan price. All members and renewals are projected together as NumPy arrays
+and summed into weekly buckets with bincount (expected_renewals is the
+expected number of renewals in the week).
+
+A plan's renewal probability is renewals / (renewals + lapses):
+  - renewals: each completed payment after a member's first
+  - lapses: members whose membership has already ended
+Plans with no history use the overall rate, or DEFAULT_RENEWAL_PROBABILITY
+when there is no history at all.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from flask import current_app
+
+from app.models.database import execute_query
+
+DEFAULT_WEEKS = 52
+MIN_WEEKS = 26
+MAX_WEEKS = 52
+DEFAULT_RENEWAL_PROBABILITY = 0.5
+
+PLANS_QUERY = '''
+    SELECT mp.id, mp.name, mp.price, mp.duration_months,
+           COALESCE(SUM(MAX(COALESCE(p.completed, 0) - 1, 0)), 0) AS renewals,
+           COALESCE(SUM(m.membership_end_date < ?), 0) AS lapses
+    FROM membership_plans mp
+    LEFT JOIN members m ON m.membership_plan_id = mp.id
+    LEFT JOIN (SELECT member_id, COUNT(*) AS completed FROM payments
+               WHERE payment_status = 'completed' GROUP BY member_id) p ON p.member_id = m.id
+    GROUP BY mp.id
+'''
+
+# Only members whose membership ends inside the horizon can renew inside it. Members
+# sharing a plan and end date renew together, so they are projected once, weighted.
+EXPIRING_QUERY = '''
+    SELECT membership_plan_id, substr(membership_end_date, 1, 10) AS end_date, COUNT(*)
+    FROM members
+    WHERE status = 'active' AND membership_end_date >= ? AND membership_end_date < ?
+    GROUP BY membership_plan_id, end_date
+'''
+
+
+def add_months(days, months):
+    """datetime64[D] + whole months, clamping the day to the target month's length"""
+    month = days.astype('datetime64[M]')
+    day_of_month = days - month.astype('datetime64[D]')
+    target = month + months
+    month_length = (target + 1).astype('datetime64[D]') - target.astype('datetime64[D]')
+    return target.astype('datetime64[D]') + np.minimum(day_of_month, month_length - np.timedelta64(1, 'D'))
+
+
+class RevenueForecast:
+    @classmethod
+    def get(cls, weeks=DEFAULT_WEEKS):
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        return cls.compute(db_path, weeks)
+
+    @classmethod
+    def compute(cls, db_path, weeks=DEFAULT_WEEKS, today=None):
+        """Forecast for the ``weeks`` weeks starting ``today`` (default: today)"""
+        if not MIN_WEEKS <= weeks <= MAX_WEEKS:
+            raise ValueError(f"weeks must be between {MIN_WEEKS} and {MAX_WEEKS}")
+        today = today or date.today()
+        horizon = today + timedelta(weeks=weeks)
+
+        plan_rows = execute_query(PLANS_QUERY, (today.isoformat(),), db_path, fetch=True) or []
+        plan_ids = [r[0] for r in plan_rows]
+        price = np.array([float(r[2] or 0) for r in plan_rows])
+        duration = np.array([max(int(r[3] or 1), 1) for r in plan_rows])
+        renewals = np.array([r[4] for r in plan_rows], dtype=np.float64)
+        lapses = np.array([r[5] for r in plan_rows], dtype=np.float64)
+        seen = renewals + lapses
+        overall = renewals.sum() / seen.sum() if seen.sum() else DEFAULT_RENEWAL_PROBABILITY
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probability = np.where(seen > 0, renewals / np.maximum(seen, 1), overall)
+
+        plan_index = {plan_id: i for i, plan_id in enumerate(plan_ids)}
+        members = [
+            (plan_index[r[0]], r[1], r[2])
+            for r in execute_query(EXPIRING_QUERY, (today.isoformat(), horizon.isoformat()), db_path, fetch=True) or []
+            if r[0] in plan_index and r[1]
+        ]
+
+        week_starts = [(today + timedelta(weeks=w)).isoformat() for w in range(weeks)]
+        expected = np.zeros(weeks)
+        expected_renewals = np.zeros(weeks)
+        by_plan = np.zeros(len(plan_ids))
+        if members:
+            plan = np.array([m[0] for m in members])
+            end = np.array([m[1] for m in members], dtype='datetime64[D]')
+            count = np.array([m[2] for m in members], dtype=np.float64)
+            # Enough renewals per member to cover the horizon with the shortest plan
+            steps = weeks // 4 // int(duration[plan].min()) + 2
+            k = np.arange(steps)
+            renew_on = add_months(end[:, None], k[None, :] * duration[plan][:, None])
+            offset = (renew_on - np.datetime64(today)).astype(np.int64)
+            chance = count[:, None] * probability[plan][:, None] ** (k[None, :] + 1)
+            inside = offset < weeks * 7
+            week = offset[inside] // 7
+            renewal_plan = np.broadcast_to(plan[:, None], inside.shape)[inside]
+            chance = chance[inside]
+            revenue = chance * price[renewal_plan]
+            expected = np.bincount(week, weights=revenue, minlength=weeks)
+            expected_renewals = np.bincount(week, weights=chance, minlength=weeks)
+            by_plan = np.bincount(renewal_plan, weights=revenue, minlength=len(plan_ids))
+
+        return {
+            'as_of': today.isoformat(),
+            'weeks': [
+                {'week_start': start, 'expected_revenue': round(float(amount), 2),
+                 'expected_renewals': round(float(count), 2)}
+                for start, amount, count in zip(week_starts, expected, expected_renewals)
+            ],
+            'total_expected_revenue': round(float(expected.sum()), 2),
+            'plans': [
+                {'plan_id': plan_id, 'name': row[1], 'price': float(price[i]), 'duration_months': int(duration[i]),
+                 'renewal_probability': round(float(probability[i]), 4),
+                 'expected_revenue': round(float(by_plan[i]), 2)}
+                for i, (plan_id, row) in enumerate(zip(plan_ids, plan_rows))
+            ],
+        }
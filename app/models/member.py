@@ -1,94 +1,8 @@
-from .database import execute_query
+from .database import execute_query, transaction
 from flask import current_app
 from datetime import date, datetime
 import calendar
-
-# models/member.py (patch — add inside Member class)
-
-from flask import current_app
-
-def delete(self):
-    """
-    Soft-delete the member.
-    - Sets users.is_active = 0
-    - Updates members.membership_status to 'removed' (or 'deactivated')
-    - Records removed_at and removed_by if these columns exist (best-effort)
-    """
-    from app.models.database import execute_query
-    db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-
-    try:
-        # Deactivate the user account
-        execute_query(
-            "UPDATE users SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (self.user_id,),
-            db_path
-        )
-
-        # Update member status (use existing column names present in your schema)
-        execute_query(
-            "UPDATE members SET membership_status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            ("removed", self.id),
-            db_path
-        )
-
-        # Optional: if you have removed_at / removed_by fields, try to set them (no-op if columns absent)
-        try:
-            execute_query(
-                "UPDATE members SET removed_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (self.id,),
-                db_path
-            )
-        except Exception:
-            # ignore if column does not exist
-            pass
-
-        return True
-    except Exception:
-        current_app.logger.exception("Failed to soft-delete member %s", getattr(self, 'id', None))
-        return False
-
-
-def hard_delete(self):
-    """
-    Permanently delete member and most related records.
-    WARNING: destructive. Back up DB before using.
-    - Deletes payments, attendance, workout plans, member record, then user record.
-    - Adjust table names below to match your schema.
-    """
-    from app.models.database import execute_query
-    db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-
-    try:
-        # Delete payments
-        try:
-            execute_query("DELETE FROM payments WHERE member_id = ?", (self.id,), db_path)
-        except Exception:
-            current_app.logger.exception("Failed to delete payments for member %s", self.id)
-
-        # Delete attendance / workout plans / workout_plan_details / member_workouts
-        for q in [
-            ("DELETE FROM attendance WHERE member_id = ?", (self.id,)),
-            ("DELETE FROM workout_plans WHERE member_id = ?", (self.id,)),
-            ("DELETE FROM member_workout_plans WHERE member_id = ?", (self.id,)),
-            ("DELETE FROM workout_plan_details WHERE member_id = ?", (self.id,)),
-            ("DELETE FROM member_measurements WHERE member_id = ?", (self.id,)),
-        ]:
-            try:
-                execute_query(q[0], q[1], db_path)
-            except Exception:
-                current_app.logger.exception("Failed to execute cleanup query for member %s: %s", self.id, q[0])
-
-        # Delete member row
-        execute_query("DELETE FROM members WHERE id = ?", (self.id,), db_path)
-
-        # Delete user record
-        execute_query("DELETE FROM users WHERE id = ?", (self.user_id,), db_path)
-
-        return True
-    except Exception:
-        current_app.logger.exception("Failed to hard-delete member %s", getattr(self, 'id', None))
-        return False
+from app.utils.helpers import days_from_today, month_bounds
 
 def _add_months(sourcedate: date, months: int) -> date:
     """Return date + months (handles month rollovers)."""
@@ -165,6 +79,7 @@ class Member:
         email=None,
         plan_name=None,
         trainer_name=None,
+        attendance_rate=None,
         # Legacy/compat fields not stored in DB
         payment_status='pending',
         # Legacy aliases accepted on init (mapped to new fields if provided)
@@ -201,6 +116,7 @@ class Member:
         self.email = email
         self.plan_name = plan_name
         self.trainer_name = trainer_name
+        self.attendance_rate = attendance_rate
 
         # Legacy compatibility field (not persisted)
         self.payment_status = payment_status
@@ -469,12 +385,9 @@ class Member:
     @classmethod
     def get_expiring_soon(cls, days=30):
         """
-        Members whose membership_end_date is within the next `days`.
-        Uses SQLite date('now', '+X days') to filter.
+        Members whose membership_end_date is within the next `days` (today included).
         """
         db_path = cls._db_path()
-        # NOTE: SQLite accepts a modifier like '+30 days' as a single parameter.
-        modifier = f'+{int(days)} days'
         query = '''
             SELECT
                 m.id, m.user_id, u.full_name, u.email,
@@ -483,12 +396,10 @@ class Member:
                 m.status
             FROM members m
             LEFT JOIN users u ON m.user_id = u.id
-            WHERE m.membership_end_date IS NOT NULL
-              AND DATE(m.membership_end_date) >= DATE('now')
-              AND DATE(m.membership_end_date) <= DATE('now', ?)
+            WHERE m.membership_end_date >= ? AND m.membership_end_date < ?
             ORDER BY m.membership_end_date ASC
         '''
-        rows = execute_query(query, (modifier,), db_path, fetch=True)
+        rows = execute_query(query, days_from_today(days), db_path, fetch=True)
         out = []
         for r in rows:
             out.append(cls(
@@ -517,19 +428,18 @@ class Member:
         # New members this month
         q_new = """
             SELECT COUNT(*) FROM members
-            WHERE strftime('%Y-%m', membership_start_date) = strftime('%Y-%m', 'now')
+            WHERE membership_start_date >= ? AND membership_start_date < ?
         """
-        new_this_month = execute_query(q_new, (), db_path, fetch=True)
+        today = date.today()
+        new_this_month = execute_query(q_new, month_bounds(today.year, today.month), db_path, fetch=True)
         new_this_month = new_this_month[0][0] if new_this_month else 0
 
         # Expiring memberships in next 7 days
         q_exp_7 = """
             SELECT COUNT(*) FROM members
-            WHERE membership_end_date IS NOT NULL
-            AND DATE(membership_end_date) >= DATE('now')
-            AND DATE(membership_end_date) <= DATE('now', '+7 days')
+            WHERE membership_end_date >= ? AND membership_end_date < ?
         """
-        expiring_next_7_days = execute_query(q_exp_7, (), db_path, fetch=True)
+        expiring_next_7_days = execute_query(q_exp_7, days_from_today(7, today), db_path, fetch=True)
         expiring_next_7_days = expiring_next_7_days[0][0] if expiring_next_7_days else 0
 
         return {
@@ -600,6 +510,58 @@ class Member:
             self.id = new_id
             return self.id
 
+    def delete(self):
+        """
+        Soft-delete: disable the login and mark the membership inactive.
+        Both updates commit together or not at all.
+        """
+        db_path = self._db_path()
+        try:
+            with transaction(db_path):
+                execute_query(
+                    "UPDATE users SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (self.user_id,), db_path
+                )
+                execute_query(
+                    "UPDATE members SET status = 'inactive', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (self.id,), db_path
+                )
+            self.status = 'inactive'
+            return True
+        except Exception:
+            current_app.logger.exception("Failed to deactivate member %s", self.id)
+            return False
+
+    def hard_delete(self):
+        """
+        Permanently delete the member, their history and their user account.
+        Children are removed before parents (foreign keys are enforced) inside
+        one transaction, so a failure leaves the member fully intact.
+        """
+        db_path = self._db_path()
+        steps = [
+            ("DELETE FROM workout_plan_details WHERE plan_id IN "
+             "(SELECT id FROM member_workout_plans WHERE member_id = ?)", self.id),
+            ("DELETE FROM member_workout_plans WHERE member_id = ?", self.id),
+            ("DELETE FROM diet_plan_meals WHERE diet_plan_id IN "
+             "(SELECT id FROM diet_plans WHERE member_id = ?)", self.id),
+            ("DELETE FROM diet_plans WHERE member_id = ?", self.id),
+            ("DELETE FROM member_progress WHERE member_id = ?", self.id),
+            ("DELETE FROM attendance WHERE member_id = ?", self.id),
+            ("DELETE FROM payments WHERE member_id = ?", self.id),
+            ("DELETE FROM members WHERE id = ?", self.id),
+            ("UPDATE announcements SET created_by = NULL WHERE created_by = ?", self.user_id),
+            ("DELETE FROM users WHERE id = ?", self.user_id),
+        ]
+        try:
+            with transaction(db_path):
+                for query, key in steps:
+                    execute_query(query, (key,), db_path)
+            return True
+        except Exception:
+            current_app.logger.exception("Failed to hard-delete member %s", self.id)
+            return False
+
     # -------------------- Actions --------------------
 
     def renew_membership(self, new_expiry_date, payment_status='done'):
@@ -671,7 +633,8 @@ class Member:
         """
         Get detailed client info for trainer’s dashboard/clients page.
         Returns Member objects with id, full_name, email, phone,
-        membership_start_date, membership_end_date, height, and status.
+        membership_start_date, membership_end_date, height, status and
+        attendance_rate (present / (present + absent), None before any marked session).
         """
         db_path = cls._db_path()
         query = """
@@ -680,9 +643,11 @@ class Member:
                 m.phone,
                 m.membership_start_date, m.membership_end_date,
                 m.height,
-                m.status
+                m.status,
+                ROUND(100.0 * s.present / NULLIF(s.present + s.absent, 0), 2)
             FROM members m
             LEFT JOIN users u ON m.user_id = u.id
+            LEFT JOIN member_attendance_stats s ON s.member_id = m.id
             WHERE m.trainer_id = ?
             ORDER BY u.full_name
         """
@@ -696,7 +661,8 @@ class Member:
                 membership_start_date=_to_date(r[4]),
                 membership_end_date=_to_date(r[5]),
                 height=r[6],
-                status=r[7]
+                status=r[7],
+                attendance_rate=r[8]
             )
             for r in rows
         ]
@@ -1,7 +1,9 @@
 # payment.py (UPDATED)
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from flask import current_app
-from app.models.database import execute_query
+from app.models.database import execute_query, execute_batches, transaction
+from app.utils.helpers import month_bounds, to_iso_date, year_bounds
+from app.utils.pagination import DEFAULT_PAGE_SIZE, build_page, keyset_filter
 import uuid
 
 class Payment:
@@ -41,41 +43,60 @@ class Payment:
                 WHERE p.member_id = ? 
                 ORDER BY p.created_at DESC'''
         results = execute_query(query, (member_id,), db_path, fetch=True) or []
-
-        payments = []
         today = date.today()
+        return [cls._member_payment(row, today) for row in results]
 
-        for row in results:
-            payment = cls(
-                id=row[0], member_id=row[1], membership_plan_id=row[2],
-                amount=row[3], payment_method=row[4], payment_status=row[5],
-                transaction_id=row[6], payment_date=row[7], due_date=row[8],
-                notes=row[9], created_at=row[10],
-                invoice_number=row[11] if len(row) > 11 else None,
-                reminder_sent=row[12] if len(row) > 12 else 0,
-                reminder_sent_at=row[13] if len(row) > 13 else None,
-                cancelled_processed=row[14] if len(row) > 14 else 0
-            )
-            payment.plan_name = row[-1]  # plan_name is last from SELECT
+    @classmethod
+    def get_member_payments_page(cls, member_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        One page of get_member_payments, newest first, keyset-paginated on
+        (created_at, id) over idx_payments_member_created. ``cursor`` is the
+        previous page's next_cursor; ValueError if it is malformed.
+        """
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        after, after_params = keyset_filter('p.created_at', 'p.id', cursor)
+        query = f'''SELECT p.*, mp.name as plan_name
+                FROM payments p
+                JOIN membership_plans mp ON p.membership_plan_id = mp.id
+                WHERE p.member_id = ? {after}
+                ORDER BY p.created_at DESC, p.id DESC
+                LIMIT ?'''
+        rows = execute_query(query, (member_id, *after_params, limit + 1), db_path, fetch=True) or []
+        page = build_page(rows, limit, key=lambda row: (row[10], row[0]))
+        today = date.today()
+        page.items = [cls._member_payment(row, today) for row in page.items]
+        return page
 
-            # --- Compute helper fields for template usage ---
-            due_date_obj = None
+    @classmethod
+    def _member_payment(cls, row, today):
+        """Payment from a ``p.*, plan_name`` row, with due_date_obj, days_left and is_overdue set"""
+        payment = cls(
+            id=row[0], member_id=row[1], membership_plan_id=row[2],
+            amount=row[3], payment_method=row[4], payment_status=row[5],
+            transaction_id=row[6], payment_date=row[7], due_date=row[8],
+            notes=row[9], created_at=row[10],
+            invoice_number=row[11] if len(row) > 11 else None,
+            reminder_sent=row[12] if len(row) > 12 else 0,
+            reminder_sent_at=row[13] if len(row) > 13 else None,
+            cancelled_processed=row[14] if len(row) > 14 else 0
+        )
+        payment.plan_name = row[-1]  # plan_name is last from SELECT
+
+        # --- Compute helper fields for template usage ---
+        due_date_obj = None
+        try:
+            if payment.due_date:
+                due_date_obj = datetime.fromisoformat(str(payment.due_date)).date()
+        except Exception:
             try:
-                if payment.due_date:
-                    due_date_obj = datetime.fromisoformat(str(payment.due_date)).date()
+                due_date_obj = datetime.strptime(str(payment.due_date), "%Y-%m-%d").date()
             except Exception:
-                try:
-                    due_date_obj = datetime.strptime(str(payment.due_date), "%Y-%m-%d").date()
-                except Exception:
-                    pass
-
-            payment.due_date_obj = due_date_obj
-            payment.days_left = (due_date_obj - today).days if due_date_obj else None
-            payment.is_overdue = (payment.payment_status == "pending" and due_date_obj and due_date_obj < today)
+                pass
 
-            payments.append(payment)
-
-        return payments
+        payment.due_date_obj = due_date_obj
+        payment.days_left = (due_date_obj - today).days if due_date_obj else None
+        payment.is_overdue = (payment.payment_status == "pending" and due_date_obj and due_date_obj < today)
+        return payment
 
 
     @classmethod
@@ -114,24 +135,21 @@ class Payment:
 
     @classmethod
     def get_revenue_stats(cls, year=None, month=None):
+        """Completed revenue for a month, a year or all time (read from the daily_revenue rollup)"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         if year and month:
-            query = '''SELECT SUM(amount), COUNT(*) 
-                       FROM payments 
-                       WHERE payment_status = 'completed' 
-                       AND strftime('%Y', payment_date) = ? 
-                       AND strftime('%m', payment_date) = ?'''
-            params = (str(year), f"{month:02d}")
+            query = '''SELECT SUM(total), SUM(payments)
+                       FROM daily_revenue
+                       WHERE day >= ? AND day < ?'''
+            params = month_bounds(year, month)
         elif year:
-            query = '''SELECT SUM(amount), COUNT(*) 
-                       FROM payments 
-                       WHERE payment_status = 'completed' 
-                       AND strftime('%Y', payment_date) = ?'''
-            params = (str(year),)
+            query = '''SELECT SUM(total), SUM(payments)
+                       FROM daily_revenue
+                       WHERE day >= ? AND day < ?'''
+            params = year_bounds(year)
         else:
-            query = '''SELECT SUM(amount), COUNT(*) 
-                       FROM payments 
-                       WHERE payment_status = 'completed' '''
+            query = '''SELECT SUM(total), SUM(payments)
+                       FROM daily_revenue'''
             params = ()
 
         result = execute_query(query, params, db_path, fetch=True)
@@ -160,6 +178,45 @@ class Payment:
             )
         return None
 
+    @classmethod
+    def get_all_with_details_page(cls, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        One page of every payment with member and plan names, newest first,
+        keyset-paginated on (created_at, id) over idx_payments_created.
+        """
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        after, after_params = keyset_filter('p.created_at', 'p.id', cursor)
+        query = f'''
+            SELECT p.*, u.full_name as member_name, mp.name as plan_name
+            FROM payments p
+            JOIN members m ON p.member_id = m.id
+            JOIN users u ON m.user_id = u.id
+            JOIN membership_plans mp ON p.membership_plan_id = mp.id
+            WHERE 1 = 1 {after}
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT ?
+        '''
+        rows = execute_query(query, (*after_params, limit + 1), db_path, fetch=True) or []
+        page = build_page(rows, limit, key=lambda row: (row[10], row[0]))
+        payments = []
+        for row in page.items:
+            payment = cls(
+                id=row[0], member_id=row[1], membership_plan_id=row[2],
+                amount=row[3], payment_method=row[4], payment_status=row[5],
+                transaction_id=row[6], payment_date=row[7], due_date=row[8],
+                notes=row[9], created_at=row[10],
+                invoice_number=row[11] if len(row) > 11 else None,
+                reminder_sent=row[12] if len(row) > 12 else 0,
+                reminder_sent_at=row[13] if len(row) > 13 else None,
+                cancelled_processed=row[14] if len(row) > 14 else 0
+            )
+            # member_name and plan_name follow the p.* columns
+            payment.member_name = row[-2]
+            payment.plan_name = row[-1]
+            payments.append(payment)
+        page.items = payments
+        return page
+
     @classmethod
     def get_all_with_details(cls):
         """Get all payments with member and plan details"""
@@ -218,8 +275,9 @@ class Payment:
                 reminder_sent_at=row[13] if len(row) > 13 else None,
                 cancelled_processed=row[14] if len(row) > 14 else 0
             )
-            payment.member_name = row[11] if len(row) > 11 else None
-            payment.plan_name = row[12] if len(row) > 12 else None
+            # member_name and plan_name follow the p.* columns
+            payment.member_name = row[-2]
+            payment.plan_name = row[-1]
             payments.append(payment)
         return payments
 
@@ -241,7 +299,7 @@ class Payment:
                        WHERE id=?'''
             params = (self.member_id, self.membership_plan_id, self.amount,
                      self.payment_method, self.payment_status, self.transaction_id,
-                     self.payment_date, self.due_date, self.notes,
+                     to_iso_date(self.payment_date), to_iso_date(self.due_date), self.notes,
                      self.invoice_number, int(self.reminder_sent), self.reminder_sent_at, int(self.cancelled_processed),
                      self.id)
         else:
@@ -252,7 +310,7 @@ class Payment:
                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
             params = (self.member_id, self.membership_plan_id, self.amount,
                      self.payment_method, self.payment_status, self.transaction_id,
-                     self.payment_date, self.due_date, self.notes,
+                     to_iso_date(self.payment_date), to_iso_date(self.due_date), self.notes,
                      self.invoice_number, int(self.reminder_sent), self.reminder_sent_at, int(self.cancelled_processed))
 
         result = execute_query(query, params, db_path)
@@ -274,31 +332,40 @@ class Payment:
         payment.payment_date = date.today().isoformat()
         if transaction_id:
             payment.transaction_id = transaction_id
-        payment.save()
 
-        # Activate member and their user account
-        # After setting payment payment_status/payment_date and payment.save()
         try:
             from models.member import Member
-            member = Member.get_by_id(payment.member_id)
-            if member:
-                # compute duration from plan if possible
-                duration = 1
-                if getattr(payment, 'membership_plan_id', None):
-                    from models.membership_plan import MembershipPlan
-                    plan = MembershipPlan.get_by_id(payment.membership_plan_id)
-                    if plan and getattr(plan, 'duration_months', None):
-                        duration = plan.duration_months
-                member.activate_membership(duration_months=int(duration), start_date=payment.payment_date or None)
-
-                # enable user account
-                rows = execute_query("SELECT user_id FROM members WHERE id = ?", (payment.member_id,), db_path, fetch=True)
-                if rows:
-                    user_id = rows[0][0]
-                    execute_query("UPDATE users SET is_active = 1 WHERE id = ?", (user_id,), db_path)
-        except Exception as e:
-            current_app.logger.exception("Failed to activate member after payment %s: %s", payment_id, e)
+        except ImportError:
+            from app.models.member import Member
+        try:
+            from models.membership_plan import MembershipPlan
+        except ImportError:
+            from app.models.membership_plan import MembershipPlan
 
+        # Payment, membership and user account change together: if activation
+        # fails the payment stays pending instead of completed-but-inactive.
+        try:
+            with transaction(db_path):
+                payment.save()
+                member = Member.get_by_id(payment.member_id)
+                if member:
+                    # compute duration from plan if possible
+                    duration = 1
+                    if getattr(payment, 'membership_plan_id', None):
+                        plan = MembershipPlan.get_by_id(payment.membership_plan_id)
+                        if plan and getattr(plan, 'duration_months', None):
+                            duration = plan.duration_months
+                    if not member.activate_membership(duration_months=int(duration), start_date=payment.payment_date or None):
+                        raise RuntimeError(f"could not activate member {payment.member_id}")
+
+                    # enable user account
+                    rows = execute_query("SELECT user_id FROM members WHERE id = ?", (payment.member_id,), db_path, fetch=True)
+                    if rows:
+                        user_id = rows[0][0]
+                        execute_query("UPDATE users SET is_active = 1 WHERE id = ?", (user_id,), db_path)
+        except Exception as e:
+            current_app.logger.exception("Failed to complete payment %s: %s", payment_id, e)
+            return False
 
         # Send confirmation email if possible
         try:
@@ -323,20 +390,32 @@ class Payment:
         Send reminders and cancel expired pending payments.
         - reminder_before_days : number of days before due_date to send reminder (5 -> reminder at due_date - 5)
         This method is intended to be run daily (cron/Flask CLI or invoked from admin dashboard).
+
+        All flag/status updates are collected and written in one transaction;
+        reminder and cancellation emails are sent only after it commits.
         """
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         today = date.today()
 
-        # Get all pending payments with due_date
+        # Only pending payments that are due within the reminder window (or overdue)
+        # and have not already been cancelled can need any action
         query = '''SELECT p.*, m.user_id as member_user_id, u.email as member_email, u.full_name as member_name
                    FROM payments p
                    JOIN members m ON p.member_id = m.id
                    JOIN users u ON m.user_id = u.id
-                   WHERE p.payment_status = 'pending' AND p.due_date IS NOT NULL'''
-        rows = execute_query(query, (), db_path, fetch=True) or []
+                   WHERE p.payment_status = 'pending' AND p.due_date IS NOT NULL
+                     AND p.cancelled_processed = 0 AND p.due_date <= ?'''
+        horizon = (today + timedelta(days=reminder_before_days)).isoformat() + ' 23:59:59'
+        rows = execute_query(query, (horizon,), db_path, fetch=True) or []
 
         reminders_sent = []
         cancellations_done = []
+        reminder_updates = []
+        cancelled_members = []
+        cancelled_users = []
+        cancelled_payments = []
+        reminder_notices = []
+        cancellation_notices = []
 
         for row in rows:
             # parse fields
@@ -371,66 +450,65 @@ class Payment:
 
             # 1) Send reminder when days_left == reminder_before_days and reminder not already sent
             if days_left == reminder_before_days and payment.reminder_sent == 0:
-                # Try to call an email helper, otherwise log
-                try:
-                    from utils.email_utils import send_membership_payment_reminder
-                    # expected signature (email, full_name, due_date_str, days_left, invoice)
-                    try:
-                        send_membership_payment_reminder(member_email, member_name, due_date_obj.isoformat(), days_left, payment.invoice_number)
-                    except TypeError:
-                        # fallback signature variations
-                        send_membership_payment_reminder(member_email, member_name, due_date_obj.isoformat(), days_left)
-                except Exception as e:
-                    try:
-                        current_app.logger.info(f"Reminder would be sent to {member_email} for payment {payment.id} (no helper available or failed): {e}")
-                    except:
-                        print(f"Reminder would be sent to {member_email} for payment {payment.id} (no helper available or failed): {e}")
-
-                # Mark reminder sent
-                try:
-                    execute_query("UPDATE payments SET reminder_sent = 1, reminder_sent_at = ? WHERE id = ?", (datetime.now().isoformat(), payment.id), db_path)
-                    reminders_sent.append(payment.id)
-                except Exception as e:
-                    try:
-                        current_app.logger.exception(f"Failed to mark reminder_sent for payment {payment.id}: {e}")
-                    except:
-                        print(f"Failed to mark reminder_sent for payment {payment.id}: {e}")
+                reminder_notices.append((member_email, member_name, payment.id, payment.invoice_number,
+                                         due_date_obj, days_left))
+                reminder_updates.append((datetime.now().isoformat(), payment.id))
+                reminders_sent.append(payment.id)
 
             # 2) Cancel expired pending payments (due_date < today) and not yet processed
             if due_date_obj < today and (payment.cancelled_processed == 0):
+                # mark member as inactive, disable the user and flag the payment
+                # (payment_status stays 'pending' so an admin can still mark it failed)
+                cancelled_members.append(('inactive', payment.member_id))
+                if member_user_id:
+                    cancelled_users.append((member_user_id,))
+                cancelled_payments.append((payment.id,))
+                cancellation_notices.append((member_email, member_name, payment.invoice_number, due_date_obj))
+                cancellations_done.append(payment.id)
+
+        if reminder_updates or cancelled_payments:
+            try:
+                execute_batches([
+                    ("UPDATE payments SET reminder_sent = 1, reminder_sent_at = ? WHERE id = ?", reminder_updates),
+                    ("UPDATE members SET status = ? WHERE id = ?", cancelled_members),
+                    ("UPDATE users SET is_active = 0 WHERE id = ?", cancelled_users),
+                    ("UPDATE payments SET cancelled_processed = 1 WHERE id = ?", cancelled_payments),
+                ], db_path)
+            except Exception as e:
+                current_app.logger.exception(f"Failed to apply pending-payment updates: {e}")
+                return {'reminders_sent': [], 'cancellations_done': []}
+
+        # send reminder emails once reminder_sent is committed, so a failed write
+        # leaves them to the next run instead of sending them twice
+        for member_email, member_name, payment_id, invoice_number, due_date_obj, days_left in reminder_notices:
+            # Try to call an email helper, otherwise log
+            try:
+                from utils.email_utils import send_membership_payment_reminder
+                # expected signature (email, full_name, due_date_str, days_left, invoice)
                 try:
-                    # Cancel membership and disable user
-                    # New — mark member as inactive (allowed value)
-                    execute_query("UPDATE members SET status = ? WHERE id = ?", ('inactive', payment.member_id), db_path)
-
-                    # get user_id
-                    user_rows = execute_query("SELECT user_id FROM members WHERE id = ?", (payment.member_id,), db_path, fetch=True)
-                    if user_rows:
-                        user_id = user_rows[0][0]
-                        execute_query("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,), db_path)
-
-                    # mark payment as cancelled_processed (don't change payment_status here; keep it 'pending' or let admin mark failed)
-                    execute_query("UPDATE payments SET cancelled_processed = 1 WHERE id = ?", (payment.id,), db_path)
-
-                    # attempt to send cancellation email
-                    try:
-                        from utils.email_utils import send_membership_cancelled_notification
-                        try:
-                            send_membership_cancelled_notification(member_email, member_name, payment.invoice_number, due_date_obj.isoformat())
-                        except TypeError:
-                            send_membership_cancelled_notification(member_email, member_name, due_date_obj.isoformat())
-                    except Exception as e:
-                        try:
-                            current_app.logger.info(f"Cancellation notification for {member_email} (helper missing or failed): {e}")
-                        except:
-                            print(f"Cancellation notification for {member_email} (helper missing or failed): {e}")
-
-                    cancellations_done.append(payment.id)
-                except Exception as e:
-                    try:
-                        current_app.logger.exception(f"Failed to cancel membership for payment {payment.id}: {e}")
-                    except:
-                        print(f"Failed to cancel membership for payment {payment.id}: {e}")
+                    send_membership_payment_reminder(member_email, member_name, due_date_obj.isoformat(), days_left, invoice_number)
+                except TypeError:
+                    # fallback signature variations
+                    send_membership_payment_reminder(member_email, member_name, due_date_obj.isoformat(), days_left)
+            except Exception as e:
+                try:
+                    current_app.logger.info(f"Reminder would be sent to {member_email} for payment {payment_id} (no helper available or failed): {e}")
+                except:
+                    print(f"Reminder would be sent to {member_email} for payment {payment_id} (no helper available or failed): {e}")
+
+        # attempt to send cancellation emails once the cancellations are committed
+        for member_email, member_name, invoice_number, due_date_obj in cancellation_notices:
+            try:
+                from utils.email_utils import send_membership_cancelled_notification
+                try:
+                    send_membership_cancelled_notification(member_email, member_name, invoice_number, due_date_obj.isoformat())
+                except TypeError:
+                    send_membership_cancelled_notification(member_email, member_name, due_date_obj.isoformat())
+            except Exception as e:
+                try:
+                    current_app.logger.info(f"Cancellation notification for {member_email} (helper missing or failed): {e}")
+                except:
+                    print(f"Cancellation notification for {member_email} (helper missing or failed): {e}")
 
         # return lists for callers to inspect/log
         return {'reminders_sent': reminders_sent, 'cancellations_done': cancellations_done}
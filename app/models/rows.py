@@ -0,0 +1,94 @@
+"""Explicit-column row mapping for the models.
+
+Each model declares a RowMapper once with the columns it reads. The mapper
+supplies the SELECT list (so queries never depend on ``SELECT *`` column
+order) and a builder that turns result rows into model objects. The builder
+is generated code that unpacks the row once and does one attribute store per
+column, so mapping a row costs neither a kwargs dict nor an ``__init__`` call.
+
+For large list pages, ``light()`` returns namedtuples instead of model objects.
+They use much less memory but have no model methods.
+
+    EQUIPMENT = RowMapper(Equipment, ['id', 'name', 'status'], defaults={'status': 'working'})
+    rows = execute_query(f"SELECT {EQUIPMENT.select} FROM equipment", (), db_path, fetch=True)
+    return EQUIPMENT.all(rows)
+"""
+import inspect
+from collections import namedtuple
+
+
+class RowMapper:
+    def __init__(self, model, columns, alias=None, converters=None, defaults=None):
+        """
+        columns:    attribute names in SELECT order; use ('attr', 'sql expression')
+                    for joined or computed values, e.g. ('full_name', 'u.full_name')
+        alias:      table alias prefixed to the plain column names
+        converters: attr -> callable applied to the raw value (e.g. bool)
+        defaults:   attr -> value used when the column is NULL
+        """
+        self.model = model
+        self.alias = alias
+        self.columns = tuple(columns)
+        self.fields = tuple(c if isinstance(c, str) else c[0] for c in self.columns)
+        self.select = ", ".join(self._sql(c) for c in self.columns)
+        self.converters = dict(converters or {})
+        self.defaults = dict(defaults or {})
+        self.Row = namedtuple(f"{model.__name__}Row", self.fields)
+        self._build = self._compile()
+
+    def _sql(self, column):
+        if isinstance(column, str):
+            return f"{self.alias}.{column}" if self.alias else column
+        return f"{column[1]} AS {column[0]}"
+
+    def _compile(self):
+        # Attributes __init__ would set that this mapper does not select keep their defaults
+        params = inspect.signature(self.model.__init__).parameters
+        unselected = {
+            name: p.default for name, p in params.items()
+            if name != 'self' and p.default is not inspect.Parameter.empty and name not in self.fields
+        }
+        namespace = {'_new': object.__new__, '_model': self.model}
+        lines = ["def build(row):", f"    {', '.join(f'_{i}' for i in range(len(self.fields)))}, = row",
+                 "    obj = _new(_model)"]
+        # Plain attribute stores keep CPython's shared-key instance dicts (a d[...] store would not)
+        for name, value in unselected.items():
+            namespace[f"_unselected_{name}"] = value
+            lines.append(f"    obj.{name} = _unselected_{name}")
+        for i, field in enumerate(self.fields):
+            value = f"_{i}"
+            if field in self.defaults:
+                namespace[f"_default_{field}"] = self.defaults[field]
+                value = f"({value} if {value} is not None else _default_{field})"
+            if field in self.converters:
+                namespace[f"_convert_{field}"] = self.converters[field]
+                value = f"_convert_{field}({value})"
+            lines.append(f"    obj.{field} = {value}")
+        lines.append("    return obj")
+        exec("\n".join(lines), namespace)
+        return namespace['build']
+
+    def subset(self, *fields, extra=()):
+        """A mapper over fewer columns (plus ``extra`` columns) with the same alias and conversions"""
+        columns = [c for c in self.columns if (c if isinstance(c, str) else c[0]) in fields]
+        return RowMapper(self.model, columns + list(extra), self.alias, self.converters, self.defaults)
+
+    def extend(self, *extra):
+        """A mapper over all of this mapper's columns plus ``extra`` ones (e.g. joined values)"""
+        return RowMapper(self.model, list(self.columns) + list(extra), self.alias, self.converters, self.defaults)
+
+    def one(self, row):
+        """Build one object; short rows are padded with None and extra columns are ignored"""
+        if not row:
+            return None
+        width = len(self.fields)
+        if len(row) != width:
+            row = (tuple(row) + (None,) * width)[:width]
+        return self._build(row)
+
+    def all(self, rows):
+        return [self._build(row) for row in rows] if rows else []
+
+    def light(self, rows):
+        """Rows as namedtuples (attribute access, no per-object __dict__, no conversions)"""
+        return list(map(self.Row._make, rows)) if rows else []
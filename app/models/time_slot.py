@@ -0,0 +1,165 @@
+"""Bookable time slots.
+
+Slots live in the time_slots table as integer minutes after midnight
+(start_minute, end_minute). A slot with neither trainer_id nor weekday is a
+gym-wide default. Overrides replace the defaults for one trainer, one weekday
+(0 = Monday, as date.weekday()) or one trainer on one weekday, in that order
+of precedence:
+
+    (trainer, weekday) > (trainer) > (weekday) > default
+
+capacity is how many members one trainer can take in the slot at once
+(1 for personal sessions); a trainer override can raise it. It is enforced
+by a trigger on attendance, see app/models/booking.py.
+
+The whole table is small, so it is read once into a SlotCatalog and cached per
+database. data_versions tells the cache when the table was written.
+attendance.time_slot_id points at the booked slot; attendance.time_slot keeps
+its label for display and for rows written before the catalog existed.
+"""
+import threading
+from datetime import date, datetime, time, timedelta
+
+from flask import current_app
+
+from app.models.database import execute_query, get_data_versions
+from app.models.rows import RowMapper
+
+# Gym-wide two-hour slots, 6:00 AM to 10:00 PM (seeded into an empty table)
+DEFAULT_SLOTS = tuple((start, start + 120) for start in range(360, 1320, 120))
+
+
+def minutes_label(start_minute, end_minute):
+    """(360, 480) -> '6:00 AM - 8:00 AM'"""
+    def fmt(minute):
+        hour, minute = divmod(minute % 1440, 60)
+        return f"{(hour % 12) or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+    return f"{fmt(start_minute)} - {fmt(end_minute)}"
+
+
+def minute_mask(start_minute, end_minute):
+    """Bitset of the minutes [start, end) of a day: bit n is minute n after midnight"""
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute if end_minute > start_minute else 0
+
+
+class TimeSlot:
+    def __init__(self, id=None, label=None, start_minute=None, end_minute=None,
+                 trainer_id=None, weekday=None, is_active=1, created_at=None, capacity=1):
+        self.id = id
+        self.label = label
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.trainer_id = trainer_id
+        self.weekday = weekday
+        self.is_active = is_active
+        self.created_at = created_at
+        self.capacity = capacity
+
+    def starts_at(self, day):
+        return datetime.combine(day, time.min) + timedelta(minutes=self.start_minute)
+
+    def ends_at(self, day):
+        return datetime.combine(day, time.min) + timedelta(minutes=self.end_minute)
+
+    def overlaps(self, other):
+        return self.start_minute < other.end_minute and other.start_minute < self.end_minute
+
+    @property
+    def mask(self):
+        return minute_mask(self.start_minute, self.end_minute)
+
+    def save(self):
+        """Insert or update the slot; the label defaults to the formatted minutes"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        if not 0 <= self.start_minute < self.end_minute <= 1440:
+            raise ValueError("A slot must start before it ends, within one day")
+        if not self.capacity or self.capacity < 1:
+            raise ValueError("A slot must take at least one member")
+        self.label = self.label or minutes_label(self.start_minute, self.end_minute)
+        params = (self.label, self.start_minute, self.end_minute, self.trainer_id, self.weekday, self.is_active,
+                  self.capacity)
+        if self.id:
+            execute_query(
+                '''UPDATE time_slots SET label = ?, start_minute = ?, end_minute = ?, trainer_id = ?,
+                   weekday = ?, is_active = ?, capacity = ? WHERE id = ?''',
+                params + (self.id,), db_path
+            )
+        else:
+            self.id = execute_query(
+                '''INSERT INTO time_slots (label, start_minute, end_minute, trainer_id, weekday, is_active, capacity)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                params, db_path
+            )
+        return self.id
+
+    def __repr__(self):
+        return f"<TimeSlot id={self.id} {self.label} trainer={self.trainer_id} weekday={self.weekday}>"
+
+
+TIME_SLOT = RowMapper(
+    TimeSlot, ['id', 'label', 'start_minute', 'end_minute', 'trainer_id', 'weekday', 'is_active', 'created_at',
+               'capacity'],
+    defaults={'capacity': 1},
+)
+
+
+class SlotCatalog:
+    """The active slots of one database, indexed by id and by (trainer_id, weekday) scope"""
+
+    def __init__(self, slots):
+        self.slots = sorted(slots, key=lambda s: (s.start_minute, s.end_minute, s.id or 0))
+        self.by_id = {slot.id: slot for slot in self.slots}
+        self.by_scope = {}
+        for slot in self.slots:
+            self.by_scope.setdefault((slot.trainer_id, slot.weekday), []).append(slot)
+
+    def get(self, slot_id):
+        return self.by_id.get(slot_id)
+
+    def for_trainer_day(self, trainer_id=None, day=None):
+        """Slots offered by ``trainer_id`` on ``day`` (a date, or None for any day)"""
+        weekday = day.weekday() if isinstance(day, date) else None
+        for scope in ((trainer_id, weekday), (trainer_id, None), (None, weekday), (None, None)):
+            if scope in self.by_scope:
+                return self.by_scope[scope]
+        return []
+
+    def resolve(self, value, trainer_id=None, day=None):
+        """
+        The slot a form value names: a slot id or a slot label. When
+        trainer_id/day are given, only slots offered then are accepted.
+        Returns None for unknown values.
+        """
+        if value is None or value == '':
+            return None
+        if trainer_id is None and day is None:
+            # Any active slot; a label shared with overrides means the default one
+            offered = self.for_trainer_day() + self.slots
+        else:
+            offered = self.for_trainer_day(trainer_id, day)
+        if isinstance(value, int) or str(value).strip().isdigit():
+            slot = self.by_id.get(int(value))
+            return slot if slot in offered else None
+        label = str(value).strip()
+        return next((slot for slot in offered if slot.label == label), None)
+
+
+_cache = {}  # db_path -> (versions, catalog)
+_cache_lock = threading.Lock()
+
+
+def slot_catalog(db_path=None):
+    """The cached SlotCatalog for ``db_path`` (default: the app's database)"""
+    db_path = db_path or current_app.config.get('DATABASE_PATH', 'gym_management.db')
+    versions = get_data_versions(('time_slots',), db_path)
+    with _cache_lock:
+        cached = _cache.get(db_path)
+    if cached and cached[0] == versions:
+        return cached[1]
+    rows = execute_query(
+        f"SELECT {TIME_SLOT.select} FROM time_slots WHERE is_active = 1", (), db_path, fetch=True
+    )
+    catalog = SlotCatalog(TIME_SLOT.all(rows))
+    with _cache_lock:
+        _cache[db_path] = (versions, catalog)
+    return catalog
@@ -1,72 +1,7 @@
-from .database import execute_query
+from .database import execute_query, transaction
+from .rows import RowMapper
 from flask import current_app
 
-def delete(self):
-    """
-    Soft-delete trainer:
-    - Deactivate underlying user account (users.is_active = 0)
-    - Mark trainer.status = 'removed' (or 'inactive')
-    """
-    from models.database import execute_query
-    db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-
-    try:
-        execute_query(
-            "UPDATE users SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (self.user_id,),
-            db_path
-        )
-
-        execute_query(
-            "UPDATE trainers SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            ("removed", self.id),
-            db_path
-        )
-
-        # Optional set removed_at if column exists
-        try:
-            execute_query(
-                "UPDATE trainers SET removed_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (self.id,),
-                db_path
-            )
-        except Exception:
-            pass
-
-        return True
-    except Exception:
-        current_app.logger.exception("Failed to soft-delete trainer %s", getattr(self, 'id', None))
-        return False
-
-
-def hard_delete(self):
-    """
-    Permanently delete trainer and related records.
-    WARNING: destructive. Back up DB before use.
-    """
-    from models.database import execute_query
-    db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-
-    try:
-        # Delete trainer-related tables (update names according to your schema)
-        for q in [
-            ("DELETE FROM workouts WHERE trainer_id = ?", (self.id,)),
-            ("DELETE FROM trainer_schedules WHERE trainer_id = ?", (self.id,)),
-            ("DELETE FROM trainer_assignments WHERE trainer_id = ?", (self.id,)),
-        ]:
-            try:
-                execute_query(q[0], q[1], db_path)
-            except Exception:
-                current_app.logger.exception("Failed to execute cleanup query for trainer %s: %s", self.id, q[0])
-
-        # Delete trainer row and user row
-        execute_query("DELETE FROM trainers WHERE id = ?", (self.id,), db_path)
-        execute_query("DELETE FROM users WHERE id = ?", (self.user_id,), db_path)
-
-        return True
-    except Exception:
-        current_app.logger.exception("Failed to hard-delete trainer %s", getattr(self, 'id', None))
-        return False
 class Trainer:
     def __init__(self, id=None, user_id=None, phone=None, specialization=None,
              experience_years=None, certification=None, salary=None,
@@ -89,65 +24,22 @@ class Trainer:
     def get_all_active(cls):
         """Get all active trainers"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM trainers WHERE status = "active"'
-        results = execute_query(query, (), db_path, fetch=True)
-        
-        trainers = []
-        for row in results:
-            trainer = cls(
-                id=row[0],
-                user_id=row[1],
-                phone=row[2],
-                specialization=row[3],
-                experience_years=row[4],
-                certification=row[5],
-                salary=row[6],
-                working_hours=row[7],
-                bio=row[8],
-                status=row[9],
-                created_at=row[10],
-                updated_at=row[11]
-            )
-            trainers.append(trainer)
-        return trainers
+        query = f"SELECT {TRAINER.select} FROM trainers WHERE status = 'active'"
+        return TRAINER.all(execute_query(query, (), db_path, fetch=True))
 
-    
     @classmethod
     def get_by_id(cls, trainer_id):
         """Get trainer by ID (with full_name from users table)"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = """
-            SELECT t.id, t.user_id, t.phone, t.specialization, t.experience_years,
-                t.certification, t.salary, t.working_hours, t.bio, t.status,
-                t.created_at, t.updated_at, u.full_name
+        query = f"""
+            SELECT {TRAINER_WITH_NAME.select}
             FROM trainers t
             LEFT JOIN users u ON t.user_id = u.id
             WHERE t.id = ?
         """
         result = execute_query(query, (trainer_id,), db_path, fetch=True)
+        return TRAINER_WITH_NAME.one(result[0]) if result else None
 
-        if result:
-            row = result[0]
-            trainer = cls(
-                id=row[0],
-                user_id=row[1],
-                phone=row[2],
-                specialization=row[3],
-                experience_years=row[4],
-                certification=row[5],
-                salary=row[6],
-                working_hours=row[7],
-                bio=row[8],
-                status=row[9],
-                created_at=row[10],
-                updated_at=row[11]
-            )
-            trainer.full_name = row[12]  # ✅ add full_name from users
-            return trainer
-        return None
-
-
-    
     @classmethod
     def get_count_active(cls):
         """Get count of active trainers"""
@@ -158,112 +50,51 @@ class Trainer:
     
     @classmethod
     def get_available_for_slot(cls, time_slot, check_date=None):
-        """Return trainers who are free in a given time slot and date"""
+        """
+        Return active trainers with no session overlapping a given time slot (id, label
+        or TimeSlot) on a date. Sessions are compared by slot minutes, or by label for
+        rows without a time_slot_id, using the AvailabilityIndex.
+        """
         from datetime import date
+        from .availability import AvailabilityIndex
+        from .time_slot import slot_catalog
         if check_date is None:
             check_date = date.today()
+        elif not isinstance(check_date, date):
+            check_date = date.fromisoformat(str(check_date)[:10])
 
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-
-        # Trainers who already have a session at that slot/date
-        query = '''
-            SELECT trainer_id 
-            FROM attendance 
-            WHERE date = ? AND time_slot = ?
-        '''
-        busy = execute_query(query, (check_date, time_slot), db_path, fetch=True)
-        busy_ids = [row[0] for row in busy] if busy else []
-
-        # Now fetch active trainers excluding busy ones
-        if busy_ids:
-            placeholders = ','.join('?' * len(busy_ids))
-            query = f'SELECT * FROM trainers WHERE status = "active" AND id NOT IN ({placeholders})'
-            results = execute_query(query, busy_ids, db_path, fetch=True)
-        else:
-            query = 'SELECT * FROM trainers WHERE status = "active"'
-            results = execute_query(query, db_path=db_path, fetch=True)
-
-        return [cls(
-            id=row[0],
-            user_id=row[1],
-            phone=row[2],
-            specialization=row[3],
-            experience_years=row[4],
-            certification=row[5],
-            salary=row[6],
-            working_hours=row[7],
-            bio=row[8],
-            status=row[9],
-            created_at=row[10],
-            updated_at=row[11]
-        ) for row in results] if results else []
+        slot = time_slot if hasattr(time_slot, 'start_minute') else slot_catalog(db_path).resolve(time_slot)
+        query = f"""
+            SELECT {TRAINER_SUMMARY.select}
+            FROM trainers t
+            LEFT JOIN users u ON t.user_id = u.id
+            WHERE t.status = 'active'
+        """
+        trainers = TRAINER_SUMMARY.all(execute_query(query, (), db_path, fetch=True))
+        free = AvailabilityIndex.free_trainers([t.id for t in trainers], slot or time_slot, check_date, db_path)
+        return [t for t in trainers if t.id in free]
 
     @classmethod
     def get_by_user_id(cls, user_id):
         """Get trainer by linked user_id"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = 'SELECT * FROM trainers WHERE user_id = ?'
+        query = f'SELECT {TRAINER.select} FROM trainers WHERE user_id = ?'
         result = execute_query(query, (user_id,), db_path, fetch=True)
-        
-        if result:
-            row = result[0]
-            return cls(
-                id=row[0],
-                user_id=row[1],
-                phone=row[2],
-                specialization=row[3],
-                experience_years=row[4],
-                certification=row[5],
-                salary=row[6],
-                working_hours=row[7],
-                bio=row[8],
-                status=row[9],
-                created_at=row[10],
-                updated_at=row[11]
-            )
-        return None
+        return TRAINER.one(result[0]) if result else None
 
     @classmethod
     def get_all_with_details(cls):
-        """Get all trainers with user details"""
+        """Get all trainers with user details (username, email, full_name)"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
-        query = '''
-            SELECT t.id, t.user_id, u.username, u.email, u.full_name, 
-                t.phone, t.specialization, t.experience_years, 
-                t.certification, t.salary, t.working_hours, 
-                t.bio, t.status, t.created_at, t.updated_at
+        query = f"""
+            SELECT {TRAINER_WITH_USER.select}
             FROM trainers t
             JOIN users u ON t.user_id = u.id
             ORDER BY t.id DESC
-        '''
-        results = execute_query(query, (), db_path, fetch=True)
-
-        trainers = []
-        for row in results:
-            trainer = cls(
-                id=row[0],
-                user_id=row[1],
-                phone=row[5],
-                specialization=row[6],
-                experience_years=row[7],
-                certification=row[8],
-                salary=row[9],
-                working_hours=row[10],
-                bio=row[11],
-                status=row[12],
-                created_at=row[13],
-                updated_at=row[14]
-            )
-            # attach user details as extra attributes
-            trainer.username = row[2]
-            trainer.email = row[3]
-            trainer.full_name = row[4]
-
-            trainers.append(trainer)
-        return trainers
-
+        """
+        return TRAINER_WITH_USER.all(execute_query(query, (), db_path, fetch=True))
 
-        
     def save(self):
         """Save trainer to database"""
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
@@ -302,16 +133,88 @@ class Trainer:
         """Deactivate trainer"""
         self.status = 'inactive'
         return self.save()
+
+    def delete(self):
+        """Soft-delete: disable the login and mark the trainer removed, in one commit"""
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        try:
+            with transaction(db_path):
+                execute_query(
+                    "UPDATE users SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (self.user_id,), db_path
+                )
+                execute_query(
+                    "UPDATE trainers SET status = 'inactive', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (self.id,), db_path
+                )
+            self.status = 'inactive'
+            return True
+        except Exception:
+            current_app.logger.exception("Failed to deactivate trainer %s", self.id)
+            return False
+
+    def hard_delete(self):
+        """
+        Permanently delete the trainer and their user account.
+        Plans, sessions and time-slot overrides they own are deleted; members,
+        progress entries and workouts they are only referenced by are detached
+        (set to NULL).
+        Runs in one transaction: on failure nothing is changed.
+        """
+        db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
+        steps = [
+            ("DELETE FROM workout_plan_details WHERE plan_id IN "
+             "(SELECT id FROM member_workout_plans WHERE trainer_id = ?)", self.id),
+            ("DELETE FROM member_workout_plans WHERE trainer_id = ?", self.id),
+            ("DELETE FROM diet_plan_meals WHERE diet_plan_id IN "
+             "(SELECT id FROM diet_plans WHERE trainer_id = ?)", self.id),
+            ("DELETE FROM diet_plans WHERE trainer_id = ?", self.id),
+            ("DELETE FROM attendance WHERE trainer_id = ?", self.id),
+            # their slot overrides; the attendance rows pointing at them are gone
+            ("DELETE FROM time_slots WHERE trainer_id = ?", self.id),
+            ("UPDATE members SET trainer_id = NULL WHERE trainer_id = ?", self.id),
+            ("UPDATE member_progress SET recorded_by = NULL WHERE recorded_by = ?", self.id),
+            ("UPDATE workouts SET created_by = NULL WHERE created_by = ?", self.id),
+            ("DELETE FROM trainers WHERE id = ?", self.id),
+            ("UPDATE announcements SET created_by = NULL WHERE created_by = ?", self.user_id),
+            ("DELETE FROM users WHERE id = ?", self.user_id),
+        ]
+        try:
+            with transaction(db_path):
+                for query, key in steps:
+                    execute_query(query, (key,), db_path)
+            return True
+        except Exception:
+            current_app.logger.exception("Failed to hard-delete trainer %s", self.id)
+            return False
     
     def get_todays_schedule(self):
         """Get trainer's schedule for today"""
         from datetime import date
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         query = '''
-            SELECT a.time_slot, m.name as member_name, a.status
+            SELECT a.time_slot, u.full_name as member_name, a.status
             FROM attendance a
             JOIN members m ON a.member_id = m.id
+            JOIN users u ON m.user_id = u.id
+            LEFT JOIN time_slots s ON s.id = a.time_slot_id
             WHERE a.trainer_id = ? AND a.date = ?
-            ORDER BY a.time_slot
+            ORDER BY s.start_minute, a.time_slot
         '''
-        return execute_query(query, (self.id, date.today()), db_path, fetch=True)
\ No newline at end of file
+        return execute_query(query, (self.id, date.today().isoformat()), db_path, fetch=True)
+
+
+TRAINER_COLUMNS = [
+    'id', 'user_id', 'phone', 'specialization', 'experience_years', 'certification',
+    'salary', 'working_hours', 'bio', 'status', 'created_at', 'updated_at',
+]
+TRAINER = RowMapper(Trainer, TRAINER_COLUMNS)
+# For queries that join users as u
+_JOINED = RowMapper(Trainer, TRAINER_COLUMNS, alias='t')
+TRAINER_WITH_NAME = _JOINED.extend(('full_name', 'u.full_name'))
+TRAINER_WITH_USER = _JOINED.extend(('username', 'u.username'), ('email', 'u.email'), ('full_name', 'u.full_name'))
+# Slot pickers need who and what, not bio/salary/certification text
+TRAINER_SUMMARY = _JOINED.subset(
+    'id', 'user_id', 'phone', 'specialization', 'experience_years', 'status',
+    extra=[('full_name', 'u.full_name')],
+)
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app, Response, abort, stream_with_context
 import traceback
 from app.models.database import execute_query
 
@@ -11,7 +11,16 @@ from app.models.payment import Payment
 from app.models.announcement import Announcement
 from app.models.attendance import Attendance
 from app.models.equipment import Equipment
+from app.models.dashboard import DashboardSnapshot
+from app.models.cohorts import CohortAnalytics
+from app.models.forecast import RevenueForecast, DEFAULT_WEEKS
+from app.models.checkin import NO_SESSION, TOO_EARLY, get_desk
 from app.utils.decorators import login_required, admin_required
+from app.utils.pagination import page_size
+from app.utils import query_stats
+from app.utils.exports import csv_stream, xlsx_available, xlsx_stream
+from app.models.exports import EXPORTS, export_rows, parse_date
+from app import scheduler
 from app.utils.email_utils import send_welcome_email, send_membership_renewal_reminder
 # removed werkzeug import; using bcrypt instead
 from flask_bcrypt import Bcrypt
@@ -21,17 +30,6 @@ import string
 import json
 from app.models.workout import Workout
 from app.models.workout_plan import MemberWorkoutPlan, WorkoutPlanDetail
-def table_exists(table_name, db_path):
-    res = execute_query("SELECT name FROM sqlite_master WHERE type='table' AND name = ?", (table_name,), db_path, fetch=True)
-    return bool(res)
-
-def column_exists(table_name, column_name, db_path):
-    try:
-        rows = execute_query(f"PRAGMA table_info({table_name})", (), db_path, fetch=True)
-        cols = [r['name'] if isinstance(r, dict) else r[1] for r in rows]
-        return column_name in cols
-    except Exception:
-        return False
 
 admin_bp = Blueprint('admin', __name__,url_prefix='/admin')
 
@@ -39,7 +37,7 @@ admin_bp = Blueprint('admin', __name__,url_prefix='/admin')
 def equipment_list():
     """View all equipment"""
     try:
-        equipment = Equipment.get_all()
+        equipment = Equipment.get_list_rows()
         return render_template('admin/equipment_list.html', equipment=equipment)
     except Exception as e:
         flash(f"Error loading equipment list: {str(e)}", "danger")
@@ -129,57 +127,9 @@ def update_equipment_status(equipment_id):
 @admin_required
 def dashboard():
     """Admin dashboard with statistics and overview"""
+    # Pending-payment reminders/cancellations run as a background job (app/scheduler.py)
     try:
-    # Auto-process pending payments (send reminders and cancel expired ones)
-    # Safe to call on dashboard load for small DBs. Remove if you prefer cron-only.
-        try:
-            Payment.process_pending_payments(reminder_before_days=5)
-        except Exception as e:
-            current_app.logger.warning(f"Auto-processing pending payments failed: {e}")
-    except Exception:
-        pass
-    try:
-        # Get key statistics
-        total_members = Member.get_count_active()
-        total_trainers = Trainer.get_count_active()
-        today_attendance = Attendance.get_todays_attendance()
-
-        # Financial stats
-        revenue_stats = Payment.get_revenue_stats()
-        monthly_revenue = Payment.get_revenue_stats(year=date.today().year, month=date.today().month)
-
-        # Pending payments
-        pending_payments = Payment.get_pending_payments()
-
-        # Equipment stats
-        working_equipment = Equipment.get_working_count()
-        maintenance_equipment = Equipment.get_maintenance_count()
-
-        # Recent activity
-        recent_members = Member.get_recent(5)
-        recent_payments = Payment.get_recent(5)
-
-        # Memberships expiring soon
-        expiring_memberships = Member.get_expiring_soon(15)
-
-        # 🔹 Get recent announcements (latest 5)
-        announcements = Announcement.get_all()[:5]
-
-        return render_template(
-            'admin/dashboard.html',
-            total_members=total_members,
-            total_trainers=total_trainers,
-            today_attendance=today_attendance,
-            total_revenue=revenue_stats.get('total_revenue', 0) if revenue_stats else 0,
-            monthly_revenue=monthly_revenue.get('total_revenue', 0) if monthly_revenue else 0,
-            pending_payments=len(pending_payments),
-            working_equipment=working_equipment,
-            maintenance_equipment=maintenance_equipment,
-            recent_members=recent_members,
-            recent_payments=recent_payments,
-            expiring_memberships=expiring_memberships,
-            announcements=announcements   # 🔹 pass to template
-        )
+        return render_template('admin/dashboard.html', **DashboardSnapshot.get())
     except Exception as e:
         print("\n--- DASHBOARD ERROR ---")
         print("Error:", e)
@@ -460,11 +410,9 @@ def confirm_delete_member(member_id):
 @admin_required
 def delete_member(member_id):
     """
-    Safe deletion handler:
-     - If force=1 -> try to permanently remove rows from tables that contain member_id
-     - If not force -> perform soft-delete (disable user, mark member removed)
-    This implementation checks table existence and column presence before running DELETE,
-    to avoid sqlite OperationalError for missing tables or different schema.
+    force=1 -> permanently remove the member, their history and login
+    otherwise -> soft-delete (disable login, mark membership inactive)
+    Either way the change is one transaction: it fully applies or not at all.
     """
     force = request.form.get("force", "0") == "1"
     member = Member.get_by_id(member_id)
@@ -472,98 +420,16 @@ def delete_member(member_id):
         flash("Member not found.", "danger")
         return redirect(url_for("admin.members"))
 
-    db_path = current_app.config.get("DATABASE_PATH", "gym_management.db")
-
-    try:
-        if not force:
-            # Soft-delete (non-destructive)
-            if hasattr(member, "delete"):
-                ok = member.delete()
-            else:
-                execute_query("UPDATE users SET is_active = 0 WHERE id = ?", (member.user_id,), db_path)
-                execute_query("UPDATE members SET membership_status = ? WHERE id = ?", ("removed", member_id), db_path)
-                ok = True
-
-            if ok:
-                flash(f"Member {getattr(member, 'full_name', member_id)} deactivated.", "success")
-            else:
-                flash("Failed to deactivate member. See logs.", "danger")
-            return redirect(url_for("admin.members"))
-
-        # If force -> destructive delete, but only on tables that exist and have member_id column.
-        # List of candidate tables to try (ordered roughly by likely relationships).
-        candidate_tables = [
-            "payments",
-            "attendance",
-            "member_progress",
-            "member_workout_plans",
-            "member_workout_plans",    # repeated safe
-            "member_workout_plans",    # harmless duplicates ok
-            "diet_plans",
-            "diet_plan_meals",
-            # skip workout_plan tables that don't reference member directly
-            # "workout_plan_details",
-            # "workouts",
-        ]
-
-        # Helper: check table existence
-        def table_exists(table_name):
-            q = "SELECT name FROM sqlite_master WHERE type='table' AND name = ?"
-            res = execute_query(q, (table_name,), db_path, fetch=True)
-            return bool(res)
-
-        # Helper: check if column exists in table
-        def column_exists(table_name, column_name):
-            try:
-                res = execute_query(f"PRAGMA table_info({table_name})", (), db_path, fetch=True)
-                cols = [r['name'] if isinstance(r, dict) else r[1] for r in res]
-                return column_name in cols
-            except Exception:
-                return False
-
-        # Run deletes only on tables that exist and have 'member_id' column
-        deleted_summary = []
-        for tbl in candidate_tables:
-            if not table_exists(tbl):
-                current_app.logger.debug("Skipping delete: table not found: %s", tbl)
-                continue
-            # prefer 'member_id' but some tables might use 'member' or 'members_id' — check common variants
-            col = None
-            for candidate_col in ("member_id", "memberid", "members_id", "member"):
-                if column_exists(tbl, candidate_col):
-                    col = candidate_col
-                    break
-            if not col:
-                current_app.logger.debug("Table %s exists but no member_id-like column; skipping", tbl)
-                continue
-
-            # perform delete
-            try:
-                execute_query(f"DELETE FROM {tbl} WHERE {col} = ?", (member_id,), db_path)
-                deleted_summary.append(tbl)
-            except Exception:
-                current_app.logger.exception("Failed to delete rows from %s for member %s", tbl, member_id)
-
-        # Finally remove member row and user row if present
-        if table_exists("members"):
-            try:
-                execute_query("DELETE FROM members WHERE id = ?", (member_id,), db_path)
-                deleted_summary.append("members")
-            except Exception:
-                current_app.logger.exception("Failed to delete members row %s", member_id)
-
-        if getattr(member, "user_id", None):
-            # deactivate or delete user row
-            try:
-                execute_query("DELETE FROM users WHERE id = ?", (member.user_id,), db_path)
-                deleted_summary.append("users")
-            except Exception:
-                current_app.logger.exception("Failed to delete user row for member %s", member_id)
-
-        flash(f"Member {getattr(member, 'full_name', member_id)} permanently deleted (tables affected: {', '.join(deleted_summary)})", "success")
-    except Exception:
-        current_app.logger.exception("Error deleting member %s", member_id)
-        flash("An error occurred while deleting the member. See logs.", "danger")
+    name = getattr(member, 'full_name', None) or member_id
+    if not force:
+        if member.delete():
+            flash(f"Member {name} deactivated.", "success")
+        else:
+            flash("Failed to deactivate member. See logs.", "danger")
+    elif member.hard_delete():
+        flash(f"Member {name} permanently deleted.", "success")
+    else:
+        flash("An error occurred while deleting the member; nothing was changed. See logs.", "danger")
 
     return redirect(url_for("admin.members"))
 
@@ -587,58 +453,14 @@ def delete_trainer(trainer_id):
         flash("Trainer not found.", "danger")
         return redirect(url_for("admin.trainers"))
 
-    db_path = current_app.config.get("DATABASE_PATH", "gym_management.db")
-
+    name = getattr(trainer, 'full_name', None) or trainer_id
     if not force:
-        if hasattr(trainer, "delete"):
-            ok = trainer.delete()
-        else:
-            if table_exists("users", db_path) and getattr(trainer, "user_id", None):
-                execute_query("UPDATE users SET is_active = 0 WHERE id = ?", (trainer.user_id,), db_path)
-            if table_exists("trainers", db_path):
-                execute_query("UPDATE trainers SET status = ? WHERE id = ?", ("removed", trainer_id), db_path)
-            ok = True
-
-        flash(f"Trainer {getattr(trainer,'full_name',trainer_id)} deactivated." if ok else "Failed to deactivate trainer.", "success" if ok else "danger")
-        return redirect(url_for("admin.trainers"))
-
-    # force -> permanent delete (schema-aware)
-    deleted = []
-    try:
-        # member_workout_plans (remove assignments)
-        if table_exists("member_workout_plans", db_path) and column_exists("member_workout_plans", "trainer_id", db_path):
-            execute_query("DELETE FROM member_workout_plans WHERE trainer_id = ?", (trainer_id,), db_path)
-            deleted.append("member_workout_plans")
-
-        # diet_plans assigned to this trainer (if trainer owns them)
-        if table_exists("diet_plans", db_path) and column_exists("diet_plans", "trainer_id", db_path):
-            # if diet_plan_meals exists, cleanup meals first
-            plans = execute_query("SELECT id FROM diet_plans WHERE trainer_id = ?", (trainer_id,), db_path, fetch=True)
-            plan_ids = [r['id'] if isinstance(r, dict) else r[0] for r in plans] if plans else []
-            if plan_ids and table_exists("diet_plan_meals", db_path) and column_exists("diet_plan_meals", "diet_plan_id", db_path):
-                for pid in plan_ids:
-                    execute_query("DELETE FROM diet_plan_meals WHERE diet_plan_id = ?", (pid,), db_path)
-                deleted.append("diet_plan_meals")
-            execute_query("DELETE FROM diet_plans WHERE trainer_id = ?", (trainer_id,), db_path)
-            deleted.append("diet_plans")
-
-        # attendance rows where trainer was present/assigned
-        if table_exists("attendance", db_path) and column_exists("attendance", "trainer_id", db_path):
-            execute_query("DELETE FROM attendance WHERE trainer_id = ?", (trainer_id,), db_path)
-            deleted.append("attendance")
-
-        # finally remove trainer row and user row
-        if table_exists("trainers", db_path):
-            execute_query("DELETE FROM trainers WHERE id = ?", (trainer_id,), db_path)
-            deleted.append("trainers")
-        if getattr(trainer, "user_id", None) and table_exists("users", db_path):
-            execute_query("DELETE FROM users WHERE id = ?", (trainer.user_id,), db_path)
-            deleted.append("users")
-
-        flash(f"Trainer permanently deleted (tables affected: {', '.join(deleted)})", "success")
-    except Exception:
-        current_app.logger.exception("Error permanently deleting trainer %s", trainer_id)
-        flash("An error occurred while permanently deleting the trainer. See logs.", "danger")
+        ok = trainer.delete()
+        flash(f"Trainer {name} deactivated." if ok else "Failed to deactivate trainer.", "success" if ok else "danger")
+    elif trainer.hard_delete():
+        flash(f"Trainer {name} permanently deleted.", "success")
+    else:
+        flash("An error occurred while permanently deleting the trainer; nothing was changed. See logs.", "danger")
 
     return redirect(url_for("admin.trainers"))
 
@@ -735,10 +557,17 @@ def edit_membership_plan(plan_id):
 @admin_bp.route('/payments')
 @admin_required
 def payments():
-    payments = Payment.get_all_with_details()
+    # Newest first; older pages through ?cursor= (keyset pagination on created_at, id)
+    cursor = request.args.get('cursor')
+    try:
+        page = Payment.get_all_with_details_page(cursor, limit=page_size(request.args.get('per_page', type=int)))
+    except ValueError:
+        return redirect(url_for('admin.payments'))
     pending_payments = Payment.get_pending_payments()
     return render_template('admin/payments.html',
-                           payments=payments,
+                           payments=page.items,
+                           cursor=cursor,
+                           next_cursor=page.next_cursor,
                            pending_payments=pending_payments)
 
 @admin_bp.route('/payments/<int:payment_id>/update', methods=['POST'])
@@ -764,7 +593,7 @@ def update_payment_status(payment_id):
             if success:
                 flash('Payment marked as completed and membership activated!')
             else:
-                flash('Payment updated but failed to activate membership; check logs.', 'warning')
+                flash('Could not complete payment or activate membership; nothing was changed. Check logs.', 'warning')
         else:
             # For pending/failed/refunded, just update the payment row
             payment.payment_status = new_status
@@ -879,6 +708,7 @@ def reports():
       - attendance_stats (aggregated here)
       - revenue_labels / revenue_data for last 12 months
       - attendance_labels / attendance_data for last 14 days
+    Revenue and attendance come from the daily_revenue / daily_attendance rollups.
     """
     try:
         # basic aggregates (reuse model helpers where available)
@@ -905,14 +735,12 @@ def reports():
             month_keys.append(key)
             months.append(label)
 
-        # Query payments grouped by YYYY-MM
+        # Completed revenue grouped by YYYY-MM (from the daily_revenue rollup)
         start_month = (today.replace(day=1) - relativedelta(months=11)).strftime("%Y-%m-01")
         sql = """
-            SELECT strftime('%Y-%m', payment_date) as ym, IFNULL(SUM(amount),0) as total
-            FROM payments
-            WHERE payment_status = 'completed'
-              AND payment_date IS NOT NULL
-              AND DATE(payment_date) >= DATE(?) 
+            SELECT substr(day, 1, 7) as ym, IFNULL(SUM(total),0) as total
+            FROM daily_revenue
+            WHERE day >= ?
             GROUP BY ym
             ORDER BY ym;
         """
@@ -939,11 +767,9 @@ def reports():
             days.append(label)
 
         sql_att = """
-            SELECT DATE(date) as d, 
-                   SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present_count
-            FROM attendance
-            WHERE DATE(date) >= DATE(?)
-            GROUP BY d
+            SELECT day as d, present as present_count
+            FROM daily_attendance
+            WHERE day >= ?
             ORDER BY d;
         """
         start_day = (today - timedelta(days=days_back)).isoformat()
@@ -978,7 +804,9 @@ def reports():
             revenue_labels=revenue_labels,
             revenue_data=revenue_json,
             attendance_labels=attendance_labels,
-            attendance_data=attendance_json
+            attendance_data=attendance_json,
+            exports=EXPORTS,
+            xlsx_enabled=xlsx_available()
         )
 
     except Exception as e:
@@ -993,10 +821,135 @@ def reports():
             revenue_labels=json.dumps([]),
             revenue_data=json.dumps([]),
             attendance_labels=json.dumps([]),
-            attendance_data=json.dumps([])
+            attendance_data=json.dumps([]),
+            exports=EXPORTS,
+            xlsx_enabled=xlsx_available()
         )
 
 
+@admin_bp.route('/api/metrics')
+@admin_required
+def metrics():
+    """Dashboard counters as JSON. Conditional GETs get a 304 while the data is unchanged."""
+    try:
+        etag = DashboardSnapshot.etag()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(as_of=date.today().isoformat(), metrics=DashboardSnapshot.metrics())
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception:
+        current_app.logger.exception("Failed building dashboard metrics")
+        return jsonify({'error': 'Failed to load metrics'}), 500
+
+
+@admin_bp.route('/api/checkin', methods=['POST'])
+@admin_required
+def kiosk_checkin():
+    """Front-desk scan: check a member in to today's session by member_id or user_id (JSON or form)"""
+    data = request.get_json(silent=True) or request.form
+    try:
+        member_id = int(data['member_id']) if data.get('member_id') not in (None, '') else None
+        user_id = int(data['user_id']) if data.get('user_id') not in (None, '') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'member_id and user_id must be integers'}), 400
+    if member_id is None and user_id is None:
+        return jsonify({'error': 'member_id or user_id is required'}), 400
+    try:
+        result = get_desk().scan(member_id=member_id, user_id=user_id)
+    except Exception:
+        current_app.logger.exception("Kiosk check-in failed")
+        return jsonify({'error': 'Check-in failed'}), 500
+    status_code = {NO_SESSION: 404, TOO_EARLY: 409}.get(result['result'], 200)
+    return jsonify(result), status_code
+
+
+@admin_bp.route('/api/revenue-forecast')
+@admin_required
+def revenue_forecast():
+    """Expected renewal revenue per week, as JSON (?weeks=26..52)"""
+    weeks = request.args.get('weeks', DEFAULT_WEEKS, type=int)
+    try:
+        return jsonify(RevenueForecast.get(weeks))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception:
+        current_app.logger.exception("Failed building revenue forecast")
+        return jsonify({'error': 'Failed to build forecast'}), 500
+
+
+@admin_bp.route('/reports/cohorts')
+@admin_required
+def cohort_reports():
+    """Retention, churn and renewal by join month and plan (cached per day)"""
+    try:
+        cohorts = CohortAnalytics.get()
+    except Exception:
+        current_app.logger.exception("Failed building cohort report")
+        flash("Error building cohort report. Check logs.", "danger")
+        cohorts = {'as_of': date.today().isoformat(), 'months': [], 'cohorts': [], 'plans': []}
+    return render_template('admin/cohorts.html', report=cohorts)
+
+
+# -------------------- Query Performance --------------------
+@admin_bp.route('/_perf')
+@admin_required
+def perf():
+    """Top routes by query count / DB time, with suspected N+1 patterns"""
+    sort = request.args.get('sort', 'queries')
+    if sort not in ('queries', 'db_time'):
+        sort = 'queries'
+    return render_template(
+        'admin/perf.html',
+        routes=query_stats.top_routes(sort=sort),
+        sort=sort,
+        slow_query_ms=current_app.config.get('SLOW_QUERY_MS'),
+        n_plus_one_threshold=current_app.config.get('N_PLUS_ONE_THRESHOLD'),
+        job_runs=scheduler.recent_runs(10)
+    )
+
+
+# -------------------- Exports --------------------
+@admin_bp.route('/export/<kind>')
+@admin_required
+def export(kind):
+    """Stream payments / attendance / members as CSV (or XLSX), with optional from/to/status filters"""
+    if kind not in EXPORTS:
+        abort(404)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'xlsx'):
+        flash('Unknown export format.')
+        return redirect(url_for('admin.reports'))
+    if fmt == 'xlsx' and not xlsx_available():
+        flash('XLSX export needs the openpyxl package; use CSV instead.')
+        return redirect(url_for('admin.reports'))
+    try:
+        header, rows = export_rows(
+            kind,
+            date_from=parse_date(request.args.get('from')),
+            date_to=parse_date(request.args.get('to')),
+            status=request.args.get('status') or None,
+        )
+    except ValueError as e:
+        flash(f'Invalid export filters: {e}')
+        return redirect(url_for('admin.reports'))
+
+    filename = f"{kind}-{date.today().strftime('%Y%m%d')}.{fmt}"
+    if fmt == 'xlsx':
+        body = xlsx_stream(header, rows, title=kind.title())
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        body = csv_stream(header, rows)
+        mimetype = 'text/csv'
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
 # -------------------- Renewal Reminders --------------------
 @admin_bp.route('/send-renewal-reminders', methods=['POST'])
 @admin_required
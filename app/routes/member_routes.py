@@ -9,10 +9,14 @@ from app.models.payment import Payment
 from app.models.workout import Workout
 from app.models.diet import Diet
 from app.models.progress import Progress
-from app.models.attendance import Attendance, _slot_to_datetimes, _parse_datetime
+from app.models.attendance import Attendance
+from app.models.availability import AvailabilityIndex, DEFAULT_DAYS
+from app.models.booking import BookingEngine, MEMBER_DAY_BOOKED, PAST_SLOT, SAME_SLOT, SLOT_FULL, TRAINER_BUSY
+from app.models.time_slot import slot_catalog
 from app.models.announcement import Announcement
 from app.routes.admin import members
 from app.utils.decorators import login_required, member_required
+from app.utils.pagination import decode_cursor
 from app.models.workout_plan import MemberWorkoutPlan, WorkoutPlanDetail
 import json
 
@@ -330,57 +334,31 @@ def progress():
 @login_required
 @member_required
 def attendance():
-    """Member attendance history with auto-absent handling"""
+    """Member attendance history (expired sessions are marked absent by the reconciler)"""
     try:
         user_id = session['user_id']
         member = Member.get_by_user_id(user_id)
 
-        # Try to call Attendance.auto_mark_absent() if provided by model; fallback to safe manual logic.
+        # Bounded pre-step; the reconcile_attendance job does the bulk of the work
         try:
-            if hasattr(Attendance, 'auto_mark_absent'):
-                Attendance.auto_mark_absent()
-            else:
-                # Fallback: mark scheduled sessions for past dates as absent
-                attendance_records_tmp = Attendance.get_member_attendance(member.id, limit=30)
-                now = datetime.now()
-                for record in attendance_records_tmp:
-                    if getattr(record, 'status', None) == "scheduled" and getattr(record, 'date', None) and record.date < date.today():
-                        try:
-                            record.status = "absent"
-                            record.save()
-                        except Exception:
-                            current_app.logger.debug("Failed to auto-mark absent for record %s", getattr(record, 'id', 'N/A'))
+            Attendance.reconcile_expired()
         except Exception as ex:
-            current_app.logger.warning("Auto-absent operation failed: %s", ex)
-
-        # Get last 30 records
-        attendance_records = Attendance.get_member_attendance(member.id, limit=30)
-
-        # More robust auto-absent: if scheduled and start time passed for same day
-        now = datetime.now()
-        for record in attendance_records:
-            try:
-                if getattr(record, 'status', None) == "scheduled":
-                    check_in = getattr(record, 'check_in_time', None)
-                    # if check_in stored as string, parse it
-                    if isinstance(check_in, str):
-                        check_in = _parse_datetime(check_in)
-                    if check_in and record.date:
-                        session_datetime = datetime.combine(record.date, check_in.time())
-                        if now > session_datetime:
-                            record.status = "absent"
-                            record.save()
-            except Exception as e:
-                current_app.logger.warning("Auto-absent failed for %s: %s", getattr(record, 'id', 'N/A'), e)
-
-        # Re-fetch after updates
-        attendance_records = Attendance.get_member_attendance(member.id, limit=30)
-
-        # Stats
-        total_sessions = len(attendance_records)
-        present_sessions = sum(1 for a in attendance_records if getattr(a, 'status', None) == 'present')
-        absent_sessions = sum(1 for a in attendance_records if getattr(a, 'status', None) == 'absent')
-        late_sessions = sum(1 for a in attendance_records if getattr(a, 'status', None) == 'late')
+            current_app.logger.warning("Attendance reconcile failed: %s", ex)
+
+        # Newest first; older pages through ?cursor= (keyset pagination on date, id)
+        cursor = request.args.get('cursor')
+        try:
+            page = Attendance.get_member_attendance_page(member.id, cursor)
+        except ValueError:
+            return redirect(url_for('member.attendance'))
+        attendance_records = page.items
+
+        # Lifetime counts from the member_attendance_stats rollup
+        stats = Attendance.get_member_stats(member.id)
+        total_sessions = stats['total']
+        present_sessions = stats['present']
+        absent_sessions = stats['absent']
+        late_sessions = stats['late']
 
         # Only count completed sessions for percentage
         completed = present_sessions + absent_sessions + late_sessions
@@ -394,6 +372,9 @@ def attendance():
             absent_sessions=absent_sessions,
             late_sessions=late_sessions,
             attendance_percentage=attendance_percentage,
+            cursor=cursor,
+            next_cursor=page.next_cursor,
+            time_slots=slot_catalog().for_trainer_day(member.trainer_id),
             today=date.today()
         )
 
@@ -419,9 +400,18 @@ def payments():
             flash('Member profile not found.', 'danger')
             return redirect(url_for('auth.login'))
 
+        # Older pages are reached through ?cursor= (keyset pagination on created_at, id)
+        cursor = request.args.get('cursor')
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            return redirect(url_for('member.payments'))
+        next_cursor = None
+
         # Try model first, fallback to direct query if model fails
         try:
-            payment_records = Payment.get_member_payments(member.id) or []
+            page = Payment.get_member_payments_page(member.id, cursor)
+            payment_records, next_cursor = page.items, page.next_cursor
         except Exception as ex:
             current_app.logger.exception("Payment model fetch failed, falling back to SQL: %s", ex)
             # fallback direct query
@@ -470,7 +460,8 @@ def payments():
         payment_records = normalized
 
         # Pass the member to the template (fixes UndefinedError)
-        return render_template('member/payments.html', payment_records=payment_records, member=member)
+        return render_template('member/payments.html', payment_records=payment_records, member=member,
+                               cursor=cursor, next_cursor=next_cursor)
 
     except Exception as e:
         # Log full traceback and render the payments page (empty) instead of redirecting.
@@ -500,17 +491,8 @@ def schedule_session():
         # Get available trainers
         assigned_trainer = Trainer.get_by_id(member.trainer_id)
 
-        # Get available time slots
-        time_slots = [
-            "6:00 AM - 8:00 AM",
-            "8:00 AM - 10:00 AM",
-            "10:00 AM - 12:00 PM",
-            "12:00 PM - 2:00 PM",
-            "2:00 PM - 4:00 PM",
-            "4:00 PM - 6:00 PM",
-            "6:00 PM - 8:00 PM",
-            "8:00 PM - 10:00 PM"
-        ]
+        # Slots the assigned trainer offers (day-specific overrides are checked on submit)
+        time_slots = slot_catalog().for_trainer_day(member.trainer_id)
 
         return render_template(
             'member/schedule_session.html',
@@ -573,146 +555,95 @@ def schedule_session_post():
             flash('Cannot schedule sessions for past dates', 'warning')
             return redirect(url_for('member.schedule_session'))
 
-        # 2) Derive slot datetimes and require start > now
-        start_iso, end_iso = _slot_to_datetimes(time_slot, on_date=session_date)
-        if not start_iso:
-            flash('Invalid time slot selected.', 'warning')
+        # 2) Check and book in one transaction: slot offered and in the future, one session
+        #    per member per DATE (2 hrs), trainer free and slot capacity left
+        result = BookingEngine.book(member.id, assigned_trainer.id, time_slot, session_date)
+        if result.conflict in (SAME_SLOT, MEMBER_DAY_BOOKED):
+            # Changing an existing booking goes through the Attendance page
+            flash(result.message, 'info' if result.conflict == SAME_SLOT else 'warning')
+            return redirect(url_for('member.attendance'))
+        if not result.ok:
+            flash(result.message, 'warning')
             return redirect(url_for('member.schedule_session'))
+        flash('Session scheduled successfully!', 'success')
 
-        try:
-            start_dt = datetime.fromisoformat(start_iso)
-        except Exception:
-            flash('Failed to parse slot start time', 'warning')
-            return redirect(url_for('member.schedule_session'))
+    except Exception as e:
+        current_app.logger.exception(f'Error scheduling session: {e}')
+        flash('Error scheduling session', 'danger')
 
-        if start_dt <= datetime.now():
-            flash('Cannot schedule a session that starts now or in the past. Please select a future slot.', 'warning')
-            return redirect(url_for('member.schedule_session'))
+    return redirect(url_for('member.attendance'))
 
-        # --------------------
-        # 3) Enforce: only one session per member per DATE (2 hrs)
-        # --------------------
-        existing_for_member = Attendance.get_member_scheduled_on_date(member.id, session_date)
+@member_routes_bp.route('/schedule_session/recurring', methods=['POST'])
+@login_required
+@member_required
+def schedule_recurring_post():
+    """Book one slot on chosen weekdays until an end date, in one request.
 
-        # Helper to normalize model returns (list/tuple/dict/sqlite3.Row/object) -> object-like with attributes
-        from types import SimpleNamespace
-        def _normalize_record(rec):
-            if rec is None:
-                return None
-            # If list/tuple: take first element (most model helpers return list when they intend single)
-            if isinstance(rec, (list, tuple)):
-                if not rec:
-                    return None
-                rec = rec[0]
-            # sqlite3.Row or dict-like
-            if hasattr(rec, 'keys'):
-                try:
-                    return SimpleNamespace(**{k: rec[k] for k in rec.keys()})
-                except Exception:
-                    # fallback: try mapping to common names
-                    data = {}
-                    try:
-                        data['id'] = rec['id']
-                    except Exception:
-                        pass
-                    return SimpleNamespace(**data)
-            # dict
-            if isinstance(rec, dict):
-                return SimpleNamespace(**rec)
-            # object already with attributes
-            if hasattr(rec, 'id') or hasattr(rec, 'time_slot'):
-                return rec
-            # tuple/list fallback: assume common ordering [id, member_id, trainer_id, date, time_slot, status, ...]
-            if isinstance(rec, (list, tuple)):
-                try:
-                    return SimpleNamespace(
-                        id=rec[0] if len(rec) > 0 else None,
-                        member_id=rec[1] if len(rec) > 1 else None,
-                        trainer_id=rec[2] if len(rec) > 2 else None,
-                        date=rec[3] if len(rec) > 3 else None,
-                        time_slot=rec[4] if len(rec) > 4 else None,
-                        status=rec[5] if len(rec) > 5 else None
-                    )
-                except Exception:
-                    return None
-            return None
-
-        existing_record = _normalize_record(existing_for_member)
-
-        # If member already has any booking that day -> block creation and instruct reschedule via Attendance page
-        if existing_record:
-            # If booking is for the same slot, tell them they already booked it
-            if getattr(existing_record, 'time_slot', None) == time_slot:
-                flash('You already have this slot booked for that date.', 'info')
-            else:
-                flash('Only one booking per day is allowed. To change your slot, please reschedule from the Attendance page.', 'warning')
-            return redirect(url_for('member.attendance'))
+    Form fields (or a JSON body): time_slot, weekdays (repeatable, 0 = Monday),
+    start_date and end_date. Free dates are booked together; dates that
+    conflict are skipped and listed. JSON requests get the per-date results back.
+    """
+    wants_json = request.is_json
+    data = (request.get_json(silent=True) or {}) if wants_json else request.form
+    weekdays = data.get('weekdays', []) if wants_json else request.form.getlist('weekdays')
 
-        # 4) New booking: check trainer's slot availability
-        if not Attendance.check_slot_availability(assigned_trainer.id, time_slot, session_date):
-            flash('This time slot is not available', 'warning')
-            return redirect(url_for('member.schedule_session'))
+    def fail(message, status=400):
+        if wants_json:
+            return jsonify({'error': message}), status
+        flash(message, 'warning')
+        return redirect(url_for('member.schedule_session'))
 
-        existing_for_member = Attendance.get_member_scheduled_on_date(member.id, session_date)
-        # existing_for_member may be a list of Attendance objects (your model returns a list)
-        existing_record = None
-        if isinstance(existing_for_member, (list, tuple)):
-            existing_record = existing_for_member[0] if existing_for_member else None
-        else:
-            existing_record = existing_for_member
-
-        # if there's an existing record, check whether this request intends to reschedule
-        wants_reschedule = request.form.get('reschedule', '').lower() in ('1', 'true', 'yes') or request.form.get('action') == 'reschedule'
-
-        if existing_record:
-            # If same slot already exists, simply inform user
-            if getattr(existing_record, 'time_slot', None) == time_slot:
-                flash('You already have this slot booked for that date.', 'info')
-                return redirect(url_for('member.attendance'))
-
-            # If user explicitly requested reschedule, attempt to reschedule
-            if wants_reschedule:
-                # check trainer availability excluding the existing attendance id
-                if not Attendance.check_slot_availability(
-                    assigned_trainer.id,
-                    time_slot,
-                    session_date,
-                    exclude_attendance_id=getattr(existing_record, 'id', None)
-                ):
-                    flash('Trainer is not available for the new slot. Please choose a different slot.', 'warning')
-                    return redirect(url_for('member.schedule_session'))
-
-                # perform reschedule (update existing record)
-                try:
-                    existing_record.time_slot = time_slot
-                    existing_record.status = 'scheduled'
-                    existing_record.save()
-                    flash('Your session has been rescheduled.', 'success')
-                except Exception as ex:
-                    current_app.logger.exception("Failed to reschedule attendance id=%s: %s", getattr(existing_record, 'id', None), ex)
-                    flash('Failed to reschedule. Please try again or contact admin.', 'danger')
-                return redirect(url_for('member.attendance'))
-
-            # otherwise (no reschedule intent) block another booking the same day
-            flash('Only one booking per day is allowed. To change your slot, please reschedule from the Attendance page.', 'warning')
-            return redirect(url_for('member.attendance'))
-        # 5) Create attendance record (store time_slot; Attendance.save will persist datetimes if needed)
-        attendance = Attendance(
-            member_id=member.id,
-            trainer_id=assigned_trainer.id,
-            date=session_date,
-            time_slot=time_slot,
-            status='scheduled'
-        )
-        attendance.save()
-        flash('Session scheduled successfully!', 'success')
+    try:
+        member = Member.get_by_user_id(session.get('user_id'))
+        if not member:
+            return fail("Member profile not found.", 404)
+        if getattr(member, 'status', 'inactive') != "active" or (
+                member.membership_end_date and member.membership_end_date < date.today()
+        ):
+            return fail("Your membership is inactive or expired. Please contact admin to activate or renew.", 403)
+        if not member.trainer_id or not Trainer.get_by_id(member.trainer_id):
+            return fail("Assigned trainer not found. Contact admin.")
 
-    except Exception as e:
-        current_app.logger.exception(f'Error scheduling session: {e}')
-        flash('Error scheduling session', 'danger')
+        time_slot = data.get('time_slot')
+        if not all([time_slot, weekdays, data.get('start_date'), data.get('end_date')]):
+            return fail('All fields are required')
+        try:
+            start = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+            until = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return fail('Invalid date format')
+        try:
+            weekdays = [int(w) for w in weekdays]
+        except (TypeError, ValueError):
+            return fail('Invalid weekday')
+        if start < date.today():
+            return fail('Cannot schedule sessions for past dates')
+        # Memberships end; sessions after that could not be attended
+        if member.membership_end_date and until > member.membership_end_date:
+            return fail('The end date is after your membership ends '
+                        f'({member.membership_end_date.strftime("%B %d, %Y")}).')
 
+        try:
+            result = BookingEngine.book_recurring(member.id, member.trainer_id, time_slot, weekdays, start, until)
+        except ValueError as e:
+            return fail(str(e))
+    except Exception as e:
+        current_app.logger.exception(f'Error scheduling recurring sessions: {e}')
+        return fail('Error scheduling sessions', 500)
+
+    if wants_json:
+        return jsonify(result.to_dict())
+    booked, conflicts = result.booked, result.conflicts
+    if booked:
+        flash(f'{len(booked)} session(s) scheduled.', 'success')
+    if conflicts:
+        skipped = ', '.join(f'{day.strftime("%b %d")} ({r.message.rstrip(".")})'
+                            for day, r in list(conflicts.items())[:5])
+        more = f' and {len(conflicts) - 5} more' if len(conflicts) > 5 else ''
+        flash(f'{len(conflicts)} date(s) could not be booked: {skipped}{more}.', 'warning')
     return redirect(url_for('member.attendance'))
 
+
 @member_routes_bp.route('/attendance/<int:attendance_id>/reschedule', methods=['POST'])
 @login_required
 @member_required
@@ -753,38 +684,18 @@ def reschedule_attendance(attendance_id):
             flash('Please choose a new time slot.', 'warning')
             return redirect(url_for('member.attendance'))
 
-        # 4. Check if the new slot is the same as the existing one (Good UX)
-        if attendance.time_slot == new_slot:
-            flash('You are already booked for this slot on that date.', 'info')
-            return redirect(url_for('member.attendance'))
-
-        # Derive datetimes for the new slot
-        start_iso, end_iso = _slot_to_datetimes(new_slot, on_date=attendance.date)
-        if not start_iso:
-            flash('Invalid time slot selected.', 'warning')
+        # 4. Validate, check trainer availability excluding this booking and update, atomically
+        result = BookingEngine.reschedule(attendance.id, member.id, new_slot)
+        if not result.ok:
+            messages = {
+                SAME_SLOT: ('You are already booked for this slot on that date.', 'info'),
+                PAST_SLOT: ('Cannot reschedule to a slot that starts now or in the past. Please select a future slot.',
+                            'warning'),
+                TRAINER_BUSY: ('Trainer is not available at the requested new slot.', 'warning'),
+                SLOT_FULL: ('Trainer is not available at the requested new slot.', 'warning'),
+            }
+            flash(*messages.get(result.conflict, (result.message, 'warning')))
             return redirect(url_for('member.attendance'))
-
-        try:
-            start_dt = datetime.fromisoformat(start_iso)
-        except Exception:
-            flash('Failed to parse slot start time', 'warning')
-            return redirect(url_for('member.attendance'))
-
-        # 5. FUTURE START TIME CHECK (Constraint from schedule_session_post)
-        if start_dt <= datetime.now():
-            flash('Cannot reschedule to a slot that starts now or in the past. Please select a future slot.', 'warning')
-            return redirect(url_for('member.attendance'))
-
-        # 6. Check trainer availability excluding this attendance id (Core rescheduling check)
-        # We use the assigned_trainer ID retrieved earlier
-        if not Attendance.check_slot_availability(assigned_trainer.id, new_slot, attendance.date, exclude_attendance_id=attendance.id):
-            flash('Trainer is not available at the requested new slot.', 'warning')
-            return redirect(url_for('member.attendance'))
-
-        # Update and save
-        attendance.time_slot = new_slot
-        attendance.status = 'scheduled'
-        attendance.save()
         flash('Booking rescheduled successfully!', 'success')
         return redirect(url_for('member.attendance'))
 
@@ -866,3 +777,21 @@ def trainer_schedule_api(trainer_id):
     except Exception as e:
         current_app.logger.exception("Error fetching trainer schedule: %s", e)
         return jsonify({'error': 'Failed to fetch schedule'}), 500
+
+
+@member_routes_bp.route('/api/availability')
+@login_required
+@member_required
+def availability_api():
+    """Free/booked slot ids per trainer per day as one JSON grid (?start=YYYY-MM-DD&days=1..31&trainer_id=)"""
+    try:
+        start_raw = request.args.get('start')
+        start = datetime.strptime(start_raw, '%Y-%m-%d').date() if start_raw else date.today()
+        days = request.args.get('days', DEFAULT_DAYS, type=int)
+        trainer_id = request.args.get('trainer_id', type=int)
+        return jsonify(AvailabilityIndex.grid(start, days, trainer_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.exception("Error building availability grid: %s", e)
+        return jsonify({'error': 'Failed to load availability'}), 500
@@ -6,6 +6,7 @@ from app.models.workout import Workout
 from app.models.diet import Diet
 from app.models.progress import Progress
 from app.models.attendance import Attendance,_slot_to_datetimes
+from app.models.time_slot import slot_catalog
 from app.models.announcement import Announcement
 
 from app.utils.decorators import  login_required, trainer_required
@@ -27,7 +28,7 @@ trainer_routes_bp = Blueprint('trainer_routes', __name__,url_prefix='/trainer')
 def equipment_list():
     """View all equipment"""
     try:
-        equipment = Equipment.get_all()
+        equipment = Equipment.get_list_rows()
         return render_template('trainer/equipment_list.html', equipment=equipment)
     except Exception as e:
         flash(f"Error loading equipment list: {str(e)}", "danger")
@@ -133,8 +134,14 @@ def client_details(member_id):
         flash('Client not found or not assigned to you!')
         return redirect(url_for('trainer_routes.clients'))
     
-    # Get client's comprehensive data
-    attendance_records = Attendance.get_member_attendance(member_id, limit=10)
+    # Get client's comprehensive data; older attendance through ?cursor= (keyset on date, id)
+    cursor = request.args.get('cursor')
+    try:
+        attendance_page = Attendance.get_member_attendance_page(member_id, cursor, limit=10)
+    except ValueError:
+        return redirect(url_for('trainer_routes.client_details', member_id=member_id))
+    attendance_records = attendance_page.items
+    attendance_stats = Attendance.get_member_stats(member_id)
     progress_records = Progress.get_member_progress(member_id, limit=5)
     current_workout_plan = MemberWorkoutPlan.get_member_active_plan(member_id)
     current_diet_plan = Diet.get_member_active_plan(member_id)
@@ -143,6 +150,9 @@ def client_details(member_id):
                          member=member,
                           client=member, 
                          attendance_records=attendance_records,
+                         attendance_stats=attendance_stats,
+                         cursor=cursor,
+                         next_cursor=attendance_page.next_cursor,
                          progress_records=progress_records,
                          current_workout_plan=current_workout_plan,
                          current_diet_plan=current_diet_plan)
@@ -211,7 +221,7 @@ def create_workout_plan(member_id):
     
     # Get available workouts and equipment
     available_workouts = Workout.get_all_active()
-    available_equipment = [eq for eq in Equipment.get_all() if eq.is_working()]
+    available_equipment = Equipment.get_working()
     
     return render_template(
         'trainer/create_workout_plan.html',
@@ -236,7 +246,7 @@ def edit_workout_plan(plan_id):
     # Get plan details, workouts, equipment, and member info
     plan_details = WorkoutPlanDetail.get_plan_details(plan_id)
     available_workouts = Workout.get_all_active()
-    available_equipment = [eq for eq in Equipment.get_all() if eq.is_working()]
+    available_equipment = Equipment.get_working()
     member = Member.get_by_id(workout_plan.member_id)
     
     return render_template(
@@ -454,11 +464,15 @@ def mark_attendance(member_id):
             flash('No scheduled session found for this member at that date/slot. Trainers can only mark scheduled sessions.', 'warning')
             return redirect(url_for('trainer_routes.client_details', member_id=member_id))
 
-        # 2) Get slot datetimes
-        start_iso, end_iso = _slot_to_datetimes(existing.time_slot, on_date=existing.date)
+        # 2) Get slot datetimes (catalog minutes; free-text labels are parsed)
+        slot = slot_catalog().get(existing.time_slot_id)
+        if slot:
+            start_dt, end_dt = slot.starts_at(existing.date), slot.ends_at(existing.date)
+        else:
+            start_iso, end_iso = _slot_to_datetimes(existing.time_slot, on_date=existing.date)
+            start_dt = datetime.fromisoformat(start_iso) if start_iso else None
+            end_dt = datetime.fromisoformat(end_iso) if end_iso else None
         now = datetime.now()
-        start_dt = datetime.fromisoformat(start_iso) if start_iso else None
-        end_dt = datetime.fromisoformat(end_iso) if end_iso else None
 
         # Check trainer is marking during scheduled slot
         if not (start_dt and end_dt and start_dt <= now <= end_dt):
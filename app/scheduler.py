@@ -0,0 +1,215 @@
+"""Periodic background jobs.
+
+Jobs are registered with ``@job(name, interval_seconds)``. They can run in two ways:
+
+    flask --app app.app run-jobs            run every due job once (for cron)
+    SCHEDULER_ENABLED=1                     a daemon thread in each web worker checks every
+                                            SCHEDULER_TICK_SECONDS (default 60)
+
+Either way a job runs at most once per interval across all processes. The
+``job_locks`` row is a lease: the worker that takes it runs the job, the others
+skip. A lease whose holder died expires after ``lease_seconds``. Every run is
+recorded in ``job_runs`` with its duration, row count and error, if any. The
+last successful run there decides when the job is next due.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.models.attendance import RECONCILE_BATCH, Attendance, fill_slot_end_times
+from app.models.database import execute_query, transaction
+from app.models.payment import Payment
+
+DEFAULT_TICK_SECONDS = 60
+
+JOBS = {}
+
+
+class Job:
+    __slots__ = ('name', 'func', 'interval', 'lease_seconds')
+
+    def __init__(self, name, func, interval, lease_seconds=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.lease_seconds = lease_seconds or max(interval, 300)
+
+
+def job(name, interval, lease_seconds=None):
+    """Register ``func`` to run every ``interval`` seconds.
+
+    The function returns the number of rows it handled, or a dict with a
+    ``rows`` key plus any details worth keeping in job_runs.
+    """
+    def decorator(func):
+        JOBS[name] = Job(name, func, interval, lease_seconds)
+        return func
+    return decorator
+
+
+def _db_path():
+    return current_app.config.get('DATABASE_PATH', 'gym_management.db')
+
+
+def _owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lock(name, owner, lease_seconds, db_path):
+    """Take the lease on ``name`` unless another owner holds an unexpired one"""
+    now = datetime.now()
+    with transaction(db_path):
+        execute_query('''
+            INSERT INTO job_locks (name, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE job_locks.expires_at < ?
+        ''', (name, owner, (now + timedelta(seconds=lease_seconds)).isoformat(), now.isoformat()), db_path)
+        row = execute_query('SELECT owner FROM job_locks WHERE name = ?', (name,), db_path, fetch=True)
+    return bool(row) and row[0][0] == owner
+
+
+def release_lock(name, owner, db_path):
+    execute_query('DELETE FROM job_locks WHERE name = ? AND owner = ?', (name, owner), db_path)
+
+
+def last_success(name, db_path):
+    """Start time of the last successful run of ``name`` (None if it never succeeded)"""
+    row = execute_query(
+        "SELECT MAX(started_at) FROM job_runs WHERE job_name = ? AND status = 'success'",
+        (name,), db_path, fetch=True
+    )
+    return datetime.fromisoformat(row[0][0]) if row and row[0][0] else None
+
+
+def is_due(job_, db_path, now=None):
+    last = last_success(job_.name, db_path)
+    return last is None or (now or datetime.now()) - last >= timedelta(seconds=job_.interval)
+
+
+def run_job(job_, db_path, force=False):
+    """Run one job under its lease.
+
+    Returns the job_runs id, or None when the job was not due or another worker
+    holds the lease.
+    """
+    owner = _owner_id()
+    if not acquire_lock(job_.name, owner, job_.lease_seconds, db_path):
+        return None
+    try:
+        # Checked under the lease so two workers cannot both find the job due
+        if not force and not is_due(job_, db_path):
+            return None
+        started_at = datetime.now()
+        run_id = execute_query(
+            "INSERT INTO job_runs (job_name, owner, started_at, status) VALUES (?, ?, ?, 'running')",
+            (job_.name, owner, started_at.isoformat()), db_path
+        )
+        started = time.perf_counter()
+        status, rows, details, error = 'success', 0, None, None
+        try:
+            result = job_.func()
+            if isinstance(result, dict):
+                rows = result.get('rows', 0)
+                details = json.dumps(result, default=str)
+            else:
+                rows = result or 0
+        except Exception as e:
+            status, error = 'failed', str(e)
+            current_app.logger.exception(f"Job {job_.name} failed: {e}")
+        execute_query(
+            '''UPDATE job_runs SET finished_at = ?, duration_ms = ?, status = ?,
+                                   rows_affected = ?, details = ?, error = ?
+               WHERE id = ?''',
+            (datetime.now().isoformat(), round((time.perf_counter() - started) * 1000, 1),
+             status, rows, details, error, run_id), db_path
+        )
+        return run_id
+    finally:
+        release_lock(job_.name, owner, db_path)
+
+
+def run_due_jobs(names=None, force=False):
+    """Run every registered job (or those in ``names``) that is due. Returns {name: run id or None}."""
+    db_path = _db_path()
+    results = {}
+    for name, job_ in JOBS.items():
+        if names and name not in names:
+            continue
+        try:
+            results[name] = run_job(job_, db_path, force=force)
+        except Exception as e:
+            current_app.logger.exception(f"Could not run job {name}: {e}")
+            results[name] = None
+    return results
+
+
+def recent_runs(limit=20, db_path=None):
+    """Latest job_runs rows, newest first"""
+    return execute_query(
+        '''SELECT id, job_name, owner, started_at, finished_at, duration_ms, status, rows_affected, details, error
+           FROM job_runs ORDER BY id DESC LIMIT ?''',
+        (limit,), db_path or _db_path(), fetch=True
+    ) or []
+
+
+class SchedulerThread(threading.Thread):
+    """Daemon thread that calls run_due_jobs every ``tick`` seconds inside an app context"""
+
+    def __init__(self, app, tick):
+        super().__init__(name='fitzone-scheduler', daemon=True)
+        self.app = app
+        self.tick = tick
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.tick):
+            with self.app.app_context():
+                run_due_jobs()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def init_app(app):
+    app.config.setdefault('SCHEDULER_ENABLED', False)
+    app.config.setdefault('SCHEDULER_TICK_SECONDS', DEFAULT_TICK_SECONDS)
+    if app.config['SCHEDULER_ENABLED'] and not app.config.get('TESTING'):
+        app.scheduler = SchedulerThread(app, app.config['SCHEDULER_TICK_SECONDS'])
+        app.scheduler.start()
+
+
+# ----------------- Jobs -----------------
+
+@job('process_pending_payments', interval=3600)
+def process_pending_payments():
+    """Payment reminders and cancellation of overdue invoices (formerly run on every dashboard load)"""
+    result = Payment.process_pending_payments(reminder_before_days=5)
+    reminders, cancellations = result['reminders_sent'], result['cancellations_done']
+    return {
+        'rows': len(reminders) + len(cancellations),
+        'reminders_sent': len(reminders),
+        'cancellations_done': len(cancellations),
+    }
+
+
+@job('reconcile_attendance', interval=300)
+def reconcile_attendance():
+    """Mark sessions that ended since the watermark as absent (formerly run on the member attendance page)"""
+    filled = fill_slot_end_times(_db_path())
+    marked = batch = Attendance.reconcile_expired()
+    while batch >= RECONCILE_BATCH:
+        batch = Attendance.reconcile_expired()
+        marked += batch
+    return {'rows': marked, 'marked_absent': marked, 'slot_end_filled': filled}
+
+
+@job('sweep_absent', interval=3600)
+def sweep_absent():
+    """Full auto-absent sweep; catches sessions booked behind the reconciler's watermark"""
+    return Attendance.auto_mark_absent()
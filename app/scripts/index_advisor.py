@@ -0,0 +1,227 @@
+# scripts/index_advisor.py
+"""Report full-table scans in the SQL issued by the models and routes.
+
+Every string literal in app/models and app/routes that looks like a SQL
+statement is run through EXPLAIN QUERY PLAN against a real database (only the
+plan is computed, nothing is executed). f-string interpolations of
+module-level string constants are substituted; other interpolations are tried
+as a select list, an empty clause and a parameter list. Plans that contain a
+bare ``SCAN <table>`` step - i.e. a scan not satisfied by an index - are
+reported.
+
+Usage:
+    python app/scripts/index_advisor.py [gym_management.db] [--ignore TABLE ...]
+
+Exits with status 1 when any full scans are found, so it can gate CI.
+"""
+import argparse
+import ast
+import itertools
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_SOURCES = [APP_DIR / 'models', APP_DIR / 'routes']
+
+# Upper-case keywords only, so flash messages like "Update status..." are skipped
+SQL_START = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s')
+# Small, admin-maintained catalog tables where a scan is cheaper than an index
+DEFAULT_IGNORED_TABLES = {
+    'sqlite_master', 'membership_plans', 'equipment', 'announcements', 'workouts',
+}
+
+
+# Stand-ins tried, in order, for an interpolated part that cannot be resolved
+# statically: a select list, an optional clause, a parameter list
+FILLERS = ('*', '', '?')
+FORMAT_FIELD = re.compile(r'\{(\w*)\}')
+
+
+def _module_constants(tree):
+    """{name: str} for module-level assignments that evaluate to a string statically"""
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            value = _static_str(node.value, constants)
+            if value is not None:
+                constants[node.targets[0].id] = value
+    return constants
+
+
+def _static_str(node, constants):
+    """The string (or int) ``node`` evaluates to using only literals and ``constants``, else None"""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, (str, int)) else None
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.JoinedStr):
+        parts = [_static_str(v, constants) for v in node.values]
+        return None if None in parts else ''.join(str(p) for p in parts)
+    if isinstance(node, ast.FormattedValue):
+        return None if node.format_spec else _static_str(node.value, constants)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _static_str(node.left, constants), _static_str(node.right, constants)
+        return left + right if isinstance(left, str) and isinstance(right, str) else None
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format'
+            and not node.args and all(k.arg for k in node.keywords)):
+        template = _static_str(node.func.value, constants)
+        kwargs = {k.arg: _static_str(k.value, constants) for k in node.keywords}
+        if isinstance(template, str) and None not in kwargs.values():
+            return template.format(**kwargs)
+    return None
+
+
+def _sql_variants(node, constants):
+    """
+    Candidate SQL texts for a string literal. Interpolations of module-level
+    constants are substituted; anything else (locals, attributes, str.format
+    fields) is tried with each of FILLERS in turn.
+    """
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for v in node.values:
+            text = _static_str(v, constants)
+            parts.append(str(text) if text is not None else None)
+    else:
+        parts = []
+        pos = 0
+        for match in FORMAT_FIELD.finditer(node.value):
+            parts += [node.value[pos:match.start()], None]
+            pos = match.end()
+        parts.append(node.value[pos:])
+    choices = []
+    for before, part in zip([''] + parts, parts):
+        if part is None:
+            # "IN ()" is valid SQLite, so a hole in parentheses tries a parameter list first
+            in_parens = (before or '').rstrip().endswith('(')
+            choices.append(('?', '*', '') if in_parens else FILLERS)
+    variants = []
+    for fill in itertools.product(*choices):
+        fill = iter(fill)
+        variants.append(''.join(p if p is not None else next(fill) for p in parts).strip())
+    return variants
+
+
+def _sql_literals(path):
+    """Yield (lineno, function name, [candidate sql, ...]) for SQL-looking string literals in a file"""
+    tree = ast.parse(Path(path).read_text(), filename=str(path))
+    constants = _module_constants(tree)
+    scopes = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for child in ast.walk(node):
+                scopes.setdefault(id(child), node.name)
+
+    fstring_parts = {id(v) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for v in node.values}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if id(node) in fstring_parts:
+                continue
+        elif not isinstance(node, ast.JoinedStr):
+            continue
+        variants = _sql_variants(node, constants)
+        if SQL_START.match(variants[0]):
+            yield node.lineno, scopes.get(id(node), '<module>'), variants
+
+
+def find_sql_strings(path):
+    """Yield (lineno, function name, sql) for SQL-looking string literals in a file"""
+    for lineno, func, variants in _sql_literals(path):
+        yield lineno, func, variants[0]
+
+
+def explain(conn, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for ``sql``"""
+    params = [None] * sql.count('?')
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def _plan_first(conn, variants):
+    """(plan, sql, None) for the first variant that plans, else (None, None, first error)"""
+    first_error = None
+    for sql in variants:
+        try:
+            return explain(conn, sql), sql, None
+        except sqlite3.Error as e:
+            first_error = first_error or str(e)
+    return None, None, first_error
+
+
+def full_scans(plan):
+    """Tables scanned without an index in a query plan"""
+    tables = []
+    for detail in plan:
+        match = re.match(r'SCAN (\w+)(?: AS \w+)?$', detail.strip())
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def _display_path(path):
+    try:
+        return path.resolve().relative_to(APP_DIR.parent)
+    except ValueError:
+        return path
+
+
+def analyse(db_path, sources=None, ignored_tables=DEFAULT_IGNORED_TABLES):
+    """Return (scans, errors) for every SQL literal under ``sources``.
+
+    scans:  list of (location, tables, sql)
+    errors: list of (location, message) for statements that could not be planned
+            (e.g. referencing tables that no longer exist)
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    scans, errors = [], []
+    try:
+        for source in sources or DEFAULT_SOURCES:
+            files = sorted(Path(source).glob('*.py')) if Path(source).is_dir() else [Path(source)]
+            for path in files:
+                for lineno, func, variants in _sql_literals(path):
+                    location = f"{_display_path(path)}:{lineno} ({func})"
+                    plan, sql, error = _plan_first(conn, variants)
+                    if plan is None:
+                        errors.append((location, error))
+                        continue
+                    # Plans name tables by alias when one is used; map back to table names
+                    aliases = dict(re.findall(r'\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)', sql, re.IGNORECASE))
+                    by_alias = {alias: table for table, alias in aliases.items()}
+                    tables = [by_alias.get(t, t) for t in full_scans(plan)]
+                    tables = [t for t in tables if t not in ignored_tables]
+                    if tables:
+                        scans.append((location, tables, sql))
+    finally:
+        conn.close()
+    return scans, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('db_path', nargs='?', default='gym_management.db')
+    parser.add_argument('--ignore', nargs='*', default=sorted(DEFAULT_IGNORED_TABLES),
+                        help='tables whose scans are acceptable')
+    parser.add_argument('--show-errors', action='store_true',
+                        help='also list statements that could not be planned')
+    args = parser.parse_args(argv)
+
+    if not Path(args.db_path).exists():
+        print(f"ERROR: Database not found at {Path(args.db_path).resolve()}")
+        return 2
+
+    scans, errors = analyse(args.db_path, ignored_tables=set(args.ignore))
+    for location, tables, sql in scans:
+        snippet = ' '.join(sql.split())[:120]
+        print(f"FULL SCAN {', '.join(tables)}  {location}\n    {snippet}")
+    if args.show_errors:
+        for location, message in errors:
+            print(f"SKIPPED  {location}: {message}")
+
+    print(f"\n{len(scans)} statement(s) with full-table scans, {len(errors)} could not be planned.")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,22 +15,24 @@ def send_email(to_email, subject, body, html_body=None):
         mail.send(msg)
         
         # Log email
-        from models.database import execute_query
+        from app.models.database import execute_query
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         execute_query(
             '''INSERT INTO email_logs (recipient_email, subject, body, status, sent_at)
                VALUES (?, ?, ?, ?, ?)''',
-            (to_email, subject, body, 'sent', datetime.now())
+            (to_email, subject, body, 'sent', datetime.now()),
+            db_path
         )
         return True
     except Exception as e:
         # Log error
-        from models.database import execute_query
+        from app.models.database import execute_query
         db_path = current_app.config.get('DATABASE_PATH', 'gym_management.db')
         execute_query(
             '''INSERT INTO email_logs (recipient_email, subject, body, status, error_message)
                VALUES (?, ?, ?, ?, ?)''',
-            (to_email, subject, body, 'failed', str(e))
+            (to_email, subject, body, 'failed', str(e)),
+            db_path
         )
         return False
 
@@ -0,0 +1,58 @@
+"""Streaming writers for the admin exports (see app/models/exports.py).
+
+``csv_stream`` yields the CSV text in batches as rows arrive. ``xlsx_stream``
+needs the optional openpyxl package. It builds the workbook in write-only
+mode (rows go to a temp file, not memory) and then streams the saved file.
+"""
+import csv
+import io
+import tempfile
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _safe(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(header, rows, batch_size=500):
+    """Yield CSV text for ``header`` + ``rows``, ``batch_size`` rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_safe(value) for value in row])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def xlsx_available():
+    return Workbook is not None
+
+
+def xlsx_stream(header, rows, title='Export', chunk_size=64 * 1024):
+    """Yield the bytes of an .xlsx file containing ``header`` + ``rows``"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([_safe(value) for value in row])
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
@@ -1,4 +1,4 @@
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 import re
 
 def calculate_expiry_date(membership_date, months=1):
@@ -92,3 +92,41 @@ def get_bmi_category(bmi):
         return "Overweight"
     else:
         return "Obese"
+
+
+# ---- Date ranges for SQL filters ----
+# Date columns are stored as ISO 'YYYY-MM-DD' text, which sorts chronologically.
+# Filtering with `col >= start AND col < end` lets SQLite use an index on the
+# column; wrapping it in DATE()/strftime() forces a full scan.
+
+def to_iso_date(value):
+    """Normalize a date, datetime or ISO string to 'YYYY-MM-DD' (None stays None)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        return text
+
+
+def month_bounds(year, month):
+    """Half-open ISO range [first of month, first of next month)"""
+    start = date(int(year), int(month), 1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def year_bounds(year):
+    """Half-open ISO range [Jan 1, Jan 1 of next year)"""
+    return date(int(year), 1, 1).isoformat(), date(int(year) + 1, 1, 1).isoformat()
+
+
+def days_from_today(days, today=None):
+    """Half-open ISO range covering today and the next ``days`` days"""
+    today = today or date.today()
+    return today.isoformat(), (today + timedelta(days=int(days) + 1)).isoformat()
@@ -0,0 +1,77 @@
+"""Keyset (cursor) pagination for newest-first history lists.
+
+A page is read with ``WHERE (sort_key, id) < (last_sort_key, last_id) ORDER BY
+sort_key DESC, id DESC LIMIT n + 1``. It does not use OFFSET, so page N seeks
+straight to its first row through an index on (..., sort_key) and costs the
+same as page 1. SQLite appends the rowid to every index, so that index also
+orders the id tiebreak. The extra row only tells whether another page exists.
+
+The cursor handed to the client is the last row's (sort_key, id) as
+URL-safe base64 JSON. It is opaque to the client and never trusted beyond
+being two values to compare against.
+"""
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class Page:
+    """One page of ``items`` plus the cursor for the next (older) page, None on the last one"""
+    __slots__ = ('items', 'next_cursor')
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(sort_key, row_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_key, row_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(sort_key, id) from a cursor, or None for no cursor; ValueError if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid page cursor")
+    if not isinstance(sort_key, str) or not isinstance(row_id, int):
+        raise ValueError("Invalid page cursor")
+    return sort_key, row_id
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """A requested page size clamped to 1..MAX_PAGE_SIZE (``default`` when missing)"""
+    if value is None:
+        return default
+    return max(1, min(int(value), MAX_PAGE_SIZE))
+
+
+def keyset_filter(sort_column, id_column, cursor):
+    """(``AND ...`` clause, params) selecting rows after ``cursor``; empty for the first page"""
+    after = decode_cursor(cursor)
+    if after is None:
+        return '', ()
+    return f"AND ({sort_column}, {id_column}) < (?, ?)", after
+
+
+def build_page(items, limit, key):
+    """Page from up to ``limit + 1`` fetched ``items``; ``key(item)`` gives its (sort_key, id)"""
+    if len(items) <= limit:
+        return Page(items)
+    items = items[:limit]
+    return Page(items, encode_cursor(*key(items[-1])))
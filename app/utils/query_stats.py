@@ -0,0 +1,149 @@
+"""Per-request query instrumentation for execute_query.
+
+Every query run inside an app context is counted and timed on ``flask.g``.
+When the request finishes the totals are folded into process-wide per-route
+aggregates, which the admin ``/admin/_perf`` page displays.
+
+Config keys:
+    QUERY_STATS_ENABLED   turn instrumentation off entirely (default True)
+    SLOW_QUERY_MS         log queries slower than this, with SQL, params and caller (default 200)
+    N_PLUS_ONE_THRESHOLD  flag a request that runs the same SQL this many times (default 5)
+"""
+import sys
+import threading
+from collections import Counter
+
+from flask import current_app, g, has_app_context, has_request_context, request
+
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+# Frames from these modules are skipped when looking for the calling model method
+_INTERNAL_MODULES = ('app.models.database', 'app.utils.query_stats', 'sqlite3')
+
+_route_stats = {}
+_route_lock = threading.Lock()
+
+
+class RouteStats:
+    """Aggregated query statistics for one endpoint"""
+
+    __slots__ = ('endpoint', 'requests', 'queries', 'db_time', 'max_queries', 'n_plus_one')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.requests = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.max_queries = 0
+        self.n_plus_one = Counter()  # "caller: sql" -> number of requests it was seen in
+
+    @property
+    def avg_queries(self):
+        return self.queries / self.requests if self.requests else 0
+
+    @property
+    def avg_db_ms(self):
+        return self.db_time * 1000 / self.requests if self.requests else 0
+
+
+def _compact(query):
+    return ' '.join(query.split())
+
+
+def find_caller():
+    """Qualified name and location of the first frame outside the DB layer"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(_INTERNAL_MODULES):
+            code = frame.f_code
+            return f"{code.co_qualname} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})"
+        frame = frame.f_back
+    return '<unknown>'
+
+
+def _request_stats():
+    stats = g.get('_query_stats')
+    if stats is None:
+        stats = g._query_stats = {'count': 0, 'time': 0.0, 'by_sql': Counter(), 'n_plus_one': {}}
+    return stats
+
+
+def record_query(query, params, elapsed):
+    """Account one execute_query call (``elapsed`` in seconds)"""
+    if not has_app_context():
+        return
+    config = current_app.config
+    if not config.get('QUERY_STATS_ENABLED', True):
+        return
+
+    stats = _request_stats()
+    stats['count'] += 1
+    stats['time'] += elapsed
+
+    by_sql = stats['by_sql']
+    by_sql[query] += 1
+    if by_sql[query] == config.get('N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD):
+        stats['n_plus_one'][query] = find_caller()
+
+    slow_ms = config.get('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        current_app.logger.warning(
+            "Slow query %.1f ms in %s | Query: %s | Params: %r",
+            elapsed * 1000, find_caller(), _compact(query), params
+        )
+
+
+def finish_request(exception=None):
+    """teardown_request hook: fold this request's numbers into the route aggregates"""
+    stats = g.pop('_query_stats', None)
+    if not stats or not has_request_context():
+        return
+    endpoint = request.endpoint or request.path
+
+    for query, caller in stats['n_plus_one'].items():
+        current_app.logger.warning(
+            "Possible N+1 in %s: %s ran %d times from %s",
+            endpoint, _compact(query)[:200], stats['by_sql'][query], caller
+        )
+
+    with _route_lock:
+        route = _route_stats.get(endpoint)
+        if route is None:
+            route = _route_stats[endpoint] = RouteStats(endpoint)
+        route.requests += 1
+        route.queries += stats['count']
+        route.db_time += stats['time']
+        route.max_queries = max(route.max_queries, stats['count'])
+        for query, caller in stats['n_plus_one'].items():
+            route.n_plus_one[f"{caller}: {_compact(query)[:160]}"] += 1
+
+
+def add_server_timing(response):
+    """after_request hook: expose the request's DB cost to browser dev tools"""
+    stats = g.get('_query_stats')
+    if stats:
+        response.headers['Server-Timing'] = f"db;desc=\"{stats['count']} queries\";dur={stats['time'] * 1000:.1f}"
+    return response
+
+
+def top_routes(sort='queries', limit=20):
+    """Route aggregates sorted by total query count (``queries``) or DB time (``db_time``)"""
+    with _route_lock:
+        routes = list(_route_stats.values())
+    key = (lambda r: r.db_time) if sort == 'db_time' else (lambda r: r.queries)
+    return sorted(routes, key=key, reverse=True)[:limit]
+
+
+def reset():
+    with _route_lock:
+        _route_stats.clear()
+
+
+def init_app(app):
+    app.config.setdefault('QUERY_STATS_ENABLED', True)
+    app.config.setdefault('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+    app.after_request(add_server_timing)
+    app.teardown_request(finish_request)
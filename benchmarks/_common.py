@@ -0,0 +1,49 @@
+"""Shared helpers for the benchmark scripts.
+
+Each benchmark builds a throwaway database in a temp directory, so they can be
+run from the repository root without touching ``gym_management.db``:
+
+    python benchmarks/bench_connection_pool.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def temp_db_path(name='bench.db'):
+    """Path to a fresh database file inside a new temp directory"""
+    return os.path.join(tempfile.mkdtemp(prefix='fitzone-bench-'), name)
+
+
+def make_app(db_path, seed=True, **config):
+    """Create the real application against ``db_path`` (with demo data) and config overrides"""
+    os.environ['DATABASE_PATH'] = db_path
+    from app.app import create_app
+    from app.models.database import seed_db
+    app = create_app()
+    app.config.update(TESTING=True, **config)
+    if seed:
+        with app.app_context():
+            seed_db(db_path)
+    return app
+
+
+def timed(fn, repeat=1):
+    """Run ``fn`` ``repeat`` times and return total seconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - start
+
+
+def report(label, seconds, calls=None):
+    if calls:
+        print(f"{label:<48} {seconds * 1000:9.1f} ms total  {seconds / calls * 1e6:9.1f} us/call")
+    else:
+        print(f"{label:<48} {seconds * 1000:9.1f} ms")
@@ -0,0 +1,97 @@
+"""auto_mark_absent at 100k scheduled sessions: per-row parsing vs slot_end_at.
+
+Seeds 100k 'scheduled' sessions over +/- 30 days (about half already over)
+and times:
+  - the old sweep: load every scheduled row, build an Attendance, parse the
+    slot label, then UPDATE the expired ids in one executemany
+  - Attendance.auto_mark_absent: one UPDATE on the partial
+    idx_attendance_scheduled_end index
+  - a second sweep with nothing left to mark (what a periodic run costs)
+  - Attendance.reconcile_expired in RECONCILE_BATCH chunks from an empty
+    watermark, and the no-op probe the member attendance page runs
+Statuses are reset between runs outside the timed section.
+"""
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.attendance import RECONCILE_BATCH, Attendance, _slot_to_datetimes, slot_end_at
+from app.models.database import execute_many, execute_query
+
+SESSIONS = 100_000
+REPEAT = 3
+SLOTS = ('6:00 AM - 8:00 AM', '8:00 AM - 10:00 AM', '4:00 PM - 6:00 PM', '6:00 PM - 8:00 PM')
+
+
+def seed(db_path):
+    rng = random.Random(17)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    member_id, trainer_id = conn.execute("SELECT id, trainer_id FROM members LIMIT 1").fetchone()
+    rows = []
+    for _ in range(SESSIONS):
+        day = today + timedelta(days=rng.randrange(-30, 30))
+        slot = rng.choice(SLOTS)
+        rows.append((member_id, trainer_id, day.isoformat(), slot, slot_end_at(slot, day)))
+    conn.executemany("INSERT INTO attendance (member_id, trainer_id, date, time_slot, status, slot_end_at) "
+                     "VALUES (?, ?, ?, ?, 'scheduled', ?)", rows)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def legacy_sweep(db_path):
+    rows = execute_query("SELECT * FROM attendance WHERE status = 'scheduled'", (), db_path, fetch=True)
+    now = datetime.now()
+    expired_ids = []
+    for r in rows:
+        att = Attendance._from_attendance_row(r)
+        if not att or not att.date:
+            continue
+        _, end_iso = _slot_to_datetimes(att.time_slot, on_date=att.date)
+        if att.date < date.today() or (end_iso and now > datetime.fromisoformat(end_iso)):
+            expired_ids.append((att.id,))
+    return execute_many("UPDATE attendance SET status = 'absent' WHERE id = ? AND status = 'scheduled'",
+                        expired_ids, db_path)
+
+
+def reset(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE attendance SET status = 'scheduled' WHERE time_slot IN (%s)" % ",".join("?" * len(SLOTS)),
+                 SLOTS)
+    conn.execute("DELETE FROM watermarks")
+    conn.commit()
+    conn.close()
+
+
+def drain():
+    marked = batch = Attendance.reconcile_expired()
+    while batch >= RECONCILE_BATCH:
+        batch = Attendance.reconcile_expired()
+        marked += batch
+    return marked
+
+
+def main():
+    db_path = temp_db_path()
+    app = make_app(db_path, SLOW_QUERY_MS=None)
+    seed(db_path)
+    with app.app_context():
+        for label, sweep in (("legacy: parse every scheduled row", lambda: legacy_sweep(db_path)),
+                             ("auto_mark_absent (slot_end_at UPDATE)", Attendance.auto_mark_absent),
+                             ("reconcile_expired, drained in batches", drain)):
+            total, marked = 0.0, 0
+            for _ in range(REPEAT):
+                reset(db_path)
+                result = []
+                total += timed(lambda: result.append(sweep()))
+                marked = result[0]
+            report(f"{label} [{marked:,} marked]", total, REPEAT)
+        report("auto_mark_absent, nothing due", timed(Attendance.auto_mark_absent, REPEAT * 10), REPEAT * 10)
+        report("reconcile_expired, nothing due", timed(Attendance.reconcile_expired, REPEAT * 100), REPEAT * 100)
+
+
+if __name__ == "__main__":
+    main()
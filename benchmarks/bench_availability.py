@@ -0,0 +1,97 @@
+"""Availability for a booking grid: one query per (trainer, day, slot) vs the index.
+
+Adds 30 trainers and 60k booked sessions over the next 60 days, then times
+the availability of every default slot for every active trainer, for a week
+and for a month:
+  - the old way: one COUNT query per trainer, day and slot, as
+    check_slot_availability used to run
+  - AvailabilityIndex.grid on a cold index (one bookings query for the range)
+  - AvailabilityIndex.grid on a warm index (one data_versions read)
+  - check_slot_availability for a single slot, cold and warm
+The index is dropped before each cold run.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.attendance import Attendance
+from app.models.availability import AvailabilityIndex
+from app.models.database import execute_query
+from app.models.time_slot import slot_catalog
+
+TRAINERS = 30
+SESSIONS = 60_000
+REPEAT = 5
+
+LEGACY_CHECK = "SELECT COUNT(*) FROM attendance WHERE trainer_id = ? AND time_slot = ? AND date = ?"
+
+
+def seed(db_path):
+    rng = random.Random(11)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    for i in range(TRAINERS):
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash, role, full_name) VALUES (?, ?, 'x', 'trainer', ?)",
+            (f"bench_trainer_{i}", f"bench_trainer_{i}@example.com", f"Bench Trainer {i}")).lastrowid
+        conn.execute("INSERT INTO trainers (user_id, phone, status) VALUES (?, '0', 'active')", (user_id,))
+    trainer_ids = [r[0] for r in conn.execute("SELECT id FROM trainers WHERE status = 'active'")]
+    member_id = conn.execute("SELECT id FROM members LIMIT 1").fetchone()[0]
+    # Room for several members per trainer slot, so random bookings stay under capacity
+    conn.execute("UPDATE time_slots SET capacity = 8")
+    slots = conn.execute("SELECT id, label FROM time_slots").fetchall()
+    rows = []
+    for _ in range(SESSIONS):
+        slot_id, label = rng.choice(slots)
+        day = today + timedelta(days=rng.randrange(60))
+        rows.append((member_id, rng.choice(trainer_ids), day.isoformat(), label, slot_id))
+    conn.executemany("INSERT INTO attendance (member_id, trainer_id, date, time_slot, time_slot_id, status) "
+                     "VALUES (?, ?, ?, ?, ?, 'scheduled')", rows)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return trainer_ids
+
+
+def legacy_grid(db_path, trainer_ids, start, days):
+    labels = [slot.label for slot in slot_catalog(db_path).for_trainer_day()]
+    free = 0
+    for trainer_id in trainer_ids:
+        for i in range(days):
+            day = (start + timedelta(days=i)).isoformat()
+            for label in labels:
+                free += execute_query(LEGACY_CHECK, (trainer_id, label, day), db_path, fetch=True)[0][0] == 0
+    return free
+
+
+def cold(fn):
+    def run():
+        AvailabilityIndex.invalidate()
+        fn()
+    return run
+
+
+def main():
+    db_path = temp_db_path()
+    app = make_app(db_path, SLOW_QUERY_MS=None)
+    trainer_ids = seed(db_path)
+    start = date.today() + timedelta(days=1)
+    with app.app_context():
+        slot = slot_catalog(db_path).resolve("6:00 PM - 8:00 PM")
+        for days in (7, 31):
+            calls = len(trainer_ids) * days * 8
+            report(f"legacy: {calls:,} COUNT queries ({days} days)",
+                   timed(lambda: legacy_grid(db_path, trainer_ids, start, days), REPEAT), REPEAT)
+            report(f"grid, cold index ({days} days)", timed(cold(lambda: AvailabilityIndex.grid(start, days)), REPEAT),
+                   REPEAT)
+            report(f"grid, warm index ({days} days)", timed(lambda: AvailabilityIndex.grid(start, days), REPEAT),
+                   REPEAT)
+        check = lambda: Attendance.check_slot_availability(trainer_ids[0], slot, start)  # noqa: E731
+        report("check_slot_availability, cold index", timed(cold(check), REPEAT * 20), REPEAT * 20)
+        report("check_slot_availability, warm index", timed(check, REPEAT * 200), REPEAT * 200)
+
+
+if __name__ == "__main__":
+    main()
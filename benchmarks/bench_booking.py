@@ -0,0 +1,97 @@
+"""Bookings per second through BookingEngine, from 1 to 16 threads.
+
+Adds 400 members split over the active trainers, then has every member book
+one session a day for the next 10 days. Each thread takes a share of the
+members. The default slots are given a capacity of 8; once a trainer's day is
+full the remaining attempts come back as slot_full conflicts, which cost a
+transaction too and count as attempts. Uses the
+production connection profile (WAL plus busy_timeout), as a multi-worker
+deployment would.
+
+Then books a 12-week, three-times-a-week plan (36 sessions) for 20 members,
+once as 36 BookingEngine.book calls each and once as one book_recurring call.
+"""
+import os
+import random
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.booking import BookingEngine
+from app.models.database import close_pools
+
+MEMBERS = 400
+DAYS = 10
+
+
+def seed(db_path):
+    conn = sqlite3.connect(db_path)
+    trainer_ids = [r[0] for r in conn.execute("SELECT id FROM trainers WHERE status = 'active'")]
+    members = []
+    for i in range(MEMBERS):
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash, role, full_name) VALUES (?, ?, 'x', 'member', ?)",
+            (f"bench_member_{i}", f"bench_member_{i}@example.com", f"Bench Member {i}")).lastrowid
+        trainer_id = trainer_ids[i % len(trainer_ids)]
+        member_id = conn.execute(
+            "INSERT INTO members (user_id, phone, status, membership_start_date, membership_end_date, trainer_id) "
+            "VALUES (?, '0', 'active', DATE('now'), DATE('now', '+1 year'), ?)", (user_id, trainer_id)).lastrowid
+        members.append((member_id, trainer_id))
+    conn.execute("UPDATE time_slots SET capacity = 8")
+    slot_ids = [r[0] for r in conn.execute("SELECT id FROM time_slots WHERE trainer_id IS NULL AND weekday IS NULL")]
+    conn.commit()
+    conn.close()
+    return members, slot_ids
+
+
+def run(app, members, slot_ids, threads, first_day):
+    rng = random.Random(threads)
+    work = [(member_id, trainer_id, rng.choice(slot_ids), first_day + timedelta(days=d))
+            for member_id, trainer_id in members for d in range(DAYS)]
+    outcomes = []
+
+    def worker(chunk):
+        with app.app_context():
+            outcomes.extend(BookingEngine.book(*args).ok for args in chunk)
+
+    pool = [threading.Thread(target=worker, args=(work[i::threads],)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return outcomes
+
+
+def main():
+    db_path = temp_db_path()
+    os.environ['DB_PROFILE'] = 'production'
+    app = make_app(db_path, SLOW_QUERY_MS=None)
+    members, slot_ids = seed(db_path)
+    attempts = MEMBERS * DAYS
+    for n, threads in enumerate((1, 4, 16)):
+        # Each round books its own block of days
+        first_day = date.today() + timedelta(days=1 + n * DAYS)
+        outcomes = []
+        seconds = timed(lambda: outcomes.extend(run(app, members, slot_ids, threads, first_day)))
+        report(f"{threads:>2} threads: {sum(outcomes):,} booked of {attempts:,}", seconds, attempts)
+        print(f"{'':<48} {attempts / seconds:9.0f} attempts/s")
+
+    # Each round books its own 12 weeks for its own members
+    plans = members[:40]
+    first_day = date.today() + timedelta(days=1 + 3 * DAYS)
+    monday = first_day + timedelta(days=-first_day.weekday() % 7)
+    days = [monday + timedelta(weeks=w, days=d) for w in range(12) for d in (0, 2, 4)]
+    with app.app_context():
+        report("12-week plan: 36 x book", timed(lambda: [
+            BookingEngine.book(member_id, trainer_id, slot_ids[0], day)
+            for member_id, trainer_id in plans[:20] for day in days]), 20)
+        report("12-week plan: one book_recurring", timed(lambda: [
+            BookingEngine.book_recurring(member_id, trainer_id, slot_ids[1], [0, 2, 4], days[0], days[-1])
+            for member_id, trainer_id in plans[20:]]), 20)
+    close_pools()
+
+
+if __name__ == "__main__":
+    main()
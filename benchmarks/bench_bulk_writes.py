@@ -0,0 +1,56 @@
+"""Nightly batch jobs at scale: auto_mark_absent and process_pending_payments.
+
+Seeds 50k expired scheduled sessions and 50k overdue pending payments, then
+compares a row-by-row execute_query loop (how the jobs used to write) with
+the executemany-based batch paths.
+"""
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+ROWS = 50_000
+
+
+def seed(app):
+    from app.models.database import execute_many, execute_query
+    db_path = app.config['DATABASE_PATH']
+    member_id, trainer_id, plan_id = execute_query(
+        "SELECT id, trainer_id, membership_plan_id FROM members LIMIT 1", (), db_path, fetch=True)[0]
+    past = (date.today() - timedelta(days=3)).isoformat()
+    execute_query("DELETE FROM attendance", (), db_path)
+    execute_query("DELETE FROM payments", (), db_path)
+    execute_many(
+        "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, ?, 'scheduled')",
+        [(member_id, trainer_id, past, '6:00 AM - 8:00 AM') for _ in range(ROWS)], db_path)
+    execute_many(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, due_date) VALUES (?, ?, 999, 'pending', ?)",
+        [(member_id, plan_id, past) for _ in range(ROWS)], db_path)
+
+
+def main():
+    app = make_app(temp_db_path())
+    app.logger.disabled = True  # process_pending_payments logs one line per missing email helper
+    from app.models.attendance import Attendance
+    from app.models.payment import Payment
+    from app.models.database import execute_query
+
+    with app.app_context():
+        db_path = app.config['DATABASE_PATH']
+        seed(app)
+        ids = [r[0] for r in execute_query("SELECT id FROM attendance", (), db_path, fetch=True)]
+        seconds = timed(lambda: [
+            execute_query("UPDATE attendance SET status = 'absent' WHERE id = ?", (i,), db_path) for i in ids
+        ])
+        report(f"row-by-row UPDATE, {ROWS} sessions", seconds, calls=ROWS)
+
+        seed(app)
+        seconds = timed(Attendance.auto_mark_absent)
+        report(f"Attendance.auto_mark_absent, {ROWS} sessions", seconds, calls=ROWS)
+
+        seed(app)
+        seconds = timed(lambda: Payment.process_pending_payments(reminder_before_days=5))
+        report(f"Payment.process_pending_payments, {ROWS} payments", seconds, calls=ROWS)
+
+
+if __name__ == '__main__':
+    main()
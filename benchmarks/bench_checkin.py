@@ -0,0 +1,86 @@
+"""Front-desk check-in: one attendance write per scan vs the kiosk desk.
+
+Books 500 members into today's sessions and checks every one of them in:
+  - the old way: look up the scheduled row and save it, as
+    trainer_routes.mark_attendance does
+  - CheckInDesk.scan for every member, then one batched flush
+  - CheckInDesk.scan alone (what a kiosk waits for)
+Each run starts from a freshly reset day of bookings.
+"""
+import sqlite3
+from datetime import date, datetime
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models import checkin
+from app.models.attendance import Attendance
+
+MEMBERS = 500
+
+
+def seed(db_path):
+    conn = sqlite3.connect(db_path)
+    trainer_id = conn.execute("SELECT id FROM trainers WHERE status = 'active' LIMIT 1").fetchone()[0]
+    slot_id = conn.execute(
+        "INSERT INTO time_slots (label, start_minute, end_minute, capacity) VALUES ('All day', 0, 1440, ?)",
+        (MEMBERS,)).lastrowid
+    today = date.today().isoformat()
+    members = []
+    for i in range(MEMBERS):
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash, role, full_name) VALUES (?, ?, 'x', 'member', ?)",
+            (f"bench_member_{i}", f"bench_member_{i}@example.com", f"Bench Member {i}")).lastrowid
+        member_id = conn.execute(
+            "INSERT INTO members (user_id, phone, status, trainer_id) VALUES (?, '0', 'active', ?)",
+            (user_id, trainer_id)).lastrowid
+        conn.execute("INSERT INTO attendance (member_id, trainer_id, date, time_slot, time_slot_id, status) "
+                     "VALUES (?, ?, ?, 'All day', ?, 'scheduled')", (member_id, trainer_id, today, slot_id))
+        members.append(member_id)
+    conn.commit()
+    conn.close()
+    return trainer_id, members
+
+
+def reset(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE attendance SET status = 'scheduled', check_in_time = NULL WHERE time_slot = 'All day'")
+    conn.commit()
+    conn.close()
+
+
+def legacy(trainer_id, members):
+    today = date.today()
+    for member_id in members:
+        row = Attendance.get_for_trainer_member_slot(trainer_id=trainer_id, member_id=member_id,
+                                                     attendance_date=today, time_slot='All day')
+        row.check_in_time = row.check_in_time or datetime.now()
+        row.status = 'present'
+        row.save()
+
+
+def kiosk(members):
+    desk = checkin.get_desk()
+    for member_id in members:
+        desk.scan(member_id=member_id)
+    desk.flush()
+
+
+def main():
+    db_path = temp_db_path()
+    # Flushes run only when the benchmark asks for them
+    app = make_app(db_path, SLOW_QUERY_MS=None, KIOSK_FLUSH_INTERVAL=3600)
+    trainer_id, members = seed(db_path)
+    with app.app_context():
+        reset(db_path)
+        report(f"legacy: lookup + save x {MEMBERS}", timed(lambda: legacy(trainer_id, members)), MEMBERS)
+        reset(db_path)
+        report(f"kiosk: scan x {MEMBERS} + one flush", timed(lambda: kiosk(members)), MEMBERS)
+        reset(db_path)
+        checkin.close_desks()  # a new desk, so today's check-ins are forgotten
+        desk = checkin.get_desk()
+        report(f"kiosk: scan only x {MEMBERS}", timed(lambda: [desk.scan(member_id=m) for m in members]), MEMBERS)
+        checkin.close_desks()
+
+
+if __name__ == "__main__":
+    main()
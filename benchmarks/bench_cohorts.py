@@ -0,0 +1,63 @@
+"""Time the cohort retention report as the member count grows.
+
+Seeds members spread over the last 12 join months across the demo plans, with
+one to four payments each and attendance in the last few weeks, then times the
+uncached CohortAnalytics.compute (grouped SQL + NumPy) and a cached
+CohortAnalytics.get.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.cohorts import CohortAnalytics
+
+SIZES = (10_000, 50_000)
+REPEAT = 5
+
+
+def seed(db_path, members):
+    rng = random.Random(14)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    plans = conn.execute("SELECT id, duration_months FROM membership_plans").fetchall()
+    first_id = (conn.execute("SELECT MAX(id) FROM members").fetchone()[0] or 0) + 1
+    rows, payments, attendance = [], [], []
+    for offset in range(members):
+        plan_id, duration = rng.choice(plans)
+        start = today - timedelta(days=rng.randrange(365))
+        renewals = rng.choice((0, 0, 1, 2, 3))
+        end = start + timedelta(days=30 * duration * (renewals + 1))
+        rows.append((plan_id, start.isoformat(), end.isoformat()))
+        member_id = first_id + offset
+        payments.extend((member_id, plan_id, start.isoformat()) for _ in range(renewals + 1))
+        if end >= today:
+            attendance.extend((member_id, (today - timedelta(days=rng.randrange(40))).isoformat())
+                              for _ in range(rng.randrange(6)))
+    conn.executemany("INSERT INTO members (membership_plan_id, phone, membership_start_date, membership_end_date, "
+                     "status) VALUES (?, '000', ?, ?, 'active')", rows)
+    conn.executemany("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                     "VALUES (?, ?, 999, 'completed', ?)", payments)
+    conn.executemany("INSERT INTO attendance (member_id, date, status) VALUES (?, ?, 'present')", attendance)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return len(payments), len(attendance)
+
+
+def main():
+    for size in SIZES:
+        db_path = temp_db_path()
+        app = make_app(db_path, SLOW_QUERY_MS=None)
+        payments, attendance = seed(db_path, size)
+        print(f"\n{size:,} members, {payments:,} payments, {attendance:,} attendance rows")
+        with app.app_context():
+            report("CohortAnalytics.compute (uncached)",
+                   timed(lambda: CohortAnalytics.compute(db_path), REPEAT), REPEAT)
+            CohortAnalytics.get()
+            report("CohortAnalytics.get (cached)", timed(CohortAnalytics.get, 1000), 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Per-call overhead of model fetchers with and without the connection pool.
+
+"unpooled" sets DB_POOL_SIZE=0, which restores the old behaviour of opening a
+new connection (plus PRAGMA setup) for every execute_query call.
+"""
+from _common import make_app, report, temp_db_path, timed
+
+CALLS = 2000
+
+
+def run(app, label):
+    from app.models.member import Member
+    from app.models.payment import Payment
+    from app.models.attendance import Attendance
+
+    fetchers = [
+        ('Member.get_by_id', lambda: Member.get_by_id(1)),
+        ('Payment.get_member_payments', lambda: Payment.get_member_payments(1)),
+        ('Attendance.get_member_attendance', lambda: Attendance.get_member_attendance(1, limit=30)),
+    ]
+    for name, fn in fetchers:
+        # One app context per simulated request, three fetcher calls per request
+        def request():
+            with app.app_context():
+                fn()
+                fn()
+                fn()
+        seconds = timed(request, repeat=CALLS // 3)
+        report(f"[{label}] {name}", seconds, calls=(CALLS // 3) * 3)
+
+
+def main():
+    app = make_app(temp_db_path())
+    app.config['DB_POOL_SIZE'] = 0
+    run(app, 'unpooled')
+    app.config['DB_POOL_SIZE'] = 10
+    run(app, 'pooled')
+
+
+if __name__ == '__main__':
+    main()
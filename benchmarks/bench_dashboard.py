@@ -0,0 +1,127 @@
+"""Admin dashboard: per-model queries vs the cached snapshot.
+
+Seeds 20k members, 200k payments and 300k attendance rows and times:
+  - the twelve model calls the dashboard used to make on every load
+  - DashboardSnapshot.compute (one counters statement + four list queries)
+  - DashboardSnapshot.get on a warm cache (one data_versions read)
+  - what a polling screen pays per refresh: the full page, /admin/api/metrics,
+    and a conditional GET of it answered with 304
+and the cost the data_versions triggers add to a 100k-row bulk insert.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+MEMBERS = 20_000
+PAYMENTS = 200_000
+SESSIONS = 300_000
+REPEAT = 20
+
+
+def seed(db_path):
+    rng = random.Random(3)
+    today = date.today()
+
+    def day(span=730):
+        return (today - timedelta(days=rng.randrange(span))).isoformat()
+
+    conn = sqlite3.connect(db_path)
+    user_id, trainer_id, plan_id = conn.execute(
+        "SELECT user_id, trainer_id, membership_plan_id FROM members LIMIT 1").fetchone()
+    conn.executemany(
+        "INSERT INTO members (user_id, membership_plan_id, phone, membership_start_date, membership_end_date, status) "
+        "VALUES (?, ?, '0', ?, ?, ?)",
+        ((user_id, plan_id, day(), (today + timedelta(days=rng.randrange(-300, 300))).isoformat(),
+          rng.choice(('active', 'active', 'inactive'))) for _ in range(MEMBERS)))
+    member_ids = [r[0] for r in conn.execute("SELECT id FROM members")]
+    conn.executemany(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) VALUES (?, ?, 999, ?, ?)",
+        ((rng.choice(member_ids), plan_id, rng.choice(('completed', 'completed', 'pending')), day())
+         for _ in range(PAYMENTS)))
+    conn.executemany(
+        "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, '6:00 AM - 8:00 AM', 'present')",
+        ((rng.choice(member_ids), trainer_id, day(60)) for _ in range(SESSIONS)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def legacy_dashboard():
+    from app.models.announcement import Announcement
+    from app.models.attendance import Attendance
+    from app.models.equipment import Equipment
+    from app.models.member import Member
+    from app.models.payment import Payment
+    from app.models.trainer import Trainer
+
+    today = date.today()
+    Member.get_count_active()
+    Trainer.get_count_active()
+    Attendance.get_todays_attendance()
+    Payment.get_revenue_stats()
+    Payment.get_revenue_stats(year=today.year, month=today.month)
+    len(Payment.get_pending_payments())
+    Equipment.get_working_count()
+    Equipment.get_maintenance_count()
+    Member.get_recent(5)
+    Payment.get_recent(5)
+    Member.get_expiring_soon(15)
+    Announcement.get_all()[:5]
+
+
+def polling(app):
+    from app.models.dashboard import DashboardSnapshot
+
+    app.logger.disabled = True  # the after_request hook logs the session on every response
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=1, role='admin')
+    etag = client.get('/admin/api/metrics').headers['ETag']
+
+    def uncached(path, **kwargs):
+        def call():
+            DashboardSnapshot.invalidate()
+            client.get(path, **kwargs)
+        return call
+
+    report("GET /admin/dashboard (cold cache)", timed(uncached('/admin/dashboard'), REPEAT), calls=REPEAT)
+    report("GET /admin/api/metrics (cold cache)", timed(uncached('/admin/api/metrics'), REPEAT), calls=REPEAT)
+    report("GET /admin/api/metrics -> 304",
+           timed(uncached('/admin/api/metrics', headers={'If-None-Match': etag}), REPEAT * 50), calls=REPEAT * 50)
+
+
+def trigger_cost(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = [('Bench', 'cardio')] * 100_000
+
+    def insert():
+        conn.executemany("INSERT INTO equipment (name, category) VALUES (?, ?)", rows)
+        conn.rollback()
+
+    report("100k equipment inserts (with version triggers)", timed(insert))
+    for event in ('insert', 'update', 'delete'):
+        conn.execute(f"DROP TRIGGER trg_equipment_{event}_version")
+    report("100k equipment inserts (no triggers)", timed(insert))
+    conn.close()
+
+
+def main():
+    from app.models.dashboard import DashboardSnapshot
+
+    app = make_app(temp_db_path(), SLOW_QUERY_MS=None)
+    db_path = app.config['DATABASE_PATH']
+    seed(db_path)
+
+    with app.app_context():
+        report("legacy: 12 model calls", timed(legacy_dashboard, REPEAT), calls=REPEAT)
+        report("DashboardSnapshot.compute", timed(lambda: DashboardSnapshot.compute(db_path), REPEAT), calls=REPEAT)
+        DashboardSnapshot.get()
+        report("DashboardSnapshot.get (cache hit)", timed(DashboardSnapshot.get, REPEAT * 50), calls=REPEAT * 50)
+    polling(app)
+    trigger_cost(db_path)
+
+
+if __name__ == '__main__':
+    main()
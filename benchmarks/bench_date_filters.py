@@ -0,0 +1,105 @@
+"""Date-filtered reports on a multi-year dataset.
+
+Seeds five years of history (500k sessions, 200k payments, 50k members) and
+times each report query in its old form (column wrapped in strftime()/DATE())
+against the half-open ISO range form the models now use, printing the
+query plan for both.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+YEARS = 5
+SESSIONS = 500_000
+PAYMENTS = 200_000
+MEMBERS = 50_000
+REPEAT = 20
+
+
+def seed(db_path):
+    rng = random.Random(7)
+    first = date.today() - timedelta(days=365 * YEARS)
+    span = 365 * YEARS
+
+    def day():
+        return (first + timedelta(days=rng.randrange(span))).isoformat()
+
+    conn = sqlite3.connect(db_path)
+    member_id, trainer_id, plan_id, user_id = conn.execute(
+        "SELECT id, trainer_id, membership_plan_id, user_id FROM members LIMIT 1").fetchone()
+    conn.executemany(
+        "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, '6:00 AM - 8:00 AM', ?)",
+        ((member_id, trainer_id, day(), rng.choice(('present', 'absent'))) for _ in range(SESSIONS)))
+    conn.executemany(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) VALUES (?, ?, 999, ?, ?)",
+        ((member_id, plan_id, rng.choice(('completed', 'completed', 'pending')), day()) for _ in range(PAYMENTS)))
+    conn.executemany(
+        "INSERT INTO members (user_id, membership_plan_id, phone, membership_start_date, membership_end_date, status) "
+        "VALUES (?, ?, '0', ?, ?, 'active')",
+        ((user_id, plan_id, day(), (date.today() + timedelta(days=rng.randrange(-span, 365))).isoformat())
+         for _ in range(MEMBERS)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def compare(conn, label, old, new):
+    old_sql, old_params = old
+    new_sql, new_params = new
+    assert conn.execute(old_sql, old_params).fetchall() == conn.execute(new_sql, new_params).fetchall(), label
+    for name, (sql, params) in (("before", old), ("after", new)):
+        plan = "; ".join(r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        seconds = timed(lambda: conn.execute(sql, params).fetchall(), repeat=REPEAT)
+        report(f"{label} [{name}]", seconds, calls=REPEAT)
+        print(f"    plan: {plan}")
+
+
+def main():
+    from app.utils.helpers import days_from_today, month_bounds, year_bounds
+    app = make_app(temp_db_path())
+    db_path = app.config['DATABASE_PATH']
+    seed(db_path)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+
+    compare(conn, "Attendance.get_monthly_stats", (
+        "SELECT COUNT(*), COUNT(DISTINCT member_id) FROM attendance "
+        "WHERE strftime('%Y', date) = ? AND strftime('%m', date) = ? AND status IN ('present', 'absent')",
+        (str(today.year), f"{today.month:02d}"),
+    ), (
+        "SELECT COUNT(*), COUNT(DISTINCT member_id) FROM attendance "
+        "WHERE date >= ? AND date < ? AND status IN ('present', 'absent')",
+        month_bounds(today.year, today.month),
+    ))
+    compare(conn, "Payment.get_revenue_stats(year)", (
+        "SELECT SUM(amount), COUNT(*) FROM payments WHERE payment_status = 'completed' AND strftime('%Y', payment_date) = ?",
+        (str(today.year),),
+    ), (
+        "SELECT SUM(amount), COUNT(*) FROM payments WHERE payment_status = 'completed' "
+        "AND payment_date >= ? AND payment_date < ?",
+        year_bounds(today.year),
+    ))
+    compare(conn, "Member.get_expiring_soon(30)", (
+        "SELECT id FROM members WHERE membership_end_date IS NOT NULL "
+        "AND DATE(membership_end_date) >= DATE('now') AND DATE(membership_end_date) <= DATE('now', '+30 days') "
+        "ORDER BY membership_end_date, id",
+        (),
+    ), (
+        "SELECT id FROM members WHERE membership_end_date >= ? AND membership_end_date < ? "
+        "ORDER BY membership_end_date, id",
+        days_from_today(30),
+    ))
+    compare(conn, "admin reports: attendance, 14 days", (
+        "SELECT DATE(date) AS d, SUM(status = 'present') FROM attendance WHERE DATE(date) >= DATE(?) GROUP BY d",
+        ((today - timedelta(days=13)).isoformat(),),
+    ), (
+        "SELECT date AS d, SUM(status = 'present') FROM attendance WHERE date >= ? GROUP BY d",
+        ((today - timedelta(days=13)).isoformat(),),
+    ))
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
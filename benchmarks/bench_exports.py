@@ -0,0 +1,69 @@
+"""Payment export memory: loading model objects vs streaming chunks.
+
+For each history size, exports every payment as CSV two ways and reports time
+and peak traced memory:
+  - load:   Payment.get_all_with_details() then write the CSV (the old way)
+  - stream: export_rows('payments') through csv_stream (what /admin/export does)
+"""
+import csv
+import io
+import random
+import sqlite3
+import tracemalloc
+from datetime import date, timedelta
+
+from _common import make_app, temp_db_path, timed
+
+SIZES = (50_000, 200_000, 400_000)
+
+
+def seed(db_path, rows):
+    rng = random.Random(5)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    member_id, plan_id = conn.execute("SELECT id, membership_plan_id FROM members LIMIT 1").fetchone()
+    conn.executemany(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_method, payment_status, payment_date, invoice_number) "
+        "VALUES (?, ?, 999, 'card', 'completed', ?, ?)",
+        ((member_id, plan_id, (today - timedelta(days=rng.randrange(1800))).isoformat(), f"INV-{i:08d}")
+         for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def load_then_write():
+    from app.models.payment import Payment
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for p in Payment.get_all_with_details():
+        writer.writerow([p.id, p.invoice_number, p.member_name, p.plan_name, p.amount,
+                         p.payment_method, p.payment_status, p.payment_date])
+    return len(out.getvalue())
+
+
+def stream():
+    from app.models.exports import export_rows
+    from app.utils.exports import csv_stream
+    header, rows = export_rows('payments')
+    return sum(len(chunk) for chunk in csv_stream(header, rows))
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    seconds = timed(fn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {seconds * 1000:9.1f} ms   peak {peak / 1e6:8.1f} MB")
+
+
+def main():
+    for size in SIZES:
+        app = make_app(temp_db_path(), SLOW_QUERY_MS=None)
+        seed(app.config['DATABASE_PATH'], size)
+        with app.app_context():
+            measure(f"{size:>7} payments: load objects + CSV", load_then_write)
+            measure(f"{size:>7} payments: streamed CSV", stream)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Time the weekly renewal revenue forecast over the full member base.
+
+Seeds active members with end dates spread over the next year across the
+demo plans (plus a renewal history for each plan) and times an uncached
+RevenueForecast.compute over 26 and 52 weeks.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.forecast import RevenueForecast
+
+SIZES = (10_000, 100_000)
+REPEAT = 5
+
+
+def seed(db_path, members):
+    rng = random.Random(15)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    plans = [row[0] for row in conn.execute("SELECT id FROM membership_plans")]
+    first_id = (conn.execute("SELECT MAX(id) FROM members").fetchone()[0] or 0) + 1
+    rows, payments = [], []
+    for offset in range(members):
+        plan_id = rng.choice(plans)
+        end = today + timedelta(days=rng.randrange(-180, 365))
+        rows.append((plan_id, end.isoformat(), 'active' if end >= today else 'inactive'))
+        payments.extend((first_id + offset, plan_id) for _ in range(rng.choice((1, 1, 2, 3))))
+    conn.executemany("INSERT INTO members (membership_plan_id, phone, membership_end_date, status) "
+                     "VALUES (?, '000', ?, ?)", rows)
+    conn.executemany("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status) "
+                     "VALUES (?, ?, 999, 'completed')", payments)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def main():
+    for size in SIZES:
+        db_path = temp_db_path()
+        app = make_app(db_path, SLOW_QUERY_MS=None)
+        seed(db_path, size)
+        print(f"\n{size:,} members")
+        with app.app_context():
+            for weeks in (26, 52):
+                report(f"RevenueForecast.compute ({weeks} weeks)",
+                       timed(lambda: RevenueForecast.compute(db_path, weeks), REPEAT), REPEAT)
+
+
+if __name__ == "__main__":
+    main()
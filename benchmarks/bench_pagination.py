@@ -0,0 +1,85 @@
+"""History pages: LIMIT/OFFSET vs keyset (cursor) pagination.
+
+Gives one member ROWS attendance rows and ROWS payments, then reads page 1
+and a deep page of each history two ways:
+  - ORDER BY ... LIMIT 20 OFFSET n, which walks and discards n index entries
+  - the keyset page queries behind the member/admin history views, which seek
+    straight to the cursor
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+from app.models.attendance import Attendance
+from app.models.payment import Payment
+from app.utils.pagination import encode_cursor
+
+ROWS = 200_000
+PAGE = 20
+REPEAT = 50
+
+ATTENDANCE_OFFSET = '''
+    SELECT a.*, ut.full_name FROM attendance a
+    LEFT JOIN trainers t ON a.trainer_id = t.id
+    LEFT JOIN users ut ON t.user_id = ut.id
+    WHERE a.member_id = ? ORDER BY a.date DESC, a.id DESC LIMIT ? OFFSET ?
+'''
+PAYMENTS_OFFSET = '''
+    SELECT p.*, mp.name FROM payments p
+    JOIN membership_plans mp ON p.membership_plan_id = mp.id
+    WHERE p.member_id = ? ORDER BY p.created_at DESC, p.id DESC LIMIT ? OFFSET ?
+'''
+
+
+def seed(db_path):
+    rng = random.Random(5)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    member_id, trainer_id, plan_id = conn.execute(
+        "SELECT id, trainer_id, membership_plan_id FROM members LIMIT 1").fetchone()
+    days = [(today - timedelta(days=rng.randrange(365 * 10))).isoformat() for _ in range(ROWS)]
+    conn.executemany("INSERT INTO attendance (member_id, trainer_id, date, status) VALUES (?, ?, ?, 'present')",
+                     ((member_id, trainer_id, d) for d in days))
+    conn.executemany("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, created_at) "
+                     "VALUES (?, ?, 999, 'completed', ?)", ((member_id, plan_id, f"{d} 09:00:00") for d in days))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return member_id
+
+
+def deep_cursor(db_path, query, member_id, offset):
+    """The cursor a client holds after paging down to ``offset``"""
+    conn = sqlite3.connect(db_path)
+    sort_key, row_id = conn.execute(query, (member_id, offset)).fetchone()
+    conn.close()
+    return encode_cursor(sort_key, row_id)
+
+
+def main():
+    db_path = temp_db_path()
+    app = make_app(db_path, SLOW_QUERY_MS=None)
+    member_id = seed(db_path)
+    offset = ROWS // 2
+    conn = sqlite3.connect(db_path)
+    with app.app_context():
+        for label, offset_sql, page_fn, key_sql in (
+            ("attendance", ATTENDANCE_OFFSET, Attendance.get_member_attendance_page,
+             "SELECT date, id FROM attendance WHERE member_id = ? ORDER BY date DESC, id DESC LIMIT 1 OFFSET ?"),
+            ("payments", PAYMENTS_OFFSET, Payment.get_member_payments_page,
+             "SELECT created_at, id FROM payments WHERE member_id = ? "
+             "ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?"),
+        ):
+            cursor = deep_cursor(db_path, key_sql, member_id, offset - 1)
+            for where, skip, cur in (("page 1", 0, None), (f"row {offset}", offset, cursor)):
+                report(f"{label} {where}: OFFSET",
+                       timed(lambda: conn.execute(offset_sql, (member_id, PAGE, skip)).fetchall(), REPEAT), REPEAT)
+                report(f"{label} {where}: keyset",
+                       timed(lambda: page_fn(member_id, cur, limit=PAGE), REPEAT), REPEAT)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Report latency as raw history grows: raw aggregates vs daily rollups.
+
+For each history size (payments and attendance rows each, spread over five
+years) times the queries behind the admin reports page: all-time and monthly
+revenue, the 12-month revenue series, the 14-day attendance series and the
+monthly session count. It also shows what the rollup triggers add to bulk
+inserts.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+SIZES = (50_000, 200_000, 800_000)
+REPEAT = 10
+
+
+def seed(db_path, rows):
+    rng = random.Random(11)
+    today = date.today()
+
+    def day():
+        return (today - timedelta(days=rng.randrange(365 * 5))).isoformat()
+
+    conn = sqlite3.connect(db_path)
+    member_id, trainer_id, plan_id = conn.execute(
+        "SELECT id, trainer_id, membership_plan_id FROM members LIMIT 1").fetchone()
+    conn.executemany(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) VALUES (?, ?, 999, ?, ?)",
+        ((member_id, plan_id, rng.choice(('completed', 'completed', 'pending')), day()) for _ in range(rows)))
+    conn.executemany(
+        "INSERT INTO attendance (member_id, trainer_id, date, status) VALUES (?, ?, ?, ?)",
+        ((member_id, trainer_id, day(), rng.choice(('present', 'absent'))) for _ in range(rows)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def report_queries(today):
+    month = (today.replace(day=1).isoformat(), (today.replace(day=28) + timedelta(days=4)).replace(day=1).isoformat())
+    year_ago = (today.replace(day=1) - timedelta(days=335)).replace(day=1).isoformat()
+    fortnight = (today - timedelta(days=13)).isoformat()
+    raw = [
+        ("SELECT SUM(amount), COUNT(*) FROM payments WHERE payment_status = 'completed'", ()),
+        ("SELECT SUM(amount), COUNT(*) FROM payments WHERE payment_status = 'completed' "
+         "AND payment_date >= ? AND payment_date < ?", month),
+        ("SELECT substr(payment_date, 1, 7) AS ym, SUM(amount) FROM payments "
+         "WHERE payment_status = 'completed' AND payment_date >= ? GROUP BY ym", (year_ago,)),
+        ("SELECT date, SUM(status = 'present') FROM attendance WHERE date >= ? GROUP BY date", (fortnight,)),
+        ("SELECT COUNT(*) FROM attendance WHERE date >= ? AND date < ? AND status IN ('present', 'absent')", month),
+    ]
+    rollup = [
+        ("SELECT SUM(total), SUM(payments) FROM daily_revenue", ()),
+        ("SELECT SUM(total), SUM(payments) FROM daily_revenue WHERE day >= ? AND day < ?", month),
+        ("SELECT substr(day, 1, 7) AS ym, SUM(total) FROM daily_revenue WHERE day >= ? GROUP BY ym", (year_ago,)),
+        ("SELECT day, present FROM daily_attendance WHERE day >= ?", (fortnight,)),
+        ("SELECT SUM(present + absent) FROM daily_attendance WHERE day >= ? AND day < ?", month),
+    ]
+    return raw, rollup
+
+
+def run_all(conn, queries):
+    return [conn.execute(sql, params).fetchall() for sql, params in queries]
+
+
+def trigger_cost(db_path):
+    conn = sqlite3.connect(db_path)
+    member_id, plan_id = conn.execute("SELECT id, membership_plan_id FROM members LIMIT 1").fetchone()
+    rows = [(member_id, plan_id, '2020-01-01')] * 100_000
+
+    def insert():
+        conn.executemany("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                         "VALUES (?, ?, 10, 'completed', ?)", rows)
+        conn.rollback()
+
+    report("100k completed payments (rollup triggers)", timed(insert))
+    for event in ('insert', 'update', 'delete'):
+        conn.execute(f"DROP TRIGGER trg_payments_rollup_{event}")
+    report("100k completed payments (no rollup triggers)", timed(insert))
+    conn.close()
+
+
+def main():
+    today = date.today()
+    raw, rollup = report_queries(today)
+    for size in SIZES:
+        app = make_app(temp_db_path(), SLOW_QUERY_MS=None)
+        db_path = app.config['DATABASE_PATH']
+        seed(db_path, size)
+        conn = sqlite3.connect(db_path)
+        raw_results = run_all(conn, raw)
+        rollup_results = run_all(conn, rollup)
+        assert [r[0][0] for r in raw_results[:2]] == [r[0][0] for r in rollup_results[:2]]
+        report(f"{size:>7} rows: raw aggregates", timed(lambda: run_all(conn, raw), REPEAT), calls=REPEAT)
+        report(f"{size:>7} rows: daily rollups", timed(lambda: run_all(conn, rollup), REPEAT), calls=REPEAT)
+        conn.close()
+    trigger_cost(db_path)
+
+
+if __name__ == '__main__':
+    main()
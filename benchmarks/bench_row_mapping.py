@@ -0,0 +1,78 @@
+"""Mapping 100k-row lists: SELECT * + positional constructor vs RowMapper.
+
+Seeds 100k equipment rows (with maintenance notes) and compares, for the
+equipment list page:
+  * SELECT * and Equipment(*row), the old _from_row path
+  * SELECT with explicit columns and the generated EQUIPMENT builder
+  * the list-page subset as namedtuples (EQUIPMENT_LIST.light)
+reporting time and the peak memory held by the resulting list.
+"""
+import gc
+import sqlite3
+import tracemalloc
+
+from _common import make_app, report, temp_db_path, timed
+
+ROWS = 100_000
+NOTES = "Belt replaced, rollers lubricated, console firmware updated. " * 4
+
+
+def seed(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM equipment")
+    conn.executemany(
+        "INSERT INTO equipment (name, category, brand, model, purchase_date, warranty_end_date, status, "
+        "last_maintenance_date, next_maintenance_date, maintenance_notes, location) "
+        "VALUES (?, 'Cardio', 'TechFit', 'TX-2024', '2023-01-01', '2026-01-01', 'working', "
+        "'2024-01-01', '2024-07-01', ?, 'Cardio Area')",
+        ((f"Treadmill {i:06d}", NOTES) for i in range(ROWS)))
+    conn.commit()
+    conn.close()
+
+
+def measure(label, fn):
+    """Time ``fn`` and report the memory still held by the list it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    seconds = timed(fn, repeat=3)
+    report(label, seconds / 3, calls=ROWS)
+    print(f"    list holds {retained / 1e6:.1f} MB")
+
+
+def main():
+    from app.models.database import execute_query
+    from app.models.equipment import EQUIPMENT, EQUIPMENT_LIST, Equipment
+
+    app = make_app(temp_db_path(), SLOW_QUERY_MS=None)
+    db_path = app.config['DATABASE_PATH']
+    seed(db_path)
+
+    with app.app_context():
+        star = execute_query("SELECT * FROM equipment ORDER BY name", (), db_path, fetch=True)
+        full = execute_query(f"SELECT {EQUIPMENT.select} FROM equipment ORDER BY name", (), db_path, fetch=True)
+        listed = execute_query(f"SELECT {EQUIPMENT_LIST.select} FROM equipment ORDER BY name", (), db_path, fetch=True)
+
+        print("Mapping only (rows already fetched):")
+        measure("Equipment(*row) (old _from_row)", lambda: [Equipment(*row) for row in star])
+        measure("Equipment(id=row[0], ...) keyword constructor", lambda: [Equipment(
+            id=r[0], name=r[1], category=r[2], brand=r[3], model=r[4], purchase_date=r[5],
+            warranty_end_date=r[6], status=r[7], last_maintenance_date=r[8], next_maintenance_date=r[9],
+            maintenance_notes=r[10], location=r[11], created_at=r[12]) for r in star])
+        measure("EQUIPMENT.all (generated builder)", lambda: EQUIPMENT.all(full))
+        measure("EQUIPMENT_LIST.light (namedtuples)", lambda: EQUIPMENT_LIST.light(listed))
+        del star, full, listed
+
+        print("Fetch + map (what the list pages pay):")
+        measure("SELECT * + Equipment(*row)", lambda: [
+            Equipment(*row) for row in execute_query("SELECT * FROM equipment ORDER BY name", (), db_path, fetch=True)])
+        measure("Equipment.get_all", Equipment.get_all)
+        measure("Equipment.get_list_rows", Equipment.get_list_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Dashboard latency vs number of overdue invoices.
+
+For each backlog size, seeds that many overdue pending payments and times one
+admin dashboard request. "inline" adds the Payment.process_pending_payments call
+the dashboard used to make on every load. Now that work runs in the
+process_pending_payments job; its job_runs row is printed too.
+"""
+import sqlite3
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+BACKLOGS = (100, 1_000, 10_000)
+
+
+def seed_overdue(db_path, count):
+    conn = sqlite3.connect(db_path)
+    member_id, plan_id = conn.execute("SELECT id, membership_plan_id FROM members LIMIT 1").fetchone()
+    due = (date.today() - timedelta(days=3)).isoformat()
+    conn.executemany(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, due_date) VALUES (?, ?, 999, 'pending', ?)",
+        ((member_id, plan_id, due) for _ in range(count)))
+    conn.commit()
+    conn.close()
+
+
+def main():
+    from app import scheduler
+    from app.models.payment import Payment
+
+    for backlog in BACKLOGS:
+        app = make_app(temp_db_path(), SLOW_QUERY_MS=None, DASHBOARD_CACHE_SECONDS=0)
+        app.logger.disabled = True  # process_pending_payments logs one line per missing email helper
+        db_path = app.config['DATABASE_PATH']
+        seed_overdue(db_path, backlog)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(user_id=1, role='admin')
+
+        def dashboard():
+            assert client.get('/admin/dashboard').status_code == 200
+
+        def inline():
+            with app.app_context():
+                Payment.process_pending_payments(reminder_before_days=5)
+            dashboard()
+
+        report(f"{backlog:>6} overdue: inline processing + dashboard", timed(inline))
+        report(f"{backlog:>6} overdue: dashboard only", timed(dashboard, 10), calls=10)
+
+        seed_overdue(db_path, backlog)
+        with app.app_context():
+            scheduler.run_due_jobs(['process_pending_payments'], force=True)
+            run = scheduler.recent_runs(1)[0]
+        print(f"    job_runs: {run['status']}, {run['rows_affected']} rows in {run['duration_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Process start cost of the database layer.
+
+Times create_app against:
+  * a new, empty database file (cold: builds the schema)
+  * an up-to-date database (warm: one schema_version lookup)
+and, for comparison, the work every start used to do on a warm database:
+init_db's CREATE TABLE IF NOT EXISTS / PRAGMA checks plus insert_default_data
+(Bcrypt setup and COUNT probes).
+"""
+import os
+import sqlite3
+
+from _common import make_app, report, temp_db_path, timed
+
+REPEAT = 20
+
+
+def main():
+    from app.app import create_app
+    from app.models import database
+
+    def cold():
+        os.environ['DATABASE_PATH'] = temp_db_path()
+        create_app()
+
+    seconds = timed(cold, repeat=REPEAT)
+    report("create_app, cold (new database)", seconds, calls=REPEAT)
+
+    app = make_app(temp_db_path())  # schema + demo data
+    seconds = timed(create_app, repeat=REPEAT)
+    report("create_app, warm (schema_version check)", seconds, calls=REPEAT)
+
+    db_path = app.config['DATABASE_PATH']
+
+    def legacy_warm_start():
+        with app.app_context():
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            database._create_schema(cursor)
+            database.insert_default_data(cursor)
+            conn.commit()
+            conn.close()
+
+    seconds = timed(lambda: database.ensure_schema(db_path), repeat=REPEAT)
+    report("ensure_schema, warm", seconds, calls=REPEAT)
+    seconds = timed(legacy_warm_start, repeat=REPEAT)
+    report("previous per-start init_db + seeding probes", seconds, calls=REPEAT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Deleting a member with a long history.
+
+Each member gets 20k sessions, 2k payments, 1k progress entries and 200 diet
+and workout plans (with meals/exercises). Compares:
+
+  * the old admin route: one auto-committed DELETE per table, plus the
+    per-plan child cleanup loop the trainer delete used
+  * Member.hard_delete: the same cascade as one unit of work
+"""
+from datetime import date, timedelta
+
+from _common import make_app, report, temp_db_path, timed
+
+SESSIONS = 20_000
+PAYMENTS = 2_000
+PROGRESS = 1_000
+PLANS = 200
+CHILDREN_PER_PLAN = 5
+
+
+def seed_member(db_path):
+    """Create a member with a long history and return it"""
+    from app.models.database import execute_many, execute_query, transaction
+    from app.models.member import Member
+    trainer_id, plan_id = execute_query(
+        "SELECT id, (SELECT id FROM membership_plans LIMIT 1) FROM trainers LIMIT 1", (), db_path, fetch=True)[0]
+    workout_id = execute_query("SELECT id FROM workouts LIMIT 1", (), db_path, fetch=True)[0][0]
+    with transaction(db_path):
+        tag = execute_query("SELECT COALESCE(MAX(id), 0) + 1 FROM users", (), db_path, fetch=True)[0][0]
+        user_id = execute_query(
+            "INSERT INTO users (username, email, password_hash, role, full_name) VALUES (?, ?, 'x', 'member', 'Bench')",
+            (f"bench{tag}", f"bench{tag}@example.com"), db_path)
+        member_id = execute_query(
+            "INSERT INTO members (user_id, membership_plan_id, phone, trainer_id, status) VALUES (?, ?, '0', ?, 'active')",
+            (user_id, plan_id, trainer_id), db_path)
+        start = date.today() - timedelta(days=SESSIONS)
+        execute_many(
+            "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, '6:00 AM - 8:00 AM', 'present')",
+            [(member_id, trainer_id, (start + timedelta(days=i)).isoformat()) for i in range(SESSIONS)], db_path)
+        execute_many(
+            "INSERT INTO payments (member_id, membership_plan_id, amount, payment_status) VALUES (?, ?, 999, 'completed')",
+            [(member_id, plan_id)] * PAYMENTS, db_path)
+        execute_many(
+            "INSERT INTO member_progress (member_id, recorded_date, weight, recorded_by) VALUES (?, ?, 70, ?)",
+            [(member_id, (start + timedelta(days=i)).isoformat(), trainer_id) for i in range(PROGRESS)], db_path)
+        for _ in range(PLANS):
+            diet_id = execute_query(
+                "INSERT INTO diet_plans (member_id, trainer_id, name) VALUES (?, ?, 'Bench diet')",
+                (member_id, trainer_id), db_path)
+            execute_many(
+                "INSERT INTO diet_plan_meals (diet_plan_id, meal_type, meal_name) VALUES (?, 'lunch', 'Rice bowl')",
+                [(diet_id,)] * CHILDREN_PER_PLAN, db_path)
+            workout_plan_id = execute_query(
+                "INSERT INTO member_workout_plans (member_id, trainer_id, name, start_date) VALUES (?, ?, 'Bench plan', DATE('now'))",
+                (member_id, trainer_id), db_path)
+            execute_many(
+                "INSERT INTO workout_plan_details (plan_id, workout_id, day_of_week) VALUES (?, ?, 1)",
+                [(workout_plan_id, workout_id)] * CHILDREN_PER_PLAN, db_path)
+    return Member.get_by_id(member_id)
+
+
+def delete_statement_by_statement(member, db_path):
+    """The pre-unit-of-work approach: every statement commits on its own"""
+    from app.models.database import execute_query
+    for table, column in (("diet_plans", "member_id"), ("member_workout_plans", "member_id")):
+        child, fk = ("diet_plan_meals", "diet_plan_id") if table == "diet_plans" else ("workout_plan_details", "plan_id")
+        for (plan_id,) in execute_query(f"SELECT id FROM {table} WHERE {column} = ?", (member.id,), db_path, fetch=True):
+            execute_query(f"DELETE FROM {child} WHERE {fk} = ?", (plan_id,), db_path)
+    for table in ("member_workout_plans", "diet_plans", "member_progress", "attendance", "payments"):
+        execute_query(f"DELETE FROM {table} WHERE member_id = ?", (member.id,), db_path)
+    execute_query("DELETE FROM members WHERE id = ?", (member.id,), db_path)
+    execute_query("DELETE FROM users WHERE id = ?", (member.user_id,), db_path)
+
+
+def main():
+    # Pooling off so every statement pays for its own commit, as before
+    app = make_app(temp_db_path(), DB_POOL_SIZE=0)
+    with app.app_context():
+        db_path = app.config['DATABASE_PATH']
+
+        member = seed_member(db_path)
+        seconds = timed(lambda: delete_statement_by_statement(member, db_path))
+        report("statement-by-statement commits", seconds)
+
+        member = seed_member(db_path)
+        seconds = timed(member.hard_delete)
+        report("Member.hard_delete (one transaction)", seconds)
+
+
+if __name__ == '__main__':
+    main()
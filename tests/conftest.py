@@ -1,5 +1,6 @@
 import sys
 import os
+import sqlite3
 import types
 import importlib.util
 import re
@@ -140,3 +141,50 @@ def load_module_from_path():
         return mod
 
     return _loader
+
+# -------------------------------------------------------------------
+# Real application on a fresh, seeded database (integration tests)
+# -------------------------------------------------------------------
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "db_profile(name): run the seeded `app` fixture with DB_PROFILE=name (e.g. 'production')")
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    Factory for the real application on a new database in tmp_path, seeded
+    with the demo data. Keyword arguments are environment overrides read by
+    create_app (DB_PROFILE, DB_WRITE_QUEUE, ...). Pools are closed on teardown.
+    """
+    from app.models import database
+
+    def _make(**env):
+        monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "app.db"))
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        app = create_app()
+        app.test_cli_runner().invoke(args=["seed-db"])
+        app.config.update(TESTING=True)
+        return app
+
+    yield _make
+    database.close_pools()
+
+
+@pytest.fixture
+def app(request, make_app):
+    """The seeded application; ``@pytest.mark.db_profile("production")`` selects the WAL profile"""
+    marker = request.node.get_closest_marker("db_profile")
+    return make_app(**({"DB_PROFILE": marker.args[0]} if marker else {}))
+
+
+@pytest.fixture
+def active_member(app):
+    """(member id, user id, trainer id) of a seeded active member with a trainer and 30+ days left"""
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    row = conn.execute(
+        "SELECT m.id, m.user_id, m.trainer_id FROM members m WHERE m.status = 'active' AND m.trainer_id IS NOT NULL "
+        "AND m.membership_end_date >= DATE('now', '+30 day') ORDER BY m.id LIMIT 1").fetchone()
+    conn.close()
+    return row
@@ -0,0 +1,121 @@
+# tests/integration/test_attendance_sweep.py
+"""auto_mark_absent as one indexed UPDATE on attendance.slot_end_at, and the
+backfill that fills slot_end_at for existing rows."""
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from app.models import database
+from app.models.attendance import Attendance
+
+SWEEP = "UPDATE attendance SET status = 'absent' WHERE status = 'scheduled' AND slot_end_at < ?"
+
+
+def _member(conn):
+    return conn.execute("SELECT id, trainer_id FROM members LIMIT 1").fetchone()
+
+
+def test_sweep_marks_only_finished_sessions(app):
+    today = date.today()
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    member_id, trainer_id = _member(conn)
+    with app.app_context():
+        ids = {}
+        for name, day, slot in (("yesterday", today - timedelta(days=1), "6:00 PM - 7:00 PM"),
+                                ("morning", today, "6:00 AM - 7:00 AM"),
+                                ("evening", today, "8:00 PM - 9:00 PM"),
+                                ("tomorrow", today + timedelta(days=1), "6:00 AM - 7:00 AM")):
+            ids[name] = Attendance(member_id=member_id, trainer_id=trainer_id, date=day,
+                                   time_slot=slot, status="scheduled").save()
+        # Written without save(): picked up by the sweep's fill step
+        ids["raw"] = conn.execute(
+            "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, 'Morning', 'scheduled')",
+            (member_id, trainer_id, (today - timedelta(days=2)).isoformat())).lastrowid
+        conn.commit()
+
+        marked = Attendance.auto_mark_absent(now=datetime.combine(today, datetime.min.time()).replace(hour=12))
+    assert marked == 3
+    status = dict(conn.execute("SELECT id, status FROM attendance WHERE id IN (%s)" % ",".join("?" * len(ids)),
+                               tuple(ids.values())).fetchall())
+    assert {name: status[i] for name, i in ids.items()} == {
+        "yesterday": "absent", "morning": "absent", "raw": "absent", "evening": "scheduled", "tomorrow": "scheduled",
+    }
+    conn.close()
+
+
+def test_sweep_uses_partial_index(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {SWEEP}", ("2025-01-01",)))
+    assert "idx_attendance_scheduled_end" in plan
+    conn.close()
+
+
+def test_backfill_existing_rows(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    member_id, trainer_id = _member(conn)
+    conn.executemany("INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) VALUES (?, ?, ?, ?, ?)",
+                     [(member_id, trainer_id, "2024-03-01", "6:00 AM - 8:00 AM", "present"),
+                      (member_id, trainer_id, "2024-03-01", "7:00 PM", "scheduled")])
+    conn.execute("UPDATE attendance SET slot_end_at = NULL")
+    database._backfill_slot_end_at(conn.cursor())
+    assert conn.execute("SELECT COUNT(*) FROM attendance WHERE slot_end_at IS NULL").fetchone() == (0,)
+    assert conn.execute("SELECT time_slot, slot_end_at FROM attendance WHERE date = '2024-03-01' ORDER BY id").fetchall() == [
+        ("6:00 AM - 8:00 AM", "2024-03-01T08:00:00"), ("7:00 PM", "2024-03-01T20:00:00")]
+    conn.close()
+
+
+def _schedule(conn, member_id, trainer_id, ends):
+    """Insert scheduled sessions ending at ``ends`` (ISO timestamps); returns their ids"""
+    return [conn.execute(
+        "INSERT INTO attendance (member_id, trainer_id, date, time_slot, status, slot_end_at) "
+        "VALUES (?, ?, ?, 'slot', 'scheduled', ?)", (member_id, trainer_id, end[:10], end)).lastrowid for end in ends]
+
+
+def _statuses(conn, ids):
+    return [conn.execute("SELECT status FROM attendance WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+
+
+def test_reconcile_advances_watermark(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    member_id, trainer_id = _member(conn)
+    ids = _schedule(conn, member_id, trainer_id,
+                    ["2030-01-01T08:00:00", "2030-01-01T09:00:00", "2030-01-01T10:00:00", "2030-01-02T08:00:00"])
+    conn.commit()
+    now = datetime(2030, 1, 1, 12, 0)
+    with app.app_context():
+        assert Attendance.reconcile_expired(limit=2, now=now) == 2
+        assert _statuses(conn, ids) == ["absent", "absent", "scheduled", "scheduled"]
+        assert Attendance.reconcile_expired(limit=2, now=now) == 1
+        assert conn.execute("SELECT value FROM watermarks WHERE name = 'attendance_absent'").fetchone() == (
+            "2030-01-01T10:00:00",)
+
+        # Nothing new: no write at all
+        versions = database.get_data_versions(("attendance",), app.config["DATABASE_PATH"])
+        assert Attendance.reconcile_expired(now=now) == 0
+        assert database.get_data_versions(("attendance",), app.config["DATABASE_PATH"]) == versions
+
+        # Booked behind the watermark: left to the full sweep
+        late = _schedule(conn, member_id, trainer_id, ["2030-01-01T07:00:00"])
+        conn.commit()
+        assert Attendance.reconcile_expired(now=now) == 0
+        assert Attendance.auto_mark_absent(now=now) == 1
+        assert _statuses(conn, late + ids[3:]) == ["absent", "scheduled"]
+    conn.close()
+
+
+def test_attendance_page_reads_once(app, monkeypatch):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    member_id, user_id, trainer_id = conn.execute("SELECT id, user_id, trainer_id FROM members LIMIT 1").fetchone()
+    expired = _schedule(conn, member_id, trainer_id, [(datetime.now() - timedelta(hours=1)).isoformat()])
+    conn.commit()
+
+    reads = []
+    original = Attendance.get_member_attendance_page.__func__
+    monkeypatch.setattr(Attendance, "get_member_attendance_page",
+                        classmethod(lambda cls, *a, **k: reads.append(a) or original(cls, *a, **k)))
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member_id)
+    assert client.get("/member/attendance").status_code == 200
+    assert len(reads) == 1
+    assert _statuses(conn, expired) == ["absent"]
+    conn.close()
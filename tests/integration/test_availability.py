@@ -0,0 +1,94 @@
+# tests/integration/test_availability.py
+"""The availability index behind check_slot_availability, get_available_for_slot
+and the /member/api/availability grid."""
+import sqlite3
+from datetime import date, timedelta
+
+from app.models import database
+from app.models.attendance import Attendance
+from app.models.availability import AvailabilityIndex
+from app.models.time_slot import TimeSlot, slot_catalog
+from app.models.trainer import Trainer
+
+
+def test_grid_covers_every_trainer_and_day(app, active_member):
+    member_id, _, trainer_id = active_member
+    start = date.today() + timedelta(days=1)
+    with app.app_context():
+        slot = slot_catalog().resolve("8:00 AM - 10:00 AM")
+        Attendance(member_id=member_id, trainer_id=trainer_id, date=start + timedelta(days=2),
+                   time_slot_id=slot.id, status="scheduled").save()
+        grid = AvailabilityIndex.grid(start, 7)
+        active = database.execute_query("SELECT COUNT(*) FROM trainers WHERE status = 'active'", (),
+                                        app.config["DATABASE_PATH"], fetch=True)[0][0]
+
+    assert len(grid["trainers"]) == active
+    assert len(grid["slots"]) == 8
+    trainer = next(t for t in grid["trainers"] if t["trainer_id"] == trainer_id)
+    assert [d["date"] for d in trainer["days"]] == [(start + timedelta(days=i)).isoformat() for i in range(7)]
+    assert trainer["days"][2]["booked"] == [slot.id]
+    assert slot.id not in trainer["days"][2]["free"]
+    assert all(not d["booked"] for i, d in enumerate(trainer["days"]) if i != 2)
+
+
+def test_bookings_invalidate_the_index(app, active_member):
+    member_id, _, trainer_id = active_member
+    day = date.today() + timedelta(days=4)
+    with app.app_context():
+        slot = slot_catalog().resolve("6:00 PM - 8:00 PM")
+        assert Attendance.check_slot_availability(trainer_id, slot, day)
+        assert trainer_id in {t.id for t in Trainer.get_available_for_slot(slot, day)}
+
+        booking = Attendance(member_id=member_id, trainer_id=trainer_id, date=day, time_slot_id=slot.id,
+                             status="scheduled")
+        booking.save()
+        assert not Attendance.check_slot_availability(trainer_id, slot, day)
+        assert Attendance.check_slot_availability(trainer_id, slot, day, exclude_attendance_id=booking.id)
+        assert trainer_id not in {t.id for t in Trainer.get_available_for_slot(slot.label, day)}
+
+        # A write from another connection is seen through data_versions
+        conn = sqlite3.connect(app.config["DATABASE_PATH"])
+        conn.execute("DELETE FROM attendance WHERE id = ?", (booking.id,))
+        conn.commit()
+        conn.close()
+        assert Attendance.check_slot_availability(trainer_id, slot, day)
+
+
+def test_overlaps_and_legacy_labels(app, active_member):
+    member_id, _, trainer_id = active_member
+    day = date.today() + timedelta(days=6)
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    conn.execute("INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) "
+                 "VALUES (?, ?, ?, '9:00 AM - 11:00 AM', 'scheduled')", (member_id, trainer_id, day.isoformat()))
+    conn.commit()
+    conn.close()
+    with app.app_context():
+        early = TimeSlot(start_minute=1260, end_minute=1320, trainer_id=trainer_id).save()  # 9-10 PM, trainer only
+        grid = AvailabilityIndex.grid(day, 1, trainer_id=trainer_id)
+        Attendance(member_id=member_id, trainer_id=trainer_id, date=day, time_slot_id=early, status="scheduled").save()
+        catalog = slot_catalog()
+        assert [d["booked"] for d in grid["trainers"][0]["days"]] == [[]]  # the override replaced the defaults
+        assert not Attendance.check_slot_availability(trainer_id, catalog.resolve("8:00 AM - 10:00 AM"), day)
+        assert not Attendance.check_slot_availability(trainer_id, catalog.resolve("10:00 AM - 12:00 PM"), day)
+        assert Attendance.check_slot_availability(trainer_id, catalog.resolve("12:00 PM - 2:00 PM"), day)
+        assert not Attendance.check_slot_availability(trainer_id, catalog.resolve("8:00 PM - 10:00 PM"), day)
+
+
+def test_availability_endpoint(app, active_member):
+    member_id, user_id, trainer_id = active_member
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member_id)
+
+    resp = client.get("/member/api/availability?days=31")
+    assert resp.status_code == 200
+    assert all(len(t["days"]) == 31 for t in resp.get_json()["trainers"])
+
+    resp = client.get(f"/member/api/availability?trainer_id={trainer_id}&start=2030-01-01")
+    body = resp.get_json()
+    assert [t["trainer_id"] for t in body["trainers"]] == [trainer_id]
+    assert body["start"] == "2030-01-01" and body["days"] == 7
+
+    assert client.get("/member/api/availability?days=60").status_code == 400
+    assert client.get("/member/api/availability?start=tomorrow").status_code == 400
+    assert client.get("/member/api/availability?trainer_id=99999").status_code == 400
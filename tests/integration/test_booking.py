@@ -0,0 +1,218 @@
+# tests/integration/test_booking.py
+"""BookingEngine: many members racing for one trainer slot, per-slot capacity,
+the structured conflicts it returns and recurring weekly bookings."""
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models import booking as booking_module
+from app.models.booking import BookingEngine
+from app.models.time_slot import TimeSlot, slot_catalog
+
+RACERS = 16
+
+pytestmark = pytest.mark.db_profile("production")
+
+
+def _trainer(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    trainer_id = conn.execute("SELECT id FROM trainers WHERE status = 'active' ORDER BY id LIMIT 1").fetchone()[0]
+    conn.close()
+    return trainer_id
+
+
+def _add_members(app, trainer_id, count):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    ids = []
+    for i in range(count):
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash, role, full_name) VALUES (?, ?, 'x', 'member', ?)",
+            (f"racer_{i}", f"racer_{i}@example.com", f"Racer {i}")).lastrowid
+        ids.append(conn.execute(
+            "INSERT INTO members (user_id, phone, status, membership_start_date, membership_end_date, trainer_id) "
+            "VALUES (?, '0', 'active', DATE('now'), DATE('now', '+1 year'), ?)", (user_id, trainer_id)).lastrowid)
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def _race(app, member_ids, trainer_id, slot_id, day):
+    results = []
+    barrier = threading.Barrier(len(member_ids))
+
+    def book(member_id):
+        with app.app_context():
+            barrier.wait()
+            results.append(BookingEngine.book(member_id, trainer_id, slot_id, day))
+
+    threads = [threading.Thread(target=book, args=(m,)) for m in member_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _booked(app, trainer_id, day):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    rows = conn.execute("SELECT member_id FROM attendance WHERE trainer_id = ? AND date = ?",
+                        (trainer_id, day.isoformat())).fetchall()
+    conn.close()
+    return [r[0] for r in rows]
+
+
+def test_contended_slot_is_booked_once(app, record_property):
+    trainer_id = _trainer(app)
+    members = _add_members(app, trainer_id, RACERS)
+    day = date.today() + timedelta(days=2)
+    with app.app_context():
+        slot = slot_catalog().resolve("6:00 PM - 8:00 PM")
+
+    started = time.perf_counter()
+    results = _race(app, members, trainer_id, slot.id, day)
+    elapsed = time.perf_counter() - started
+    record_property("booking_attempts_per_sec", round(len(results) / elapsed, 1))
+
+    assert sum(r.ok for r in results) == 1
+    assert {r.conflict for r in results if not r.ok} == {booking_module.SLOT_FULL}
+    assert len(_booked(app, trainer_id, day)) == 1
+
+
+def test_capacity_allows_that_many_bookings(app, record_property):
+    trainer_id = _trainer(app)
+    members = _add_members(app, trainer_id, RACERS)
+    day = date.today() + timedelta(days=3)
+    with app.app_context():
+        group = TimeSlot(start_minute=1080, end_minute=1140, trainer_id=trainer_id, capacity=3).save()
+
+    started = time.perf_counter()
+    results = _race(app, members, trainer_id, group, day)
+    record_property("booking_attempts_per_sec", round(len(results) / (time.perf_counter() - started), 1))
+
+    assert sum(r.ok for r in results) == 3
+    booked = _booked(app, trainer_id, day)
+    assert len(booked) == len(set(booked)) == 3
+
+
+def test_conflicts_are_structured(app):
+    trainer_id = _trainer(app)
+    first, second = _add_members(app, trainer_id, 2)
+    day = date.today() + timedelta(days=4)
+    with app.app_context():
+        catalog = slot_catalog()
+        evening = catalog.resolve("6:00 PM - 8:00 PM")
+        morning = catalog.resolve("8:00 AM - 10:00 AM")
+
+        booked = BookingEngine.book(first, trainer_id, evening.id, day)
+        assert booked.ok and booked.slot.id == evening.id
+
+        assert BookingEngine.book(first, trainer_id, evening.id, day).conflict == booking_module.SAME_SLOT
+        clash = BookingEngine.book(first, trainer_id, morning.id, day)
+        assert clash.conflict == booking_module.MEMBER_DAY_BOOKED
+        assert clash.conflicting_ids == (booked.attendance_id,)
+        assert BookingEngine.book(second, trainer_id, "nonsense", day).conflict == booking_module.INVALID_SLOT
+        assert BookingEngine.book(second, trainer_id, morning.id, day,
+                                  now=datetime.combine(day, datetime.min.time()).replace(hour=9)
+                                  ).conflict == booking_module.PAST_SLOT
+
+        # A trainer-only 7-8:30 PM slot overlaps the evening booking
+        overlap = TimeSlot(start_minute=1140, end_minute=1230, trainer_id=trainer_id).save()
+        busy = BookingEngine.book(second, trainer_id, overlap, day)
+        assert busy.conflict == booking_module.TRAINER_BUSY
+        assert busy.conflicting_ids == (booked.attendance_id,)
+        assert busy.to_dict()["message"] == "This time slot is not available"
+
+        assert BookingEngine.reschedule(booked.attendance_id, second, overlap).conflict == booking_module.NOT_FOUND
+        moved = BookingEngine.reschedule(booked.attendance_id, first, overlap)
+        assert moved.ok and moved.attendance_id == booked.attendance_id
+
+
+def test_trigger_rejects_overbooking_from_other_writers(app):
+    trainer_id = _trainer(app)
+    first, second = _add_members(app, trainer_id, 2)
+    day = (date.today() + timedelta(days=5)).isoformat()
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    slot_id = conn.execute("SELECT id FROM time_slots WHERE start_minute = 360 AND trainer_id IS NULL").fetchone()[0]
+    insert = ("INSERT INTO attendance (member_id, trainer_id, date, time_slot_id, status) "
+              "VALUES (?, ?, ?, ?, 'scheduled')")
+    conn.execute(insert, (first, trainer_id, day, slot_id))
+    with pytest.raises(sqlite3.IntegrityError, match="slot full"):
+        conn.execute(insert, (second, trainer_id, day, slot_id))
+    conn.close()
+
+
+def test_recurring_booking_reports_conflicts_per_date(app):
+    trainer_id = _trainer(app)
+    member, other = _add_members(app, trainer_id, 2)
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    with app.app_context():
+        evening = slot_catalog().resolve("6:00 PM - 8:00 PM")
+        morning = slot_catalog().resolve("8:00 AM - 10:00 AM")
+        taken = BookingEngine.book(other, trainer_id, evening.id, monday + timedelta(days=2))
+        own = BookingEngine.book(member, trainer_id, morning.id, monday + timedelta(weeks=3))
+
+        result = BookingEngine.book_recurring(member, trainer_id, evening.id, [0, 2, 4], monday,
+                                              monday + timedelta(weeks=12, days=-1))
+
+    assert len(result.results) == 36
+    assert len(result.booked) == 34
+    assert {day: r.conflict for day, r in result.conflicts.items()} == {
+        monday + timedelta(days=2): booking_module.SLOT_FULL,
+        monday + timedelta(weeks=3): booking_module.MEMBER_DAY_BOOKED,
+    }
+    assert result.conflicts[monday + timedelta(days=2)].conflicting_ids == (taken.attendance_id,)
+    assert result.conflicts[monday + timedelta(weeks=3)].conflicting_ids == (own.attendance_id,)
+
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    rows = dict(conn.execute("SELECT date, id FROM attendance WHERE member_id = ? AND time_slot_id = ?",
+                             (member, evening.id)).fetchall())
+    conn.close()
+    assert rows == {r.day.isoformat(): r.attendance_id for r in result.booked}
+    assert {date.fromisoformat(d).weekday() for d in rows} == {0, 2, 4}
+
+
+def test_recurring_booking_validates_the_pattern(app):
+    trainer_id = _trainer(app)
+    (member,) = _add_members(app, trainer_id, 1)
+    start = date.today() + timedelta(days=1)
+    with app.app_context():
+        for weekdays, until in (([], start + timedelta(days=7)), ([7], start + timedelta(days=7)),
+                                ([0], start - timedelta(days=1)), ([0], start + timedelta(weeks=30))):
+            with pytest.raises(ValueError):
+                BookingEngine.book_recurring(member, trainer_id, "6:00 PM - 8:00 PM", weekdays, start, until)
+
+
+def test_recurring_booking_endpoint(app):
+    trainer_id = _trainer(app)
+    (member,) = _add_members(app, trainer_id, 1)
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    user_id = conn.execute("SELECT user_id FROM members WHERE id = ?", (member,)).fetchone()[0]
+    conn.close()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member)
+    start = date.today() + timedelta(days=1)
+    until = start + timedelta(weeks=4, days=-1)
+    with app.app_context():
+        slot = slot_catalog().resolve("4:00 PM - 6:00 PM")
+
+    resp = client.post("/member/schedule_session/recurring", json={
+        "time_slot": slot.id, "weekdays": [1, 3], "start_date": start.isoformat(), "end_date": until.isoformat()})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert len(body["booked"]) == 8 and body["conflicts"] == []
+
+    # The same pattern again through the form: every date is already booked
+    resp = client.post("/member/schedule_session/recurring", data={
+        "time_slot": str(slot.id), "weekdays": ["1", "3"], "start_date": start.isoformat(),
+        "end_date": until.isoformat()})
+    assert resp.status_code == 302
+    assert client.post("/member/schedule_session/recurring", json={
+        "time_slot": slot.id, "weekdays": ["x"], "start_date": start.isoformat(),
+        "end_date": until.isoformat()}).status_code == 400
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    assert conn.execute("SELECT COUNT(*) FROM attendance WHERE member_id = ?", (member,)).fetchone() == (8,)
+    conn.close()
@@ -0,0 +1,124 @@
+# tests/integration/test_checkin.py
+"""Kiosk check-in: scans resolved from today's bookings in memory, present/late
+by arrival time, and batched flushes to attendance."""
+import sqlite3
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app.models import checkin
+from app.models.attendance import Attendance
+from app.models.time_slot import TimeSlot, slot_catalog
+
+SCANS = 2000
+
+
+@pytest.fixture(autouse=True)
+def desks(app):
+    app.config.update(KIOSK_FLUSH_INTERVAL=60)  # tests flush explicitly
+    yield
+    checkin.close_desks()
+
+
+def _members(app, count):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    rows = conn.execute(
+        "SELECT id, user_id, trainer_id FROM members WHERE status = 'active' AND trainer_id IS NOT NULL "
+        "ORDER BY id LIMIT ?", (count,)).fetchall()
+    conn.close()
+    return rows
+
+
+def _status(app, attendance_id):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    row = conn.execute("SELECT status, check_in_time FROM attendance WHERE id = ?", (attendance_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def _book(member, slot, day):
+    booking = Attendance(member_id=member[0], trainer_id=member[2], date=day, time_slot_id=slot.id,
+                         status="scheduled")
+    booking.save()
+    return booking.id
+
+
+def test_scans_mark_present_or_late_and_flush_in_one_batch(app):
+    today = date.today()
+    at = lambda h, m: datetime.combine(today, datetime.min.time()).replace(hour=h, minute=m)  # noqa: E731
+    on_time, late, early = _members(app, 3)
+    with app.app_context():
+        slot = slot_catalog().resolve("4:00 PM - 6:00 PM")
+        slot.capacity = 3  # the members may share a trainer
+        slot.save()
+        ids = [_book(m, slot, today) for m in (on_time, late, early)]
+        desk = checkin.get_desk()
+
+        assert desk.scan(member_id=on_time[0], now=at(15, 45))["status"] == "present"
+        assert desk.scan(user_id=late[1], now=at(16, 25))["status"] == "late"
+        too_early = desk.scan(member_id=early[0], now=at(15, 0))
+        assert too_early["result"] == checkin.TOO_EARLY
+        assert too_early["starts_at"] == at(16, 0).isoformat()
+        assert desk.scan(member_id=99999, now=at(16, 0))["result"] == checkin.NO_SESSION
+
+        again = desk.scan(member_id=on_time[0], now=at(16, 5))
+        assert (again["result"], again["status"]) == (checkin.ALREADY_CHECKED_IN, "present")
+        assert _status(app, ids[0])[0] == "scheduled"  # queued, not yet written
+        assert desk.pending() == 2
+
+        assert desk.flush() == 2
+        assert desk.pending() == 0
+        assert _status(app, ids[0])[0] == "present"
+        assert _status(app, ids[1])[0] == "late"
+        assert _status(app, ids[2])[0] == "scheduled"
+        # Still remembered after the map is rebuilt from the database
+        assert desk.scan(user_id=late[1], now=at(16, 30))["result"] == checkin.ALREADY_CHECKED_IN
+
+
+def test_scan_throughput(app, record_property):
+    today = date.today()
+    members = _members(app, 50)
+    with app.app_context():
+        # One slot per member spanning the whole day, so every scan finds a session
+        slot = TimeSlot(start_minute=0, end_minute=1440, capacity=len(members)).save()
+        ids = [_book(m, slot_catalog().get(slot), today) for m in members]
+        desk = checkin.get_desk()
+        now = datetime.combine(today, datetime.min.time()).replace(hour=12)
+        started = time.perf_counter()
+        for i in range(SCANS):
+            desk.scan(member_id=members[i % len(members)][0], now=now)
+        elapsed = time.perf_counter() - started
+        assert desk.flush() == len(members)
+
+    record_property("scan_ms", round(elapsed / SCANS * 1000, 3))
+    assert elapsed / SCANS < 0.005
+    assert {_status(app, i)[0] for i in ids} == {"late"}
+
+
+def test_checkin_endpoint(app):
+    member = _members(app, 1)[0]
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    admin_id = conn.execute("SELECT id FROM users WHERE role = 'admin' LIMIT 1").fetchone()[0]
+    conn.close()
+    with app.app_context():
+        slot = TimeSlot(start_minute=0, end_minute=1440, trainer_id=member[2]).save()
+        attendance_id = _book(member, slot_catalog().get(slot), date.today())
+
+    client = app.test_client()
+    assert client.post("/admin/api/checkin", json={"member_id": member[0]}).status_code == 302  # login required
+    with client.session_transaction() as sess:
+        sess.update(user_id=admin_id, role="admin")
+
+    resp = client.post("/admin/api/checkin", json={"user_id": member[1]})
+    assert resp.status_code == 200
+    assert resp.get_json()["attendance_id"] == attendance_id
+    assert resp.get_json()["result"] == checkin.CHECKED_IN
+    assert client.post("/admin/api/checkin", data={"member_id": member[0]}).get_json()["result"] == \
+        checkin.ALREADY_CHECKED_IN
+    assert client.post("/admin/api/checkin", json={"member_id": 99999}).status_code == 404
+    assert client.post("/admin/api/checkin", json={"member_id": "abc"}).status_code == 400
+    assert client.post("/admin/api/checkin", json={}).status_code == 400
+
+    checkin.close_desks()  # flushes what is queued
+    assert _status(app, attendance_id)[0] in ("present", "late")
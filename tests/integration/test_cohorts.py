@@ -0,0 +1,89 @@
+# tests/integration/test_cohorts.py
+"""Cohort retention, churn and renewal rates on a controlled set of members,
+the per-day cache, and the reports tab."""
+import sqlite3
+from datetime import date
+
+import pytest
+
+from app.models.cohorts import CohortAnalytics
+
+# Far enough ahead that the seeded members fall outside the 12 cohort months
+TODAY = date(2031, 6, 15)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(app):
+    CohortAnalytics.invalidate()
+    yield
+    CohortAnalytics.invalidate()
+
+
+def _add_member(conn, plan_id, start, end):
+    return conn.execute(
+        "INSERT INTO members (membership_plan_id, phone, membership_start_date, membership_end_date, status) "
+        "VALUES (?, '000', ?, ?, 'active')", (plan_id, start, end)).lastrowid
+
+
+@pytest.fixture
+def cohort_data(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    plan_id = conn.execute("SELECT MIN(id) FROM membership_plans").fetchone()[0]
+    _add_member(conn, plan_id, "2030-07-01", "2030-08-01")                 # 1 month
+    renewed = _add_member(conn, plan_id, "2030-07-10", "2031-01-10")       # 6 months, renewed
+    _add_member(conn, plan_id, "2030-07-20", "2030-08-19")                 # a day short of 1 month
+    active = _add_member(conn, plan_id, "2030-07-05", "2031-12-05")        # still a member
+    _add_member(conn, plan_id, "2031-05-03", "2031-08-03")                 # joined last month
+    for day in ("2030-07-10", "2030-10-10"):
+        conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                     "VALUES (?, ?, 100, 'completed', ?)", (renewed, plan_id, day))
+    conn.execute("INSERT INTO attendance (member_id, date, status) VALUES (?, '2031-06-10', 'present')", (active,))
+    conn.commit()
+    conn.close()
+    return plan_id
+
+
+def test_retention_matrix(app, cohort_data):
+    report = CohortAnalytics.compute(app.config["DATABASE_PATH"], 12, TODAY)
+    cohorts = {row["cohort"]: row for row in report["cohorts"]}
+    assert list(cohorts)[0] == "2030-07" and list(cohorts)[-1] == "2031-06"
+
+    july = cohorts["2030-07"]
+    assert july["size"] == 4
+    assert july["retention"] == [1.0, 0.75] + [0.5] * 5 + [0.25] * 5
+
+    # Only months the cohort has lived through are reported
+    assert cohorts["2031-05"]["retention"] == [1.0, 1.0] + [None] * 10
+    assert cohorts["2031-06"] == {"cohort": "2031-06", "size": 0, "retention": [None] * 12}
+
+
+def test_plan_rates(app, cohort_data):
+    report = CohortAnalytics.compute(app.config["DATABASE_PATH"], 12, TODAY)
+    plans = {row["cohort"]: row for row in report["plans"]}
+    assert set(plans) == {"2030-07", "2031-05"}
+
+    july = plans["2030-07"]
+    assert july["plan_id"] == cohort_data
+    assert (july["size"], july["churn_rate"], july["renewal_rate"], july["active_rate"]) == (4, 0.75, 0.25, 0.25)
+    assert (july["retention_1"], july["retention_3"], july["retention_6"]) == (0.75, 0.5, 0.5)
+
+    may = plans["2031-05"]
+    assert (may["churn_rate"], may["retention_1"], may["retention_3"]) == (0.0, 1.0, None)
+
+
+def test_report_is_cached_for_the_day(app, cohort_data):
+    with app.app_context():
+        first = CohortAnalytics.get()
+        assert CohortAnalytics.get() is first
+        CohortAnalytics.invalidate()
+        assert CohortAnalytics.get() is not first
+
+
+def test_cohort_tab_renders(app, cohort_data):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=1, role="admin")
+    response = client.get("/admin/reports/cohorts")
+    assert response.status_code == 200
+    assert b"Month-N Retention" in response.data
+    assert b"/admin/reports/cohorts" in client.get("/admin/reports").data
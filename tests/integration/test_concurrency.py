@@ -0,0 +1,116 @@
+# tests/integration/test_concurrency.py
+"""Hammer the booking and payment endpoints from many threads against a
+production-profile database and make sure SQLite never reports a lock error."""
+import logging
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import database
+
+THREADS_PER_ROLE = 4
+BOOKINGS_PER_MEMBER = 8
+PAYMENTS_PER_THREAD = 10
+SLOTS = ["6:00 AM - 8:00 AM", "8:00 AM - 10:00 AM", "4:00 PM - 6:00 PM", "6:00 PM - 8:00 PM"]
+
+
+class _LockErrorCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.errors = []
+
+    def emit(self, record):
+        text = record.getMessage()
+        if record.exc_info:
+            text += " " + repr(record.exc_info[1])
+        if "locked" in text.lower():
+            self.errors.append(text)
+
+
+@pytest.fixture(params=[False, True], ids=["pooled-writers", "write-queue"])
+def stress_app(request, make_app):
+    app = make_app(DB_PROFILE="production", DB_WRITE_QUEUE="1" if request.param else "0")
+    app.config.update(SECRET_KEY="stress")
+    collector = _LockErrorCollector()
+    app.logger.addHandler(collector)
+    app.lock_errors = collector.errors
+    yield app
+    app.logger.removeHandler(collector)
+
+
+def _seed_pending_payments(app, count):
+    db_path = app.config["DATABASE_PATH"]
+    with app.app_context():
+        member_id, plan_id = database.execute_query(
+            "SELECT id, membership_plan_id FROM members ORDER BY id LIMIT 1", (), db_path, fetch=True)[0]
+        ids = []
+        for _ in range(count):
+            ids.append(database.execute_query(
+                "INSERT INTO payments (member_id, membership_plan_id, amount, payment_method, payment_status, due_date) "
+                "VALUES (?, ?, 999, 'cash', 'pending', DATE('now', '+10 day'))",
+                (member_id, plan_id), db_path))
+        # Members who can book every day of the run, starting from an empty calendar
+        members = database.execute_query(
+            "SELECT m.id, m.user_id FROM members m WHERE m.status = 'active' AND m.trainer_id IS NOT NULL "
+            "AND m.membership_end_date >= DATE('now', ?) ORDER BY m.id LIMIT ?",
+            (f"+{BOOKINGS_PER_MEMBER + 1} day", THREADS_PER_ROLE), db_path, fetch=True)
+        database.execute_query(
+            "DELETE FROM attendance WHERE date > DATE('now') AND date <= DATE('now', ?)",
+            (f"+{BOOKINGS_PER_MEMBER} day",), db_path)
+    return ids, [(row[0], row[1]) for row in members]
+
+
+def test_concurrent_bookings_and_payments_never_lock(stress_app):
+    payment_ids, members = _seed_pending_payments(stress_app, THREADS_PER_ROLE * PAYMENTS_PER_THREAD)
+    failures = []
+
+    def book(member_id, user_id, time_slot):
+        client = stress_app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(user_id=user_id, role="member", member_id=member_id)
+        for i in range(BOOKINGS_PER_MEMBER):
+            day = (date.today() + timedelta(days=i + 1)).isoformat()
+            resp = client.post("/member/schedule_session",
+                               data={"session_date": day, "time_slot": time_slot})
+            if resp.status_code != 302:
+                failures.append(("book", member_id, resp.status_code))
+
+    def pay(chunk):
+        client = stress_app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(user_id=1, role="admin")
+        for payment_id in chunk:
+            resp = client.post(f"/admin/payments/{payment_id}/update", data={"status": "completed"})
+            if resp.status_code != 302:
+                failures.append(("pay", payment_id, resp.status_code))
+
+    # One slot per member, so no booking is refused for a shared trainer being busy
+    assert len(members) == THREADS_PER_ROLE
+    threads = [threading.Thread(target=book, args=(*m, SLOTS[i])) for i, m in enumerate(members)]
+    threads += [
+        threading.Thread(target=pay, args=(payment_ids[i::THREADS_PER_ROLE],))
+        for i in range(THREADS_PER_ROLE)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert failures == []
+    assert stress_app.lock_errors == []
+
+    db_path = stress_app.config["DATABASE_PATH"]
+    with stress_app.app_context():
+        placeholders = ",".join("?" * len(payment_ids))
+        completed = database.execute_query(
+            f"SELECT COUNT(*) FROM payments WHERE payment_status = 'completed' AND id IN ({placeholders})",
+            payment_ids, db_path, fetch=True)[0][0]
+        booked = database.execute_query(
+            "SELECT COUNT(*) FROM attendance WHERE status = 'scheduled' AND date > DATE('now') "
+            "AND date <= DATE('now', ?)", (f"+{BOOKINGS_PER_MEMBER} day",), db_path, fetch=True)[0][0]
+        journal = database.execute_query("PRAGMA journal_mode", (), db_path, fetch=True)[0][0]
+    assert completed == len(payment_ids)
+    # A refused booking also redirects, so count the rows: every attempt must have booked
+    assert booked == THREADS_PER_ROLE * BOOKINGS_PER_MEMBER
+    assert journal == "wal"
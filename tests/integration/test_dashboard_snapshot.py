@@ -0,0 +1,96 @@
+# tests/integration/test_dashboard_snapshot.py
+"""The dashboard snapshot matches the per-model queries it replaced, is served
+from cache, and is invalidated by writes recorded in data_versions."""
+import sqlite3
+from datetime import date
+
+import pytest
+
+from app.models.attendance import Attendance
+from app.models.dashboard import DashboardSnapshot
+from app.models.equipment import Equipment
+from app.models.member import Member
+from app.models.payment import Payment
+from app.models.trainer import Trainer
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(app):
+    app.config.update(DASHBOARD_CACHE_SECONDS=60)
+    DashboardSnapshot.invalidate()
+    yield
+    DashboardSnapshot.invalidate()
+
+
+def test_snapshot_matches_model_queries(app):
+    today = date.today()
+    with app.app_context():
+        snapshot = DashboardSnapshot.get()
+        assert snapshot["total_members"] == Member.get_count_active()
+        assert snapshot["total_trainers"] == Trainer.get_count_active()
+        assert snapshot["today_attendance"] == Attendance.get_todays_attendance()
+        assert snapshot["total_revenue"] == Payment.get_revenue_stats()["total_revenue"]
+        assert snapshot["monthly_revenue"] == Payment.get_revenue_stats(year=today.year, month=today.month)["total_revenue"]
+        assert snapshot["pending_payments"] == len(Payment.get_pending_payments())
+        assert snapshot["working_equipment"] == Equipment.get_working_count()
+        assert snapshot["maintenance_equipment"] == Equipment.get_maintenance_count()
+        assert len(snapshot["announcements"]) <= 5
+
+
+def test_snapshot_is_cached_until_a_write(app, monkeypatch):
+    db_path = app.config["DATABASE_PATH"]
+    calls = []
+    compute = DashboardSnapshot.compute.__func__
+    monkeypatch.setattr(DashboardSnapshot, "compute",
+                        classmethod(lambda cls, *a, **k: calls.append(1) or compute(cls, *a, **k)))
+
+    with app.app_context():
+        first = DashboardSnapshot.get()
+        assert DashboardSnapshot.get() is first
+        assert len(calls) == 1
+
+        # A write from another connection bumps data_versions through the triggers
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE equipment SET status = 'maintenance' WHERE status = 'working'")
+        conn.commit()
+        conn.close()
+
+        second = DashboardSnapshot.get()
+        assert len(calls) == 2
+        assert second["working_equipment"] == 0
+        assert second["maintenance_equipment"] == first["maintenance_equipment"] + first["working_equipment"]
+
+
+def test_snapshot_cache_can_be_disabled(app):
+    app.config["DASHBOARD_CACHE_SECONDS"] = 0
+    with app.app_context():
+        assert DashboardSnapshot.get() is not DashboardSnapshot.get()
+
+
+def test_metrics_endpoint_conditional_get(app, monkeypatch):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=1, role="admin")
+
+    response = client.get("/admin/api/metrics")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+    assert response.get_json()["metrics"]["working_equipment"] >= 0
+
+    # Unchanged data: 304 without building a snapshot
+    DashboardSnapshot.invalidate()
+    with monkeypatch.context() as patched:
+        patched.setattr(DashboardSnapshot, "compute", classmethod(lambda cls, *a, **k: pytest.fail("computed")))
+        response = client.get("/admin/api/metrics", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    conn.execute("UPDATE equipment SET status = 'maintenance'")
+    conn.commit()
+    conn.close()
+    response = client.get("/admin/api/metrics", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["metrics"]["working_equipment"] == 0
@@ -0,0 +1,66 @@
+# tests/integration/test_date_queries.py
+"""Date filters are half-open ranges on ISO text columns, so they can use
+the indexes; legacy timestamp-style values are normalized on upgrade."""
+import sqlite3
+from pathlib import Path
+
+from app.models import database
+from app.models.attendance import Attendance
+from app.models.payment import Payment
+
+ADVISOR_PATH = Path(__file__).resolve().parents[2] / "app" / "scripts" / "index_advisor.py"
+REPORT_FUNCTIONS = {"get_monthly_stats", "get_expiring_soon", "get_statistics", "get_revenue_stats", "reports"}
+
+
+def test_report_date_filters_use_indexes(app, load_module_from_path):
+    advisor = load_module_from_path(ADVISOR_PATH, name="index_advisor")
+    scans, _ = advisor.analyse(app.config["DATABASE_PATH"])
+    date_scans = [
+        (location, sql) for location, _, sql in scans
+        if location.split("(")[-1].rstrip(")") in REPORT_FUNCTIONS and "date" in sql.lower()
+    ]
+    assert date_scans == []
+
+
+def test_month_filters_include_boundaries(app):
+    db_path = app.config["DATABASE_PATH"]
+    conn = sqlite3.connect(db_path)
+    member_id, trainer_id, plan_id = conn.execute(
+        "SELECT id, trainer_id, membership_plan_id FROM members LIMIT 1").fetchone()
+    conn.execute("DELETE FROM attendance")
+    conn.execute("DELETE FROM payments")
+    for day in ("2020-01-31", "2020-02-01", "2020-02-29", "2020-03-01"):
+        conn.execute("INSERT INTO attendance (member_id, trainer_id, date, status) VALUES (?, ?, ?, 'present')",
+                     (member_id, trainer_id, day))
+        conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                     "VALUES (?, ?, 10, 'completed', ?)", (member_id, plan_id, day))
+    conn.commit()
+    conn.close()
+
+    with app.app_context():
+        assert Attendance.get_monthly_stats(2020, 2)["total_sessions"] == 2
+        assert Payment.get_revenue_stats(year=2020, month=2)["total_payments"] == 2
+        assert Payment.get_revenue_stats(year=2020)["total_payments"] == 4
+
+
+def test_upgrade_normalizes_legacy_dates(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE payments (id INTEGER PRIMARY KEY, member_id INTEGER, amount REAL, created_at TEXT, "
+                 "payment_status TEXT, payment_date TEXT, due_date TEXT)")
+    # time_slot_id is added by init_db before the index pack runs
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, member_id INTEGER, trainer_id INTEGER, "
+                 "date TEXT, time_slot TEXT, time_slot_id INTEGER)")
+    conn.execute("CREATE TABLE members (id INTEGER PRIMARY KEY, user_id INTEGER, trainer_id INTEGER, created_at TEXT, "
+                 "membership_start_date TEXT, membership_end_date TEXT)")
+    conn.execute("INSERT INTO payments (payment_date, due_date) VALUES ('2024-05-01 10:30:00', 'soon')")
+    conn.execute("INSERT INTO attendance (date) VALUES ('2024-05-02T07:00:00')")
+    conn.execute("INSERT INTO members (membership_start_date, membership_end_date) VALUES ('2024-05-03', NULL)")
+    conn.execute("PRAGMA user_version = 1")  # indexes already applied, date fixes pending
+
+    database.apply_indexes(conn.cursor())
+    conn.commit()
+    assert conn.execute("SELECT payment_date, due_date FROM payments").fetchone() == ("2024-05-01", "soon")
+    assert conn.execute("SELECT date FROM attendance").fetchone() == ("2024-05-02",)
+    assert conn.execute("SELECT membership_start_date, membership_end_date FROM members").fetchone() == ("2024-05-03", None)
+    conn.close()
@@ -0,0 +1,70 @@
+# tests/integration/test_forecast.py
+"""Weekly renewal revenue forecast on a controlled plan, and its JSON endpoint."""
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models.forecast import RevenueForecast, add_months
+
+TODAY = date(2031, 6, 15)
+
+
+def _add_member(conn, plan_id, end, status="active", payments=0):
+    member_id = conn.execute(
+        "INSERT INTO members (membership_plan_id, phone, membership_start_date, membership_end_date, status) "
+        "VALUES (?, '000', '2030-01-01', ?, ?)", (plan_id, end, status)).lastrowid
+    for _ in range(payments):
+        conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                     "VALUES (?, ?, 100, 'completed', '2030-01-01')", (member_id, plan_id))
+    return member_id
+
+
+@pytest.fixture
+def plan_id(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    plan_id = conn.execute("INSERT INTO membership_plans (name, duration_months, price) "
+                           "VALUES ('Monthly Test', 1, 100)").lastrowid
+    # History: three members renewed once and then lapsed -> 3 renewals, 3 lapses
+    for _ in range(3):
+        _add_member(conn, plan_id, "2031-01-01", payments=2)
+    _add_member(conn, plan_id, "2031-06-20", payments=1)                 # renews from next week
+    _add_member(conn, plan_id, "2031-06-20", status="inactive")          # not forecast
+    _add_member(conn, plan_id, "2032-06-20", payments=1)                 # ends after the horizon
+    conn.commit()
+    conn.close()
+    return plan_id
+
+
+def test_add_months_clamps_to_month_end():
+    days = np.array(["2031-01-31", "2031-06-20", "2032-01-31"], dtype="datetime64[D]")
+    assert add_months(days, np.array([1, 3, 1])).astype(str).tolist() == ["2031-02-28", "2031-09-20", "2032-02-29"]
+
+
+def test_expected_revenue_per_week(app, plan_id):
+    forecast = RevenueForecast.compute(app.config["DATABASE_PATH"], 26, TODAY)
+    plan = next(p for p in forecast["plans"] if p["plan_id"] == plan_id)
+    assert plan["renewal_probability"] == 0.5
+
+    weeks = forecast["weeks"]
+    assert len(weeks) == 26 and weeks[0]["week_start"] == "2031-06-15"
+    # Renews on the 20th of each month with probability 0.5, 0.25, 0.125, ...
+    assert weeks[0]["expected_revenue"] == 50.0 and weeks[0]["expected_renewals"] == 0.5
+    assert weeks[5]["expected_revenue"] == 25.0   # 2031-07-20
+    assert weeks[9]["expected_revenue"] == 12.5   # 2031-08-20
+    # Six renewals (Jun-Nov) fall inside 26 weeks; December's does not
+    assert plan["expected_revenue"] == 98.44
+
+
+def test_forecast_endpoint(app, plan_id):
+    client = app.test_client()
+    assert client.get("/admin/api/revenue-forecast").status_code == 302  # login required
+
+    with client.session_transaction() as sess:
+        sess.update(user_id=1, role="admin")
+    response = client.get("/admin/api/revenue-forecast?weeks=26")
+    assert response.status_code == 200
+    assert len(response.get_json()["weeks"]) == 26
+    assert client.get("/admin/api/revenue-forecast?weeks=4").status_code == 400
+    assert b"forecastChart" in client.get("/admin/reports").data
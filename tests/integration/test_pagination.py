@@ -0,0 +1,138 @@
+# tests/integration/test_pagination.py
+"""Keyset pagination of attendance and payment history: walking every page
+returns each row once in order, cursors are validated and the page queries
+read their indexes without a sort."""
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import database
+from app.models.attendance import Attendance
+from app.models.payment import Payment
+from app.utils.pagination import decode_cursor, encode_cursor
+
+ROWS = 95
+
+
+@pytest.fixture
+def member(app):
+    """A member with ROWS attendance rows and ROWS payments, several sharing a sort key"""
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    trainer_id = conn.execute("SELECT id FROM trainers WHERE status = 'active' ORDER BY id LIMIT 1").fetchone()[0]
+    plan_id = conn.execute("SELECT id FROM membership_plans ORDER BY id LIMIT 1").fetchone()[0]
+    user_id = conn.execute(
+        "INSERT INTO users (username, email, password_hash, role, full_name) "
+        "VALUES ('pager', 'pager@example.com', 'x', 'member', 'Pager')").lastrowid
+    member_id = conn.execute(
+        "INSERT INTO members (user_id, phone, status, membership_start_date, membership_end_date, trainer_id) "
+        "VALUES (?, '0', 'active', DATE('now', '-1 year'), DATE('now', '+1 year'), ?)",
+        (user_id, trainer_id)).lastrowid
+    start = date.today() - timedelta(days=ROWS)
+    for i in range(ROWS):
+        day = (start + timedelta(days=i // 3)).isoformat()  # three rows per date
+        conn.execute("INSERT INTO attendance (member_id, trainer_id, date, time_slot, status) "
+                     "VALUES (?, ?, ?, '6:00 PM - 8:00 PM', 'present')", (member_id, trainer_id, day))
+        conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, created_at) "
+                     "VALUES (?, ?, 10, 'completed', ?)", (member_id, plan_id, f"{day} 10:00:00"))
+    conn.commit()
+    conn.close()
+    return user_id, member_id
+
+
+def _walk(fetch):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = fetch(cursor)
+        rows.extend(page.items)
+        pages += 1
+        if not page.has_more:
+            return rows, pages
+        cursor = page.next_cursor
+
+
+def test_attendance_pages_cover_history_once(app, member):
+    _, member_id = member
+    with app.app_context():
+        rows, pages = _walk(lambda c: Attendance.get_member_attendance_page(member_id, c, limit=20))
+        everything = Attendance.get_member_attendance(member_id, limit=ROWS * 2)
+    assert pages == 5
+    assert [r.id for r in rows] == sorted({r.id for r in rows}, key=lambda i: -i)
+    assert len(rows) == len(everything) == ROWS
+    assert [r.date for r in rows] == [r.date for r in everything]
+
+
+def test_payment_pages_cover_history_once(app, member):
+    _, member_id = member
+    with app.app_context():
+        mine, _ = _walk(lambda c: Payment.get_member_payments_page(member_id, c, limit=30))
+        everyone, _ = _walk(lambda c: Payment.get_all_with_details_page(c, limit=40))
+        total = len(Payment.get_all_with_details())
+    assert len(mine) == len({p.id for p in mine}) == ROWS
+    keys = [(p.created_at, p.id) for p in mine]
+    assert keys == sorted(keys, reverse=True)
+    assert all(p.plan_name for p in mine)
+    assert len(everyone) == len({p.id for p in everyone}) == total
+    assert all(p.member_name for p in everyone)
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor("2024-01-02", 7)) == ("2024-01-02", 7)
+    assert decode_cursor(None) is None
+    for bad in ("garbage!", encode_cursor(1, 2), "W10"):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT id FROM attendance a WHERE a.member_id = 1 AND (a.date, a.id) < ('2024-01-01', 5) "
+    "ORDER BY a.date DESC, a.id DESC LIMIT 21",
+    "SELECT id FROM payments p WHERE p.member_id = 1 AND (p.created_at, p.id) < ('2024-01-01', 5) "
+    "ORDER BY p.created_at DESC, p.id DESC LIMIT 21",
+    "SELECT id FROM payments p WHERE (p.created_at, p.id) < ('2024-01-01', 5) "
+    "ORDER BY p.created_at DESC, p.id DESC LIMIT 21",
+])
+def test_page_queries_do_not_sort(app, query):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+    conn.close()
+    assert "USING" in plan and "TEMP B-TREE" not in plan
+
+
+def test_history_pages_render(app, member):
+    user_id, member_id = member
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member_id)
+
+    resp = client.get("/member/attendance")
+    assert resp.status_code == 200 and b"cursor=" in resp.data
+    with app.app_context():
+        cursor = Attendance.get_member_attendance_page(member_id).next_cursor
+    assert client.get(f"/member/attendance?cursor={cursor}").status_code == 200
+    assert client.get("/member/attendance?cursor=garbage!").status_code == 302
+    assert client.get("/member/payments").status_code == 200
+    assert client.get("/member/payments?cursor=garbage!").status_code == 302
+
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    admin_id = conn.execute("SELECT id FROM users WHERE role = 'admin' LIMIT 1").fetchone()[0]
+    conn.close()
+    with client.session_transaction() as sess:
+        sess.clear()
+        sess.update(user_id=admin_id, role="admin")
+    resp = client.get("/admin/payments?per_page=10")
+    assert resp.status_code == 200 and b"cursor=" in resp.data
+
+
+def test_upgrade_backfills_payment_created_at(app):
+    db_path = app.config["DATABASE_PATH"]
+    conn = sqlite3.connect(db_path)
+    payment_id = conn.execute(
+        "INSERT INTO payments (member_id, membership_plan_id, amount, payment_date, created_at) "
+        "SELECT id, membership_plan_id, 10, '2020-01-05', NULL FROM members LIMIT 1").lastrowid
+    conn.execute("DELETE FROM schema_version")
+    conn.commit()
+    with app.app_context():
+        database.init_db(db_path)
+    assert conn.execute("SELECT created_at FROM payments WHERE id = ?", (payment_id,)).fetchone() == ("2020-01-05",)
+    conn.close()
@@ -0,0 +1,125 @@
+# tests/integration/test_rollups.py
+"""daily_revenue / daily_attendance / member_attendance_stats stay equal to
+aggregates over the raw rows through inserts, status changes, date moves and
+deletes, and can be rebuilt."""
+import sqlite3
+
+from app.models import database
+from app.models.attendance import Attendance
+from app.models.member import Member
+
+RAW_REVENUE = '''SELECT payment_date, SUM(amount), COUNT(*) FROM payments
+                 WHERE payment_status = 'completed' AND payment_date IS NOT NULL
+                 GROUP BY payment_date ORDER BY payment_date'''
+RAW_ATTENDANCE = '''SELECT date, SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'late'),
+                           SUM(status = 'scheduled')
+                    FROM attendance GROUP BY date ORDER BY date'''
+RAW_MEMBER_STATS = '''SELECT member_id, SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'late'), COUNT(*)
+                      FROM attendance GROUP BY member_id ORDER BY member_id'''
+
+
+def _rollups(conn):
+    revenue = conn.execute("SELECT day, total, payments FROM daily_revenue WHERE payments <> 0 ORDER BY day").fetchall()
+    attendance = conn.execute(
+        "SELECT day, present, absent, late, scheduled FROM daily_attendance "
+        "WHERE present + absent + late + scheduled <> 0 ORDER BY day").fetchall()
+    members = conn.execute(
+        "SELECT member_id, present, absent, late, total FROM member_attendance_stats WHERE total <> 0 "
+        "ORDER BY member_id").fetchall()
+    return revenue, attendance, members
+
+
+def _raw(conn):
+    return (conn.execute(RAW_REVENUE).fetchall(), conn.execute(RAW_ATTENDANCE).fetchall(),
+            conn.execute(RAW_MEMBER_STATS).fetchall())
+
+
+def test_rollups_track_writes(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    assert _rollups(conn) == _raw(conn)  # seeded history was rolled up as it was inserted
+
+    member_id, plan_id = conn.execute("SELECT id, membership_plan_id FROM members LIMIT 1").fetchone()
+    conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                 "VALUES (?, ?, 250, 'pending', '2021-03-04')", (member_id, plan_id))
+    conn.execute("UPDATE payments SET payment_status = 'completed' WHERE payment_date = '2021-03-04'")
+    conn.execute("UPDATE payments SET payment_date = '2021-03-05', amount = 300 WHERE payment_date = '2021-03-04'")
+    conn.execute("DELETE FROM payments WHERE id = (SELECT MIN(id) FROM payments WHERE payment_status = 'completed')")
+    conn.execute("INSERT INTO attendance (member_id, date) VALUES (?, '2021-03-05')", (member_id,))
+    conn.execute("UPDATE attendance SET status = 'present' WHERE date = '2021-03-05'")
+    conn.execute("UPDATE attendance SET date = '2021-03-06' WHERE date = '2021-03-05'")
+    conn.execute("DELETE FROM attendance WHERE id = (SELECT MIN(id) FROM attendance)")
+    other = conn.execute("SELECT MAX(id) FROM members").fetchone()[0]
+    conn.execute("UPDATE attendance SET member_id = ?, status = 'late' WHERE date = '2021-03-06'", (other,))
+    conn.commit()
+
+    assert _rollups(conn) == _raw(conn)
+    assert conn.execute("SELECT total FROM daily_revenue WHERE day = '2021-03-05'").fetchone() == (300,)
+    conn.close()
+
+
+def test_rebuild_rollups_command(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    conn.execute("UPDATE daily_revenue SET total = total + 1")
+    conn.execute("DELETE FROM daily_attendance")
+    conn.execute("UPDATE member_attendance_stats SET present = present + 5")
+    conn.commit()
+
+    result = app.test_cli_runner().invoke(args=["rebuild-rollups"])
+    assert result.exit_code == 0, result.output
+    assert _rollups(conn) == _raw(conn)
+    conn.close()
+
+
+def test_upgrade_backfills_rollups(tmp_path):
+    db_path = str(tmp_path / "upgrade.db")
+    database.init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO payments (member_id, membership_plan_id, amount, payment_status, payment_date) "
+                 "VALUES (1, 1, 40, 'completed', '2022-01-01')")
+    # Simulate a database from before the rollups existed
+    conn.execute("DROP TABLE daily_revenue")
+    conn.execute("DROP TABLE daily_attendance")
+    conn.execute("DROP TABLE member_attendance_stats")
+    conn.execute("DELETE FROM schema_version")
+    conn.commit()
+    conn.close()
+
+    assert database.ensure_schema(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT day, total, payments FROM daily_revenue").fetchall() == [("2022-01-01", 40, 1)]
+    conn.close()
+
+
+def test_member_pages_read_member_stats(app):
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    member_id, user_id, trainer_id = conn.execute(
+        "SELECT id, user_id, trainer_id FROM members WHERE status = 'active' AND trainer_id IS NOT NULL "
+        "ORDER BY id LIMIT 1").fetchone()
+    conn.execute("DELETE FROM attendance WHERE member_id = ?", (member_id,))
+    # January: 28 present; February: 12 present, 10 absent, 2 late
+    statuses = [("2021-01", "present")] * 28 + [("2021-02", "present")] * 12 + [("2021-02", "absent")] * 10 + \
+        [("2021-02", "late")] * 2
+    days = {}
+    rows = []
+    for month, status in statuses:
+        days[month] = days.get(month, 0) + 1
+        rows.append((member_id, trainer_id, f"{month}-{days[month]:02d}", status))
+    conn.executemany("INSERT INTO attendance (member_id, trainer_id, date, status) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    with app.app_context():
+        stats = Attendance.get_member_stats(member_id)
+        assert stats == {"present": 40, "absent": 10, "late": 2, "total": 52}
+        assert Attendance.get_member_attendance_percentage(member_id) == 80.0
+        assert Attendance.get_member_attendance_percentage(member_id, "2021-01-31") == 100.0
+        assert Attendance.get_member_stats(99999) == {"present": 0, "absent": 0, "late": 0, "total": 0}
+        clients = {c.id: c for c in Member.get_trainer_clients_detailed(trainer_id)}
+        assert clients[member_id].attendance_rate == 80.0
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member_id)
+    page = client.get("/member/attendance")
+    assert page.status_code == 200
+    assert b"52" in page.data and b"76.9%" in page.data  # 40 of 52 marked sessions
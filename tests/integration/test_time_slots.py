@@ -0,0 +1,107 @@
+# tests/integration/test_time_slots.py
+"""The time_slots catalog: seeded defaults, per-trainer/per-day overrides,
+bookings by slot id and overlap checks on slot minutes."""
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from app.models.attendance import Attendance, fill_slot_end_times
+from app.models.time_slot import TimeSlot, slot_catalog
+from app.models.trainer import Trainer
+
+
+def test_defaults_are_seeded(app):
+    with app.app_context():
+        slots = slot_catalog().for_trainer_day()
+    assert [s.label for s in slots[:2]] == ["6:00 AM - 8:00 AM", "8:00 AM - 10:00 AM"]
+    assert (slots[-1].start_minute, slots[-1].end_minute) == (1200, 1320)
+    assert len(slots) == 8
+
+
+def test_overrides_take_precedence_and_refresh_the_cache(app):
+    day = date(2030, 1, 7)  # a Monday
+    with app.app_context():
+        default = [s.id for s in slot_catalog().for_trainer_day(1, day)]
+        TimeSlot(start_minute=420, end_minute=480, trainer_id=1).save()
+        monday = TimeSlot(start_minute=600, end_minute=660, weekday=0).save()
+        both = TimeSlot(start_minute=900, end_minute=990, trainer_id=1, weekday=0).save()
+        catalog = slot_catalog()
+
+        assert [s.id for s in catalog.for_trainer_day(1, day)] == [both]
+        assert [s.label for s in catalog.for_trainer_day(1, day + timedelta(days=1))] == ["7:00 AM - 8:00 AM"]
+        assert [s.id for s in catalog.for_trainer_day(2, day)] == [monday]
+        assert [s.id for s in catalog.for_trainer_day(2, day + timedelta(days=1))] == default
+        # Only slots offered that day resolve
+        assert catalog.resolve(both, 1, day).label == "3:00 PM - 4:30 PM"
+        assert catalog.resolve(monday, 1, day) is None
+
+
+def test_booking_by_slot_id(app, active_member):
+    member_id, user_id, trainer_id = active_member
+    day = date.today() + timedelta(days=3)
+    with app.app_context():
+        slot = slot_catalog().resolve("4:00 PM - 6:00 PM")
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, role="member", member_id=member_id)
+    page = client.get("/member/schedule_session")
+    assert f'value="{slot.id}"'.encode() in page.data
+
+    resp = client.post("/member/schedule_session", data={"session_date": day.isoformat(), "time_slot": str(slot.id)})
+    assert resp.status_code == 302
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    row = conn.execute("SELECT time_slot, time_slot_id, check_in_time, slot_end_at FROM attendance "
+                       "WHERE member_id = ? AND date = ?", (member_id, day.isoformat())).fetchone()
+    conn.close()
+    assert row == ("4:00 PM - 6:00 PM", slot.id, f"{day.isoformat()}T16:00:00", f"{day.isoformat()}T18:00:00")
+
+
+def test_availability_compares_slot_minutes(app, active_member):
+    member_id, _, trainer_id = active_member
+    day = date.today() + timedelta(days=5)
+    with app.app_context():
+        early = TimeSlot(start_minute=420, end_minute=540, trainer_id=trainer_id).save()  # 7-9 AM
+        Attendance(member_id=member_id, trainer_id=trainer_id, date=day, time_slot_id=early,
+                   status="scheduled").save()
+        catalog = slot_catalog()
+        six_to_eight = catalog.resolve("6:00 AM - 8:00 AM")
+        ten_to_twelve = catalog.resolve("10:00 AM - 12:00 PM")
+
+        assert not Attendance.check_slot_availability(trainer_id, six_to_eight, day)
+        assert Attendance.check_slot_availability(trainer_id, ten_to_twelve, day)
+        assert trainer_id not in {t.id for t in Trainer.get_available_for_slot(six_to_eight.id, day)}
+        assert trainer_id in {t.id for t in Trainer.get_available_for_slot(ten_to_twelve.id, day)}
+
+
+def test_end_times_filled_from_slot_minutes(app, active_member):
+    member_id, _, trainer_id = active_member
+    db_path = app.config["DATABASE_PATH"]
+    conn = sqlite3.connect(db_path)
+    slot_id = conn.execute("SELECT id FROM time_slots WHERE start_minute = 1200").fetchone()[0]
+    row_id = conn.execute(
+        "INSERT INTO attendance (member_id, trainer_id, date, time_slot_id, status) VALUES (?, ?, '2030-03-01', ?, "
+        "'scheduled')", (member_id, trainer_id, slot_id)).lastrowid
+    conn.commit()
+    with app.app_context():
+        assert fill_slot_end_times(db_path) >= 1
+        assert Attendance.auto_mark_absent(now=datetime(2030, 3, 1, 21, 59)) == 0
+    assert conn.execute("SELECT slot_end_at FROM attendance WHERE id = ?", (row_id,)).fetchone() == (
+        "2030-03-01T22:00:00",)
+    conn.close()
+
+
+def test_todays_schedule_is_in_slot_order(app, active_member):
+    member_id, user_id, trainer_id = active_member
+    today = date.today().isoformat()
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    conn.execute("DELETE FROM attendance WHERE trainer_id = ? AND date = ?", (trainer_id, today))
+    for start in (1200, 360):
+        conn.execute("INSERT INTO attendance (member_id, trainer_id, date, time_slot, time_slot_id, status) "
+                     "SELECT ?, ?, ?, label, id, 'scheduled' FROM time_slots WHERE start_minute = ? "
+                     "AND trainer_id IS NULL", (member_id, trainer_id, today, start))
+    name = conn.execute("SELECT full_name FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    conn.commit()
+    conn.close()
+    with app.app_context():
+        schedule = Trainer.get_by_id(trainer_id).get_todays_schedule()
+    assert [tuple(row) for row in schedule] == [
+        ("6:00 AM - 8:00 AM", name, "scheduled"), ("8:00 PM - 10:00 PM", name, "scheduled")]
@@ -0,0 +1,86 @@
+# tests/integration/test_transactions.py
+"""Multi-statement model operations run as one unit of work: when any step
+fails, the database is left exactly as it was."""
+import sqlite3
+
+from app.models import database
+from app.models.member import Member
+from app.models.time_slot import TimeSlot
+from app.models.trainer import Trainer
+
+
+def _member_footprint(db_path, member):
+    conn = sqlite3.connect(db_path)
+    counts = {
+        "members": conn.execute("SELECT COUNT(*) FROM members WHERE id = ?", (member.id,)).fetchone()[0],
+        "users": conn.execute("SELECT COUNT(*) FROM users WHERE id = ?", (member.user_id,)).fetchone()[0],
+        "payments": conn.execute("SELECT COUNT(*) FROM payments WHERE member_id = ?", (member.id,)).fetchone()[0],
+        "attendance": conn.execute("SELECT COUNT(*) FROM attendance WHERE member_id = ?", (member.id,)).fetchone()[0],
+        "diet_plan_meals": conn.execute(
+            "SELECT COUNT(*) FROM diet_plan_meals WHERE diet_plan_id IN "
+            "(SELECT id FROM diet_plans WHERE member_id = ?)", (member.id,)).fetchone()[0],
+        "workout_plan_details": conn.execute(
+            "SELECT COUNT(*) FROM workout_plan_details WHERE plan_id IN "
+            "(SELECT id FROM member_workout_plans WHERE member_id = ?)", (member.id,)).fetchone()[0],
+    }
+    conn.close()
+    return counts
+
+
+def _seeded_member(app):
+    with app.app_context():
+        row = database.execute_query(
+            "SELECT m.id FROM members m JOIN diet_plans d ON d.member_id = m.id "
+            "JOIN member_workout_plans w ON w.member_id = m.id ORDER BY m.id LIMIT 1",
+            (), app.config["DATABASE_PATH"], fetch=True)
+        return Member.get_by_id(row[0][0])
+
+
+def test_member_hard_delete_removes_history(app):
+    db_path = app.config["DATABASE_PATH"]
+    member = _seeded_member(app)
+    with app.app_context():
+        assert member.hard_delete() is True
+    assert set(_member_footprint(db_path, member).values()) == {0}
+
+
+def test_member_hard_delete_failure_rolls_back_everything(app):
+    db_path = app.config["DATABASE_PATH"]
+    member = _seeded_member(app)
+    before = _member_footprint(db_path, member)
+    assert before["payments"] and before["diet_plan_meals"]
+
+    # Make the very last step (deleting the login) fail
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TRIGGER block_user_delete BEFORE DELETE ON users "
+                 "BEGIN SELECT RAISE(ABORT, 'users are protected'); END")
+    conn.commit()
+    conn.close()
+
+    with app.app_context():
+        assert member.hard_delete() is False
+    assert _member_footprint(db_path, member) == before
+
+
+def test_trainer_hard_delete_detaches_members(app):
+    db_path = app.config["DATABASE_PATH"]
+    with app.app_context():
+        trainer_id = database.execute_query(
+            "SELECT trainer_id FROM members WHERE trainer_id IS NOT NULL LIMIT 1", (), db_path, fetch=True)[0][0]
+        trainer = Trainer.get_by_id(trainer_id)
+        assert trainer.hard_delete() is True
+        assert database.execute_query(
+            "SELECT COUNT(*) FROM members WHERE trainer_id = ?", (trainer_id,), db_path, fetch=True)[0][0] == 0
+        assert Trainer.get_by_id(trainer_id) is None
+
+
+def test_trainer_hard_delete_removes_slot_overrides(app):
+    db_path = app.config["DATABASE_PATH"]
+    with app.app_context():
+        trainer_id = database.execute_query(
+            "SELECT trainer_id FROM members WHERE trainer_id IS NOT NULL LIMIT 1", (), db_path, fetch=True)[0][0]
+        TimeSlot(start_minute=420, end_minute=480, trainer_id=trainer_id).save()
+        assert Trainer.get_by_id(trainer_id).hard_delete() is True
+        assert Trainer.get_by_id(trainer_id) is None
+        assert database.execute_query(
+            "SELECT COUNT(*) FROM time_slots WHERE trainer_id = ?", (trainer_id,), db_path, fetch=True)[0][0] == 0
@@ -0,0 +1,29 @@
+# tests/unit/test_cli.py
+import sqlite3
+
+from app.app import create_app
+from app.models import database
+
+
+def test_seed_db_command_populates_empty_database(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "cli.db")
+    monkeypatch.setenv("DATABASE_PATH", db_path)
+    app = create_app()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=["seed-db"])
+    assert result.exit_code == 0, result.output
+    conn = sqlite3.connect(db_path)
+    admins = conn.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'").fetchone()[0]
+    conn.close()
+    assert admins == 1
+
+    # Seeding is idempotent
+    runner.invoke(args=["seed-db"])
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'").fetchone()[0] == 1
+    conn.close()
+
+    result = runner.invoke(args=["init-db"])
+    assert f"already at version {database.SCHEMA_VERSION}" in result.output
+    database.close_pools()
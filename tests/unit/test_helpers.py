@@ -36,3 +36,16 @@ def test_get_bmi_category_defined_ranges():
     assert helpers.get_bmi_category(22.0) == "Normal weight"
     assert helpers.get_bmi_category(27.0) == "Overweight"
     assert helpers.get_bmi_category(32.0) == "Obese"
+
+def test_month_and_year_bounds_are_half_open():
+    assert helpers.month_bounds(2024, 2) == ("2024-02-01", "2024-03-01")
+    assert helpers.month_bounds(2024, 12) == ("2024-12-01", "2025-01-01")
+    assert helpers.year_bounds(2023) == ("2023-01-01", "2024-01-01")
+    assert helpers.days_from_today(7, today=date(2024, 1, 30)) == ("2024-01-30", "2024-02-07")
+
+def test_to_iso_date_normalizes_common_forms():
+    from datetime import datetime
+    assert helpers.to_iso_date(date(2024, 5, 1)) == "2024-05-01"
+    assert helpers.to_iso_date(datetime(2024, 5, 1, 13, 45)) == "2024-05-01"
+    assert helpers.to_iso_date("2024-05-01 13:45:00") == "2024-05-01"
+    assert helpers.to_iso_date(None) is None
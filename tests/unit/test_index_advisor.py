@@ -0,0 +1,76 @@
+# tests/unit/test_index_advisor.py
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+ADVISOR_PATH = Path(__file__).resolve().parents[2] / "app" / "scripts" / "index_advisor.py"
+
+
+@pytest.fixture
+def advisor(load_module_from_path):
+    return load_module_from_path(ADVISOR_PATH, name="index_advisor")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "advisor.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, member_id INTEGER, date TEXT, status TEXT)")
+    conn.execute("CREATE INDEX idx_attendance_member_date ON attendance (member_id, date)")
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_find_sql_strings_skips_prose(advisor, tmp_path):
+    src = tmp_path / "model.py"
+    src.write_text(
+        "def load():\n"
+        "    q = 'SELECT * FROM attendance WHERE member_id = ?'\n"
+        "    msg = 'Update status failed'\n"
+    )
+    found = list(advisor.find_sql_strings(src))
+    assert found == [(2, "load", "SELECT * FROM attendance WHERE member_id = ?")]
+
+
+def test_analyse_reports_only_unindexed_scans(advisor, db_path, tmp_path):
+    src = tmp_path / "model.py"
+    src.write_text(
+        "def by_member():\n"
+        "    return 'SELECT * FROM attendance a WHERE a.member_id = ? AND a.date = ?'\n"
+        "def by_status():\n"
+        "    return \"SELECT * FROM attendance WHERE status = 'scheduled'\"\n"
+        "def broken():\n"
+        "    return 'SELECT * FROM missing_table'\n"
+    )
+    scans, errors = advisor.analyse(db_path, sources=[src], ignored_tables=set())
+    assert [(loc.split(" ")[-1], tables) for loc, tables, _ in scans] == [("(by_status)", ["attendance"])]
+    assert len(errors) == 1 and "missing_table" in errors[0][1]
+
+
+def test_find_sql_strings_plans_fstring_select_lists(advisor, tmp_path):
+    src = tmp_path / "model.py"
+    src.write_text(
+        "def load():\n"
+        "    return f'SELECT {MAPPER.select} FROM attendance WHERE member_id = ?'\n"
+    )
+    found = list(advisor.find_sql_strings(src))
+    assert found == [(2, "load", "SELECT * FROM attendance WHERE member_id = ?")]
+
+
+def test_analyse_plans_interpolated_clauses(advisor, db_path, tmp_path):
+    src = tmp_path / "model.py"
+    src.write_text(
+        "JOIN = 'JOIN attendance b ON b.id = a.id'\n"
+        "BY_MEMBER = '''SELECT id FROM attendance WHERE member_id IN ({placeholders})'''\n"
+        "def page(after):\n"
+        "    return f'SELECT {COLS} FROM attendance a {JOIN} WHERE a.member_id = ? {after} ORDER BY a.date'\n"
+        "def by_status(status_filter):\n"
+        "    return f\"SELECT id FROM attendance WHERE {status_filter}status = 'x'\"\n"
+    )
+    scans, errors = advisor.analyse(db_path, sources=[src], ignored_tables=set())
+    assert errors == []
+    assert [(loc.split(" ")[-1], tables) for loc, tables, _ in scans] == [("(by_status)", ["attendance"])]
+    # Module-level constants are substituted, not stood in for
+    assert "a JOIN attendance b ON b.id = a.id WHERE" in list(advisor.find_sql_strings(src))[1][2]
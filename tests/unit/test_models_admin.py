@@ -44,18 +44,12 @@ def setup_admin_route_test(monkeypatch):
 
 def test_dashboard_renders(monkeypatch, flask_app):
     """Ensure /admin/dashboard renders without crashing."""
-    monkeypatch.setattr(admin_routes.Payment, "process_pending_payments", staticmethod(lambda **k: None))
-    monkeypatch.setattr(admin_routes.Member, "get_count_active", staticmethod(lambda: 10))
-    monkeypatch.setattr(admin_routes.Trainer, "get_count_active", staticmethod(lambda: 5))
-    monkeypatch.setattr(admin_routes.Attendance, "get_todays_attendance", staticmethod(lambda: 7))
-    monkeypatch.setattr(admin_routes.Payment, "get_revenue_stats", staticmethod(lambda **k: {"total_revenue": 1000}))
-    monkeypatch.setattr(admin_routes.Payment, "get_pending_payments", staticmethod(lambda: []))
-    monkeypatch.setattr(admin_routes.Equipment, "get_working_count", staticmethod(lambda: 2))
-    monkeypatch.setattr(admin_routes.Equipment, "get_maintenance_count", staticmethod(lambda: 1))
-    monkeypatch.setattr(admin_routes.Member, "get_recent", staticmethod(lambda n: []))
-    monkeypatch.setattr(admin_routes.Payment, "get_recent", staticmethod(lambda n: []))
-    monkeypatch.setattr(admin_routes.Member, "get_expiring_soon", staticmethod(lambda n: []))
-    monkeypatch.setattr(admin_routes.Announcement, "get_all", staticmethod(lambda: []))
+    snapshot = dict(
+        total_members=10, total_trainers=5, today_attendance=7, total_revenue=1000,
+        monthly_revenue=1000, pending_payments=0, working_equipment=2, maintenance_equipment=1,
+        recent_members=[], recent_payments=[], expiring_memberships=[], announcements=[],
+    )
+    monkeypatch.setattr(admin_routes.DashboardSnapshot, "get", staticmethod(lambda: snapshot))
 
     with flask_app.test_client() as client:
         _login_as_admin(client)
@@ -23,7 +23,7 @@ def mock_execute_query(monkeypatch):
         if "SELECT" in query:
             if "WHERE id =" in query:
                 return [[1, "Title", "Body", "info", "all", 1, 1, "2025-01-01", "2025-12-31", 1, "2025-01-01 12:00:00"]]
-            elif "created_by" in query:
+            elif "WHERE created_by" in query:
                 return [[2, "Trainer Note", "Keep going!", "info", "trainer", 1, 1, None, None, 5, "2025-02-01 12:00:00"]]
             else:
                 return [
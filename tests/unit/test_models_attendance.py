@@ -1,6 +1,7 @@
 import pytest
 from datetime import date, datetime, time
 from app.models import attendance as att_module
+from app.models.time_slot import DEFAULT_SLOTS, SlotCatalog, TimeSlot, minutes_label
 
 
 # -----------------------------------------
@@ -40,8 +41,8 @@ def mock_execute_query(monkeypatch):
     """Mock database query function for Attendance model."""
     mock_data = {
         "attendance": [
-            (1, 2, 3, "2025-01-01T06:00:00", "2025-01-01T07:00:00", "2025-01-01", "6:00 AM - 7:00 AM", "Cardio", "ok", "present", "2025-01-01T06:00:00", "John", "TrainerA"),
-            (2, 2, 3, "2025-01-01T07:00:00", "2025-01-01T08:00:00", "2025-01-01", "7:00 AM - 8:00 AM", "Yoga", "", "scheduled", "2025-01-01T06:00:00", "John", "TrainerA"),
+            (1, 2, 3, "2025-01-01T06:00:00", "2025-01-01T07:00:00", "2025-01-01", "6:00 AM - 7:00 AM", "Cardio", "ok", "present", "2025-01-01T06:00:00", None, "John", "TrainerA"),
+            (2, 2, 3, "2025-01-01T07:00:00", "2025-01-01T08:00:00", "2025-01-01", "7:00 AM - 8:00 AM", "Yoga", "", "scheduled", "2025-01-01T06:00:00", None, "John", "TrainerA"),
         ]
     }
 
@@ -64,7 +65,21 @@ def mock_execute_query(monkeypatch):
             return mock_data["attendance"]
         return 1
 
+    def fake_execute_many(query, seq_of_params, db_path=None):
+        return len(list(seq_of_params))
+
+    def fake_execute_update(query, params=(), db_path=None):
+        return 1
+
+    catalog = SlotCatalog([TimeSlot(id=i + 1, label=minutes_label(start, end), start_minute=start, end_minute=end)
+                           for i, (start, end) in enumerate(DEFAULT_SLOTS)])
+
     monkeypatch.setattr(att_module, "execute_query", fake_execute_query)
+    monkeypatch.setattr(att_module, "execute_many", fake_execute_many)
+    monkeypatch.setattr(att_module, "execute_update", fake_execute_update)
+    monkeypatch.setattr(att_module, "slot_catalog", lambda db_path=None: catalog)
+    monkeypatch.setattr(att_module.AvailabilityIndex, "bookings", classmethod(
+        lambda cls, trainer_ids, days, db_path=None: {(t, d.isoformat()): () for t in trainer_ids for d in days}))
     return fake_execute_query
 
 
@@ -112,7 +127,7 @@ def test_attendance_repr_and_str():
 
 def test_from_attendance_row_creates_instance():
     row = (1, 2, 3, "2025-01-01T06:00:00", "2025-01-01T07:00:00",
-           "2025-01-01", "6:00 AM - 7:00 AM", "Cardio", "ok", "present", "2025-01-01T06:00:00", "John", "TrainerA")
+           "2025-01-01", "6:00 AM - 7:00 AM", "Cardio", "ok", "present", "2025-01-01T06:00:00", None, "John", "TrainerA")
     att = att_module.Attendance._from_attendance_row(row)
     assert isinstance(att, att_module.Attendance)
     assert att.member_id == 2
@@ -200,10 +215,28 @@ def test_get_member_attendance_percentage(mock_execute_query):
     assert pct > 0
 
 
-def test_auto_mark_absent(mock_execute_query):
-    updated = att_module.Attendance.auto_mark_absent()
-    assert isinstance(updated, int)
-    assert updated >= 0
+def test_auto_mark_absent(mock_execute_query, monkeypatch):
+    statements = []
+
+    def fake_execute_update(query, params=(), db_path=None):
+        statements.append((" ".join(query.split()), params))
+        return 1
+
+    monkeypatch.setattr(att_module, "execute_update", fake_execute_update)
+    updated = att_module.Attendance.auto_mark_absent(now=datetime(2025, 1, 2, 9, 0))
+    # a single set-based UPDATE on the precomputed end time, no per-row parsing
+    assert updated == 1
+    assert statements[-1] == (
+        "UPDATE attendance SET status = 'absent' WHERE status = 'scheduled' AND slot_end_at < ?",
+        ("2025-01-02T09:00:00",),
+    )
+
+
+def test_slot_end_at():
+    assert att_module.slot_end_at("6:00 AM - 8:00 AM", "2025-01-01") == "2025-01-01T08:00:00"
+    assert att_module.slot_end_at("6:00 PM", date(2025, 1, 1)) == "2025-01-01T19:00:00"
+    assert att_module.slot_end_at("Morning", "2025-01-01") == "2025-01-02T00:00:00"
+    assert att_module.slot_end_at("6:00 AM - 8:00 AM", None) is None
 
 
 def test_get_member_scheduled_on_date(mock_execute_query):
@@ -104,3 +104,197 @@ def test_execute_query_commit_and_fetch(tmp_path):
     # Fetch
     rows = database.execute_query("SELECT * FROM demo", db_path=str(db_file), fetch=True)
     assert len(rows) == 1 and rows[0][1] == "john"
+
+
+# --- Connection pool tests ---
+@pytest.fixture
+def pooled_app(tmp_path):
+    from flask import Flask
+    app = Flask("pool_test")
+    app.config["DATABASE_PATH"] = str(tmp_path / "pool.sqlite")
+    database.init_app(app)
+    conn = sqlite3.connect(app.config["DATABASE_PATH"])
+    conn.execute("CREATE TABLE demo (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    yield app
+    database.close_pools()
+
+
+def test_execute_query_reuses_connection_within_app_context(pooled_app):
+    db_path = pooled_app.config["DATABASE_PATH"]
+    with pooled_app.app_context():
+        database.execute_query("INSERT INTO demo (name) VALUES (?)", ("a",), db_path)
+        first = database._request_connection(db_path)
+        rows = database.execute_query("SELECT name FROM demo", db_path=db_path, fetch=True)
+        assert rows[0][0] == "a"
+        assert database._request_connection(db_path) is first
+
+    # Teardown returns the connection, so the next context gets the same one back
+    with pooled_app.app_context():
+        assert database._request_connection(db_path) is first
+
+
+def test_pool_raises_when_exhausted(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / "tiny.sqlite"), size=1, timeout=0.01)
+    conn = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_pool_release_discards_uncommitted_work(pooled_app):
+    db_path = pooled_app.config["DATABASE_PATH"]
+    pool = database.ConnectionPool(db_path, size=1)
+    conn = pool.acquire()
+    conn.execute("INSERT INTO demo (name) VALUES ('dangling')")
+    pool.release(conn)
+    assert conn.execute("SELECT COUNT(*) FROM demo").fetchone()[0] == 0
+
+
+def test_init_db_applies_versioned_indexes(tmp_path, mock_flask_context):
+    db_file = tmp_path / "indexed.sqlite"
+    database.init_db(str(db_file))
+    conn = sqlite3.connect(str(db_file))
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_attendance_member_date", "idx_payments_status_date", "idx_users_reset_token"} <= indexes
+    # superseded by idx_attendance_trainer_date_slot_id in a later version
+    assert "idx_attendance_trainer_date_slot_id" in indexes
+    assert "idx_attendance_trainer_date_slot" not in indexes
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == database.INDEX_VERSION
+    conn.close()
+
+
+# --- Bulk write tests ---
+def _make_demo_db(path, rows=0):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE demo (id INTEGER PRIMARY KEY, name TEXT UNIQUE, flag INTEGER DEFAULT 0)")
+    conn.executemany("INSERT INTO demo (name) VALUES (?)", [(f"n{i}",) for i in range(rows)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_execute_update_returns_rowcount(tmp_path):
+    db_path = _make_demo_db(tmp_path / "update.sqlite", rows=10)
+    assert database.execute_update("UPDATE demo SET flag = 1 WHERE id <= ?", (4,), db_path) == 4
+    assert database.execute_update("DELETE FROM demo WHERE flag = 0", (), db_path) == 6
+    with database.transaction(db_path):
+        assert database.execute_update("UPDATE demo SET flag = 2", (), db_path) == 4
+
+
+def test_execute_many_returns_affected_count(tmp_path):
+    db_path = _make_demo_db(tmp_path / "bulk.sqlite", rows=10)
+    updated = database.execute_many("UPDATE demo SET flag = 1 WHERE id = ?", [(i,) for i in range(1, 6)], db_path)
+    assert updated == 5
+    assert database.execute_many("UPDATE demo SET flag = 1 WHERE id = ?", [], db_path) == 0
+
+
+def test_execute_batches_is_all_or_nothing(tmp_path):
+    db_path = _make_demo_db(tmp_path / "atomic.sqlite", rows=3)
+    with pytest.raises(sqlite3.IntegrityError):
+        database.execute_batches([
+            ("UPDATE demo SET flag = 1 WHERE id = ?", [(1,), (2,)]),
+            ("INSERT INTO demo (name) VALUES (?)", [("fresh",), ("n0",)]),  # n0 violates UNIQUE
+        ], db_path)
+    rows = database.execute_query("SELECT COUNT(*), SUM(flag) FROM demo", db_path=db_path, fetch=True)
+    assert tuple(rows[0]) == (3, 0)
+
+
+# --- Unit of work ---
+def test_transaction_commits_once_on_success(tmp_path):
+    db_path = _make_demo_db(tmp_path / "uow.sqlite", rows=2)
+    with database.transaction(db_path):
+        database.execute_query("UPDATE demo SET flag = 1 WHERE id = 1", (), db_path)
+        database.execute_many("INSERT INTO demo (name) VALUES (?)", [("a",), ("b",)], db_path)
+        # Not visible to other connections until the block exits
+        other = sqlite3.connect(db_path)
+        assert other.execute("SELECT COUNT(*) FROM demo").fetchone()[0] == 2
+        other.close()
+    rows = database.execute_query("SELECT COUNT(*), SUM(flag) FROM demo", db_path=db_path, fetch=True)
+    assert tuple(rows[0]) == (4, 1)
+
+
+def test_transaction_rollback_leaves_no_partial_state(tmp_path):
+    db_path = _make_demo_db(tmp_path / "uow_rollback.sqlite", rows=3)
+    with pytest.raises(sqlite3.IntegrityError):
+        with database.transaction(db_path):
+            database.execute_query("DELETE FROM demo WHERE id = 1", (), db_path)
+            database.execute_query("UPDATE demo SET flag = 1", (), db_path)
+            database.execute_query("INSERT INTO demo (name) VALUES ('n2')", (), db_path)  # UNIQUE violation
+    rows = database.execute_query("SELECT COUNT(*), SUM(flag) FROM demo", db_path=db_path, fetch=True)
+    assert tuple(rows[0]) == (3, 0)
+
+
+def test_nested_transaction_rolls_back_to_savepoint(tmp_path):
+    db_path = _make_demo_db(tmp_path / "uow_nested.sqlite", rows=1)
+    with database.transaction(db_path):
+        database.execute_query("INSERT INTO demo (name) VALUES ('outer')", (), db_path)
+        with pytest.raises(ValueError):
+            with database.transaction(db_path):
+                database.execute_query("INSERT INTO demo (name) VALUES ('inner')", (), db_path)
+                raise ValueError("abort inner")
+    names = {r[0] for r in database.execute_query("SELECT name FROM demo", db_path=db_path, fetch=True)}
+    assert names == {"n0", "outer"}
+
+
+def test_transaction_uses_request_connection(pooled_app):
+    db_path = pooled_app.config["DATABASE_PATH"]
+    with pooled_app.app_context():
+        with database.transaction() as conn:
+            assert conn is database._request_connection(db_path)
+            database.execute_query("INSERT INTO demo (name) VALUES ('x')", (), db_path)
+        assert not conn.in_transaction
+
+
+# --- Schema versioning ---
+def test_ensure_schema_runs_init_db_once(tmp_path, mock_flask_context, monkeypatch):
+    db_file = str(tmp_path / "versioned.sqlite")
+    assert database.ensure_schema(db_file) is True
+
+    conn = sqlite3.connect(db_file)
+    assert database.get_schema_version(conn.cursor()) == database.SCHEMA_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0  # no seeding at startup
+    conn.close()
+
+    def fail(cursor):
+        raise AssertionError("warm start must not rebuild the schema")
+
+    monkeypatch.setattr(database, "_create_schema", fail)
+    assert database.ensure_schema(db_file) is False
+    assert database.init_db(db_file) is False
+
+
+def test_get_schema_version_of_legacy_database(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.sqlite"))
+    assert database.get_schema_version(conn.cursor()) == 0
+    conn.close()
+
+
+def test_data_versions_count_writes(tmp_path):
+    db_path = str(tmp_path / "versions.db")
+    database.init_db(db_path)
+    before = database.get_data_versions(('equipment', 'payments'), db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO equipment (name, category) VALUES ('Bike', 'cardio')")
+    conn.execute("UPDATE equipment SET status = 'maintenance'")
+    conn.execute("DELETE FROM equipment")
+    conn.commit()
+    conn.close()
+
+    assert database.get_data_versions(('equipment', 'payments'), db_path) == (before[0] + 3, before[1])
+
+
+def test_iter_query_fetches_in_chunks(tmp_path):
+    db_path = str(tmp_path / "iter.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT INTO t (id) VALUES (?)", [(i,) for i in range(1, 26)])
+    conn.commit()
+    conn.close()
+
+    rows = database.iter_query("SELECT id FROM t WHERE id > ? ORDER BY id", (5,), db_path, chunk_size=7)
+    assert not isinstance(rows, list)
+    assert [row[0] for row in rows] == list(range(6, 26))
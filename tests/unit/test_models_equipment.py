@@ -49,7 +49,7 @@ def test_get_all_and_get_by_id_and_get_working_counts(monkeypatch, flask_app):
 
     def fake_execute_query(query, params=(), db_path=None, fetch=False):
         q = (query or "").lower()
-        if "select * from equipment order by name" in q:
+        if "from equipment order by name" in q:
             return all_rows if fetch else None
         if "where id = ?" in q:
             # return first row if param == 1 else second
@@ -1,4 +1,5 @@
 # tests/unit/test_models_payment.py
+import sqlite3
 import sys
 from types import SimpleNamespace, ModuleType
 from datetime import date, datetime, timedelta
@@ -344,6 +345,15 @@ def test_process_pending_payments_sends_reminders_and_cancels(monkeypatch, flask
 
     monkeypatch.setattr(payment_module, "execute_query", fake_exec)
 
+    # status/flag updates are written in one batch transaction
+    def fake_batches(batches, db_path=None):
+        for q, seq in batches:
+            for p in seq:
+                calls["updates"].append((q, p))
+        return [len(seq) for _, seq in batches]
+
+    monkeypatch.setattr(payment_module, "execute_batches", fake_batches)
+
     # stub email utils so calls don't fail
     fake_email = ModuleType("utils.email_utils")
     def fake_rem(email, name, due, days_left, invoice):
@@ -361,4 +371,39 @@ def test_process_pending_payments_sends_reminders_and_cancels(monkeypatch, flask
     # Expect at least one reminder and one cancellation performed
     assert any("reminder_sent" in u[0].lower() or "update payments set reminder_sent" in u[0].lower() for u in calls["updates"]) or result["reminders_sent"]
     assert any("cancelled_processed" in u[0].lower() or "update payments set cancelled_processed" in u[0].lower() for u in calls["updates"]) or result["cancellations_done"]
+    assert ("UPDATE users SET is_active = 0 WHERE id = ?", (502,)) in calls["updates"]
+
+
+
+def test_process_pending_payments_sends_no_email_when_the_batch_fails(monkeypatch, flask_app):
+    """Emails go out only after the flag updates commit, so a failed write can't cause repeats"""
+    today = date.today()
+    row_reminder = list(make_payment_row(id=111, member_id=211, plan_id=311, amount=10.0, method="cash",
+                                         status="pending", payment_date=None,
+                                         due_date=(today + timedelta(days=5)).isoformat(),
+                                         created_at=datetime.now().isoformat(), invoice="INV111"))
+    row_reminder.extend([511, "remind@example.com", "Remind Person"])
+    row_cancel = list(make_payment_row(id=112, member_id=212, plan_id=312, amount=20.0, method="cash",
+                                       status="pending", payment_date=None,
+                                       due_date=(today - timedelta(days=2)).isoformat(),
+                                       created_at=datetime.now().isoformat(), invoice="INV112"))
+    row_cancel.extend([512, "cancel@example.com", "Cancel Person"])
+    monkeypatch.setattr(payment_module, "execute_query",
+                        lambda q, p=(), db_path=None, fetch=False: [tuple(row_reminder), tuple(row_cancel)])
+
+    def failing_batches(batches, db_path=None):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(payment_module, "execute_batches", failing_batches)
+
+    sent = []
+    fake_email = ModuleType("utils.email_utils")
+    fake_email.send_membership_payment_reminder = lambda *args: sent.append(("reminder",) + args)
+    fake_email.send_membership_cancelled_notification = lambda *args: sent.append(("cancelled",) + args)
+    monkeypatch.setitem(sys.modules, "utils.email_utils", fake_email)
+
+    with flask_app.app_context():
+        result = Payment.process_pending_payments(reminder_before_days=5)
 
+    assert result == {'reminders_sent': [], 'cancellations_done': []}
+    assert sent == []
@@ -0,0 +1,57 @@
+# tests/unit/test_models_rows.py
+from app.models.announcement import ANNOUNCEMENT, Announcement
+from app.models.equipment import EQUIPMENT_LIST, Equipment
+from app.models.rows import RowMapper
+from app.models.trainer import TRAINER_SUMMARY, TRAINER_WITH_NAME
+
+
+class Gadget:
+    def __init__(self, id=None, name=None, enabled=False, notes="n/a"):
+        self.id = id
+        self.name = name
+        self.enabled = enabled
+        self.notes = notes
+
+    def label(self):
+        return f"{self.id}:{self.name}"
+
+
+def test_mapper_builds_objects_with_conversions_and_defaults():
+    mapper = RowMapper(Gadget, ["id", "name", "enabled"], converters={"enabled": bool},
+                       defaults={"name": "unnamed"})
+    gadget = mapper.one((3, None, 1))
+    assert isinstance(gadget, Gadget)
+    assert (gadget.id, gadget.name, gadget.enabled) == (3, "unnamed", True)
+    assert gadget.notes == "n/a"  # unselected attribute keeps its __init__ default
+    assert gadget.label() == "3:unnamed"
+    assert mapper.all([]) == [] and mapper.one(None) is None
+
+
+def test_mapper_select_list_uses_alias_and_expressions():
+    mapper = RowMapper(Gadget, ["id", "name"], alias="g").extend(("owner", "u.full_name"))
+    assert mapper.select == "g.id, g.name, u.full_name AS owner"
+    assert mapper.subset("name", extra=[("n", "COUNT(*)")]).select == "g.name, COUNT(*) AS n"
+
+
+def test_light_rows_are_namedtuples():
+    mapper = RowMapper(Gadget, ["id", "name"])
+    rows = mapper.light([(1, "a"), (2, "b")])
+    assert rows[1].name == "b" and rows[1] == (2, "b")
+    assert not hasattr(rows[0], "__dict__")
+
+
+def test_model_mappers_select_explicit_columns():
+    assert "*" not in ANNOUNCEMENT.select
+    assert ANNOUNCEMENT.one([1, "T", "C", "general", "all", 1, 0, None, None, 1, None]).is_active is False
+    assert "maintenance_notes" not in EQUIPMENT_LIST.select
+    assert "bio" not in TRAINER_SUMMARY.select
+    trainer = TRAINER_WITH_NAME.one(tuple(range(12)) + ("Coach",))
+    assert trainer.full_name == "Coach" and trainer.bio == 8
+    assert isinstance(Equipment._from_row((5, "Bike")), Equipment)
+    assert isinstance(ANNOUNCEMENT.one([1] * 11), Announcement)
+
+
+def test_one_ignores_extra_columns():
+    mapper = RowMapper(Gadget, ['id', 'name'])
+    gadget = mapper.one((5, "Lamp", "unexpected"))
+    assert (gadget.id, gadget.name, gadget.notes) == (5, "Lamp", "n/a")
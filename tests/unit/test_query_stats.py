@@ -0,0 +1,72 @@
+# tests/unit/test_query_stats.py
+import logging
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from app.models import database
+from app.utils import query_stats
+
+
+class DietLike:
+    @classmethod
+    def load_meals(cls, db_path, plan_ids):
+        return [database.execute_query("SELECT id FROM meals WHERE plan_id = ?", (pid,), db_path, fetch=True)
+                for pid in plan_ids]
+
+
+@pytest.fixture
+def stats_app(tmp_path):
+    db_path = str(tmp_path / "stats.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY, plan_id INTEGER)")
+    conn.commit()
+    conn.close()
+
+    app = Flask("stats_test")
+    app.config["DATABASE_PATH"] = db_path
+    database.init_app(app)
+    query_stats.init_app(app)
+
+    @app.route("/plans")
+    def plans():
+        DietLike.load_meals(db_path, range(6))
+        return "ok"
+
+    query_stats.reset()
+    yield app
+    query_stats.reset()
+    database.close_pools()
+
+
+def test_requests_are_counted_and_n_plus_one_flagged(stats_app, caplog):
+    client = stats_app.test_client()
+    with caplog.at_level(logging.WARNING):
+        resp = client.get("/plans")
+    assert resp.status_code == 200
+    assert 'db;desc="6 queries"' in resp.headers["Server-Timing"]
+
+    (route,) = query_stats.top_routes()
+    assert route.endpoint == "plans"
+    assert route.requests == 1 and route.queries == 6
+    (pattern,) = route.n_plus_one
+    assert "DietLike.load_meals" in pattern
+    assert any("Possible N+1" in r.getMessage() for r in caplog.records)
+
+
+def test_slow_queries_are_logged_with_caller(stats_app, caplog):
+    stats_app.config["SLOW_QUERY_MS"] = 0
+    with stats_app.app_context(), caplog.at_level(logging.WARNING):
+        DietLike.load_meals(stats_app.config["DATABASE_PATH"], [42])
+    messages = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert messages and "DietLike.load_meals" in messages[0] and "(42,)" in messages[0]
+
+
+def test_perf_page_requires_admin(client):
+    assert client.get("/admin/_perf").status_code == 302
+    with client.session_transaction() as sess:
+        sess.update(user_id=1, role="admin")
+    resp = client.get("/admin/_perf?sort=db_time")
+    assert resp.status_code == 200
+    assert b"Query Performance" in resp.data
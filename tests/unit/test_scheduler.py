@@ -0,0 +1,78 @@
+# tests/unit/test_scheduler.py
+import sqlite3
+
+import pytest
+
+from app import scheduler
+from app.app import create_app
+from app.models import database
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "jobs.db"))
+    app = create_app()
+    app.config.update(TESTING=True)
+    yield app
+    database.close_pools()
+
+
+@pytest.fixture
+def counting_job(monkeypatch):
+    calls = []
+    monkeypatch.setitem(scheduler.JOBS, "count", scheduler.Job("count", lambda: calls.append(1) or 3, interval=3600))
+    return calls
+
+
+def _runs(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT job_name, status, rows_affected, duration_ms, error FROM job_runs ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_job_runs_once_per_interval_and_is_recorded(app, counting_job):
+    with app.app_context():
+        first = scheduler.run_due_jobs(["count"])
+        second = scheduler.run_due_jobs(["count"])
+        forced = scheduler.run_due_jobs(["count"], force=True)
+
+    assert first["count"] and second["count"] is None and forced["count"]
+    assert len(counting_job) == 2
+    runs = _runs(app.config["DATABASE_PATH"])
+    assert [(name, status, rows) for name, status, rows, _, _ in runs] == [("count", "success", 3)] * 2
+    assert all(duration is not None for _, _, _, duration, _ in runs)
+
+
+def test_lease_held_by_another_worker_skips_the_job(app, counting_job):
+    db_path = app.config["DATABASE_PATH"]
+    with app.app_context():
+        assert scheduler.acquire_lock("count", "other-worker", 60, db_path)
+        assert scheduler.run_due_jobs(["count"])["count"] is None
+        assert counting_job == []
+
+        # Leases expire, so a crashed holder does not block the job forever
+        assert scheduler.acquire_lock("stale", "dead-worker", -1, db_path)
+        assert scheduler.acquire_lock("stale", "me", 60, db_path)
+
+
+def test_failed_job_is_recorded_and_retried(app, monkeypatch):
+    def boom():
+        raise RuntimeError("mail server down")
+    monkeypatch.setitem(scheduler.JOBS, "boom", scheduler.Job("boom", boom, interval=3600))
+
+    with app.app_context():
+        scheduler.run_due_jobs(["boom"])
+        assert scheduler.run_due_jobs(["boom"])["boom"]  # a failure does not count as the last run
+
+    runs = _runs(app.config["DATABASE_PATH"])
+    assert [(status, error) for _, status, _, _, error in runs] == [("failed", "mail server down")] * 2
+
+
+def test_run_jobs_command(app, counting_job):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["run-jobs", "--job", "count"])
+    assert result.exit_code == 0, result.output
+    assert "count: run #" in result.output
+    assert "not due" in runner.invoke(args=["run-jobs", "--job", "count"]).output
+    assert runner.invoke(args=["run-jobs", "--job", "nope"]).exit_code != 0